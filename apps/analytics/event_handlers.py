@@ -0,0 +1,22 @@
+"""Обработчики доменных событий для аналитических агрегатов."""
+
+from __future__ import annotations
+
+from shared.application.message_bus import message_bus
+
+from .rollups import mark_stale
+
+
+def mark_rollups_stale_on_booking_created(event) -> None:  # type: ignore
+    """Помечает агрегат объекта за день создания брони как устаревший.
+
+    Сам пересчёт делает периодическая задача ``analytics.refresh_stale_daily_stats``.
+    """
+
+    mark_stale(event.property_id, event.occurred_at)
+
+
+def register_event_handlers() -> None:
+    from apps.bookings.domain.events import BookingCreated
+
+    message_bus.register_event_handler(BookingCreated, mark_rollups_stale_on_booking_created)
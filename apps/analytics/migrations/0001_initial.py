@@ -0,0 +1,97 @@
+# Generated by Django 5.1.12 on 2026-10-16 20:02
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('properties', '0004_propertyaccessinfo_propertyaccesslog'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property_id', models.BigIntegerField()),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Устаревшая дневная статистика',
+                'verbose_name_plural': 'Устаревшая дневная статистика',
+                'constraints': [models.UniqueConstraint(fields=('property_id', 'date'), name='analytics_stale_day_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AgencyDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings_count', models.PositiveIntegerField(default=0, help_text='Созданные брони')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Успешные платежи по дате оплаты', max_digits=14)),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0, help_text='Сумма оценок отзывов')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('agency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='users.realestateagency')),
+            ],
+            options={
+                'verbose_name': 'Дневная статистика агентства',
+                'verbose_name_plural': 'Дневная статистика агентств',
+                'ordering': ['date'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('agency', 'date'), name='analytics_agency_day_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OwnerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings_count', models.PositiveIntegerField(default=0, help_text='Созданные брони')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Успешные платежи по дате оплаты', max_digits=14)),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0, help_text='Сумма оценок отзывов')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Дневная статистика владельца',
+                'verbose_name_plural': 'Дневная статистика владельцев',
+                'ordering': ['date'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('owner', 'date'), name='analytics_owner_day_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertyDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings_count', models.PositiveIntegerField(default=0, help_text='Созданные брони')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Успешные платежи по дате оплаты', max_digits=14)),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0, help_text='Сумма оценок отзывов')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('agency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.realestateagency')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='properties.property')),
+            ],
+            options={
+                'verbose_name': 'Дневная статистика объекта',
+                'verbose_name_plural': 'Дневная статистика объектов',
+                'ordering': ['date'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['date', 'owner'], name='analytics_prop_day_owner_idx'), models.Index(fields=['date', 'agency'], name='analytics_prop_day_agency_idx')],
+                'constraints': [models.UniqueConstraint(fields=('property', 'date'), name='analytics_property_day_unique')],
+            },
+        ),
+    ]
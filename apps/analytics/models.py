@@ -1,3 +1,136 @@
-"""Domain models placeholder."""
+"""Daily analytics rollups.
 
-# Models will be defined in subsequent iterations.
+Агрегаты считаются по дням на трёх уровнях: объект, владелец и агентство.
+Строки объектов пересчитываются из исходных таблиц, строки владельцев и
+агентств — из строк объектов за тот же день. Пустые дни не хранятся.
+
+Дни, требующие пересчёта, помечаются строками ``StaleDailyStats`` в той же
+транзакции, что и изменение брони, платежа или отзыва; периодическая задача
+пересчитывает помеченные дни (см. ``apps.analytics.rollups``).
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.conf import settings  # type: ignore
+from django.db import models  # type: ignore
+from django.utils.translation import gettext_lazy as _  # type: ignore
+
+
+class DailyStats(models.Model):
+    """Общие поля дневного агрегата."""
+
+    date = models.DateField()
+    bookings_count = models.PositiveIntegerField(default=0, help_text=_("Созданные брони"))
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        help_text=_("Успешные платежи по дате оплаты"),
+    )
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0, help_text=_("Сумма оценок отзывов"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["date"]
+
+
+class PropertyDailyStats(DailyStats):
+    """Дневной агрегат объекта.
+
+    Владелец и агентство объекта денормализованы, чтобы пересчитывать
+    агрегаты верхних уровней без соединения с ``Property``.
+    """
+
+    property = models.ForeignKey(
+        "properties.Property",
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    agency = models.ForeignKey(
+        "users.RealEstateAgency",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    class Meta(DailyStats.Meta):
+        verbose_name = _("Дневная статистика объекта")
+        verbose_name_plural = _("Дневная статистика объектов")
+        constraints = [
+            models.UniqueConstraint(fields=["property", "date"], name="analytics_property_day_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "owner"], name="analytics_prop_day_owner_idx"),
+            models.Index(fields=["date", "agency"], name="analytics_prop_day_agency_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Property {self.property_id} stats for {self.date}"
+
+
+class OwnerDailyStats(DailyStats):
+    """Дневной агрегат владельца (риелтора)."""
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+
+    class Meta(DailyStats.Meta):
+        verbose_name = _("Дневная статистика владельца")
+        verbose_name_plural = _("Дневная статистика владельцев")
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "date"], name="analytics_owner_day_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Owner {self.owner_id} stats for {self.date}"
+
+
+class AgencyDailyStats(DailyStats):
+    """Дневной агрегат агентства."""
+
+    agency = models.ForeignKey(
+        "users.RealEstateAgency",
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+
+    class Meta(DailyStats.Meta):
+        verbose_name = _("Дневная статистика агентства")
+        verbose_name_plural = _("Дневная статистика агентств")
+        constraints = [
+            models.UniqueConstraint(fields=["agency", "date"], name="analytics_agency_day_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Agency {self.agency_id} stats for {self.date}"
+
+
+class StaleDailyStats(models.Model):
+    """Пометка «агрегат объекта за день устарел»."""
+
+    property_id = models.BigIntegerField()
+    date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Устаревшая дневная статистика")
+        verbose_name_plural = _("Устаревшая дневная статистика")
+        constraints = [
+            models.UniqueConstraint(fields=["property_id", "date"], name="analytics_stale_day_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Stale stats of property {self.property_id} for {self.date}"
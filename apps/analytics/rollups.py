@@ -0,0 +1,241 @@
+"""Maintenance of daily analytics rollups.
+
+Показатели дня объекта:
+
+- ``bookings_count`` — брони, созданные в этот день (любой статус);
+- ``revenue`` — успешные платежи, оплаченные в этот день;
+- ``reviews_count``/``rating_sum`` — отзывы, оставленные в этот день.
+
+Дни определяются в часовом поясе проекта. Пересчёт дня идемпотентен:
+строки объектов собираются тремя сгруппированными запросами за день,
+строки владельцев и агентств — суммированием строк объектов. Поэтому
+инкрементальное обновление сводится к пересчёту помеченных дней.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction  # type: ignore
+from django.db.models import Count, Sum  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .models import (
+    AgencyDailyStats,
+    OwnerDailyStats,
+    PropertyDailyStats,
+    StaleDailyStats,
+)
+
+STALE_BATCH_SIZE = 1000
+METRIC_FIELDS = ("bookings_count", "revenue", "reviews_count", "rating_sum")
+
+
+def _as_date(value: date | datetime) -> date:
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """Границы дня ``[начало, начало следующего дня)`` в часовом поясе проекта."""
+
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def mark_stale(property_id: int, moment: date | datetime | None = None) -> None:
+    """Помечает агрегат объекта за день как устаревший.
+
+    Вызывается в транзакции изменения, поэтому пометка видна задаче
+    пересчёта только вместе с самим изменением.
+    """
+
+    if not property_id:
+        return
+    day = _as_date(moment) if moment else timezone.localdate()
+    StaleDailyStats.objects.bulk_create(
+        [StaleDailyStats(property_id=property_id, date=day)],
+        ignore_conflicts=True,
+    )
+
+
+def _empty() -> dict:
+    return {"bookings_count": 0, "revenue": Decimal("0.00"), "reviews_count": 0, "rating_sum": 0}
+
+
+def _collect_property_metrics(day: date, property_ids: list[int] | None) -> dict[int, dict]:
+    from apps.bookings.models import Booking
+    from apps.finances.models import Payment
+    from apps.reviews.models import Review
+
+    start, end = day_bounds(day)
+    bookings = Booking.objects.filter(created_at__gte=start, created_at__lt=end)
+    payments = Payment.objects.filter(
+        status=Payment.Status.SUCCESS,
+        paid_at__gte=start,
+        paid_at__lt=end,
+    )
+    reviews = Review.objects.filter(created_at__gte=start, created_at__lt=end)
+    if property_ids is not None:
+        bookings = bookings.filter(property_id__in=property_ids)
+        payments = payments.filter(booking__property_id__in=property_ids)
+        reviews = reviews.filter(property_id__in=property_ids)
+
+    metrics: dict[int, dict] = defaultdict(_empty)
+    for row in bookings.order_by().values("property_id").annotate(total=Count("id")):
+        metrics[row["property_id"]]["bookings_count"] = row["total"]
+    for row in (
+        payments.order_by()
+        .values("booking__property_id")
+        .annotate(total=Sum("amount"))
+    ):
+        metrics[row["booking__property_id"]]["revenue"] = row["total"] or Decimal("0.00")
+    for row in reviews.order_by().values("property_id").annotate(total=Count("id"), rating=Sum("rating")):
+        metrics[row["property_id"]]["reviews_count"] = row["total"]
+        metrics[row["property_id"]]["rating_sum"] = row["rating"] or 0
+    return metrics
+
+
+def _is_empty(values: dict) -> bool:
+    return not any(values[field] for field in METRIC_FIELDS)
+
+
+def _upsert(model, rows: list, unique_fields: list[str], extra_fields: tuple[str, ...] = ()) -> None:  # type: ignore
+    if rows:
+        model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=[*METRIC_FIELDS, *extra_fields, "updated_at"],
+        )
+
+
+def _refresh_parent(model, key: str, day: date, ids: set[int]) -> None:  # type: ignore
+    """Пересчитывает строки владельцев или агентств из строк объектов."""
+
+    ids.discard(None)  # type: ignore[arg-type]
+    if not ids:
+        return
+    totals = {
+        row[key]: row
+        for row in PropertyDailyStats.objects.filter(date=day, **{f"{key}__in": ids})
+        .order_by()
+        .values(key)
+        .annotate(
+            bookings_count=Sum("bookings_count"),
+            revenue=Sum("revenue"),
+            reviews_count=Sum("reviews_count"),
+            rating_sum=Sum("rating_sum"),
+        )
+    }
+    _upsert(
+        model,
+        [
+            model(date=day, **{key: parent_id}, **{field: row[field] for field in METRIC_FIELDS})
+            for parent_id, row in totals.items()
+        ],
+        unique_fields=[key.removesuffix("_id"), "date"],
+    )
+    model.objects.filter(date=day, **{f"{key}__in": ids - set(totals)}).delete()
+
+
+def refresh_day(day: date, property_ids: Iterable[int] | None = None) -> int:
+    """Пересчитывает агрегаты дня.
+
+    Args:
+        day: день в часовом поясе проекта.
+        property_ids: ограничить пересчёт объектами; ``None`` — все объекты дня.
+
+    Returns:
+        int: количество пересчитанных объектов.
+    """
+
+    from apps.properties.models import Property
+
+    property_ids = None if property_ids is None else list(set(property_ids))
+    metrics = _collect_property_metrics(day, property_ids)
+
+    existing = PropertyDailyStats.objects.filter(date=day)
+    if property_ids is not None:
+        existing = existing.filter(property_id__in=property_ids)
+    previous = {
+        pid: (owner_id, agency_id)
+        for pid, owner_id, agency_id in existing.values_list("property_id", "owner_id", "agency_id")
+    }
+
+    targets = set(metrics) | set(previous)
+    if not targets:
+        return 0
+    owners = {
+        pid: (owner_id, agency_id)
+        for pid, owner_id, agency_id in Property.objects.filter(id__in=targets).values_list(
+            "id", "owner_id", "agency_id"
+        )
+    }
+
+    with transaction.atomic():
+        _upsert(
+            PropertyDailyStats,
+            [
+                PropertyDailyStats(
+                    property_id=pid,
+                    owner_id=owners[pid][0],
+                    agency_id=owners[pid][1],
+                    date=day,
+                    **values,
+                )
+                for pid, values in metrics.items()
+                if pid in owners and not _is_empty(values)
+            ],
+            unique_fields=["property", "date"],
+            # Владелец и агентство объекта могли смениться
+            extra_fields=("owner", "agency"),
+        )
+        stale = [pid for pid in targets if pid not in owners or _is_empty(metrics.get(pid) or _empty())]
+        if stale:
+            PropertyDailyStats.objects.filter(date=day, property_id__in=stale).delete()
+
+        affected = list(owners.values()) + list(previous.values())
+        _refresh_parent(OwnerDailyStats, "owner_id", day, {owner_id for owner_id, _ in affected})
+        _refresh_parent(AgencyDailyStats, "agency_id", day, {agency_id for _, agency_id in affected})
+    return len(targets)
+
+
+def refresh_stale(batch_size: int = STALE_BATCH_SIZE) -> dict[str, int]:
+    """Пересчитывает дни, помеченные ``mark_stale``.
+
+    Пометки забираются с ``SKIP LOCKED`` и удаляются в той же транзакции,
+    что и пересчёт: изменение, зафиксированное во время пересчёта, оставит
+    новую пометку и будет учтено следующим запуском.
+    """
+
+    with transaction.atomic():
+        marks = list(
+            StaleDailyStats.objects.order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", "property_id", "date")[:batch_size]
+        )
+        by_day: dict[date, set[int]] = defaultdict(set)
+        for _, property_id, day in marks:
+            by_day[day].add(property_id)
+        refreshed = 0
+        for day, property_ids in sorted(by_day.items()):
+            refreshed += refresh_day(day, property_ids)
+        StaleDailyStats.objects.filter(id__in=[mark_id for mark_id, _, _ in marks]).delete()
+    return {"marks": len(marks), "days": len(by_day), "properties": refreshed}
+
+
+def rebuild_days(start: date, end: date) -> int:
+    """Полностью пересчитывает дни ``[start, end]`` (сверка и первичное заполнение)."""
+
+    refreshed = 0
+    day = start
+    while day <= end:
+        refreshed += refresh_day(day)
+        day += timedelta(days=1)
+    return refreshed
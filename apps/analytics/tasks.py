@@ -0,0 +1,63 @@
+"""Celery tasks for analytics rollups."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+
+from celery import shared_task  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .rollups import STALE_BATCH_SIZE, rebuild_days, refresh_stale
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES_PER_RUN = 20
+RECONCILE_DAYS = 2
+
+
+@shared_task(name="analytics.refresh_stale_daily_stats")
+def refresh_stale_daily_stats() -> dict[str, int]:
+    """
+    Инкрементальное обновление дневных агрегатов.
+
+    Пересчитывает дни объектов, помеченные при изменении броней, платежей
+    и отзывов. Запускается каждые 5 минут через Celery Beat.
+
+    Returns:
+        dict: {"marks", "days", "properties"}
+    """
+    totals = {"marks": 0, "days": 0, "properties": 0}
+    for _ in range(MAX_BATCHES_PER_RUN):
+        stats = refresh_stale()
+        for key, value in stats.items():
+            totals[key] += value
+        if stats["marks"] < STALE_BATCH_SIZE:
+            break
+    if totals["marks"]:
+        logger.info(f"Refreshed analytics rollups: {totals}")
+    return totals
+
+
+@shared_task(name="analytics.rebuild_daily_stats")
+def rebuild_daily_stats(
+    start: str | None = None,
+    end: str | None = None,
+    days: int = RECONCILE_DAYS,
+) -> dict[str, int]:
+    """
+    Полный пересчёт агрегатов за период.
+
+    По умолчанию сверяет последние ``days`` дней (ежедневно ночью через
+    Celery Beat). С ``start``/``end`` (ISO-даты) используется для первичного
+    заполнения таблиц.
+
+    Returns:
+        dict: {"days": количество дней, "properties": пересчитанных строк объектов}
+    """
+    end_date = date.fromisoformat(end) if end else timezone.localdate()
+    start_date = date.fromisoformat(start) if start else end_date - timedelta(days=days - 1)
+    refreshed = rebuild_days(start_date, end_date)
+    result = {"days": (end_date - start_date).days + 1, "properties": refreshed}
+    logger.info(f"Rebuilt analytics rollups {start_date}..{end_date}: {result}")
+    return result
@@ -0,0 +1,124 @@
+"""Tests for daily analytics rollups and the overview endpoint."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.analytics.event_handlers import mark_rollups_stale_on_booking_created
+from apps.analytics.models import OwnerDailyStats, PropertyDailyStats, StaleDailyStats
+from apps.analytics.rollups import refresh_stale
+from apps.bookings.models import Booking
+from apps.finances.models import Payment
+from apps.properties.models import Property
+from apps.reviews.models import Review
+from apps.users.models import User
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self) -> None:
+        self.guest = User.objects.create_user(
+            email="guest-analytics@example.com",
+            phone="+77000000070",
+            password="GuestPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.owner = User.objects.create_user(
+            email="realtor-analytics@example.com",
+            phone="+77000000071",
+            password="RealtorPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.property = Property.objects.create(
+            owner=self.owner,
+            title="Квартира для аналитики",
+            description="Описание",
+            address_line="ул. Сатпаева, 7",
+            status=Property.Status.ACTIVE,
+            base_price=Decimal("15000.00"),
+            sleeping_places=2,
+            min_nights=1,
+            max_nights=14,
+        )
+        check_in = timezone.localdate() + timedelta(days=3)
+        self.booking = Booking.objects.create(
+            property=self.property,
+            guest=self.guest,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=2),
+        )
+
+    def test_changes_mark_days_and_refresh_builds_all_levels(self) -> None:
+        payment = Payment.objects.create(
+            booking=self.booking,
+            method=Payment.Method.CARD,
+            amount=Decimal("30000.00"),
+        )
+        payment.mark_success("tx-1")
+        Review.objects.create(user=self.guest, property=self.property, booking=self.booking, rating=4)
+
+        self.assertEqual(StaleDailyStats.objects.count(), 1)
+        result = refresh_stale()
+
+        self.assertEqual(result["properties"], 1)
+        self.assertFalse(StaleDailyStats.objects.exists())
+        row = PropertyDailyStats.objects.get(property=self.property)
+        self.assertEqual(row.owner_id, self.owner.id)
+        self.assertEqual(
+            (row.bookings_count, row.revenue, row.reviews_count, row.rating_sum),
+            (1, Decimal("30000.00"), 1, 4),
+        )
+        owner_row = OwnerDailyStats.objects.get(owner=self.owner)
+        self.assertEqual((owner_row.bookings_count, owner_row.revenue), (1, Decimal("30000.00")))
+
+    def test_deleted_source_rows_drop_empty_rollups(self) -> None:
+        refresh_stale()
+        Booking.objects.filter(id=self.booking.id).delete()
+        StaleDailyStats.objects.create(property_id=self.property.id, date=timezone.localdate())
+
+        refresh_stale()
+
+        self.assertFalse(PropertyDailyStats.objects.exists())
+        self.assertFalse(OwnerDailyStats.objects.exists())
+
+    def test_booking_created_event_only_marks_the_day(self) -> None:
+        refresh_stale()
+        yesterday = timezone.now() - timedelta(days=1)
+
+        mark_rollups_stale_on_booking_created(SimpleNamespace(property_id=self.property.id, occurred_at=yesterday))
+
+        self.assertEqual(
+            list(StaleDailyStats.objects.values_list("property_id", "date")),
+            [(self.property.id, timezone.localdate(yesterday))],
+        )
+        self.assertEqual(PropertyDailyStats.objects.count(), 1)
+
+    def test_overview_reads_rollups_with_range_and_granularity(self) -> None:
+        refresh_stale()
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        today = timezone.localdate()
+
+        response = client.get(reverse("analytics-overview"), {"granularity": "month"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["properties"], 1)
+        self.assertEqual(response.data["bookings"], 1)
+        self.assertEqual(len(response.data["series"]), 1)
+        self.assertEqual(response.data["series"][0]["period"], today.replace(day=1))
+
+        past = client.get(
+            reverse("analytics-overview"),
+            {"end": (today - timedelta(days=1)).isoformat()},
+        )
+        self.assertEqual(past.data["bookings"], 0)
+        self.assertNotIn("series", past.data)
+
+        invalid = client.get(reverse("analytics-overview"), {"granularity": "year"})
+        self.assertEqual(invalid.status_code, 400)
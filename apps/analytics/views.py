@@ -1,15 +1,20 @@
 """API views for analytics.
 
 Provides endpoints to retrieve aggregated metrics such as total
-bookings, revenue and average ratings. This implementation is
-simplified and can be extended to match the detailed analytics
-described in the technical specification.
+bookings, revenue and average ratings. Metrics of realtors, agencies and
+the platform are read from the daily rollup tables maintained by
+``apps.analytics.rollups``, the all-time rating from the review summary
+columns of ``Property``; a guest's own metrics are small and are still
+calculated from the source tables.
 """
 
 from __future__ import annotations
 
+from collections import defaultdict
+from datetime import date
 from decimal import Decimal
 
+from rest_framework import serializers  # type: ignore
 from rest_framework.views import APIView  # type: ignore
 from rest_framework.permissions import IsAuthenticated  # type: ignore
 from rest_framework.response import Response  # type: ignore
@@ -19,59 +24,166 @@ from apps.finances.models import Payment
 from apps.properties.models import Property
 from apps.reviews.models import Review
 from django.db import models  # type: ignore
+from django.db.models.functions import Trunc  # type: ignore
+
+from .models import AgencyDailyStats, OwnerDailyStats
+from .rollups import day_bounds
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _empty_totals() -> dict:
+    return {"bookings": 0, "revenue": Decimal("0"), "reviews": 0, "rating_sum": 0}
+
+
+def _present(totals: dict) -> dict:
+    reviews = totals["reviews"]
+    return {
+        "bookings": totals["bookings"],
+        "revenue": totals["revenue"] or Decimal("0"),
+        "avg_rating": round(totals["rating_sum"] / reviews, 2) if reviews else None,
+    }
 
 
 class OverviewAnalyticsView(APIView):
-    """Return general statistics for the platform or a specific user."""
+    """Return general statistics for the platform or a specific user.
+
+    Query parameters:
+        start, end: границы периода (YYYY-MM-DD, включительно), по умолчанию — всё время;
+        granularity: day | week | month — добавляет в ответ ряд ``series``.
+    """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):  # type: ignore
         user = request.user
+        start, end, granularity = self._parse_params(request)
+
         # Determine scope: admin sees all, realtor sees own properties, guest sees their bookings
-        if getattr(user, "is_staff", False) or getattr(user, "is_superuser", False):
-            prop_qs = Property.objects.all()
-            booking_qs = Booking.objects.all()
-            payment_qs = Payment.objects.filter(status=Payment.Status.SUCCESS)
-            review_qs = Review.objects.all()
-        elif hasattr(user, "is_platform_superuser") and user.is_platform_superuser():
+        if getattr(user, "is_staff", False) or getattr(user, "is_superuser", False) or (
+            hasattr(user, "is_platform_superuser") and user.is_platform_superuser()
+        ):
             prop_qs = Property.objects.all()
-            booking_qs = Booking.objects.all()
-            payment_qs = Payment.objects.filter(status=Payment.Status.SUCCESS)
-            review_qs = Review.objects.all()
+            # У каждого объекта есть владелец, поэтому сумма по владельцам — вся платформа
+            stats_qs = OwnerDailyStats.objects.all()
         elif hasattr(user, "is_super_admin") and user.is_super_admin():
             prop_qs = Property.objects.filter(agency=user.agency)
-            booking_qs = Booking.objects.filter(agency=user.agency)
-            payment_qs = Payment.objects.filter(
-                booking__agency=user.agency,
-                status=Payment.Status.SUCCESS,
-            )
-            review_qs = Review.objects.filter(property__agency=user.agency)
+            stats_qs = AgencyDailyStats.objects.filter(agency=user.agency)
         elif hasattr(user, "is_realtor") and user.is_realtor():
             prop_qs = Property.objects.filter(owner=user)
-            booking_qs = Booking.objects.filter(property__owner=user)
-            payment_qs = Payment.objects.filter(
-                booking__property__owner=user, status=Payment.Status.SUCCESS
-            )
-            review_qs = Review.objects.filter(property__owner=user)
+            stats_qs = OwnerDailyStats.objects.filter(owner=user)
         else:
             prop_qs = Property.objects.none()
-            booking_qs = Booking.objects.filter(guest=user)
-            payment_qs = Payment.objects.filter(
-                booking__guest=user, status=Payment.Status.SUCCESS
+            stats_qs = None
+
+        # Количество объектов и сводка их отзывов за всё время — одним запросом
+        summary = prop_qs.aggregate(
+            properties=models.Count("id"),
+            reviews=models.Sum("reviews_count"),
+            rating_sum=models.Sum("rating_sum"),
+        )
+        if stats_qs is not None:
+            if start:
+                stats_qs = stats_qs.filter(date__gte=start)
+            if end:
+                stats_qs = stats_qs.filter(date__lte=end)
+            totals, series = self._from_rollups(stats_qs, granularity)
+            if not start and not end:
+                reviews = summary['reviews'] or 0
+                totals['avg_rating'] = round(summary['rating_sum'] / reviews, 2) if reviews else None
+        else:
+            totals, series = self._from_source_tables(user, start, end, granularity)
+
+        data = {
+            'properties': summary['properties'],
+            'bookings': totals['bookings'],
+            'revenue': totals['revenue'],
+            'avg_rating': totals['avg_rating'],
+            'start': start,
+            'end': end,
+        }
+        if granularity:
+            data['granularity'] = granularity
+            data['series'] = series
+        return Response(data)
+
+    @staticmethod
+    def _parse_params(request) -> tuple[date | None, date | None, str | None]:  # type: ignore
+        params = request.query_params
+        try:
+            start = date.fromisoformat(params["start"]) if params.get("start") else None
+            end = date.fromisoformat(params["end"]) if params.get("end") else None
+        except ValueError:
+            raise serializers.ValidationError(
+                {"detail": "Параметры start и end должны быть в формате YYYY-MM-DD."}
+            )
+        if start and end and start > end:
+            raise serializers.ValidationError({"detail": "Дата start не может быть позже end."})
+        granularity = params.get("granularity") or None
+        if granularity and granularity not in GRANULARITIES:
+            raise serializers.ValidationError(
+                {"detail": f"Параметр granularity должен быть одним из: {', '.join(GRANULARITIES)}."}
+            )
+        return start, end, granularity
+
+    @staticmethod
+    def _from_rollups(stats_qs, granularity: str | None) -> tuple[dict, list[dict]]:  # type: ignore
+        sums = {
+            "bookings": models.Sum("bookings_count"),
+            "revenue": models.Sum("revenue"),
+            "reviews": models.Sum("reviews_count"),
+            "rating_sum": models.Sum("rating_sum"),
+        }
+        totals = _empty_totals()
+        totals.update({key: value for key, value in stats_qs.aggregate(**sums).items() if value is not None})
+
+        series = []
+        if granularity:
+            rows = (
+                stats_qs.order_by()
+                .annotate(period=Trunc("date", granularity, output_field=models.DateField()))
+                .values("period")
+                .annotate(**sums)
+                .order_by("period")
             )
-            review_qs = Review.objects.filter(user=user)
-
-        total_properties = prop_qs.count()
-        total_bookings = booking_qs.count()
-        total_revenue = payment_qs.aggregate(total=models.Sum('amount')).get('total') or Decimal('0')
-        avg_rating = review_qs.aggregate(avg=models.Avg('rating')).get('avg') or None
-
-        return Response(
-            {
-                'properties': total_properties,
-                'bookings': total_bookings,
-                'revenue': total_revenue,
-                'avg_rating': avg_rating,
-            }
+            series = [{"period": row["period"], **_present(row)} for row in rows]
+        return _present(totals), series
+
+    @staticmethod
+    def _from_source_tables(user, start, end, granularity) -> tuple[dict, list[dict]]:  # type: ignore
+        booking_qs = Booking.objects.filter(guest=user)
+        payment_qs = Payment.objects.filter(booking__guest=user, status=Payment.Status.SUCCESS)
+        review_qs = Review.objects.filter(user=user)
+        if start:
+            lower = day_bounds(start)[0]
+            booking_qs = booking_qs.filter(created_at__gte=lower)
+            payment_qs = payment_qs.filter(paid_at__gte=lower)
+            review_qs = review_qs.filter(created_at__gte=lower)
+        if end:
+            upper = day_bounds(end)[1]
+            booking_qs = booking_qs.filter(created_at__lt=upper)
+            payment_qs = payment_qs.filter(paid_at__lt=upper)
+            review_qs = review_qs.filter(created_at__lt=upper)
+
+        sources = (
+            (booking_qs, "created_at", {"bookings": models.Count("id")}),
+            (payment_qs, "paid_at", {"revenue": models.Sum("amount")}),
+            (review_qs, "created_at", {"reviews": models.Count("id"), "rating_sum": models.Sum("rating")}),
         )
+        totals = _empty_totals()
+        periods: dict[date, dict] = defaultdict(_empty_totals)
+        for queryset, moment, aggregates in sources:
+            totals.update({key: value for key, value in queryset.aggregate(**aggregates).items() if value is not None})
+            if not granularity:
+                continue
+            rows = (
+                queryset.order_by()
+                .annotate(period=Trunc(moment, granularity, output_field=models.DateField()))
+                .values("period")
+                .annotate(**aggregates)
+            )
+            for row in rows:
+                periods[row["period"]].update({key: row[key] or 0 for key in aggregates})
+
+        series = [{"period": period, **_present(periods[period])} for period in sorted(periods)]
+        return _present(totals), series
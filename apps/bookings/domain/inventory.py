@@ -13,8 +13,10 @@ Strategy (Defense in Depth):
 3. Pessimistic locking: SELECT FOR UPDATE in transactions
 """
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from typing import List
+from datetime import date
+from typing import Dict, List
 from uuid import UUID, uuid4
 
 from shared.domain.base import Aggregate
@@ -54,6 +56,18 @@ class Inventory(Aggregate):
     - All allocations must have valid date ranges
     - Quantity must be positive
 
+    Allocations are kept sorted by start date. Because they never overlap,
+    they are sorted by end date as well, so overlap checks are a binary
+    search plus a look at the two neighbours - O(log n) regardless of how
+    much booking history the property has. A booking_id -> allocation dict
+    serves lookups by booking.
+
+    Window mode:
+        The repository may load only the allocations overlapping a window
+        (``loaded_window``). Such an inventory can only answer questions about
+        dates inside that window; anything else raises ValueError instead of
+        silently reporting free dates.
+
     Usage:
         # Load inventory for property (with SELECT FOR UPDATE lock)
         inventory = inventory_repo.get_by_property_id(property_id, lock=True)
@@ -65,10 +79,46 @@ class Inventory(Aggregate):
             inventory_repo.save(inventory)
         else:
             raise ValueError("Dates not available")
+
+    Do not mutate ``allocations`` directly - use allocate()/deallocate() so the
+    indexes stay in sync.
     """
 
     property_id: UUID
     allocations: List[Allocation] = field(default_factory=list)
+    loaded_window: DateRange | None = None
+    _starts: List[date] = field(default_factory=list, repr=False, init=False)
+    _by_booking: Dict[UUID, Allocation] = field(default_factory=dict, repr=False, init=False)
+
+    def __post_init__(self):
+        self.allocations.sort(key=lambda a: (a.dates.start_date, a.dates.end_date))
+        self._starts = [a.dates.start_date for a in self.allocations]
+        self._by_booking = {
+            a.booking_id: a for a in self.allocations if a.booking_id is not None
+        }
+
+    def _ensure_loaded(self, dates: DateRange):
+        window = self.loaded_window
+        if window is not None and not (
+            window.start_date <= dates.start_date and dates.end_date <= window.end_date
+        ):
+            raise ValueError(
+                f"Dates {dates} are outside the loaded window {window} "
+                f"of inventory for property {self.property_id}"
+            )
+
+    def _find_overlapping(self, dates: DateRange) -> Allocation | None:
+        """First allocation overlapping ``dates`` (or None)."""
+        index = bisect_left(self._starts, dates.end_date)
+        # Only the last allocation starting before dates.end_date can overlap
+        # without an earlier one overlapping too: ends are sorted like starts.
+        if index and self.allocations[index - 1].dates.end_date > dates.start_date:
+            # Walk back to the earliest overlapping allocation for a stable answer
+            first = index - 1
+            while first and self.allocations[first - 1].dates.end_date > dates.start_date:
+                first -= 1
+            return self.allocations[first]
+        return None
 
     def can_allocate(self, dates: DateRange) -> bool:
         """
@@ -77,10 +127,8 @@ class Inventory(Aggregate):
         Returns True if dates are available, False otherwise.
         This is the first line of defense against double bookings.
         """
-        for allocation in self.allocations:
-            if allocation.dates.overlaps_with(dates):
-                return False
-        return True
+        self._ensure_loaded(dates)
+        return self._find_overlapping(dates) is None
 
     def allocate(self, booking_id: UUID, dates: DateRange, quantity: int = 1) -> Allocation:
         """
@@ -101,14 +149,9 @@ class Inventory(Aggregate):
             ValueError: If dates are not available (overlap detected)
         """
         # Validate availability (domain-level check)
-        if not self.can_allocate(dates):
-            # Find which allocation overlaps
-            overlapping = None
-            for alloc in self.allocations:
-                if alloc.dates.overlaps_with(dates):
-                    overlapping = alloc
-                    break
-
+        self._ensure_loaded(dates)
+        overlapping = self._find_overlapping(dates)
+        if overlapping:
             raise ValueError(
                 f"Dates {dates} are not available for property {self.property_id}. "
                 f"Overlaps with existing allocation {overlapping.id} "
@@ -124,7 +167,10 @@ class Inventory(Aggregate):
         )
 
         # Add to inventory
-        self.allocations.append(allocation)
+        index = bisect_left(self._starts, dates.start_date)
+        self.allocations.insert(index, allocation)
+        self._starts.insert(index, dates.start_date)
+        self._by_booking[booking_id] = allocation
 
         # Emit domain event
         from apps.bookings.domain.events import InventoryAllocated
@@ -152,10 +198,7 @@ class Inventory(Aggregate):
             ValueError: If no allocation found for this booking
         """
         # Find allocation for this booking
-        allocation = next(
-            (a for a in self.allocations if a.booking_id == booking_id),
-            None
-        )
+        allocation = self._by_booking.get(booking_id)
 
         if not allocation:
             raise ValueError(
@@ -164,7 +207,12 @@ class Inventory(Aggregate):
             )
 
         # Remove allocation
-        self.allocations.remove(allocation)
+        index = bisect_left(self._starts, allocation.dates.start_date)
+        while self.allocations[index] is not allocation:
+            index += 1
+        del self.allocations[index]
+        del self._starts[index]
+        del self._by_booking[booking_id]
 
         # Emit domain event
         from apps.bookings.domain.events import InventoryDeallocated
@@ -178,21 +226,22 @@ class Inventory(Aggregate):
 
     def get_allocation(self, booking_id: UUID) -> Allocation | None:
         """Get allocation for a specific booking"""
-        return next(
-            (a for a in self.allocations if a.booking_id == booking_id),
-            None
-        )
+        return self._by_booking.get(booking_id)
 
     def get_allocations_for_period(self, dates: DateRange) -> List[Allocation]:
         """Get all allocations that overlap with given period"""
-        return [
-            a for a in self.allocations
-            if a.dates.overlaps_with(dates)
-        ]
+        self._ensure_loaded(dates)
+        result = []
+        index = bisect_left(self._starts, dates.end_date) - 1
+        while index >= 0 and self.allocations[index].dates.end_date > dates.start_date:
+            result.append(self.allocations[index])
+            index -= 1
+        result.reverse()
+        return result
 
     @property
     def total_allocations(self) -> int:
-        """Total number of allocations"""
+        """Total number of allocations (in the loaded window, if any)"""
         return len(self.allocations)
 
     def __str__(self):
@@ -202,4 +251,4 @@ class Inventory(Aggregate):
         return (
             f"Inventory(id={self.id}, property_id={self.property_id}, "
             f"allocations_count={len(self.allocations)})"
-        )
\ No newline at end of file
+        )
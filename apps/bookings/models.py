@@ -11,6 +11,8 @@ from django.db import models, transaction  # type: ignore
 from django.utils import timezone  # type: ignore
 from django.utils.translation import gettext_lazy as _  # type: ignore
 
+from shared.infrastructure.ranges import PeriodExclusionConstraint
+
 
 class Booking(models.Model):
     """Бронирование объекта недвижимости."""
@@ -35,6 +37,9 @@ class Booking(models.Model):
         REALTOR = "realtor", _("Риелтор")
         SYSTEM = "system", _("Система")
 
+    # Статусы, занимающие даты объекта (см. ограничение booking_no_overlapping_active)
+    BLOCKING_STATUSES = (Status.PENDING, Status.CONFIRMED, Status.IN_PROGRESS)
+
     guest = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -118,8 +123,25 @@ class Booking(models.Model):
             models.Index(fields=["property", "check_in", "check_out"]),
             models.Index(fields=["booking_code"]),
             models.Index(fields=["status"]),
+            # Курсорная пагинация списков броней гостя, агентства и объекта
+            models.Index(fields=["guest", "-created_at", "-id"]),
+            models.Index(fields=["agency", "-created_at", "-id"]),
+            models.Index(fields=["property", "-created_at", "-id"]),
         ]
 
+    # PostgreSQL: GiST-индекс по периоду и запрет пересечения активных броней.
+    # Добавляется после Meta, потому что тело Meta не видит атрибуты модели,
+    # а условие должно совпадать с BLOCKING_STATUSES (как в find_conflicts)
+    Meta.constraints.append(
+        PeriodExclusionConstraint(
+            name="booking_no_overlapping_active",
+            owner_field="property",
+            start_field="check_in",
+            end_field="check_out",
+            condition=models.Q(status__in=BLOCKING_STATUSES),
+        )
+    )
+
     def __str__(self) -> str:
         return f"Booking #{self.booking_code} for {self.property_id}"
 
@@ -158,6 +180,10 @@ class Booking(models.Model):
                 self.booking_code = self.generate_booking_code()
             self.clean()
             super().save(*args, **kwargs)
+            if creating:
+                from apps.analytics.rollups import mark_stale  # local import to avoid circular
+
+                mark_stale(self.property_id, self.created_at)
 
     @staticmethod
     def generate_booking_code() -> str:
@@ -174,11 +200,18 @@ class Booking(models.Model):
         from .services import release_dates_for_booking  # local import to avoid circular
 
         release_dates_for_booking(self)
+        self._invalidate_leaderboard()
 
     def mark_paid(self) -> None:
         self.payment_status = self.PaymentStatus.PAID
         self.status = self.Status.CONFIRMED
         self.save(update_fields=["payment_status", "status"])
+        self._invalidate_leaderboard()
+
+    def _invalidate_leaderboard(self) -> None:
+        from apps.users.api.leaderboard import invalidate_for_booking_on_commit  # local import to avoid circular
+
+        invalidate_for_booking_on_commit(self.property_id)
 
     def should_expire(self) -> bool:
         return bool(self.expires_at and timezone.now() > self.expires_at and self.status == self.Status.PENDING)
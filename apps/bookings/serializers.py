@@ -4,13 +4,18 @@ from __future__ import annotations
 
 from datetime import date
 
-from django.db import transaction  # type: ignore
+from django.db import IntegrityError, transaction  # type: ignore
 from django.utils import timezone  # type: ignore
 
 from rest_framework import serializers  # type: ignore
 
 from .models import Booking
-from .services import BookingConflictError, ensure_property_is_available
+from .services import (
+    DATES_TAKEN_MESSAGE,
+    BookingConflictError,
+    ensure_property_is_available,
+    reserve_dates_for_booking,
+)
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -51,24 +56,29 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         expires_at = timezone.now() + timezone.timedelta(minutes=15)
         payment_deadline = timezone.now() + timezone.timedelta(hours=24)
 
-        with transaction.atomic():
-            try:
+        # Проверка, создание брони и резервирование дат — одна транзакция.
+        # Если параллельный запрос успел занять даты, исключающее ограничение
+        # PostgreSQL отклонит вставку, и клиент получит ту же ошибку конфликта.
+        try:
+            with transaction.atomic():
                 ensure_property_is_available(
                     property_obj,
                     validated_data["check_in"],
                     validated_data["check_out"],
                 )
-            except BookingConflictError as exc:
-                raise serializers.ValidationError({"non_field_errors": [str(exc)]})
-
-            booking = Booking.objects.create(
-                guest=guest,
-                agency=property_obj.agency,
-                expires_at=expires_at,
-                payment_deadline=payment_deadline,
-                property=property_obj,
-                **validated,
-            )
+                booking = Booking.objects.create(
+                    guest=guest,
+                    agency=property_obj.agency,
+                    expires_at=expires_at,
+                    payment_deadline=payment_deadline,
+                    property=property_obj,
+                    **validated,
+                )
+                reserve_dates_for_booking(booking)
+        except BookingConflictError as exc:
+            raise serializers.ValidationError({"non_field_errors": [str(exc)]})
+        except IntegrityError:
+            raise serializers.ValidationError({"non_field_errors": [DATES_TAKEN_MESSAGE]})
         return booking
 
 
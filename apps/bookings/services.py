@@ -5,78 +5,104 @@ from __future__ import annotations
 from typing import Iterable, TYPE_CHECKING
 
 from django.db import transaction  # type: ignore
-from django.db.models import Q  # type: ignore
-from django.db.utils import NotSupportedError  # type: ignore
+from django.db.models import CharField, Q, Value  # type: ignore
 
 from apps.properties.models import PropertyAvailability
+from apps.properties.calendar_cache import invalidate_property_cache_on_commit
+from apps.properties.occupancy import refresh_occupancy_index
+from shared.infrastructure.ranges import filter_overlapping
 
 if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from datetime import date
+
     from .models import Booking
 
 
 class BookingConflictError(Exception):
     """Raised when a property is busy for requested dates."""
 
+    def __init__(self, message: str, *, conflicts: list | None = None) -> None:
+        super().__init__(message)
+        self.conflicts = conflicts or []
 
-def _lock_queryset_if_possible(queryset):
-    """Apply select_for_update when inside transaction.atomic()."""
 
-    if not transaction.get_connection().in_atomic_block:
-        return queryset
+BOOKING_CONFLICT = "booking"
+AVAILABILITY_CONFLICT = "availability"
 
-    try:
-        return queryset.select_for_update()
-    except NotSupportedError:
-        return queryset
+DATES_TAKEN_MESSAGE = "Объект недоступен на выбранные даты."
 
 
-def ensure_property_is_available(
+def find_conflicts(
     property_obj,
     check_in,
     check_out,
     *,
     exclude_booking_id=None,
-) -> None:
-    """Ensure the property is free for the given period."""
+) -> list[tuple[str, int, "date", "date"]]:
+    """Return bookings and blocking periods overlapping ``[check_in, check_out)``.
 
-    from .models import Booking  # Local import to prevent circular dependency
+    Both tables are queried in one round trip (``UNION ALL``). Each row is
+    ``(kind, id, start, end)`` where ``kind`` is ``BOOKING_CONFLICT`` or
+    ``AVAILABILITY_CONFLICT``. On PostgreSQL the overlap predicates use the
+    GiST exclusion-constraint indexes of both tables.
+    """
 
-    overlapping_filter = Q(check_in__lt=check_out) & Q(check_out__gt=check_in)
+    from .models import Booking  # Local import to prevent circular dependency
 
-    blocking_statuses: Iterable[str] = (
-        Booking.Status.PENDING,
-        Booking.Status.CONFIRMED,
-        Booking.Status.IN_PROGRESS,
+    bookings_qs = filter_overlapping(
+        Booking.objects.filter(status__in=Booking.BLOCKING_STATUSES),
+        owner_field="property",
+        owner_id=property_obj.pk,
+        start_field="check_in",
+        end_field="check_out",
+        start=check_in,
+        end=check_out,
     )
-
-    bookings_qs = Booking.objects.filter(
-        property=property_obj,
-        status__in=blocking_statuses,
-    ).filter(overlapping_filter)
-
     if exclude_booking_id is not None:
         bookings_qs = bookings_qs.exclude(pk=exclude_booking_id)
 
-    bookings_qs = _lock_queryset_if_possible(bookings_qs)
-
-    if bookings_qs.exists():
-        raise BookingConflictError("Объект недоступен на выбранные даты.")
-
-    blocking_availability_statuses: Iterable[str] = (
-        PropertyAvailability.AvailabilityStatus.BOOKED,
-        PropertyAvailability.AvailabilityStatus.BLOCKED,
-        PropertyAvailability.AvailabilityStatus.MAINTENANCE,
+    availability_qs = filter_overlapping(
+        PropertyAvailability.objects.filter(status__in=PropertyAvailability.BLOCKING_STATUSES),
+        owner_field="property",
+        owner_id=property_obj.pk,
+        start_field="start_date",
+        end_field="end_date",
+        start=check_in,
+        end=check_out,
     )
 
-    availability_qs = PropertyAvailability.objects.filter(
-        property=property_obj,
-        status__in=blocking_availability_statuses,
-    ).filter(Q(start_date__lt=check_out) & Q(end_date__gt=check_in))
+    bookings_rows = bookings_qs.order_by().annotate(
+        kind=Value(BOOKING_CONFLICT, output_field=CharField()),
+    ).values_list("kind", "id", "check_in", "check_out")
+    availability_rows = availability_qs.order_by().annotate(
+        kind=Value(AVAILABILITY_CONFLICT, output_field=CharField()),
+    ).values_list("kind", "id", "start_date", "end_date")
+    return list(bookings_rows.union(availability_rows, all=True))
 
-    availability_qs = _lock_queryset_if_possible(availability_qs)
 
-    if availability_qs.exists():
-        raise BookingConflictError("Объект недоступен на выбранные даты.")
+def ensure_property_is_available(
+    property_obj,
+    check_in,
+    check_out,
+    *,
+    exclude_booking_id=None,
+) -> None:
+    """Ensure the property is free for the given period.
+
+    Конфликты ищутся одним запросом без блокировки строк: одновременную
+    вставку пересекающейся брони или блокировки отклоняют исключающие
+    ограничения PostgreSQL (см. ``PeriodExclusionConstraint``), а ошибку
+    целостности вызывающий код переводит в ``BookingConflictError``.
+    """
+
+    conflicts = find_conflicts(
+        property_obj,
+        check_in,
+        check_out,
+        exclude_booking_id=exclude_booking_id,
+    )
+    if conflicts:
+        raise BookingConflictError(DATES_TAKEN_MESSAGE, conflicts=conflicts)
 
 
 @transaction.atomic
@@ -93,6 +119,7 @@ def reserve_dates_for_booking(booking: "Booking") -> None:
             "source": "booking",
         },
     )
+    refresh_occupancy_index(booking.property_id)
 
 
 @transaction.atomic
@@ -105,3 +132,28 @@ def release_dates_for_booking(booking: "Booking") -> None:
         end_date=booking.check_out,
         source="booking",
     ).delete()
+    refresh_occupancy_index(booking.property_id)
+    invalidate_property_cache_on_commit(booking.property_id)
+
+
+@transaction.atomic
+def release_dates_for_bookings(periods: Iterable[tuple[int, "date", "date"]]) -> int:
+    """Releases reserved availability for many bookings with a single DELETE.
+
+    ``periods`` — кортежи ``(property_id, check_in, check_out)``. Карты
+    занятости и кэш пересчитываются один раз на объект, а не на бронь.
+    """
+
+    periods = list(periods)
+    if not periods:
+        return 0
+
+    condition = Q()
+    for property_id, check_in, check_out in periods:
+        condition |= Q(property_id=property_id, start_date=check_in, end_date=check_out)
+    deleted, _ = PropertyAvailability.objects.filter(condition, source="booking").delete()
+
+    for property_id in {period[0] for period in periods}:
+        refresh_occupancy_index(property_id)
+        invalidate_property_cache_on_commit(property_id)
+    return deleted
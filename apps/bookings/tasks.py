@@ -3,14 +3,16 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import timedelta
+from functools import partial
 
 from celery import shared_task  # type: ignore
 from django.db import transaction  # type: ignore
 from django.utils import timezone  # type: ignore
 
 from .models import Booking
-from .services import release_dates_for_booking
+from .services import release_dates_for_booking, release_dates_for_bookings
 
 logger = logging.getLogger(__name__)
 
@@ -44,146 +46,153 @@ def schedule_hold_expiration(booking_id: int) -> None:
 # PERIODIC TASKS (запускаются автоматически через Celery Beat)
 # ============================================================================
 
+LIFECYCLE_CHUNK_SIZE = 500
+NOTIFICATION_CHUNK_SIZE = 50
+
+
+def _enqueue_notifications(task, booking_ids: list[int]) -> None:
+    """Ставит уведомления пачками: одно сообщение брокеру на NOTIFICATION_CHUNK_SIZE броней."""
+
+    if booking_ids:
+        task.chunks(((booking_id,) for booking_id in booking_ids), NOTIFICATION_CHUNK_SIZE).apply_async()
+
+
+def _transition_in_chunks(
+    label: str,
+    filters: dict,
+    updates: dict,
+    notify_task,
+    *,
+    release_dates: bool = False,
+    chunk_size: int = LIFECYCLE_CHUNK_SIZE,
+) -> dict[str, float]:
+    """
+    Переводит брони, подходящие под ``filters``, пачками по ``chunk_size``.
+
+    Каждая пачка — одна транзакция: строки блокируются с SKIP LOCKED (чтобы
+    параллельный запуск задачи не ждал и не обрабатывал их повторно),
+    статус меняется одним UPDATE, даты освобождаются одним DELETE, а
+    уведомления ставятся в очередь после фиксации.
+    """
+
+    started = time.monotonic()
+    processed = 0
+    chunks = 0
+
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Booking.objects.filter(**filters)
+                .order_by("id")
+                .select_for_update(skip_locked=True)
+                .values_list("id", "property_id", "check_in", "check_out")[:chunk_size]
+            )
+            if not rows:
+                break
+            booking_ids = [row[0] for row in rows]
+            Booking.objects.filter(id__in=booking_ids).update(**updates, updated_at=timezone.now())
+            if release_dates:
+                release_dates_for_bookings(row[1:] for row in rows)
+            transaction.on_commit(partial(_enqueue_notifications, notify_task, booking_ids))
+
+        processed += len(rows)
+        chunks += 1
+        if len(rows) < chunk_size:
+            break
+
+    elapsed = time.monotonic() - started
+    metrics = {
+        label: processed,
+        "chunks": chunks,
+        "elapsed_seconds": round(elapsed, 3),
+        "per_second": round(processed / elapsed, 1) if elapsed > 0 else float(processed),
+    }
+    if processed:
+        logger.info(
+            f"{label}: {processed} bookings in {chunks} chunk(s), "
+            f"{metrics['elapsed_seconds']}s ({metrics['per_second']}/s)"
+        )
+    return metrics
+
+
 @shared_task(name="bookings.expire_pending_bookings")
-def expire_pending_bookings() -> dict[str, int]:
+def expire_pending_bookings() -> dict[str, float]:
     """
     Автоматическая отмена просроченных броней.
 
     Ищет бронирования со статусом PENDING, у которых истек expires_at,
-    и отменяет их автоматически.
+    и отменяет их пачками.
 
     Запускается каждую минуту через Celery Beat.
 
     Returns:
-        dict: {"expired": количество отмененных броней}
+        dict: {"expired": количество отмененных броней, "chunks", "elapsed_seconds", "per_second"}
     """
     now = timezone.now()
-    expired_count = 0
-
-    # Находим просроченные брони
-    expired_bookings = Booking.objects.filter(
-        status=Booking.Status.PENDING,
-        expires_at__lte=now,
-    ).select_related("property", "guest")
-
-    for booking in expired_bookings:
-        try:
-            with transaction.atomic():
-                booking.status = Booking.Status.EXPIRED
-                booking.payment_status = Booking.PaymentStatus.FAILED
-                booking.cancellation_source = Booking.CancellationSource.SYSTEM
-                booking.cancellation_reason = "Время на оплату истекло (15 минут)"
-                booking.cancelled_at = now
-                booking.save(
-                    update_fields=[
-                        "status",
-                        "payment_status",
-                        "cancellation_source",
-                        "cancellation_reason",
-                        "cancelled_at",
-                    ]
-                )
-
-                # Освобождаем даты
-                release_dates_for_booking(booking)
-
-                # Отправляем уведомление гостю
-                notify_booking_expired.delay(booking.id)
-
-                expired_count += 1
-                logger.info(
-                    f"Booking {booking.booking_code} expired automatically. "
-                    f"Guest: {booking.guest.email}, Property: {booking.property.title}"
-                )
-        except Exception as e:
-            logger.error(f"Error expiring booking {booking.id}: {e}", exc_info=True)
-
-    if expired_count > 0:
-        logger.info(f"Expired {expired_count} pending bookings")
-
-    return {"expired": expired_count}
+    return _transition_in_chunks(
+        "expired",
+        filters={"status": Booking.Status.PENDING, "expires_at__lte": now},
+        updates={
+            "status": Booking.Status.EXPIRED,
+            "payment_status": Booking.PaymentStatus.FAILED,
+            "cancellation_source": Booking.CancellationSource.SYSTEM,
+            "cancellation_reason": "Время на оплату истекло (15 минут)",
+            "cancelled_at": now,
+        },
+        notify_task=notify_booking_expired,
+        release_dates=True,
+    )
 
 
 @shared_task(name="bookings.update_in_progress_bookings")
-def update_in_progress_bookings() -> dict[str, int]:
+def update_in_progress_bookings() -> dict[str, float]:
     """
     Автоматический перевод подтвержденных броней в статус IN_PROGRESS.
 
     Когда наступает дата заезда (check_in), бронирование переводится
-    в статус IN_PROGRESS.
+    в статус IN_PROGRESS. Брони с датой заезда в прошлом (пропущенные,
+    например, во время простоя) тоже подхватываются, если проживание
+    ещё не закончилось.
 
     Запускается каждый час.
 
     Returns:
-        dict: {"updated": количество обновленных броней}
+        dict: {"updated": количество обновленных броней, "chunks", "elapsed_seconds", "per_second"}
     """
     today = timezone.now().date()
-    updated_count = 0
-
-    # Находим подтвержденные брони, у которых сегодня дата заезда
-    bookings_to_start = Booking.objects.filter(
-        status=Booking.Status.CONFIRMED,
-        check_in=today,
-    ).select_related("property", "guest")
-
-    for booking in bookings_to_start:
-        try:
-            booking.status = Booking.Status.IN_PROGRESS
-            booking.save(update_fields=["status"])
-
-            # Отправляем welcome уведомление гостю
-            notify_booking_started.delay(booking.id)
-
-            updated_count += 1
-            logger.info(f"Booking {booking.booking_code} started (IN_PROGRESS)")
-        except Exception as e:
-            logger.error(f"Error updating booking {booking.id} to IN_PROGRESS: {e}", exc_info=True)
-
-    if updated_count > 0:
-        logger.info(f"Updated {updated_count} bookings to IN_PROGRESS")
-
-    return {"updated": updated_count}
+    return _transition_in_chunks(
+        "updated",
+        filters={"status": Booking.Status.CONFIRMED, "check_in__lte": today, "check_out__gt": today},
+        updates={"status": Booking.Status.IN_PROGRESS},
+        notify_task=notify_booking_started,
+    )
 
 
 @shared_task(name="bookings.complete_finished_bookings")
-def complete_finished_bookings() -> dict[str, int]:
+def complete_finished_bookings() -> dict[str, float]:
     """
     Автоматическое завершение броней после выезда.
 
     Когда наступает дата выезда (check_out), бронирование переводится
-    в статус COMPLETED.
+    в статус COMPLETED. Подтверждённые брони, проживание по которым
+    закончилось до перевода в IN_PROGRESS (например, во время простоя),
+    завершаются сразу.
 
     Запускается каждый час.
 
     Returns:
-        dict: {"completed": количество завершенных броней}
+        dict: {"completed": количество завершенных броней, "chunks", "elapsed_seconds", "per_second"}
     """
     today = timezone.now().date()
-    completed_count = 0
-
-    # Находим активные брони, у которых сегодня или раньше дата выезда
-    bookings_to_complete = Booking.objects.filter(
-        status=Booking.Status.IN_PROGRESS,
-        check_out__lte=today,
-    ).select_related("property", "guest")
-
-    for booking in bookings_to_complete:
-        try:
-            booking.status = Booking.Status.COMPLETED
-            booking.save(update_fields=["status"])
-
-            # Отправляем благодарность и просьбу оставить отзыв
-            notify_booking_completed.delay(booking.id)
-
-            completed_count += 1
-            logger.info(f"Booking {booking.booking_code} completed")
-        except Exception as e:
-            logger.error(f"Error completing booking {booking.id}: {e}", exc_info=True)
-
-    if completed_count > 0:
-        logger.info(f"Completed {completed_count} bookings")
-
-    return {"completed": completed_count}
+    return _transition_in_chunks(
+        "completed",
+        filters={
+            "status__in": [Booking.Status.IN_PROGRESS, Booking.Status.CONFIRMED],
+            "check_out__lte": today,
+        },
+        updates={"status": Booking.Status.COMPLETED},
+        notify_task=notify_booking_completed,
+    )
 
 
 @shared_task(name="bookings.send_upcoming_booking_reminders")
@@ -192,33 +201,54 @@ def send_upcoming_booking_reminders() -> dict[str, int]:
     Отправка напоминаний о предстоящем заезде.
 
     За 24 часа до заезда гость получает напоминание с инструкциями.
+    Письма рендерятся одним проходом по скомпилированному шаблону и
+    уходят через одно SMTP-соединение, in-app
+    уведомления создаются одной вставкой на пачку.
 
     Запускается каждые 6 часов.
 
     Returns:
-        dict: {"sent": количество отправленных напоминаний}
+        dict: {"bookings": броней с заездом завтра, "sent": отправленных писем, "in_app": созданных уведомлений}
     """
+    from apps.notifications.services import (
+        booking_reminder_context,
+        create_in_app_notifications,
+        render_emails,
+        send_bulk_emails,
+    )
+
     tomorrow = timezone.now().date() + timedelta(days=1)
-    sent_count = 0
 
     # Находим подтвержденные брони с заездом завтра
-    upcoming_bookings = Booking.objects.filter(
-        status=Booking.Status.CONFIRMED,
-        check_in=tomorrow,
-    ).select_related("property", "guest")
-
-    for booking in upcoming_bookings:
-        try:
-            notify_booking_reminder.delay(booking.id)
-            sent_count += 1
-            logger.info(f"Sent reminder for booking {booking.booking_code}")
-        except Exception as e:
-            logger.error(f"Error sending reminder for booking {booking.id}: {e}", exc_info=True)
-
-    if sent_count > 0:
-        logger.info(f"Sent {sent_count} booking reminders")
-
-    return {"sent": sent_count}
+    upcoming_bookings = list(
+        Booking.objects.filter(
+            status=Booking.Status.CONFIRMED,
+            check_in=tomorrow,
+        ).select_related("property", "property__owner", "guest")
+    )
+    if not upcoming_bookings:
+        return {"bookings": 0, "sent": 0, "in_app": 0}
+
+    sent_count = send_bulk_emails(
+        render_emails(
+            "booking_reminder",
+            ((booking.guest.email, booking_reminder_context(booking)) for booking in upcoming_bookings),
+        )
+    )
+    in_app_count = create_in_app_notifications(
+        (
+            booking.guest,
+            "Напоминание о заезде завтра",
+            f"Завтра ваш заезд в {booking.property.title}. Инструкции отправим утром.",
+        )
+        for booking in upcoming_bookings
+    )
+
+    logger.info(
+        f"Sent booking reminders: {sent_count} emails, {in_app_count} in-app "
+        f"for {len(upcoming_bookings)} bookings"
+    )
+    return {"bookings": len(upcoming_bookings), "sent": sent_count, "in_app": in_app_count}
 
 
 # ============================================================================
@@ -0,0 +1,171 @@
+"""Tests for the combined booking conflict query."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.bookings.services import (
+    AVAILABILITY_CONFLICT,
+    BOOKING_CONFLICT,
+    DATES_TAKEN_MESSAGE,
+    BookingConflictError,
+    ensure_property_is_available,
+    find_conflicts,
+)
+from apps.properties.models import Property, PropertyAvailability
+from apps.properties.views import PropertyAvailabilityViewSet
+from apps.telegrambot import bot
+from apps.users.models import User
+
+
+class ConflictQueryTests(TestCase):
+    def setUp(self) -> None:
+        self.guest = guest = User.objects.create_user(
+            email="guest-conflicts@example.com",
+            phone="+77000000050",
+            password="GuestPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.owner = owner = User.objects.create_user(
+            email="realtor-conflicts@example.com",
+            phone="+77000000051",
+            password="RealtorPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.property = Property.objects.create(
+            owner=owner,
+            title="Квартира с конфликтами",
+            description="Описание",
+            address_line="ул. Абая, 4",
+            status=Property.Status.ACTIVE,
+            base_price=Decimal("20000.00"),
+            sleeping_places=2,
+            min_nights=1,
+            max_nights=14,
+        )
+        self.start = date.today() + timedelta(days=5)
+        self.booking = Booking.objects.create(
+            property=self.property,
+            guest=guest,
+            check_in=self.start,
+            check_out=self.start + timedelta(days=2),
+        )
+        self.block = PropertyAvailability.objects.create(
+            property=self.property,
+            start_date=self.start + timedelta(days=4),
+            end_date=self.start + timedelta(days=6),
+            status=PropertyAvailability.AvailabilityStatus.BLOCKED,
+        )
+
+    def test_returns_conflicts_from_both_tables_in_one_query(self) -> None:
+        with self.assertNumQueries(1):
+            conflicts = find_conflicts(self.property, self.start + timedelta(days=1), self.start + timedelta(days=5))
+
+        self.assertEqual(
+            sorted((kind, row_id) for kind, row_id, _, _ in conflicts),
+            [(AVAILABILITY_CONFLICT, self.block.id), (BOOKING_CONFLICT, self.booking.id)],
+        )
+
+    def test_adjacent_and_excluded_periods_do_not_conflict(self) -> None:
+        ensure_property_is_available(
+            self.property,
+            self.start + timedelta(days=2),
+            self.start + timedelta(days=4),
+        )
+        ensure_property_is_available(
+            self.property,
+            self.start,
+            self.start + timedelta(days=2),
+            exclude_booking_id=self.booking.id,
+        )
+        with self.assertRaises(BookingConflictError) as ctx:
+            ensure_property_is_available(self.property, self.start, self.start + timedelta(days=1))
+        self.assertEqual(len(ctx.exception.conflicts), 1)
+
+    def test_bot_booking_lost_race_reports_taken_dates(self) -> None:
+        check_in = self.start + timedelta(days=10)
+        profile = SimpleNamespace(user=self.guest)
+        # Параллельная бронь заняла даты после проверки: ограничение отклоняет вставку
+        with mock.patch.object(bot, "reserve_dates_for_booking", side_effect=IntegrityError):
+            booking, error = bot._create_booking_with_notifications.func(
+                profile, self.property.id, check_in, check_in + timedelta(days=1), 1,
+            )
+
+        self.assertEqual((booking, error), (None, DATES_TAKEN_MESSAGE))
+        self.assertFalse(Booking.objects.filter(check_in=check_in).exists())
+
+    def test_calendar_block_lost_race_is_rejected(self) -> None:
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        payload = {
+            "start_date": str(self.start + timedelta(days=10)),
+            "end_date": str(self.start + timedelta(days=12)),
+            "status": PropertyAvailability.AvailabilityStatus.BLOCKED,
+            "availability_type": PropertyAvailability.AvailabilityType.MANUAL_BLOCK,
+        }
+        with (
+            mock.patch.object(PropertyAvailabilityViewSet, "_validate_overlap"),
+            mock.patch.object(PropertyAvailability, "save", side_effect=IntegrityError),
+        ):
+            response = client.post(
+                reverse("property-availability-list", kwargs={"property_id": self.property.id}),
+                payload,
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, [PropertyAvailabilityViewSet.OVERLAP_MESSAGE])
+
+
+@skipUnless(connection.vendor == "postgresql", "exclusion constraints exist only on PostgreSQL")
+class PeriodExclusionConstraintTests(TestCase):
+    setUp = ConflictQueryTests.setUp
+
+    def test_overlapping_active_booking_is_rejected(self) -> None:
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Booking.objects.create(
+                property=self.property,
+                guest=self.guest,
+                check_in=self.start + timedelta(days=1),
+                check_out=self.start + timedelta(days=3),
+            )
+
+        # Неблокирующие статусы и смежные даты ограничение пропускает
+        Booking.objects.create(
+            property=self.property,
+            guest=self.guest,
+            check_in=self.start + timedelta(days=1),
+            check_out=self.start + timedelta(days=3),
+            status=Booking.Status.CANCELLED_BY_GUEST,
+        )
+        Booking.objects.create(
+            property=self.property,
+            guest=self.guest,
+            check_in=self.start + timedelta(days=2),
+            check_out=self.start + timedelta(days=3),
+        )
+
+    def test_overlapping_blocking_period_is_rejected(self) -> None:
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PropertyAvailability.objects.create(
+                property=self.property,
+                start_date=self.start + timedelta(days=5),
+                end_date=self.start + timedelta(days=7),
+                status=PropertyAvailability.AvailabilityStatus.MAINTENANCE,
+            )
+
+        PropertyAvailability.objects.create(
+            property=self.property,
+            start_date=self.start + timedelta(days=5),
+            end_date=self.start + timedelta(days=7),
+            status=PropertyAvailability.AvailabilityStatus.AVAILABLE,
+        )
@@ -0,0 +1,62 @@
+"""Unit tests for the Inventory aggregate."""
+
+from __future__ import annotations
+
+from datetime import date
+from uuid import uuid4
+
+from django.test import SimpleTestCase
+
+from apps.bookings.domain.inventory import Allocation, Inventory
+from shared.domain.value_objects import DateRange
+
+
+def _range(start_day: int, end_day: int) -> DateRange:
+    return DateRange(date(2025, 1, start_day), date(2025, 1, end_day))
+
+
+class InventoryTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.inventory = Inventory(property_id=uuid4())
+
+    def test_allocations_stay_sorted_and_adjacent_ranges_allowed(self) -> None:
+        self.inventory.allocate(uuid4(), _range(10, 12))
+        self.inventory.allocate(uuid4(), _range(1, 3))
+        self.inventory.allocate(uuid4(), _range(3, 10))
+
+        starts = [a.dates.start_date.day for a in self.inventory.allocations]
+        self.assertEqual(starts, [1, 3, 10])
+        self.assertFalse(self.inventory.can_allocate(_range(11, 15)))
+        self.assertTrue(self.inventory.can_allocate(_range(12, 15)))
+
+    def test_overlap_reports_blocking_allocation(self) -> None:
+        booking_id = uuid4()
+        self.inventory.allocate(booking_id, _range(5, 8))
+
+        with self.assertRaisesMessage(ValueError, str(booking_id)):
+            self.inventory.allocate(uuid4(), _range(1, 6))
+
+    def test_period_query_and_deallocate(self) -> None:
+        first, second, third = uuid4(), uuid4(), uuid4()
+        self.inventory.allocate(first, _range(1, 4))
+        self.inventory.allocate(second, _range(4, 6))
+        self.inventory.allocate(third, _range(8, 9))
+
+        overlapping = self.inventory.get_allocations_for_period(_range(3, 8))
+        self.assertEqual([a.booking_id for a in overlapping], [first, second])
+
+        self.inventory.deallocate(second)
+        self.assertIsNone(self.inventory.get_allocation(second))
+        self.assertTrue(self.inventory.can_allocate(_range(4, 8)))
+        self.assertEqual(self.inventory.get_allocation(third).dates, _range(8, 9))
+
+    def test_window_mode_rejects_dates_outside_window(self) -> None:
+        inventory = Inventory(
+            property_id=uuid4(),
+            allocations=[Allocation(booking_id=uuid4(), dates=_range(6, 9))],
+            loaded_window=_range(5, 15),
+        )
+
+        self.assertFalse(inventory.can_allocate(_range(8, 10)))
+        with self.assertRaises(ValueError):
+            inventory.can_allocate(_range(1, 6))
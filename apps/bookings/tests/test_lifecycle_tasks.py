@@ -0,0 +1,141 @@
+"""Tests for batched booking lifecycle tasks."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.bookings import tasks
+from apps.bookings.models import Booking
+from apps.bookings.services import reserve_dates_for_booking
+from apps.properties.models import Property, PropertyAvailability
+from apps.users.models import User
+
+
+class LifecycleTaskTests(TestCase):
+    def setUp(self) -> None:
+        self.guest = User.objects.create_user(
+            email="guest-lifecycle@example.com",
+            phone="+77000000040",
+            password="GuestPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        owner = User.objects.create_user(
+            email="realtor-lifecycle@example.com",
+            phone="+77000000041",
+            password="RealtorPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.property = Property.objects.create(
+            owner=owner,
+            title="Квартира для задач",
+            description="Описание",
+            address_line="ул. Абая, 3",
+            status=Property.Status.ACTIVE,
+            base_price=Decimal("20000.00"),
+            sleeping_places=4,
+            min_nights=1,
+            max_nights=14,
+        )
+
+    def _booking(self, offset: int, status: str, **extra) -> Booking:
+        check_in = timezone.now().date() + timedelta(days=offset)
+        return Booking.objects.create(
+            property=self.property,
+            guest=self.guest,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=2),
+            guests_count=1,
+            status=status,
+            **extra,
+        )
+
+    def test_expire_pending_bookings_in_chunks(self) -> None:
+        expired_at = timezone.now() - timedelta(minutes=1)
+        stale = [
+            self._booking(offset * 3 + 1, Booking.Status.PENDING, expires_at=expired_at)
+            for offset in range(3)
+        ]
+        for booking in stale:
+            reserve_dates_for_booking(booking)
+        fresh = self._booking(20, Booking.Status.PENDING, expires_at=timezone.now() + timedelta(minutes=10))
+
+        with mock.patch.object(tasks, "_enqueue_notifications") as enqueue, self.captureOnCommitCallbacks(
+            execute=True
+        ):
+            result = tasks._transition_in_chunks(
+                "expired",
+                filters={"status": Booking.Status.PENDING, "expires_at__lte": timezone.now()},
+                updates={"status": Booking.Status.EXPIRED},
+                notify_task=tasks.notify_booking_expired,
+                release_dates=True,
+                chunk_size=2,
+            )
+
+        self.assertEqual(result["expired"], 3)
+        self.assertEqual(result["chunks"], 2)
+        self.assertEqual(
+            [call.args[1] for call in enqueue.call_args_list],
+            [[stale[0].id, stale[1].id], [stale[2].id]],
+        )
+        self.assertEqual(
+            Booking.objects.filter(status=Booking.Status.EXPIRED).count(),
+            3,
+        )
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, Booking.Status.PENDING)
+        self.assertFalse(PropertyAvailability.objects.filter(source="booking").exists())
+
+    def test_lifecycle_transitions(self) -> None:
+        started = self._booking(0, Booking.Status.CONFIRMED)
+        finished = self._booking(-2, Booking.Status.IN_PROGRESS)
+
+        with mock.patch.object(tasks, "_enqueue_notifications") as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                updated = tasks.update_in_progress_bookings()
+            with self.captureOnCommitCallbacks(execute=True):
+                completed = tasks.complete_finished_bookings()
+
+        self.assertEqual(updated["updated"], 1)
+        self.assertEqual(completed["completed"], 1)
+        started.refresh_from_db()
+        finished.refresh_from_db()
+        self.assertEqual(started.status, Booking.Status.IN_PROGRESS)
+        self.assertEqual(finished.status, Booking.Status.COMPLETED)
+        enqueue.assert_any_call(tasks.notify_booking_started, [started.id])
+        enqueue.assert_any_call(tasks.notify_booking_completed, [finished.id])
+
+    def test_confirmed_stay_missed_during_downtime_is_completed(self) -> None:
+        # Проживание закончилось, пока задачи не запускались: приветствие уже
+        # не отправляем, бронь сразу завершается
+        missed = self._booking(-6, Booking.Status.CONFIRMED)
+
+        with mock.patch.object(tasks, "_enqueue_notifications") as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                updated = tasks.update_in_progress_bookings()
+            with self.captureOnCommitCallbacks(execute=True):
+                completed = tasks.complete_finished_bookings()
+
+        self.assertEqual((updated["updated"], completed["completed"]), (0, 1))
+        missed.refresh_from_db()
+        self.assertEqual(missed.status, Booking.Status.COMPLETED)
+        enqueue.assert_called_once_with(tasks.notify_booking_completed, [missed.id])
+
+    def test_upcoming_reminders_are_sent_in_bulk(self) -> None:
+        from django.core import mail
+
+        from apps.notifications.models import Notification
+
+        self._booking(1, Booking.Status.CONFIRMED)
+        self._booking(4, Booking.Status.CONFIRMED)
+
+        with self.assertNumQueries(2):
+            result = tasks.send_upcoming_booking_reminders()
+
+        self.assertEqual(result, {"bookings": 1, "sent": 1, "in_app": 1})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Notification.objects.filter(user=self.guest).count(), 1)
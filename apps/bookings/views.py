@@ -6,8 +6,10 @@ from rest_framework import permissions, status, viewsets  # type: ignore
 from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response  # type: ignore
 
+from shared.infrastructure.pagination import CreatedAtCursorPagination
+
 from .models import Booking
-from .services import reserve_dates_for_booking, release_dates_for_booking
+from .services import release_dates_for_booking
 from .serializers import BookingCreateSerializer, BookingSerializer
 
 
@@ -34,6 +36,7 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     queryset = Booking.objects.select_related("property", "guest", "property__owner", "agency").all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsBookingStakeholder]
+    pagination_class = CreatedAtCursorPagination
 
     def get_serializer_class(self):  # type: ignore
         if self.action == "create":
@@ -59,7 +62,6 @@ class BookingViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         booking = serializer.save()
-        reserve_dates_for_booking(booking)
         try:
             from .tasks import schedule_hold_expiration  # type: ignore
 
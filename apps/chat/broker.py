@@ -0,0 +1,104 @@
+"""Брокеры событий чата между процессами.
+
+Каждый процесс держит одно соединение подписки и подписывается только на
+каналы пользователей, подключённых к нему. ``RedisBroker`` рассылает события
+через Redis pub/sub, ``LocalBroker`` — внутри процесса (один процесс,
+разработка без Redis, тесты).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable
+
+import redis.asyncio as redis  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, str], None]
+
+
+class LocalBroker:
+    """Брокер в памяти процесса."""
+
+    def __init__(self) -> None:
+        self._handler: Handler | None = None
+        self._channels: set[str] = set()
+
+    def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def subscribe(self, channel: str) -> None:
+        self._channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._channels.discard(channel)
+
+    async def publish(self, channel: str, data: str) -> None:
+        if self._handler is not None and channel in self._channels:
+            self._handler(channel, data)
+
+    async def close(self) -> None:
+        self._channels.clear()
+
+
+class RedisBroker:
+    """Брокер на Redis pub/sub.
+
+    Сообщения подписки читает одна фоновая задача и передаёт обработчику;
+    при обрыве соединения redis-py переподключается и восстанавливает
+    подписки.
+
+    Args:
+        url: адрес Redis.
+        poll_timeout: сколько секунд ждать сообщения за одно чтение.
+    """
+
+    def __init__(self, url: str, *, poll_timeout: float = 1.0) -> None:
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.poll_timeout = poll_timeout
+        self._pubsub = self.redis.pubsub()
+        self._handler: Handler | None = None
+        self._reader: asyncio.Task | None = None
+
+    def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def subscribe(self, channel: str) -> None:
+        await self._pubsub.subscribe(channel)
+        # Чтение возможно только после первой подписки
+        if self._reader is None:
+            self._reader = asyncio.get_running_loop().create_task(self._read())
+
+    async def unsubscribe(self, channel: str) -> None:
+        await self._pubsub.unsubscribe(channel)
+
+    async def publish(self, channel: str, data: str) -> None:
+        await self.redis.publish(channel, data)
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.poll_timeout,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Chat pub/sub read failed, retrying")
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            if message is not None and message["type"] == "message" and self._handler is not None:
+                self._handler(message["channel"], message["data"])
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        await self._pubsub.aclose()
+        await self.redis.aclose()
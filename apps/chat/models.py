@@ -7,7 +7,8 @@ Conversations can be related to specific properties or bookings for context.
 from __future__ import annotations
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -119,14 +120,47 @@ class ChatConversation(models.Model):
             return self.user2_unread_count
         return 0
 
-    def mark_as_read(self, user) -> None:
-        """Mark all messages as read for a specific user."""
+    def unread_field(self, user) -> str | None:
+        """Name of the unread counter of ``user`` in this conversation."""
         if user.id == self.user1_id:
-            self.user1_unread_count = 0
-            self.save(update_fields=["user1_unread_count"])
+            return "user1_unread_count"
         elif user.id == self.user2_id:
-            self.user2_unread_count = 0
-            self.save(update_fields=["user2_unread_count"])
+            return "user2_unread_count"
+        return None
+
+    def refresh_unread_counts(self) -> None:
+        """Reload both counters after an ``F()`` update (one query)."""
+        self.refresh_from_db(fields=["user1_unread_count", "user2_unread_count"])
+
+    def mark_read_up_to(self, user, message_id: int | None = None) -> int:
+        """
+        Mark incoming messages up to ``message_id`` (all if None) as read.
+
+        Messages are flipped with a single UPDATE and the user's counter is
+        decreased by the number of flipped rows in the database, so
+        concurrent sends and reads never lose counter updates. The counters
+        on this instance are stale afterwards, see ``refresh_unread_counts``.
+
+        Returns:
+            int: number of messages marked as read
+        """
+        field = self.unread_field(user)
+        if field is None:
+            return 0
+        messages = self.messages.filter(is_read=False).exclude(sender_id=user.id)
+        if message_id is not None:
+            messages = messages.filter(pk__lte=message_id)
+        with transaction.atomic():
+            marked = messages.update(is_read=True, read_at=timezone.now())
+            if marked:
+                ChatConversation.objects.filter(pk=self.pk).update(
+                    **{field: Greatest(models.F(field) - marked, 0)}
+                )
+        return marked
+
+    def mark_as_read(self, user) -> None:
+        """Mark all messages as read for a specific user."""
+        self.mark_read_up_to(user)
 
 
 class ChatMessage(models.Model):
@@ -185,28 +219,31 @@ class ChatMessage(models.Model):
         return f"Message from {self.sender_id} at {self.sent_at}: {preview}"
 
     def save(self, *args, **kwargs):
-        """Update conversation metadata when saving a message."""
+        """
+        Update conversation metadata when saving a message.
+
+        The recipient's unread counter is bumped with an ``F()`` expression
+        in the same UPDATE that stores the last message info, so concurrent
+        sends don't overwrite each other's increments.
+        """
         is_new = self.pk is None
         super().save(*args, **kwargs)
 
         if is_new:
-            # Update conversation's last message info
-            self.conversation.last_message_at = self.sent_at
-            self.conversation.last_message_preview = self.content[:200]
-
-            # Increment unread count for recipient
-            if self.sender_id == self.conversation.user1_id:
-                self.conversation.user2_unread_count += 1
-            else:
-                self.conversation.user1_unread_count += 1
-
-            self.conversation.save(update_fields=[
-                "last_message_at",
-                "last_message_preview",
-                "user1_unread_count",
-                "user2_unread_count",
-                "updated_at",
-            ])
+            conversation = self.conversation
+            counter = (
+                "user2_unread_count"
+                if self.sender_id == conversation.user1_id
+                else "user1_unread_count"
+            )
+            ChatConversation.objects.filter(pk=self.conversation_id).update(
+                last_message_at=self.sent_at,
+                last_message_preview=self.content[:200],
+                updated_at=timezone.now(),
+                **{counter: models.F(counter) + 1},
+            )
+            conversation.last_message_at = self.sent_at
+            conversation.last_message_preview = self.content[:200]
 
     def mark_as_read(self) -> None:
         """Mark this message as read."""
@@ -0,0 +1,356 @@
+"""Чат в реальном времени через WebSocket (ASGI).
+
+``ChatWebSocketApp`` обслуживает ``/ws/chat/`` (см. ``config/asgi.py``).
+Клиент подключается с JWT: ``/ws/chat/?token=<access>``. Кадры — JSON:
+
+* клиент → сервер:
+  ``{"type": "send", "conversation": 1, "content": "...", "ref": "a1"}``,
+  ``{"type": "read", "conversation": 1, "up_to": 42}``,
+  ``{"type": "pong"}`` (ответ на ping) и ``{"type": "ping"}``;
+* сервер → клиент:
+  ``message`` (новое сообщение и счётчик непрочитанных получателя),
+  ``read`` (отметка о прочтении), ``ack`` (сообщение сохранено, ``ref``
+  клиента), ``error``, ``ping`` и ``pong``.
+
+События получают оба участника диалога во всех своих соединениях, поэтому
+список диалогов обновляется без опроса API. Между процессами события идут
+через брокер (``apps.chat.broker``): канал на пользователя, одна подписка
+на процесс.
+
+Backpressure: исходящие кадры соединения проходят через ограниченную
+очередь; клиент, который не успевает их читать, отключается с кодом 1013
+и при переподключении догружает пропущенное через историю диалога
+(``?after=<id>``, ``apps.chat.views``). Входящие кадры обрабатываются
+по одному, поэтому поток отправок упирается в запись в БД, а не в память.
+
+Heartbeat: сервер шлёт ``ping`` раз в ``CHAT_HEARTBEAT_INTERVAL`` секунд и
+закрывает соединение с кодом 4408, если от клиента ничего не приходило
+дольше ``CHAT_HEARTBEAT_TIMEOUT``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async  # type: ignore
+from django.conf import settings  # type: ignore
+from django.core.serializers.json import DjangoJSONEncoder  # type: ignore
+from django.db import close_old_connections  # type: ignore
+
+from . import services
+from .broker import LocalBroker, RedisBroker
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "chat:user:"
+
+CLOSE_NORMAL = 1000
+CLOSE_TRY_AGAIN_LATER = 1013  # клиент не успевает читать события
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_HEARTBEAT_TIMEOUT = 4408
+
+Receive = Callable[[], Awaitable[dict]]
+Send = Callable[[dict], Awaitable[None]]
+
+
+def user_channel(user_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def encode(event: dict[str, Any]) -> str:
+    return json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+def database_sync_to_async(func: Callable) -> Callable[..., Awaitable]:
+    """``sync_to_async`` для ORM вне HTTP-запроса: соединения БД не протухают."""
+
+    def inner(*args: Any, **kwargs: Any) -> Any:
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(inner)
+
+
+def build_broker() -> LocalBroker | RedisBroker:
+    if settings.CHAT_REDIS_URL:
+        return RedisBroker(settings.CHAT_REDIS_URL)
+    return LocalBroker()
+
+
+class ChatHub:
+    """Соединения процесса по пользователям и их подписки в брокере."""
+
+    def __init__(self, broker: LocalBroker | RedisBroker | None = None) -> None:
+        self.broker = broker if broker is not None else build_broker()
+        self.broker.start(self.dispatch)
+        self._connections: dict[int, set[ChatConnection]] = {}
+        self._subscribed: set[int] = set()
+        self._lock = asyncio.Lock()
+
+    async def attach(self, connection: ChatConnection) -> None:
+        self._connections.setdefault(connection.user_id, set()).add(connection)
+        await self._sync_subscription(connection.user_id)
+
+    async def detach(self, connection: ChatConnection) -> None:
+        connections = self._connections.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.user_id]
+        await self._sync_subscription(connection.user_id)
+
+    async def _sync_subscription(self, user_id: int) -> None:
+        # Подписка приводится к текущему набору соединений под замком,
+        # чтобы подключение и отключение одновременно не разошлись
+        async with self._lock:
+            wanted = user_id in self._connections
+            if wanted and user_id not in self._subscribed:
+                await self.broker.subscribe(user_channel(user_id))
+                self._subscribed.add(user_id)
+            elif not wanted and user_id in self._subscribed:
+                await self.broker.unsubscribe(user_channel(user_id))
+                self._subscribed.discard(user_id)
+
+    def dispatch(self, channel: str, data: str) -> None:
+        """Раздаёт событие из брокера соединениям пользователя в этом процессе."""
+        if not channel.startswith(CHANNEL_PREFIX):
+            return
+        user_id = int(channel[len(CHANNEL_PREFIX):])
+        for connection in list(self._connections.get(user_id, ())):
+            connection.push(data)
+
+    async def publish(self, user_id: int, event: dict[str, Any]) -> None:
+        await self.broker.publish(user_channel(user_id), encode(event))
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self._connections.values())
+
+    async def close(self) -> None:
+        await self.broker.close()
+
+
+class ChatConnection:
+    """Одно WebSocket-соединение пользователя."""
+
+    def __init__(
+        self,
+        hub: ChatHub,
+        user: Any,
+        receive: Receive,
+        send: Send,
+        *,
+        queue_size: int | None = None,
+        heartbeat_interval: float | None = None,
+        heartbeat_timeout: float | None = None,
+    ) -> None:
+        self.hub = hub
+        self.user = user
+        self.user_id = user.id
+        self._receive = receive
+        self._send = send
+        self.outbox: asyncio.Queue[str] = asyncio.Queue(
+            settings.CHAT_SEND_QUEUE_SIZE if queue_size is None else queue_size
+        )
+        self.heartbeat_interval = (
+            settings.CHAT_HEARTBEAT_INTERVAL if heartbeat_interval is None else heartbeat_interval
+        )
+        self.heartbeat_timeout = (
+            settings.CHAT_HEARTBEAT_TIMEOUT if heartbeat_timeout is None else heartbeat_timeout
+        )
+        self.overflowed = asyncio.Event()
+        self.last_seen = asyncio.get_running_loop().time()
+
+    def push(self, text: str) -> None:
+        """Ставит кадр в очередь отправки; переполнение отключает клиента."""
+        if self.overflowed.is_set():
+            return
+        try:
+            self.outbox.put_nowait(text)
+        except asyncio.QueueFull:
+            logger.warning("Chat client of user %s is too slow, disconnecting", self.user_id)
+            self.overflowed.set()
+
+    def push_event(self, event: dict[str, Any]) -> None:
+        self.push(encode(event))
+
+    async def run(self) -> None:
+        """Обслуживает соединение до отключения клиента или сервера."""
+        await self.hub.attach(self)
+        reader = asyncio.ensure_future(self._read())
+        writer = asyncio.ensure_future(self._write())
+        heartbeat = asyncio.ensure_future(self._heartbeat())
+        overflow = asyncio.ensure_future(self.overflowed.wait())
+        tasks = {reader, writer, heartbeat, overflow}
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.hub.detach(self)
+
+        if reader in done and not reader.cancelled() and reader.exception() is None:
+            return  # клиент отключился сам
+        if overflow in done:
+            code = CLOSE_TRY_AGAIN_LATER
+        elif heartbeat in done:
+            code = CLOSE_HEARTBEAT_TIMEOUT
+        else:
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    logger.error("Chat connection failed", exc_info=task.exception())
+            code = CLOSE_NORMAL
+        await self._close(code)
+
+    async def _close(self, code: int) -> None:
+        try:
+            # Отправка может висеть на медленном клиенте
+            await asyncio.wait_for(self._send({"type": "websocket.close", "code": code}), timeout=1)
+        except Exception:
+            pass
+
+    async def _read(self) -> None:
+        while True:
+            message = await self._receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            self.last_seen = asyncio.get_running_loop().time()
+            text = message.get("text")
+            if text is None and message.get("bytes") is not None:
+                text = message["bytes"].decode("utf-8", "replace")
+            await self._handle(text or "")
+
+    async def _write(self) -> None:
+        while True:
+            text = await self.outbox.get()
+            await self._send({"type": "websocket.send", "text": text})
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if loop.time() - self.last_seen > self.heartbeat_timeout:
+                return
+            self.push_event({"type": "ping"})
+
+    async def _handle(self, text: str) -> None:
+        try:
+            frame = json.loads(text)
+        except ValueError:
+            self.push_event({"type": "error", "detail": "Некорректный JSON"})
+            return
+        if not isinstance(frame, dict):
+            self.push_event({"type": "error", "detail": "Ожидается объект"})
+            return
+
+        kind = frame.get("type")
+        ref = frame.get("ref")
+        try:
+            if kind == "send":
+                await self._send_message(frame, ref)
+            elif kind == "read":
+                await self._mark_read(frame)
+            elif kind == "ping":
+                self.push_event({"type": "pong"})
+            elif kind != "pong":
+                raise services.ChatError("Неизвестный тип кадра")
+        except services.ChatError as exc:
+            self.push_event({"type": "error", "detail": str(exc), "ref": ref})
+
+    @staticmethod
+    def _int(frame: dict, name: str) -> int:
+        value = frame.get(name)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise services.ChatError(f"Поле {name} должно быть числом")
+        return value
+
+    async def _send_message(self, frame: dict, ref: Any) -> None:
+        conversation_id = self._int(frame, "conversation")
+        content = frame.get("content")
+        if not isinstance(content, str):
+            raise services.ChatError("Поле content должно быть строкой")
+        if len(content) > settings.CHAT_MESSAGE_MAX_LENGTH:
+            raise services.ChatError("Сообщение слишком длинное")
+
+        conversation, message = await database_sync_to_async(services.send_message)(
+            self.user, conversation_id, content,
+        )
+        self.push_event({"type": "ack", "ref": ref, "message": message.id})
+        payload = services.message_payload(message)
+        for user_id, unread in services.unread_counts(conversation).items():
+            await self.hub.publish(user_id, {
+                "type": "message",
+                "conversation": conversation.id,
+                "message": payload,
+                "unread": unread,
+            })
+
+    async def _mark_read(self, frame: dict) -> None:
+        conversation = await database_sync_to_async(services.mark_read)(
+            self.user, self._int(frame, "conversation"), self._int(frame, "up_to"),
+        )
+        for user_id, unread in services.unread_counts(conversation).items():
+            await self.hub.publish(user_id, {
+                "type": "read",
+                "conversation": conversation.id,
+                "reader": self.user_id,
+                "up_to": frame["up_to"],
+                "unread": unread,
+            })
+
+
+def _authenticate(token: str | None) -> Any:
+    from rest_framework_simplejwt.authentication import JWTAuthentication  # type: ignore
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken  # type: ignore
+
+    if not token:
+        return None
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+class ChatWebSocketApp:
+    """ASGI-приложение WebSocket-чата.
+
+    Хаб создаётся при первом подключении, в цикле событий сервера.
+    """
+
+    def __init__(self, hub: ChatHub | None = None, **connection_options: Any) -> None:
+        self._hub = hub
+        self.connection_options = connection_options
+
+    @property
+    def hub(self) -> ChatHub:
+        if self._hub is None:
+            self._hub = ChatHub()
+        return self._hub
+
+    async def __call__(self, scope: dict, receive: Receive, send: Send) -> None:
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        query = parse_qs(scope.get("query_string", b"").decode())
+        token = query.get("token", [None])[0]
+        user = await database_sync_to_async(_authenticate)(token)
+        if user is None:
+            # Закрытие до accept — отказ в рукопожатии
+            await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+            return
+
+        await send({"type": "websocket.accept"})
+        connection = ChatConnection(self.hub, user, receive, send, **self.connection_options)
+        await connection.run()
+
+    async def close(self) -> None:
+        if self._hub is not None:
+            await self._hub.close()
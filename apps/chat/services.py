@@ -0,0 +1,176 @@
+"""Операции чата: отправка сообщений, отметки о прочтении, история и inbox.
+
+Функции синхронные (ORM) и общие для WebSocket-канала и HTTP API.
+Результаты отправки и прочтения ``apps.chat.realtime`` рассылает участникам
+диалога. История и inbox отдаются строками ``values_list`` (компактный
+формат API) и листаются по ключу, без OFFSET.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.db import connection, transaction  # type: ignore
+from django.db.models import F, Q, Subquery  # type: ignore
+
+from shared.infrastructure.pagination import after_position, decode_cursor, encode_cursor
+
+from .models import ChatConversation, ChatMessage
+
+if TYPE_CHECKING:  # pragma: no cover
+    from apps.users.models import CustomUser
+
+
+HISTORY_FIELDS = ("id", "sender_id", "content", "sent_at", "is_read")
+HISTORY_PAGE_SIZE = 50
+
+INBOX_FIELDS = (
+    "id",
+    "other_id",
+    "other_first_name",
+    "other_last_name",
+    "property_id",
+    "booking_id",
+    "last_message_at",
+    "last_message_preview",
+    "unread",
+)
+INBOX_ORDERING = ("-last_message_at", "-id")
+INBOX_PAGE_SIZE = 20
+
+
+class ChatError(Exception):
+    """Операция чата недоступна пользователю (нет диалога, пустое сообщение)."""
+
+
+def get_conversation(user: CustomUser, conversation_id: int) -> ChatConversation:
+    """Диалог, в котором участвует ``user``."""
+    conversation = (
+        ChatConversation.objects.filter(pk=conversation_id)
+        .filter(Q(user1=user) | Q(user2=user))
+        .first()
+    )
+    if conversation is None:
+        raise ChatError("Диалог не найден")
+    return conversation
+
+
+def message_payload(message: ChatMessage) -> dict[str, Any]:
+    return {
+        "id": message.id,
+        "sender": message.sender_id,
+        "content": message.content,
+        "sent_at": message.sent_at.isoformat(),
+    }
+
+
+def unread_counts(conversation: ChatConversation) -> dict[int, int]:
+    """Счётчики непрочитанных по участникам диалога."""
+    return {
+        conversation.user1_id: conversation.user1_unread_count,
+        conversation.user2_id: conversation.user2_unread_count,
+    }
+
+
+@transaction.atomic
+def send_message(user: CustomUser, conversation_id: int, content: str) -> tuple[ChatConversation, ChatMessage]:
+    """Сохраняет сообщение; счётчик получателя увеличивает ``ChatMessage.save``."""
+    content = content.strip()
+    if not content:
+        raise ChatError("Пустое сообщение")
+    conversation = get_conversation(user, conversation_id)
+    message = ChatMessage.objects.create(conversation=conversation, sender=user, content=content)
+    conversation.refresh_unread_counts()
+    return conversation, message
+
+
+@transaction.atomic
+def mark_read(user: CustomUser, conversation_id: int, up_to: int) -> ChatConversation:
+    """Отмечает прочитанными входящие сообщения диалога с id не больше ``up_to``."""
+    conversation = get_conversation(user, conversation_id)
+    conversation.mark_read_up_to(user, up_to)
+    conversation.refresh_unread_counts()
+    return conversation
+
+
+def history_page(
+    user: CustomUser,
+    conversation_id: int,
+    *,
+    before: int | None = None,
+    after: int | None = None,
+    size: int = HISTORY_PAGE_SIZE,
+) -> tuple[list[tuple], bool]:
+    """Страница истории диалога в хронологическом порядке.
+
+    Без курсоров — последние ``size`` сообщений; ``before`` — сообщения
+    старше сообщения с этим id, ``after`` — новее (догрузка после
+    переподключения). Позиция курсора берётся подзапросом по его
+    ``sent_at``, поэтому страница читается диапазоном индекса
+    ``(conversation, sent_at)`` за один запрос.
+
+    Returns:
+        tuple: строки ``HISTORY_FIELDS`` и признак, что дальше есть ещё.
+    """
+    conversation = get_conversation(user, conversation_id)
+    messages = ChatMessage.objects.filter(conversation=conversation).order_by()
+    pivot_id = after if after is not None else before
+    if pivot_id is not None:
+        pivot = Subquery(
+            ChatMessage.objects.filter(conversation=conversation, pk=pivot_id).values("sent_at")[:1]
+        )
+        if after is not None:
+            messages = messages.filter(Q(sent_at__gt=pivot) | Q(sent_at=pivot, pk__gt=pivot_id))
+        else:
+            messages = messages.filter(Q(sent_at__lt=pivot) | Q(sent_at=pivot, pk__lt=pivot_id))
+
+    ordering = ("sent_at", "id") if after is not None else ("-sent_at", "-id")
+    rows = list(messages.order_by(*ordering).values_list(*HISTORY_FIELDS)[: size + 1])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if after is None:
+        rows.reverse()
+    return rows, has_more
+
+
+def _inbox_branch(user: CustomUser, side: str, other: str, position: list | None, size: int):  # type: ignore
+    queryset = ChatConversation.objects.filter(**{side: user}, last_message_at__isnull=False).annotate(
+        other_id=F(f"{other}_id"),
+        other_first_name=F(f"{other}__first_name"),
+        other_last_name=F(f"{other}__last_name"),
+        unread=F(f"{side}_unread_count"),
+    )
+    if position is not None:
+        queryset = queryset.filter(after_position(INBOX_ORDERING, position))
+    queryset = queryset.order_by().values_list(*INBOX_FIELDS)
+    if connection.features.supports_slicing_ordering_in_compound:
+        # Каждая половина — диапазон своего индекса с LIMIT
+        queryset = queryset.order_by(*INBOX_ORDERING)[: size + 1]
+    return queryset
+
+
+def inbox_page(user: CustomUser, cursor: str | None = None, size: int = INBOX_PAGE_SIZE) -> tuple[list[tuple], str | None]:
+    """Диалоги пользователя, последние сообщения сначала.
+
+    Один запрос: ``UNION ALL`` диалогов, где пользователь — ``user1``, и
+    где он ``user2``; каждая половина читает свой индекс
+    ``(userN, -last_message_at)``, превью и счётчик непрочитанных берутся
+    из самого диалога. Диалоги без сообщений в inbox не попадают.
+
+    Raises:
+        InvalidCursor: курсор подделан или от другого списка.
+
+    Returns:
+        tuple: строки ``INBOX_FIELDS`` и курсор следующей страницы.
+    """
+    position = decode_cursor(INBOX_ORDERING, cursor) if cursor else None
+    rows = list(
+        _inbox_branch(user, "user1", "user2", position, size)
+        .union(_inbox_branch(user, "user2", "user1", position, size), all=True)
+        .order_by(*INBOX_ORDERING)[: size + 1]
+    )
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = dict(zip(INBOX_FIELDS, rows[-1]))
+    return rows, encode_cursor(INBOX_ORDERING, last)
@@ -0,0 +1,74 @@
+"""Tests for unread counters: F()-based ingest and "read up to" in bulk."""
+
+from __future__ import annotations
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.chat.models import ChatConversation, ChatMessage
+from apps.users.models import User
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self) -> None:
+        self.guest = User.objects.create_user(
+            email="guest-counters@example.com",
+            phone="+77000000097",
+            password="StrongPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.realtor = User.objects.create_user(
+            email="realtor-counters@example.com",
+            phone="+77000000098",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.conversation = ChatConversation.objects.create(user1=self.guest, user2=self.realtor)
+
+    def test_sends_from_stale_instances_keep_every_increment(self) -> None:
+        # Два процесса с разными копиями диалога
+        first = ChatConversation.objects.get(pk=self.conversation.pk)
+        second = ChatConversation.objects.get(pk=self.conversation.pk)
+
+        with self.assertNumQueries(2):
+            ChatMessage.objects.create(conversation=first, sender=self.guest, content="Первое")
+        ChatMessage.objects.create(conversation=second, sender=self.guest, content="Второе")
+        ChatMessage.objects.create(conversation=second, sender=self.realtor, content="Ответ")
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.user2_unread_count, 2)
+        self.assertEqual(self.conversation.user1_unread_count, 1)
+        self.assertEqual(self.conversation.last_message_preview, "Ответ")
+
+    def test_read_up_to_flips_prior_messages_in_one_update(self) -> None:
+        messages = [
+            ChatMessage.objects.create(conversation=self.conversation, sender=self.guest, content=str(number))
+            for number in range(3)
+        ]
+        own = ChatMessage.objects.create(conversation=self.conversation, sender=self.realtor, content="Ответ")
+
+        with CaptureQueriesContext(connection) as queries:
+            marked = self.conversation.mark_read_up_to(self.realtor, own.id)
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+
+        self.assertEqual(marked, 3)
+        self.assertEqual(len(updates), 2)
+        self.assertFalse(ChatMessage.objects.filter(pk__in=[m.id for m in messages], is_read=False).exists())
+        self.assertFalse(ChatMessage.objects.get(pk=own.pk).is_read)
+        self.conversation.refresh_unread_counts()
+        self.assertEqual((self.conversation.user1_unread_count, self.conversation.user2_unread_count), (1, 0))
+
+    def test_newer_messages_stay_unread(self) -> None:
+        first, second = (
+            ChatMessage.objects.create(conversation=self.conversation, sender=self.guest, content=text)
+            for text in ("Раз", "Два")
+        )
+
+        self.assertEqual(self.conversation.mark_read_up_to(self.realtor, first.id), 1)
+        # Повторная отметка ничего не меняет
+        self.assertEqual(self.conversation.mark_read_up_to(self.realtor, first.id), 0)
+
+        self.conversation.refresh_unread_counts()
+        self.assertEqual(self.conversation.user2_unread_count, 1)
+        self.assertFalse(ChatMessage.objects.get(pk=second.pk).is_read)
@@ -0,0 +1,93 @@
+"""Tests for the chat history and inbox endpoints."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.chat.models import ChatConversation, ChatMessage
+from apps.users.models import User
+
+
+class ChatHistoryApiTests(TestCase):
+    def setUp(self) -> None:
+        self.guest = User.objects.create_user(
+            email="guest-history@example.com",
+            phone="+77000000099",
+            password="StrongPass123",
+            role=User.RoleChoices.GUEST,
+            first_name="Айгерим",
+        )
+        self.realtor = User.objects.create_user(
+            email="realtor-history@example.com",
+            phone="+77000000080",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+            first_name="Ерлан",
+        )
+        self.other = User.objects.create_user(
+            email="other-history@example.com",
+            phone="+77000000081",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+            first_name="Дана",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.guest)
+
+    def _conversation(self, user1: User, user2: User, *texts: str) -> ChatConversation:
+        conversation = ChatConversation.objects.create(user1=user1, user2=user2)
+        for text in texts:
+            ChatMessage.objects.create(conversation=conversation, sender=user2, content=text)
+        return conversation
+
+    def test_history_pages_by_message_id(self) -> None:
+        conversation = self._conversation(self.guest, self.realtor, *(f"m{number}" for number in range(5)))
+        ids = list(conversation.messages.order_by("id").values_list("id", flat=True))
+        url = reverse("chat-history", args=[conversation.id])
+
+        latest = self.client.get(url, {"page_size": 2}).json()
+        older = self.client.get(url, {"before": latest["messages"][0][0], "page_size": 2}).json()
+        oldest = self.client.get(url, {"before": older["messages"][0][0], "page_size": 2}).json()
+        newer = self.client.get(url, {"after": ids[1]}).json()
+
+        self.assertEqual(latest["fields"], ["id", "sender_id", "content", "sent_at", "is_read"])
+        self.assertEqual([row[0] for row in latest["messages"]], ids[3:])
+        self.assertEqual(latest["messages"][0][1:3], [self.realtor.id, "m3"])
+        self.assertTrue(latest["has_more"])
+        self.assertEqual([row[0] for row in older["messages"]], ids[1:3])
+        self.assertEqual(([row[0] for row in oldest["messages"]], oldest["has_more"]), ([ids[0]], False))
+        self.assertEqual(([row[0] for row in newer["messages"]], newer["has_more"]), (ids[2:], False))
+
+    def test_history_of_foreign_conversation_is_not_found(self) -> None:
+        conversation = self._conversation(self.other, self.realtor, "Привет")
+        url = reverse("chat-history", args=[conversation.id])
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url, {"before": "x"}).status_code, 400)
+
+    def test_inbox_merges_both_sides_in_one_query(self) -> None:
+        as_user1 = self._conversation(self.guest, self.realtor, "Первый", "Второй")
+        as_user2 = self._conversation(self.other, self.guest, "От гостя")
+        self._conversation(self.realtor, self.other, "Не мой")
+        ChatConversation.objects.create(user1=self.guest, user2=self.other, property=None)  # без сообщений
+        # Диалог, где гость — user2, обновлялся последним
+        ChatConversation.objects.filter(pk=as_user1.pk).update(last_message_at=timezone.now() - timedelta(hours=1))
+
+        with self.assertNumQueries(1):
+            first = self.client.get(reverse("chat-inbox"), {"page_size": 1}).json()
+        second = self.client.get(reverse("chat-inbox"), {"page_size": 1, "cursor": first["next"]}).json()
+
+        rows = [dict(zip(first["fields"], row)) for row in first["conversations"] + second["conversations"]]
+        self.assertIsNone(second["next"])
+        self.assertEqual([row["id"] for row in rows], [as_user2.id, as_user1.id])
+        self.assertEqual(
+            {key: rows[0][key] for key in ("other_id", "other_first_name", "last_message_preview", "unread")},
+            {"other_id": self.other.id, "other_first_name": "Дана", "last_message_preview": "От гостя", "unread": 0},
+        )
+        self.assertEqual((rows[1]["other_first_name"], rows[1]["unread"]), ("Ерлан", 2))
+        self.assertEqual(self.client.get(reverse("chat-inbox"), {"cursor": "bad"}).status_code, 400)
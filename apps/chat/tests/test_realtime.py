@@ -0,0 +1,247 @@
+"""Tests for the WebSocket chat: cross-worker fan-out, auth, backpressure, heartbeat."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.chat.broker import LocalBroker, RedisBroker
+from apps.chat.models import ChatConversation, ChatMessage
+from apps.chat.realtime import (
+    CLOSE_HEARTBEAT_TIMEOUT,
+    CLOSE_TRY_AGAIN_LATER,
+    CLOSE_UNAUTHORIZED,
+    ChatConnection,
+    ChatHub,
+    ChatWebSocketApp,
+)
+from apps.users.models import User
+
+TIMEOUT = 2
+
+
+class RedisStandIn:
+    """Минимальный Redis: PUBLISH/SUBSCRIBE/UNSUBSCRIBE по протоколу RESP."""
+
+    def __init__(self) -> None:
+        self.subscribers: dict[str, set[asyncio.StreamWriter]] = {}
+        self.server: asyncio.base_events.Server | None = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    def _bulk(value: str | None) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        data = value.encode()
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    def _push(self, *items: bytes) -> bytes:
+        return b"*%d\r\n" % len(items) + b"".join(items)
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> list[str] | None:
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            size = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(size + 2))[:-2].decode())
+        return args
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channels: set[str] = set()
+        try:
+            while (command := await self._read_command(reader)) is not None:
+                name, args = command[0].upper(), command[1:]
+                if name == "SUBSCRIBE":
+                    for channel in args:
+                        channels.add(channel)
+                        self.subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(self._push(self._bulk("subscribe"), self._bulk(channel), b":%d\r\n" % len(channels)))
+                elif name == "UNSUBSCRIBE":
+                    for channel in args or list(channels):
+                        channels.discard(channel)
+                        self.subscribers.get(channel, set()).discard(writer)
+                        writer.write(self._push(self._bulk("unsubscribe"), self._bulk(channel), b":%d\r\n" % len(channels)))
+                elif name == "PUBLISH":
+                    channel, data = args
+                    receivers = self.subscribers.get(channel, set())
+                    for receiver in receivers:
+                        receiver.write(self._push(self._bulk("message"), self._bulk(channel), self._bulk(data)))
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == "PING":
+                    writer.write(b"+PONG\r\n")
+                else:
+                    writer.write(b"+OK\r\n")
+                await writer.drain()
+        finally:
+            for channel in channels:
+                self.subscribers.get(channel, set()).discard(writer)
+            writer.close()
+
+
+class WebSocketClient:
+    """Клиент, вызывающий ASGI-приложение напрямую."""
+
+    def __init__(self, app: ChatWebSocketApp, token: str = "") -> None:
+        self.inbox: asyncio.Queue[dict] = asyncio.Queue()
+        self.outbox: asyncio.Queue[dict] = asyncio.Queue()
+        scope = {"type": "websocket", "path": "/ws/chat/", "query_string": f"token={token}".encode()}
+        self.task = asyncio.ensure_future(app(scope, self.inbox.get, self.outbox.put))
+        self.inbox.put_nowait({"type": "websocket.connect"})
+
+    async def receive(self) -> dict:
+        return await asyncio.wait_for(self.outbox.get(), TIMEOUT)
+
+    async def receive_json(self) -> dict:
+        message = await self.receive()
+        return json.loads(message["text"])
+
+    def send_json(self, frame: dict) -> None:
+        self.inbox.put_nowait({"type": "websocket.receive", "text": json.dumps(frame)})
+
+    async def disconnect(self) -> None:
+        self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, TIMEOUT)
+
+
+class ChatWebSocketTests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.guest = User.objects.create_user(
+            email="guest-chat@example.com",
+            phone="+77000000094",
+            password="StrongPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.realtor = User.objects.create_user(
+            email="realtor-chat@example.com",
+            phone="+77000000095",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.conversation = ChatConversation.objects.create(user1=self.guest, user2=self.realtor)
+        other = User.objects.create_user(
+            email="other-chat@example.com",
+            phone="+77000000096",
+            password="StrongPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.outsider = ChatConversation.objects.create(user1=other, user2=self.realtor)
+
+    async def test_events_reach_participants_on_other_workers(self) -> None:
+        redis_server = RedisStandIn()
+        url = await redis_server.start()
+        # Два процесса сервера, каждый со своим подключением к Redis
+        first = ChatWebSocketApp(ChatHub(RedisBroker(url, poll_timeout=0.05)))
+        second = ChatWebSocketApp(ChatHub(RedisBroker(url, poll_timeout=0.05)))
+        try:
+            guest = WebSocketClient(first, str(AccessToken.for_user(self.guest)))
+            realtor = WebSocketClient(second, str(AccessToken.for_user(self.realtor)))
+            self.assertEqual((await guest.receive())["type"], "websocket.accept")
+            self.assertEqual((await realtor.receive())["type"], "websocket.accept")
+            while first.hub.connection_count() + second.hub.connection_count() < 2:
+                await asyncio.sleep(0.01)
+
+            guest.send_json({"type": "send", "conversation": self.conversation.id, "content": " Здравствуйте ", "ref": "a1"})
+            ack = await guest.receive_json()
+            own = await guest.receive_json()
+            delivered = await realtor.receive_json()
+
+            message_id = ack["message"]
+            self.assertEqual(ack, {"type": "ack", "ref": "a1", "message": message_id})
+            self.assertEqual(delivered["type"], "message")
+            self.assertEqual(delivered["conversation"], self.conversation.id)
+            self.assertEqual(delivered["message"]["content"], "Здравствуйте")
+            self.assertEqual(delivered["message"]["sender"], self.guest.id)
+            self.assertEqual(delivered["unread"], 1)
+            self.assertEqual((own["message"], own["unread"]), (delivered["message"], 0))
+
+            realtor.send_json({"type": "read", "conversation": self.conversation.id, "up_to": message_id})
+            receipt = await guest.receive_json()
+            self.assertEqual(
+                receipt,
+                {"type": "read", "conversation": self.conversation.id, "reader": self.realtor.id, "up_to": message_id, "unread": 0},
+            )
+            self.assertEqual((await realtor.receive_json())["type"], "read")
+
+            # Чужой диалог недоступен
+            guest.send_json({"type": "send", "conversation": self.outsider.id, "content": "?", "ref": "a2"})
+            self.assertEqual(await guest.receive_json(), {"type": "error", "detail": "Диалог не найден", "ref": "a2"})
+
+            await guest.disconnect()
+            await realtor.disconnect()
+            self.assertEqual(first.hub.connection_count() + second.hub.connection_count(), 0)
+        finally:
+            await first.close()
+            await second.close()
+            await redis_server.stop()
+
+        message = await ChatMessage.objects.aget(pk=message_id)
+        conversation = await ChatConversation.objects.aget(pk=self.conversation.pk)
+        self.assertTrue(message.is_read)
+        self.assertEqual((conversation.user1_unread_count, conversation.user2_unread_count), (0, 0))
+
+    async def test_connection_without_valid_token_is_rejected(self) -> None:
+        app = ChatWebSocketApp(ChatHub(LocalBroker()))
+        client = WebSocketClient(app, "not-a-token")
+
+        self.assertEqual(await client.receive(), {"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+        await asyncio.wait_for(client.task, TIMEOUT)
+
+
+class ChatConnectionTests(SimpleTestCase):
+    def _run(self, send, **options) -> tuple[int, ChatHub]:  # type: ignore
+        async def scenario() -> tuple[int, ChatHub]:
+            hub = ChatHub(LocalBroker())
+            closed: list[int] = []
+            inbox: asyncio.Queue[dict] = asyncio.Queue()
+
+            async def record(message: dict) -> None:
+                if message["type"] == "websocket.close":
+                    closed.append(message["code"])
+                else:
+                    await send(message)
+
+            connection = ChatConnection(hub, SimpleNamespace(id=7), inbox.get, record, **options)
+            task = asyncio.ensure_future(connection.run())
+            while hub.connection_count() == 0:
+                await asyncio.sleep(0)
+            for number in range(5):
+                await hub.publish(7, {"type": "message", "number": number})
+            await asyncio.wait_for(task, TIMEOUT)
+            return closed[0], hub
+
+        return asyncio.run(scenario())
+
+    def test_slow_client_is_disconnected(self) -> None:
+        async def stalled(message: dict) -> None:
+            await asyncio.Event().wait()
+
+        code, hub = self._run(stalled, queue_size=2, heartbeat_interval=60, heartbeat_timeout=60)
+
+        self.assertEqual(code, CLOSE_TRY_AGAIN_LATER)
+        self.assertEqual(hub.connection_count(), 0)
+
+    def test_silent_client_times_out(self) -> None:
+        sent: list[dict] = []
+
+        async def collect(message: dict) -> None:
+            sent.append(json.loads(message["text"]))
+
+        code, _ = self._run(collect, queue_size=10, heartbeat_interval=0.01, heartbeat_timeout=0.05)
+
+        self.assertEqual(code, CLOSE_HEARTBEAT_TIMEOUT)
+        self.assertEqual([frame["number"] for frame in sent if frame["type"] == "message"], [0, 1, 2, 3, 4])
+        self.assertIn({"type": "ping"}, sent)
@@ -0,0 +1,14 @@
+"""URL routing for chat."""
+
+from django.urls import path  # type: ignore
+
+from .views import ConversationHistoryView, ConversationInboxView
+
+urlpatterns = [
+    path('conversations/', ConversationInboxView.as_view(), name='chat-inbox'),
+    path(
+        'conversations/<int:conversation_id>/messages/',
+        ConversationHistoryView.as_view(),
+        name='chat-history',
+    ),
+]
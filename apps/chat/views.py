@@ -1,3 +1,77 @@
-from django.shortcuts import render
+"""API views for chat history and the conversation inbox.
 
-# Create your views here.
+Rows are returned in a compact wire format: a ``fields`` header and a list
+of value arrays, without per-row keys. Realtime delivery lives in
+``apps.chat.realtime``.
+"""
+
+from __future__ import annotations
+
+from rest_framework import permissions  # type: ignore
+from rest_framework.exceptions import NotFound, ValidationError  # type: ignore
+from rest_framework.response import Response  # type: ignore
+from rest_framework.views import APIView  # type: ignore
+
+from shared.infrastructure.pagination import InvalidCursor
+
+from . import services
+
+MAX_PAGE_SIZE = 100
+
+
+def _int_param(request, name: str, default: int | None = None) -> int | None:  # type: ignore
+    raw = request.query_params.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValidationError({name: "Ожидается целое число."})
+    if value < 1:
+        raise ValidationError({name: "Должно быть положительным."})
+    return value
+
+
+class ConversationInboxView(APIView):
+    """Conversations of the current user, most recent first."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):  # type: ignore
+        """
+        GET /api/v1/chat/conversations/?cursor=&page_size=20
+
+        Один UNION-запрос по индексам ``(user1|user2, -last_message_at)``.
+        """
+        size = min(_int_param(request, "page_size", services.INBOX_PAGE_SIZE), MAX_PAGE_SIZE)
+        try:
+            rows, next_cursor = services.inbox_page(request.user, request.query_params.get("cursor"), size)
+        except InvalidCursor as exc:
+            raise ValidationError({"cursor": str(exc)})
+        return Response({"fields": services.INBOX_FIELDS, "conversations": rows, "next": next_cursor})
+
+
+class ConversationHistoryView(APIView):
+    """Message history of one conversation, in chronological order."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, conversation_id: int):  # type: ignore
+        """
+        GET /api/v1/chat/conversations/{id}/messages/?before=<id>|after=<id>&page_size=50
+
+        ``before`` — более ранние сообщения (листание вверх), ``after`` —
+        новые сообщения после последнего полученного.
+        """
+        before = _int_param(request, "before")
+        after = _int_param(request, "after")
+        if before is not None and after is not None:
+            raise ValidationError("Укажите только один из параметров before и after.")
+        size = min(_int_param(request, "page_size", services.HISTORY_PAGE_SIZE), MAX_PAGE_SIZE)
+        try:
+            rows, has_more = services.history_page(
+                request.user, conversation_id, before=before, after=after, size=size,
+            )
+        except services.ChatError as exc:
+            raise NotFound(str(exc))
+        return Response({"fields": services.HISTORY_FIELDS, "messages": rows, "has_more": has_more})
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.12 on 2026-10-16 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('favorites', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='favorites_f_user_id_f1e205_idx'),
+        ),
+    ]
@@ -25,6 +25,10 @@ class Favorite(models.Model):
     class Meta:
         unique_together = ('user', 'property')
         ordering = ['-created_at']
+        indexes = [
+            # Cursor pagination of a user's favorites
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
 
     def __str__(self) -> str:
         return f"Favorite property {self.property_id} by user {self.user_id}"
\ No newline at end of file
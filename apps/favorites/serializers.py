@@ -30,25 +30,19 @@ class PropertyShortSerializer(serializers.Serializer):
     max_guests = serializers.IntegerField()
     status = serializers.CharField()
 
-    # Дополнительная информация
+    # Дополнительная информация (сводка отзывов хранится на объекте)
     average_rating = serializers.SerializerMethodField()
-    reviews_count = serializers.SerializerMethodField()
+    reviews_count = serializers.IntegerField()
     main_photo_url = serializers.SerializerMethodField()
 
     def get_average_rating(self, obj):  # type: ignore
         """Средний рейтинг объекта."""
-        from django.db.models import Avg  # type: ignore
-        avg = obj.reviews.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        return round(avg, 1) if avg else None
-
-    def get_reviews_count(self, obj):  # type: ignore
-        """Количество отзывов."""
-        return obj.reviews.count()
+        return round(float(obj.rating_avg), 1) if obj.reviews_count else None
 
     def get_main_photo_url(self, obj):  # type: ignore
-        """URL главной фотографии."""
-        primary_photo = obj.photos.filter(is_primary=True).first()
-        photo = primary_photo or obj.photos.first()
+        """URL главной фотографии (по предзагруженным фотографиям)."""
+        photos = list(obj.photos.all())
+        photo = next((item for item in photos if item.is_primary), photos[0] if photos else None)
         image_field = getattr(photo, "image", None) if photo else None
         if not image_field:
             return None
@@ -3,12 +3,12 @@
 from __future__ import annotations
 
 from django.db import IntegrityError  # type: ignore
-from django.db.models import Prefetch  # type: ignore
 from rest_framework import viewsets, permissions, status  # type: ignore
 from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response  # type: ignore
 
 from apps.properties.models import Property
+from shared.infrastructure.pagination import CreatedAtCursorPagination
 from .models import Favorite
 from .serializers import (
     FavoriteSerializer,
@@ -23,7 +23,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     Viewset to add, list and remove favorite properties.
 
     Endpoints:
-    - GET /api/v1/favorites/ - список избранных
+    - GET /api/v1/favorites/ - список избранных (курсорная пагинация, ?cursor=)
     - POST /api/v1/favorites/ - добавить в избранное
     - DELETE /api/v1/favorites/{id}/ - удалить из избранного
     - POST /api/v1/favorites/toggle/ - переключить (добавить/удалить)
@@ -33,6 +33,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
 
     queryset = Favorite.objects.select_related('user', 'property').all()
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_serializer_class(self) -> type[FavoriteSerializer]:  # type: ignore
         if self.action == 'create':
@@ -48,10 +49,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
         qs = super().get_queryset().filter(user=self.request.user)
 
         # Prefetch related data для оптимизации
-        qs = qs.prefetch_related(
-            Prefetch('property__reviews'),
-            'property__photos',
-        )
+        qs = qs.prefetch_related('property__photos')
 
         # Фильтрация по city
         city = self.request.query_params.get('city', None)
@@ -102,7 +100,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
 
         # Возвращаем полную информацию о созданном избранном
         favorite = Favorite.objects.select_related('property').prefetch_related(
-            'property__reviews', 'property__photos'
+            'property__photos'
         ).get(
             user=request.user,
             property=serializer.validated_data['property']
@@ -151,7 +149,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
 
             # Возвращаем детальную информацию
             favorite = Favorite.objects.select_related('property').prefetch_related(
-                'property__reviews', 'property__photos'
+                'property__photos'
             ).get(id=favorite.id)
 
             return Response(
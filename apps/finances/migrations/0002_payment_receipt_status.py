@@ -0,0 +1,36 @@
+# Generated by Django 5.1.12 on 2026-10-16 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finances", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="receipt_status",
+            field=models.CharField(
+                choices=[
+                    ("not_uploaded", "Не загружена"),
+                    ("processing", "Распознаётся"),
+                    ("parsed", "Распознана"),
+                    ("failed", "Не распознана"),
+                ],
+                default="not_uploaded",
+                help_text="Статус распознавания квитанции",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="payment",
+            name="receipt_error",
+            field=models.CharField(
+                blank=True,
+                help_text="Причина, по которой квитанцию не удалось распознать",
+                max_length=255,
+            ),
+        ),
+    ]
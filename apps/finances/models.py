@@ -25,6 +25,12 @@ class Payment(models.Model):
         APPROVED = "approved", _("Одобрено риелтором")
         REJECTED = "rejected", _("Отклонено риелтором")
 
+    class ReceiptStatus(models.TextChoices):
+        NOT_UPLOADED = "not_uploaded", _("Не загружена")
+        PROCESSING = "processing", _("Распознаётся")
+        PARSED = "parsed", _("Распознана")
+        FAILED = "failed", _("Не распознана")
+
     class Method(models.TextChoices):
         KASPI = "kaspi", _("Kaspi Pay")
         CASH = "cash", _("Наличные")
@@ -62,6 +68,17 @@ class Payment(models.Model):
         blank=True,
         help_text=_("Сумма из квитанции"),
     )
+    receipt_status = models.CharField(
+        max_length=20,
+        choices=ReceiptStatus.choices,
+        default=ReceiptStatus.NOT_UPLOADED,
+        help_text=_("Статус распознавания квитанции"),
+    )
+    receipt_error = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text=_("Причина, по которой квитанцию не удалось распознать"),
+    )
     realtor_approval_status = models.CharField(
         max_length=20,
         choices=RealtorApprovalStatus.choices,
@@ -95,6 +112,7 @@ class Payment(models.Model):
             self.transaction_id = transaction_id
         self.paid_at = timezone.now()
         self.save(update_fields=["status", "transaction_id", "paid_at", "updated_at"])
+        self._mark_stats_stale()
         if hasattr(self.booking, "mark_paid"):
             self.booking.mark_paid()
 
@@ -110,6 +128,14 @@ class Payment(models.Model):
             self.metadata["refund_amount"] = str(amount)
         self.refunded_at = timezone.now()
         self.save(update_fields=["status", "metadata", "refunded_at", "updated_at"])
+        self._mark_stats_stale()
+
+    def _mark_stats_stale(self) -> None:
+        """Помечает дневную аналитику объекта за день оплаты для пересчёта."""
+        from apps.analytics.rollups import mark_stale  # local import to avoid circular
+
+        if self.paid_at:
+            mark_stale(self.booking.property_id, self.paid_at)
 
     def approve_by_realtor(self, realtor_user, comment: str = "") -> None:
         """Одобрение платежа риелтором (для QR оплаты)."""
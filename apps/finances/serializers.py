@@ -5,6 +5,7 @@ from __future__ import annotations
 from rest_framework import serializers  # type: ignore
 
 from .models import Payment, PaymentTransaction
+from .services import RECEIPT_MAX_BYTES
 
 
 class PaymentTransactionSerializer(serializers.ModelSerializer):
@@ -36,6 +37,8 @@ class PaymentSerializer(serializers.ModelSerializer):
             "refunded_at",
             "receipt_file",
             "receipt_amount",
+            "receipt_status",
+            "receipt_error",
             "realtor_approval_status",
             "realtor_comment",
             "realtor_decision_at",
@@ -51,6 +54,8 @@ class PaymentSerializer(serializers.ModelSerializer):
             "paid_at",
             "refunded_at",
             "receipt_amount",
+            "receipt_status",
+            "receipt_error",
             "realtor_approval_status",
             "realtor_comment",
             "realtor_decision_at",
@@ -79,8 +84,10 @@ class ReceiptUploadSerializer(serializers.Serializer):
         """Проверка что файл - это PDF."""
         if not value.name.lower().endswith('.pdf'):
             raise serializers.ValidationError("Файл должен быть в формате PDF.")
-        if value.size > 10 * 1024 * 1024:  # 10 МБ
-            raise serializers.ValidationError("Размер файла не должен превышать 10 МБ.")
+        if value.size > RECEIPT_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Размер файла не должен превышать {RECEIPT_MAX_BYTES // (1024 * 1024)} МБ."
+            )
         return value
 
 
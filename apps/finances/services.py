@@ -3,89 +3,106 @@
 from __future__ import annotations
 
 import re
-from decimal import Decimal
-from typing import Any
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any
 
 import pdfplumber  # type: ignore
-from django.core.files.uploadedfile import UploadedFile  # type: ignore
 
-
-def parse_receipt_amount(pdf_file: UploadedFile) -> Decimal | None:
+# Ограничения на квитанцию: разбор не должен занимать воркер надолго
+RECEIPT_MAX_BYTES = 10 * 1024 * 1024
+RECEIPT_MAX_PAGES = 5
+
+MIN_RECEIPT_AMOUNT = Decimal("100")
+MAX_RECEIPT_AMOUNT = Decimal("10000000")
+
+_AMOUNT = r"([0-9][0-9\s,]*(?:\.\d+)?)"
+# "Сумма: 15 000.00" или "Итого: 15000"
+LABELLED_AMOUNT_RE = re.compile(r"(?:сумма|итого|к оплате|amount|total)[:\s]+" + _AMOUNT, re.IGNORECASE)
+# "15 000.00 тенге" или "15000 KZT"
+CURRENCY_AMOUNT_RE = re.compile(_AMOUNT + r"\s*(?:тенге|тг|KZT|₸)", re.IGNORECASE)
+# Просто число с пробелами "15 000" или "15,000.00"
+BARE_AMOUNT_RE = re.compile(r"([0-9][0-9\s,]*\.?\d+)")
+SEPARATORS_RE = re.compile(r"[\s,]")
+
+
+class ReceiptParseError(Exception):
+    """Квитанцию не удалось разобрать (файл слишком большой, повреждён и т.п.)."""
+
+
+def _amounts(pattern: re.Pattern, text: str) -> list[Decimal]:
+    amounts = []
+    for match in pattern.finditer(text):
+        # Очищаем от пробелов и запятых
+        cleaned = SEPARATORS_RE.sub("", match.group(1))
+        try:
+            amount = Decimal(cleaned)
+        except (InvalidOperation, ValueError):
+            continue
+        # Игнорируем слишком малые (например, номера квитанций)
+        # и слишком большие суммы (ошибки парсинга)
+        if MIN_RECEIPT_AMOUNT <= amount <= MAX_RECEIPT_AMOUNT:
+            amounts.append(amount)
+    return amounts
+
+
+def extract_receipt_amount(
+    pdf_file: IO[bytes],
+    *,
+    max_bytes: int = RECEIPT_MAX_BYTES,
+    max_pages: int = RECEIPT_MAX_PAGES,
+) -> Decimal | None:
     """
     Извлекает сумму платежа из PDF квитанции.
 
-    Ищет паттерны типа:
-    - "15 000"
-    - "15000"
-    - "15 000.00"
-    - "15,000.00"
-    - "Сумма: 15000"
-    - "Итого: 15 000"
+    Страницы читаются по очереди. Как только на странице найдена сумма с
+    подписью («Сумма», «Итого», «К оплате», «Amount», «Total»), разбор
+    останавливается и возвращается наибольшая из подписанных сумм страницы.
+    Иначе возвращается наибольшая сумма с валютой, а если таких нет —
+    наибольшее число из текста.
 
     Args:
-        pdf_file: Загруженный PDF файл
+        pdf_file: PDF файл (загруженный или из хранилища)
+        max_bytes: максимальный размер файла
+        max_pages: максимальное количество страниц
 
     Returns:
         Decimal: Найденная сумма или None если не найдено
+
+    Raises:
+        ReceiptParseError: файл превышает ограничения или не читается как PDF
     """
+    size = getattr(pdf_file, "size", None)
+    if size is not None and size > max_bytes:
+        raise ReceiptParseError(f"Размер файла превышает {max_bytes // (1024 * 1024)} МБ.")
+
+    currency_amounts: list[Decimal] = []
+    bare_amounts: list[Decimal] = []
     try:
-        # Открываем PDF
         with pdfplumber.open(pdf_file) as pdf:
-            # Извлекаем текст из всех страниц
-            full_text = ""
+            if len(pdf.pages) > max_pages:
+                raise ReceiptParseError(f"Квитанция содержит больше {max_pages} страниц.")
             for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    full_text += text + "\n"
-
-        if not full_text:
-            return None
-
-        # Паттерны для поиска сумм
-        # Ищем числа с разделителями (пробелы, запятые) и десятичными точками
-        patterns = [
-            # "Сумма: 15 000.00" или "Итого: 15000"
-            r'(?:сумма|итого|к оплате|amount|total)[:\s]+([0-9\s,]+\.?\d*)',
-            # "15 000.00 тенге" или "15000 KZT"
-            r'([0-9\s,]+\.?\d+)\s*(?:тенге|тг|KZT|₸)',
-            # Просто число с пробелами "15 000" или "15,000.00"
-            r'([0-9\s,]+\.?\d+)',
-        ]
-
-        amounts = []
-
-        for pattern in patterns:
-            matches = re.finditer(pattern, full_text, re.IGNORECASE)
-            for match in matches:
-                # Извлекаем найденное число
-                amount_str = match.group(1)
-
-                # Очищаем от пробелов и запятых
-                cleaned = amount_str.replace(' ', '').replace(',', '')
-
-                # Пробуем конвертировать в Decimal
-                try:
-                    amount = Decimal(cleaned)
-                    # Игнорируем слишком малые (например, номера квитанций)
-                    # и слишком большие суммы (ошибки парсинга)
-                    if 100 <= amount <= 10_000_000:
-                        amounts.append(amount)
-                except (ValueError, ArithmeticError):
+                text = page.extract_text() or ""
+                # Освобождаем разобранные объекты страницы сразу
+                page.close()
+                if not text:
                     continue
-
-        if not amounts:
-            return None
-
-        # Возвращаем наибольшую найденную сумму
-        # (обычно это итоговая сумма платежа)
-        return max(amounts)
-
-    except Exception as e:
-        # Логируем ошибку, но не прерываем процесс
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Ошибка парсинга PDF квитанции: {e}")
-        return None
+                labelled = _amounts(LABELLED_AMOUNT_RE, text)
+                if labelled:
+                    return max(labelled)
+                currency_amounts += _amounts(CURRENCY_AMOUNT_RE, text)
+                if not currency_amounts:
+                    bare_amounts += _amounts(BARE_AMOUNT_RE, text)
+    except ReceiptParseError:
+        raise
+    except Exception as exc:
+        raise ReceiptParseError(f"Не удалось прочитать PDF: {exc}") from exc
+
+    if currency_amounts:
+        return max(currency_amounts)
+    if bare_amounts:
+        return max(bare_amounts)
+    return None
 
 
 def validate_receipt_amount(
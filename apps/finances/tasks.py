@@ -0,0 +1,93 @@
+"""Celery tasks for the finance domain."""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from celery import shared_task  # type: ignore
+from celery.exceptions import SoftTimeLimitExceeded  # type: ignore
+from django.db import transaction  # type: ignore
+
+from .models import Payment
+from .services import ReceiptParseError, extract_receipt_amount, validate_receipt_amount
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_SOFT_TIME_LIMIT = 60
+RECEIPT_TIME_LIMIT = 90
+# Квитанция в статусе «обрабатывается» дольше этого срока считается
+# потерянной (воркер убит по time_limit, сообщение пропало из брокера),
+# и гость может загрузить её заново
+RECEIPT_PROCESSING_TIMEOUT = timedelta(minutes=10)
+
+
+def _fail(payment: Payment, reason: str) -> dict:
+    payment.receipt_status = Payment.ReceiptStatus.FAILED
+    payment.receipt_error = reason[:255]
+    payment.save(update_fields=["receipt_status", "receipt_error", "updated_at"])
+    logger.warning(f"Receipt for payment {payment.id} was not parsed: {reason}")
+    return {"payment_id": payment.id, "status": payment.receipt_status}
+
+
+@shared_task(
+    name="finances.parse_payment_receipt",
+    soft_time_limit=RECEIPT_SOFT_TIME_LIMIT,
+    time_limit=RECEIPT_TIME_LIMIT,
+)
+def parse_payment_receipt(payment_id: int) -> dict:
+    """
+    Распознаёт сумму в загруженной квитанции.
+
+    При успехе сохраняет сумму, переводит платёж в ожидание одобрения
+    риелтором и уведомляет его. При ошибке сохраняет причину — гость видит
+    её через ``GET /payments/<id>/receipt-status/``.
+
+    Returns:
+        dict: {"payment_id", "status"}
+    """
+    try:
+        payment = Payment.objects.select_related("booking__property__owner", "booking__guest").get(pk=payment_id)
+    except Payment.DoesNotExist:
+        return {"payment_id": payment_id, "status": "missing"}
+
+    if payment.receipt_status != Payment.ReceiptStatus.PROCESSING or not payment.receipt_file:
+        return {"payment_id": payment.id, "status": payment.receipt_status}
+
+    try:
+        with payment.receipt_file.open("rb") as receipt:
+            parsed_amount = extract_receipt_amount(receipt)
+    except ReceiptParseError as exc:
+        return _fail(payment, str(exc))
+    except SoftTimeLimitExceeded:
+        return _fail(payment, "Превышено время распознавания квитанции.")
+    except Exception:
+        # Ошибка хранилища и т.п.: не оставляем квитанцию «в обработке»
+        logger.exception(f"Receipt parsing crashed for payment {payment.id}")
+        return _fail(payment, "Не удалось обработать квитанцию. Попробуйте загрузить её снова.")
+
+    if parsed_amount is None:
+        return _fail(payment, "Не удалось извлечь сумму из квитанции. Проверьте файл и попробуйте снова.")
+
+    with transaction.atomic():
+        payment.receipt_amount = parsed_amount
+        payment.receipt_status = Payment.ReceiptStatus.PARSED
+        payment.receipt_error = ""
+        payment.realtor_approval_status = Payment.RealtorApprovalStatus.PENDING_APPROVAL
+        payment.save(update_fields=[
+            "receipt_amount",
+            "receipt_status",
+            "receipt_error",
+            "realtor_approval_status",
+            "updated_at",
+        ])
+
+        # Отправляем уведомление риелтору
+        from apps.notifications.services import send_receipt_uploaded_notification
+        send_receipt_uploaded_notification(payment)
+
+    logger.info(
+        f"Receipt parsed for payment {payment.id}: parsed={parsed_amount}, "
+        f"expected={payment.amount}, valid={validate_receipt_amount(parsed_amount, payment.amount)}"
+    )
+    return {"payment_id": payment.id, "status": payment.receipt_status}
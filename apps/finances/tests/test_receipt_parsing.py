@@ -0,0 +1,184 @@
+"""Tests for background receipt parsing."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.finances.models import Payment
+from apps.finances.services import ReceiptParseError, extract_receipt_amount
+from apps.finances.tasks import parse_payment_receipt
+from apps.properties.models import Property
+from apps.users.models import User
+
+
+class FakePage:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.extracted = False
+
+    def extract_text(self) -> str:
+        self.extracted = True
+        return self.text
+
+    def close(self) -> None:
+        pass
+
+
+class FakePdf:
+    def __init__(self, pages: list[FakePage]) -> None:
+        self.pages = pages
+
+    def __enter__(self) -> "FakePdf":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+def _open_pages(*texts: str):  # type: ignore
+    pages = [FakePage(text) for text in texts]
+    return pages, mock.patch("apps.finances.services.pdfplumber.open", return_value=FakePdf(pages))
+
+
+class ExtractReceiptAmountTests(SimpleTestCase):
+    def test_stops_at_first_page_with_labelled_total(self) -> None:
+        pages, patcher = _open_pages("Квитанция 123456\nИтого: 15 000.00", "Сумма: 99 000")
+        with patcher:
+            amount = extract_receipt_amount(SimpleUploadedFile("r.pdf", b"%PDF"))
+
+        self.assertEqual(amount, Decimal("15000.00"))
+        self.assertFalse(pages[1].extracted)
+
+    def test_prefers_currency_amounts_without_label(self) -> None:
+        _, patcher = _open_pages("Номер 7000123\nОплачено 12 500 KZT")
+        with patcher:
+            amount = extract_receipt_amount(SimpleUploadedFile("r.pdf", b"%PDF"))
+
+        self.assertEqual(amount, Decimal("12500"))
+
+    def test_limits(self) -> None:
+        _, patcher = _open_pages(*["Итого: 100"] * 3)
+        with patcher, self.assertRaises(ReceiptParseError):
+            extract_receipt_amount(SimpleUploadedFile("r.pdf", b"%PDF"), max_pages=2)
+        with self.assertRaises(ReceiptParseError):
+            extract_receipt_amount(SimpleUploadedFile("r.pdf", b"%PDF-1.4"), max_bytes=4)
+
+
+@override_settings(MEDIA_ROOT="/tmp/zhilyego-test-media")
+class ReceiptUploadTests(TestCase):
+    def setUp(self) -> None:
+        self.guest = User.objects.create_user(
+            email="guest-receipt@example.com",
+            phone="+77000000072",
+            password="GuestPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        owner = User.objects.create_user(
+            email="realtor-receipt@example.com",
+            phone="+77000000073",
+            password="RealtorPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        prop = Property.objects.create(
+            owner=owner,
+            title="Квартира с QR оплатой",
+            description="Описание",
+            address_line="ул. Толе би, 12",
+            status=Property.Status.ACTIVE,
+            base_price=Decimal("15000.00"),
+            sleeping_places=2,
+            min_nights=1,
+            max_nights=14,
+        )
+        check_in = timezone.localdate() + timedelta(days=3)
+        booking = Booking.objects.create(
+            property=prop,
+            guest=self.guest,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=1),
+        )
+        self.payment = Payment.objects.create(
+            booking=booking,
+            method=Payment.Method.STATIC_QR,
+            amount=Decimal("15000.00"),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.guest)
+
+    def test_upload_queues_parsing_and_status_reports_result(self) -> None:
+        upload = SimpleUploadedFile("receipt.pdf", b"%PDF-1.4", content_type="application/pdf")
+        with (
+            mock.patch("apps.finances.views.parse_payment_receipt.delay") as delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.client.post(
+                reverse("payment-upload-receipt", args=[self.payment.id]),
+                {"receipt_file": upload},
+                format="multipart",
+            )
+
+        self.assertEqual(response.status_code, 202)
+        delay.assert_called_once_with(self.payment.id)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.receipt_status, Payment.ReceiptStatus.PROCESSING)
+
+        with (
+            mock.patch("apps.finances.tasks.extract_receipt_amount", return_value=Decimal("15000")),
+            mock.patch("apps.notifications.services.send_receipt_uploaded_notification") as notify,
+        ):
+            parse_payment_receipt(self.payment.id)
+        notify.assert_called_once()
+
+        status_response = self.client.get(reverse("payment-receipt-status", args=[self.payment.id]))
+        self.assertEqual(status_response.data["receipt_status"], Payment.ReceiptStatus.PARSED)
+        self.assertEqual(status_response.data["parsed_amount"], "15000.00")
+        self.assertTrue(status_response.data["amount_valid"])
+        self.assertEqual(
+            status_response.data["realtor_approval_status"],
+            Payment.RealtorApprovalStatus.PENDING_APPROVAL,
+        )
+
+    def test_parse_failure_is_reported(self) -> None:
+        self.payment.receipt_file = SimpleUploadedFile("receipt.pdf", b"%PDF-1.4")
+        self.payment.receipt_status = Payment.ReceiptStatus.PROCESSING
+        self.payment.save()
+
+        with mock.patch("apps.finances.tasks.extract_receipt_amount", side_effect=ReceiptParseError("битый файл")):
+            parse_payment_receipt(self.payment.id)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.receipt_status, Payment.ReceiptStatus.FAILED)
+        self.assertEqual(self.payment.receipt_error, "битый файл")
+
+    def test_unexpected_error_marks_receipt_failed(self) -> None:
+        self.payment.receipt_file = SimpleUploadedFile("receipt.pdf", b"%PDF-1.4")
+        self.payment.receipt_status = Payment.ReceiptStatus.PROCESSING
+        self.payment.save()
+
+        with mock.patch("apps.finances.tasks.extract_receipt_amount", side_effect=OSError("storage is down")):
+            parse_payment_receipt(self.payment.id)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.receipt_status, Payment.ReceiptStatus.FAILED)
+
+    def test_stuck_processing_receipt_can_be_uploaded_again(self) -> None:
+        Payment.objects.filter(pk=self.payment.pk).update(receipt_status=Payment.ReceiptStatus.PROCESSING)
+        url = reverse("payment-upload-receipt", args=[self.payment.id])
+
+        def upload():  # type: ignore
+            receipt = SimpleUploadedFile("receipt.pdf", b"%PDF-1.4", content_type="application/pdf")
+            with mock.patch("apps.finances.views.parse_payment_receipt.delay"):
+                return self.client.post(url, {"receipt_file": receipt}, format="multipart")
+
+        self.assertEqual(upload().status_code, 409)
+        Payment.objects.filter(pk=self.payment.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(upload().status_code, 202)
@@ -14,7 +14,9 @@ import logging
 from rest_framework import viewsets, permissions, status  # type: ignore
 from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response  # type: ignore
+from rest_framework.reverse import reverse  # type: ignore
 from django.db import transaction  # type: ignore
+from django.utils import timezone  # type: ignore
 
 from .models import Payment
 from .serializers import (
@@ -22,7 +24,8 @@ from .serializers import (
     ReceiptUploadSerializer,
     RealtorApprovalSerializer,
 )
-from .services import parse_receipt_amount, validate_receipt_amount
+from .services import validate_receipt_amount
+from .tasks import RECEIPT_PROCESSING_TIMEOUT, parse_payment_receipt
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +123,10 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def upload_receipt(self, request, pk=None):  # type: ignore
         """
         Загрузка PDF квитанции для оплаты через статичный QR код.
-        Парсит сумму из PDF и отправляет риелтору для одобрения.
+
+        Файл сохраняется, а сумма распознаётся в фоновой задаче: ответ 202
+        возвращается сразу, результат доступен через ``receipt-status``.
+        После распознавания квитанция отправляется риелтору для одобрения.
         """
         payment = self.get_object()
 
@@ -136,61 +142,65 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if (
+            payment.receipt_status == Payment.ReceiptStatus.PROCESSING
+            and payment.updated_at > timezone.now() - RECEIPT_PROCESSING_TIMEOUT
+        ):
+            return Response(
+                {"detail": "Квитанция уже обрабатывается."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
         serializer = ReceiptUploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         receipt_file = serializer.validated_data["receipt_file"]
 
-        # Парсим сумму из PDF
-        parsed_amount = parse_receipt_amount(receipt_file)
-
-        if parsed_amount is None:
-            return Response(
-                {
-                    "detail": (
-                        "Не удалось извлечь сумму из квитанции. "
-                        "Проверьте файл и попробуйте снова."
-                    )
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Проверяем, соответствует ли сумма ожидаемой
-        is_valid = validate_receipt_amount(parsed_amount, payment.amount)
-
         with transaction.atomic():
-            # Сохраняем файл и распознанную сумму
+            # Сохраняем файл, распознавание — в фоне после фиксации
             payment.receipt_file = receipt_file
-            payment.receipt_amount = parsed_amount
-            payment.realtor_approval_status = Payment.RealtorApprovalStatus.PENDING_APPROVAL
+            payment.receipt_amount = None
+            payment.receipt_status = Payment.ReceiptStatus.PROCESSING
+            payment.receipt_error = ""
             payment.save(update_fields=[
                 "receipt_file",
                 "receipt_amount",
-                "realtor_approval_status",
+                "receipt_status",
+                "receipt_error",
                 "updated_at",
             ])
+            transaction.on_commit(lambda: parse_payment_receipt.delay(payment.id))
 
-            # Отправляем уведомление риелтору
-            from apps.notifications.services import send_receipt_uploaded_notification
-            send_receipt_uploaded_notification(payment)
-
-        logger.info(
-            f"Receipt uploaded for payment {payment.id}: "
-            f"parsed={parsed_amount}, expected={payment.amount}, valid={is_valid}"
-        )
+        logger.info(f"Receipt uploaded for payment {payment.id}, parsing queued")
 
         return Response(
             {
-                "status": "success",
-                "message": "Квитанция загружена. Ожидается подтверждение риелтора.",
-                "parsed_amount": str(parsed_amount),
-                "expected_amount": str(payment.amount),
-                "amount_valid": is_valid,
+                "status": "processing",
+                "message": "Квитанция загружена и распознаётся.",
+                "status_url": reverse("payment-receipt-status", args=[payment.id], request=request),
                 "payment": PaymentSerializer(payment).data,
             },
-            status=status.HTTP_200_OK,
+            status=status.HTTP_202_ACCEPTED,
         )
 
+    @action(detail=True, methods=["get"], url_path="receipt-status")
+    def receipt_status(self, request, pk=None):  # type: ignore
+        """Статус распознавания загруженной квитанции."""
+        payment = self.get_object()
+
+        data = {
+            "receipt_status": payment.receipt_status,
+            "expected_amount": str(payment.amount),
+            "parsed_amount": None,
+            "amount_valid": None,
+            "error": payment.receipt_error or None,
+            "realtor_approval_status": payment.realtor_approval_status,
+        }
+        if payment.receipt_amount is not None:
+            data["parsed_amount"] = str(payment.receipt_amount)
+            data["amount_valid"] = validate_receipt_amount(payment.receipt_amount, payment.amount)
+        return Response(data, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["post"], url_path="approve")
     def approve(self, request, pk=None):  # type: ignore
         """
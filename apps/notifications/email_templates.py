@@ -0,0 +1,137 @@
+"""Email template registry.
+
+Письма уведомлений хранятся в шаблонах ``notifications/email/<имя>.html``,
+тема — в ``EMAIL_SUBJECTS``. Реестр компилирует шаблон письма один раз на
+процесс и там же готовит текстовую версию: ``<имя>.txt``, если такой
+шаблон есть, иначе шаблон, полученный из HTML-исходника удалением тегов.
+Поэтому ``strip_tags`` выполняется один раз на шаблон, а не на каждое
+письмо.
+
+``render_many`` рендерит пачку получателей одним проходом по уже
+скомпилированным шаблонам; одинаковые контексты (рассылка одного текста)
+рендерятся один раз.
+
+Скомпилированные шаблоны живут до перезапуска процесса; после правки
+шаблонов в разработке вызовите ``email_templates.clear()``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.template import TemplateDoesNotExist, engines  # type: ignore
+from django.utils.html import strip_tags  # type: ignore
+
+TEMPLATE_DIR = "notifications/email"
+
+EMAIL_SUBJECTS = {
+    "booking_confirmed": "Бронирование #{{ booking_code }} подтверждено!",
+    "booking_reminder": "Напоминание: Заезд завтра в {{ property_title }}",
+    "booking_expired": "Бронирование #{{ booking_code }} отменено",
+    "new_booking_realtor": "Новое бронирование #{{ booking_code }}",
+    "receipt_uploaded": "Новая квитанция по бронированию #{{ booking_code }}",
+    "payment_approved": "Платеж одобрен - бронирование #{{ booking_code }}",
+    "payment_rejected": "Платеж отклонен - бронирование #{{ booking_code }}",
+}
+
+# Текст и тема — не HTML, экранирование в них не нужно
+PLAIN_TEXT_WRAPPER = "{%% autoescape off %%}%s{%% endautoescape %%}"
+LINE_BREAK_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def plain_text_source(html_source: str) -> str:
+    """Исходник текстовой версии письма из исходника HTML-шаблона."""
+    text = strip_tags(LINE_BREAK_RE.sub("\n", html_source))
+    text = "\n".join(line.strip() for line in text.splitlines())
+    return BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    subject: str
+    text: str
+    html: str
+
+
+class CompiledEmailTemplate:
+    """Скомпилированные тема, HTML и текстовая версия одного письма."""
+
+    def __init__(self, name: str, subject, html, text) -> None:  # type: ignore
+        self.name = name
+        self.subject = subject
+        self.html = html
+        self.text = text
+
+    def render(self, context: dict[str, Any]) -> RenderedEmail:
+        return RenderedEmail(
+            subject=" ".join(self.subject.render(context).split()),
+            text=self.text.render(context).strip(),
+            html=self.html.render(context),
+        )
+
+
+def _freeze(context: dict[str, Any]) -> tuple | None:
+    try:
+        key = tuple(sorted(context.items()))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class EmailTemplateRegistry:
+    """Кэш скомпилированных шаблонов писем на процесс."""
+
+    def __init__(self, subjects: dict[str, str] | None = None, engine: str = "django") -> None:
+        self.subjects = EMAIL_SUBJECTS if subjects is None else subjects
+        self.engine = engine
+        self._compiled: dict[str, CompiledEmailTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CompiledEmailTemplate:
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(name)
+                if compiled is None:
+                    compiled = self._compiled[name] = self._compile(name)
+        return compiled
+
+    def _compile(self, name: str) -> CompiledEmailTemplate:
+        engine = engines[self.engine]
+        html = engine.get_template(f"{TEMPLATE_DIR}/{name}.html")
+        try:
+            text = engine.get_template(f"{TEMPLATE_DIR}/{name}.txt")
+        except TemplateDoesNotExist:
+            text = engine.from_string(PLAIN_TEXT_WRAPPER % plain_text_source(html.template.source))
+        subject = engine.from_string(PLAIN_TEXT_WRAPPER % self.subjects.get(name, ""))
+        return CompiledEmailTemplate(name, subject, html, text)
+
+    def render(self, name: str, context: dict[str, Any]) -> RenderedEmail:
+        return self.get(name).render(context)
+
+    def render_many(self, name: str, contexts: Iterable[dict[str, Any]]) -> list[RenderedEmail]:
+        """Рендерит письмо для пачки контекстов; одинаковые контексты — один раз."""
+        compiled = self.get(name)
+        rendered: dict[tuple, RenderedEmail] = {}
+        results = []
+        for context in contexts:
+            key = _freeze(context)
+            if key is None:
+                results.append(compiled.render(context))
+                continue
+            if key not in rendered:
+                rendered[key] = compiled.render(context)
+            results.append(rendered[key])
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._compiled.clear()
+
+
+email_templates = EmailTemplateRegistry()
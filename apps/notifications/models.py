@@ -4,11 +4,17 @@ Defines a simple notification entity delivered to users via the web
 interface or Telegram bot. Notifications are created by domain
 services (e.g. new booking alerts, upcoming check‑in reminders) and
 consumed by recipients. Each notification can be marked as read.
+
+``TelegramMessage`` is the delivery queue of the Telegram channel: messages
+are stored in the transaction that produced them and sent in batches by
+``apps.notifications.telegram``.
 """
 
 from __future__ import annotations
 
 from django.db import models  # type: ignore
+from django.utils import timezone  # type: ignore
+from django.utils.translation import gettext_lazy as _  # type: ignore
 
 
 class Notification(models.Model):
@@ -24,6 +30,59 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Cursor pagination of a user's notifications
+            models.Index(fields=['user', '-created_at', '-id']),
+            # Unread counters and unread-first lists
+            models.Index(fields=['user', 'is_read', '-created_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"Notification to {self.user_id}: {self.title}"
+
+    def save(self, *args, **kwargs):  # type: ignore
+        from .unread import adjust_unread_on_commit  # local import to avoid circular
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and not self.is_read:
+            adjust_unread_on_commit({self.user_id: 1})
+
+    def delete(self, *args, **kwargs):  # type: ignore
+        from .unread import adjust_unread_on_commit  # local import to avoid circular
+
+        if not self.is_read:
+            adjust_unread_on_commit({self.user_id: -1})
+        return super().delete(*args, **kwargs)
+
+
+class TelegramMessage(models.Model):
+    """Сообщение Telegram, ожидающее отправки через Bot API."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Ожидает отправки")
+        PROCESSING = "processing", _("Отправляется")
+        SENT = "sent", _("Отправлено")
+        FAILED = "failed", _("Ошибка отправки")
+
+    chat_id = models.BigIntegerField()
+    text = models.TextField()
+    parse_mode = models.CharField(max_length=16, blank=True, default="HTML")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Сообщение Telegram")
+        verbose_name_plural = _("Сообщения Telegram")
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
 
     def __str__(self) -> str:
-        return f"Notification to {self.user_id}: {self.title}"
\ No newline at end of file
+        return f"Telegram message to {self.chat_id} ({self.status})"
@@ -13,4 +13,15 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'user', 'title', 'message', 'is_read', 'created_at']
-        read_only_fields = ['user', 'title', 'message', 'created_at']
\ No newline at end of file
+        read_only_fields = ['user', 'title', 'message', 'created_at']
+
+
+class NotificationMarkReadSerializer(serializers.Serializer):
+    """Serializer for bulk marking notifications as read."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=500,
+        help_text="Список ID уведомлений",
+    )
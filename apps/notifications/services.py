@@ -3,19 +3,28 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from collections import Counter
+from html import escape
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, TypeVar
 
 from django.conf import settings  # type: ignore
-from django.core.mail import send_mail  # type: ignore
-from django.template.loader import render_to_string  # type: ignore
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail  # type: ignore
 from django.utils.html import strip_tags  # type: ignore
 
+from .email_templates import email_templates
+
 if TYPE_CHECKING:  # pragma: no cover
     from apps.users.models import CustomUser
     from apps.bookings.models import Booking
 
 logger = logging.getLogger(__name__)
 
+BULK_CHUNK_SIZE = 500
+
+T = TypeVar("T")
+
 
 # ============================================================================
 # EMAIL NOTIFICATIONS
@@ -24,10 +33,11 @@ logger = logging.getLogger(__name__)
 def send_email_notification(
     recipient_email: str,
     subject: str,
-    template_name: str,
+    template_name: str | None,
     context: dict,
     *,
     html_message: str | None = None,
+    text_message: str | None = None,
 ) -> bool:
     """
     Универсальная функция отправки email уведомлений.
@@ -35,22 +45,22 @@ def send_email_notification(
     Args:
         recipient_email: Email получателя
         subject: Тема письма
-        template_name: Путь к Django template (опционально)
+        template_name: Имя шаблона реестра ``email_templates`` (опционально)
         context: Контекст для рендеринга template
         html_message: HTML-версия письма (опционально)
+        text_message: Текстовая версия письма (опционально, по умолчанию — из HTML)
 
     Returns:
         bool: True если письмо отправлено успешно
     """
     try:
-        # Рендерим текстовую версию из HTML
         if html_message:
-            text_message = strip_tags(html_message)
+            text_message = text_message or strip_tags(html_message)
         elif template_name:
-            html_message = render_to_string(template_name, context)
-            text_message = strip_tags(html_message)
+            rendered = email_templates.render(template_name, context)
+            html_message, text_message = rendered.html, rendered.text
         else:
-            text_message = context.get("message", "")
+            text_message = text_message or context.get("message", "")
             html_message = None
 
         send_mail(
@@ -70,178 +80,68 @@ def send_email_notification(
         return False
 
 
-def send_booking_confirmation_email(booking: "Booking") -> bool:
-    """Отправка подтверждения бронирования гостю."""
-    subject = f"Бронирование #{booking.booking_code} подтверждено!"
-
-    context = {
-        "booking": booking,
-        "guest_name": booking.guest.username or booking.guest.email,
-        "property_title": booking.property.title,
-        "check_in": booking.check_in.strftime("%d.%m.%Y"),
-        "check_out": booking.check_out.strftime("%d.%m.%Y"),
-        "total_nights": booking.total_nights,
-        "total_price": booking.total_price,
-        "booking_code": booking.booking_code,
-    }
-
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {context['guest_name']}!</h2>
-        <p>Ваше бронирование успешно подтверждено.</p>
-
-        <h3>Детали бронирования:</h3>
-        <ul>
-            <li><strong>Код брони:</strong> {context['booking_code']}</li>
-            <li><strong>Объект:</strong> {context['property_title']}</li>
-            <li><strong>Заезд:</strong> {context['check_in']}</li>
-            <li><strong>Выезд:</strong> {context['check_out']}</li>
-            <li><strong>Ночей:</strong> {context['total_nights']}</li>
-            <li><strong>Итого:</strong> {context['total_price']} ₸</li>
-        </ul>
-
-        <p>За 24 часа до заезда вы получите инструкции по заселению.</p>
-
-        <p>С уважением,<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
-
+def send_templated_email(recipient_email: str, template_name: str, context: dict) -> bool:
+    """Отправка письма из шаблона: тема, HTML и текстовая версия берутся из реестра."""
+    rendered = email_templates.render(template_name, context)
     return send_email_notification(
-        recipient_email=booking.guest.email,
-        subject=subject,
+        recipient_email=recipient_email,
+        subject=rendered.subject,
         template_name=None,
         context=context,
-        html_message=html_message,
+        html_message=rendered.html,
+        text_message=rendered.text,
     )
 
 
-def send_booking_reminder_email(booking: "Booking") -> bool:
-    """Напоминание о предстоящем заезде (за 24 часа)."""
-    subject = f"Напоминание: Заезд завтра в {booking.property.title}"
-
-    context = {
-        "booking": booking,
+def _booking_context(booking: "Booking") -> dict:
+    return {
+        "booking_code": booking.booking_code,
         "guest_name": booking.guest.username or booking.guest.email,
         "property_title": booking.property.title,
         "check_in": booking.check_in.strftime("%d.%m.%Y"),
-        "check_in_time": booking.property.check_in_from.strftime("%H:%M"),
-        "property_address": booking.property.address_line,
-        "realtor_phone": booking.property.owner.phone,
+        "check_out": booking.check_out.strftime("%d.%m.%Y"),
     }
 
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {context['guest_name']}!</h2>
-        <p>Напоминаем, что завтра ваш заезд в <strong>{context['property_title']}</strong>.</p>
 
-        <h3>Информация о заселении:</h3>
-        <ul>
-            <li><strong>Дата заезда:</strong> {context['check_in']}</li>
-            <li><strong>Время заезда:</strong> с {context['check_in_time']}</li>
-            <li><strong>Адрес:</strong> {context['property_address']}</li>
-        </ul>
+def send_booking_confirmation_email(booking: "Booking") -> bool:
+    """Отправка подтверждения бронирования гостю."""
+    context = {
+        **_booking_context(booking),
+        "total_nights": booking.total_nights,
+        "total_price": booking.total_price,
+    }
+    return send_templated_email(booking.guest.email, "booking_confirmed", context)
 
-        <p><strong>Контакт владельца:</strong> {context['realtor_phone']}</p>
 
-        <p>Инструкции по заселению будут отправлены вам в день заезда.</p>
+def booking_reminder_context(booking: "Booking") -> dict:
+    """Контекст напоминания о предстоящем заезде."""
+    return {
+        **_booking_context(booking),
+        "check_in_time": booking.property.check_in_from.strftime("%H:%M"),
+        "property_address": booking.property.address_line,
+        "realtor_phone": booking.property.owner.phone,
+    }
 
-        <p>Хорошего отдыха!<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
 
-    return send_email_notification(
-        recipient_email=booking.guest.email,
-        subject=subject,
-        template_name=None,
-        context=context,
-        html_message=html_message,
-    )
+def send_booking_reminder_email(booking: "Booking") -> bool:
+    """Напоминание о предстоящем заезде (за 24 часа)."""
+    return send_templated_email(booking.guest.email, "booking_reminder", booking_reminder_context(booking))
 
 
 def send_booking_expired_email(booking: "Booking") -> bool:
     """Уведомление об истечении времени оплаты."""
-    subject = f"Бронирование #{booking.booking_code} отменено"
-
-    context = {
-        "booking": booking,
-        "guest_name": booking.guest.username or booking.guest.email,
-        "property_title": booking.property.title,
-    }
-
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {context['guest_name']}!</h2>
-        <p>К сожалению, время на оплату бронирования истекло.</p>
-
-        <p><strong>Бронирование #{context['booking_code']}</strong> для
-        <strong>{context['property_title']}</strong> отменено.</p>
-
-        <p>Вы можете создать новое бронирование в любое время.</p>
-
-        <p>С уважением,<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
-
-    return send_email_notification(
-        recipient_email=booking.guest.email,
-        subject=subject,
-        template_name=None,
-        context=context,
-        html_message=html_message,
-    )
+    return send_templated_email(booking.guest.email, "booking_expired", _booking_context(booking))
 
 
 def send_new_booking_to_realtor_email(booking: "Booking") -> bool:
     """Уведомление риелтору о новом бронировании."""
-    subject = f"Новое бронирование #{booking.booking_code}"
-
     context = {
-        "booking": booking,
+        **_booking_context(booking),
         "realtor_name": booking.property.owner.username or booking.property.owner.email,
-        "guest_name": booking.guest.username or booking.guest.email,
         "guest_phone": booking.guest.phone,
-        "property_title": booking.property.title,
-        "check_in": booking.check_in.strftime("%d.%m.%Y"),
-        "check_out": booking.check_out.strftime("%d.%m.%Y"),
         "total_price": booking.total_price,
     }
-
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {context['realtor_name']}!</h2>
-        <p>У вас новое бронирование!</p>
-
-        <h3>Детали бронирования:</h3>
-        <ul>
-            <li><strong>Код:</strong> {context['booking'].booking_code}</li>
-            <li><strong>Объект:</strong> {context['property_title']}</li>
-            <li><strong>Гость:</strong> {context['guest_name']}</li>
-            <li><strong>Телефон гостя:</strong> {context['guest_phone']}</li>
-            <li><strong>Даты:</strong> {context['check_in']} - {context['check_out']}</li>
-            <li><strong>Доход:</strong> {context['total_price']} ₸</li>
-        </ul>
-
-        <p>Проверьте объект к дате заезда!</p>
-
-        <p>С уважением,<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
-
-    return send_email_notification(
-        recipient_email=booking.property.owner.email,
-        subject=subject,
-        template_name=None,
-        context=context,
-        html_message=html_message,
-    )
+    return send_templated_email(booking.property.owner.email, "new_booking_realtor", context)
 
 
 # ============================================================================
@@ -252,24 +152,28 @@ def send_telegram_notification(telegram_id: int, message: str) -> bool:
     """
     Отправка Telegram уведомления.
 
+    Сообщение ставится в очередь и отправляется пачкой вместе с другими
+    (см. ``apps.notifications.telegram``), поэтому вызов не ждёт Bot API.
+
+    Сообщение отправляется с разметкой HTML: пользовательские значения
+    (названия объектов, комментарии, произвольный текст) нужно экранировать
+    через ``escape``, иначе Bot API отклонит сообщение окончательной ошибкой 400.
+
     Args:
         telegram_id: Telegram ID пользователя
-        message: Текст сообщения
+        message: Текст сообщения в разметке HTML
 
     Returns:
-        bool: True если сообщение отправлено успешно
+        bool: True если сообщение поставлено в очередь
     """
-    try:
-        # TODO: Интеграция с Telegram Bot API
-        # from telegram import Bot
-        # bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-        # bot.send_message(chat_id=telegram_id, text=message, parse_mode='HTML')
+    from .telegram import queue_telegram_messages
 
-        logger.info(f"[TELEGRAM] Would send to {telegram_id}: {message[:50]}...")
+    try:
+        queue_telegram_messages([(telegram_id, message)])
         return True
 
     except Exception as e:
-        logger.error(f"Failed to send Telegram message to {telegram_id}: {e}", exc_info=True)
+        logger.error(f"Failed to queue Telegram message to {telegram_id}: {e}", exc_info=True)
         return False
 
 
@@ -282,7 +186,7 @@ def send_telegram_booking_notification(user: "CustomUser", booking: "Booking") -
     message = f"""
 🏠 <b>Новое бронирование #{booking.booking_code}</b>
 
-📍 Объект: {booking.property.title}
+📍 Объект: {escape(booking.property.title)}
 📅 Даты: {booking.check_in.strftime("%d.%m.%Y")} - {booking.check_out.strftime("%d.%m.%Y")}
 🌙 Ночей: {booking.total_nights}
 💰 Сумма: {booking.total_price} ₸
@@ -362,7 +266,7 @@ def notify_user_all_channels(
 
     # Telegram
     if user.telegram_id:
-        results["telegram"] = send_telegram_notification(user.telegram_id, message)
+        results["telegram"] = send_telegram_notification(user.telegram_id, escape(message))
 
     # In-app
     results["in_app"] = create_in_app_notification(user, title, message)
@@ -370,6 +274,201 @@ def notify_user_all_channels(
     return results
 
 
+# ============================================================================
+# BULK NOTIFICATIONS
+# ============================================================================
+
+@dataclass(frozen=True)
+class BulkEmail:
+    """Письмо для массовой отправки."""
+
+    recipient_email: str
+    subject: str
+    html_message: str | None = None
+    text_message: str = ""
+
+    def build(self, connection) -> EmailMultiAlternatives:  # type: ignore
+        text_message = self.text_message or strip_tags(self.html_message or "")
+        email = EmailMultiAlternatives(
+            subject=self.subject,
+            body=text_message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[self.recipient_email],
+            connection=connection,
+        )
+        if self.html_message:
+            email.attach_alternative(self.html_message, "text/html")
+        return email
+
+
+def _chunks(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Делит последовательность (или QuerySet) на списки по ``size`` элементов."""
+    iterator = items.iterator(chunk_size=size) if hasattr(items, "iterator") else iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def render_emails(template_name: str, recipients: Iterable[tuple[str, dict]]) -> list[BulkEmail]:
+    """
+    Письма из шаблона для пачки получателей одним проходом.
+
+    Args:
+        template_name: Имя шаблона реестра ``email_templates``
+        recipients: Пары (email, контекст)
+
+    Returns:
+        list: Письма для ``send_bulk_emails``
+    """
+    recipients = list(recipients)
+    rendered = email_templates.render_many(template_name, [context for _, context in recipients])
+    return [
+        BulkEmail(email, item.subject, html_message=item.html, text_message=item.text)
+        for (email, _), item in zip(recipients, rendered)
+    ]
+
+
+def send_bulk_emails(
+    emails: Iterable[BulkEmail],
+    *,
+    connection=None,  # type: ignore
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> int:
+    """
+    Массовая отправка писем через одно SMTP-соединение.
+
+    Args:
+        emails: Письма
+        connection: Открытое соединение почтового backend'а (опционально)
+        chunk_size: Размер пачки писем
+
+    Returns:
+        int: Количество отправленных писем
+    """
+    sent = 0
+    own_connection = connection is None
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        if own_connection:
+            connection.open()
+        for chunk in _chunks(emails, chunk_size):
+            try:
+                sent += connection.send_messages([email.build(connection) for email in chunk]) or 0
+            except Exception as e:
+                logger.error(f"Failed to send {len(chunk)} emails: {e}", exc_info=True)
+    except Exception as e:
+        logger.error(f"Failed to open email connection: {e}", exc_info=True)
+    finally:
+        if own_connection:
+            connection.close()
+
+    logger.info(f"Bulk email: {sent} sent")
+    return sent
+
+
+def create_in_app_notifications(
+    items: Iterable[tuple["CustomUser", str, str]],
+    *,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> int:
+    """
+    Массовое создание in-app уведомлений через ``bulk_create``.
+
+    Args:
+        items: Тройки (пользователь, заголовок, текст)
+        chunk_size: Размер пачки вставки
+
+    Returns:
+        int: Количество созданных уведомлений
+    """
+    from .models import Notification
+    from .unread import adjust_unread_on_commit
+
+    created = 0
+    for chunk in _chunks(items, chunk_size):
+        try:
+            notifications = Notification.objects.bulk_create(
+                [Notification(user=user, title=title, message=message) for user, title, message in chunk]
+            )
+            # bulk_create не вызывает save(), счётчики непрочитанных корректируем здесь
+            adjust_unread_on_commit(Counter(notification.user_id for notification in notifications))
+            created += len(notifications)
+        except Exception as e:
+            logger.error(f"Failed to create {len(chunk)} in-app notifications: {e}", exc_info=True)
+    return created
+
+
+def notify_users_all_channels(
+    users: Iterable["CustomUser"],
+    title: str,
+    message: str,
+    email_html: str | None = None,
+    *,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> dict[str, int]:
+    """
+    Рассылка одного уведомления многим пользователям по всем каналам.
+
+    Пользователи обрабатываются пачками: письма уходят через одно
+    SMTP-соединение на всю рассылку, Telegram-сообщения ставятся в очередь
+    одной вставкой на пачку, in-app уведомления создаются ``bulk_create``.
+
+    Args:
+        users: Получатели (список или QuerySet)
+        title: Заголовок уведомления
+        message: Текст уведомления
+        email_html: HTML версия для email (опционально)
+        chunk_size: Размер пачки пользователей
+
+    Returns:
+        dict: {"recipients", "email", "telegram", "in_app"} — количество успешных отправок по каналам
+    """
+    from .telegram import queue_telegram_messages
+
+    results = {"recipients": 0, "email": 0, "telegram": 0, "in_app": 0}
+    # Текстовая версия одна на всю рассылку
+    text_message = strip_tags(email_html) if email_html else message
+    telegram_text = escape(message)
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"Failed to open email connection: {e}", exc_info=True)
+        connection = None
+
+    try:
+        for chunk in _chunks(users, chunk_size):
+            results["recipients"] += len(chunk)
+
+            if connection is not None:
+                results["email"] += send_bulk_emails(
+                    [
+                        BulkEmail(user.email, title, html_message=email_html, text_message=text_message)
+                        for user in chunk
+                        if user.email
+                    ],
+                    connection=connection,
+                    chunk_size=chunk_size,
+                )
+
+            telegram_messages = [(user.telegram_id, telegram_text) for user in chunk if user.telegram_id]
+            if telegram_messages:
+                try:
+                    results["telegram"] += len(queue_telegram_messages(telegram_messages))
+                except Exception as e:
+                    logger.error(f"Failed to queue {len(telegram_messages)} Telegram messages: {e}", exc_info=True)
+
+            results["in_app"] += create_in_app_notifications(
+                [(user, title, message) for user in chunk],
+                chunk_size=chunk_size,
+            )
+    finally:
+        if connection is not None:
+            connection.close()
+
+    logger.info(f"Bulk notification '{title}': {results}")
+    return results
+
+
 # ============================================================================
 # PAYMENT NOTIFICATIONS
 # ============================================================================
@@ -390,36 +489,19 @@ def send_receipt_uploaded_notification(payment) -> bool:  # type: ignore
     expected_amount = payment.amount or 0
     amount_match = abs(parsed_amount - expected_amount) < 100  # Допуск 100 тенге
 
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {realtor.first_name or realtor.username}!</h2>
-        <p>Гость <strong>{guest.username or guest.email}</strong> загрузил квитанцию об оплате.</p>
-
-        <h3>Детали:</h3>
-        <ul>
-            <li><strong>Бронирование:</strong> #{payment.booking.booking_code}</li>
-            <li><strong>Объект:</strong> {payment.booking.property.title}</li>
-            <li><strong>Ожидаемая сумма:</strong> {expected_amount} ₸</li>
-            <li><strong>Сумма из квитанции:</strong> {parsed_amount} ₸</li>
-            <li><strong>Совпадение:</strong> {"✅ Да" if amount_match else "⚠️ Проверьте внимательно"}</li>
-        </ul>
-
-        <p><strong>Требуется ваше решение:</strong></p>
-        <p>Пожалуйста, проверьте квитанцию и одобрите или отклоните платеж в личном кабинете.</p>
-
-        <p>С уважением,<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
-
     # Email уведомление
-    email_sent = send_email_notification(
-        recipient_email=realtor.email,
-        subject=subject,
-        template_name=None,
-        context={},
-        html_message=html_message,
+    email_sent = send_templated_email(
+        realtor.email,
+        "receipt_uploaded",
+        {
+            "booking_code": payment.booking.booking_code,
+            "realtor_name": realtor.first_name or realtor.username,
+            "guest_name": guest.username or guest.email,
+            "property_title": payment.booking.property.title,
+            "expected_amount": expected_amount,
+            "parsed_amount": parsed_amount,
+            "amount_match": amount_match,
+        },
     )
 
     # In-app уведомление
@@ -429,7 +511,7 @@ def send_receipt_uploaded_notification(payment) -> bool:  # type: ignore
         message=f"Гость {guest.username} загрузил квитанцию на {parsed_amount} ₸. Требуется ваше одобрение.",
     )
 
-    # Telegram (stubbed)
+    # Telegram
     if realtor.telegram_id:
         send_telegram_notification(
             realtor.telegram_id,
@@ -442,43 +524,21 @@ def send_receipt_uploaded_notification(payment) -> bool:  # type: ignore
     return email_sent
 
 
-def send_payment_approved_notification(payment) -> bool:  # type: ignore
-    """Уведомление гостю об одобрении платежа риелтором."""
+def _payment_context(payment) -> dict:  # type: ignore
     guest = payment.booking.guest
+    return {
+        **_booking_context(payment.booking),
+        "guest_name": guest.first_name or guest.username,
+        "amount": payment.receipt_amount or payment.amount,
+        "realtor_comment": payment.realtor_comment,
+    }
 
-    subject = f"Платеж одобрен - бронирование #{payment.booking.booking_code}"
-
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {guest.first_name or guest.username}!</h2>
-        <p>Отличные новости! Ваш платеж одобрен риелтором.</p>
-
-        <h3>Детали:</h3>
-        <ul>
-            <li><strong>Бронирование:</strong> #{payment.booking.booking_code}</li>
-            <li><strong>Объект:</strong> {payment.booking.property.title}</li>
-            <li><strong>Сумма:</strong> {payment.receipt_amount or payment.amount} ₸</li>
-            <li><strong>Статус:</strong> ✅ Оплачено</li>
-        </ul>
-
-        {f"<p><strong>Комментарий риелтора:</strong> {payment.realtor_comment}</p>" if payment.realtor_comment else ""}
-
-        <p>Теперь вы можете готовиться к заезду!</p>
-        <p>Даты: {payment.booking.check_in.strftime('%d.%m.%Y')} - {payment.booking.check_out.strftime('%d.%m.%Y')}</p>
 
-        <p>С уважением,<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
+def send_payment_approved_notification(payment) -> bool:  # type: ignore
+    """Уведомление гостю об одобрении платежа риелтором."""
+    guest = payment.booking.guest
 
-    email_sent = send_email_notification(
-        recipient_email=guest.email,
-        subject=subject,
-        template_name=None,
-        context={},
-        html_message=html_message,
-    )
+    email_sent = send_templated_email(guest.email, "payment_approved", _payment_context(payment))
 
     create_in_app_notification(
         user=guest,
@@ -501,39 +561,7 @@ def send_payment_rejected_notification(payment) -> bool:  # type: ignore
     """Уведомление гостю об отклонении платежа риелтором."""
     guest = payment.booking.guest
 
-    subject = f"Платеж отклонен - бронирование #{payment.booking.booking_code}"
-
-    html_message = f"""
-    <html>
-    <body>
-        <h2>Здравствуйте, {guest.first_name or guest.username}!</h2>
-        <p>К сожалению, ваш платеж был отклонен риелтором.</p>
-
-        <h3>Детали:</h3>
-        <ul>
-            <li><strong>Бронирование:</strong> #{payment.booking.booking_code}</li>
-            <li><strong>Объект:</strong> {payment.booking.property.title}</li>
-            <li><strong>Сумма:</strong> {payment.receipt_amount or payment.amount} ₸</li>
-            <li><strong>Статус:</strong> ❌ Отклонено</li>
-        </ul>
-
-        <p><strong>Причина отклонения:</strong></p>
-        <p>{payment.realtor_comment or "Не указана"}</p>
-
-        <p>Пожалуйста, свяжитесь с риелтором для уточнения деталей или загрузите корректную квитанцию.</p>
-
-        <p>С уважением,<br>Команда ЖильеGO</p>
-    </body>
-    </html>
-    """
-
-    email_sent = send_email_notification(
-        recipient_email=guest.email,
-        subject=subject,
-        template_name=None,
-        context={},
-        html_message=html_message,
-    )
+    email_sent = send_templated_email(guest.email, "payment_rejected", _payment_context(payment))
 
     create_in_app_notification(
         user=guest,
@@ -546,7 +574,7 @@ def send_payment_rejected_notification(payment) -> bool:  # type: ignore
             guest.telegram_id,
             f"❌ Платеж отклонен\n\n"
             f"Бронирование: #{payment.booking.booking_code}\n"
-            f"Причина: {payment.realtor_comment or 'Не указана'}\n"
+            f"Причина: {escape(payment.realtor_comment or 'Не указана')}\n"
             f"Свяжитесь с риелтором для уточнения.",
         )
 
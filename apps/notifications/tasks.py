@@ -0,0 +1,44 @@
+"""Celery tasks for notification delivery."""
+
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task  # type: ignore
+
+from .telegram import BATCH_SIZE, dispatch_batch, dispatcher_lock
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES_PER_RUN = 10
+
+
+@shared_task(name="notifications.dispatch_telegram_messages")
+def dispatch_telegram_messages() -> dict[str, int]:
+    """
+    Отправка сообщений из очереди Telegram.
+
+    Запускается после фиксации транзакций с новыми сообщениями и каждые
+    10 секунд через Celery Beat. За один запуск отправляется до
+    MAX_BATCHES_PER_RUN пачек, каждая — через один пул соединений.
+    Отправляет только один запуск одновременно (``dispatcher_lock``),
+    остальные сразу завершаются, чтобы не превысить общий лимит бота.
+
+    Returns:
+        dict: {"claimed", "sent", "retried", "failed"}
+    """
+    totals = {"claimed": 0, "sent": 0, "retried": 0, "failed": 0}
+    with dispatcher_lock() as acquired:
+        if not acquired:
+            logger.debug("Telegram dispatch is already running, skipping")
+            return totals
+        for _ in range(MAX_BATCHES_PER_RUN):
+            stats = dispatch_batch()
+            for key, value in stats.items():
+                totals[key] += value
+            if stats["claimed"] < BATCH_SIZE:
+                break
+
+    if totals["claimed"]:
+        logger.info(f"Telegram dispatch: {totals}")
+    return totals
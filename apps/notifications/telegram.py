@@ -0,0 +1,372 @@
+"""Telegram delivery channel.
+
+Сообщения ставятся в очередь ``TelegramMessage`` (``queue_telegram_messages``)
+в транзакции, которая их породила, и отправляются пачками задачей
+``notifications.dispatch_telegram_messages``:
+
+- пачка забирается короткой транзакцией с SKIP LOCKED и помечается как
+  PROCESSING, отправка идёт вне транзакции; сообщения чата, у которого
+  другое сообщение уже отправляется или ждёт повтора, не забираются, поэтому
+  параллельные запуски не нарушают порядок внутри чата;
+- вся пачка отправляется одним ``httpx.AsyncClient`` с пулом соединений,
+  поэтому всплеск уведомлений не открывает соединение на каждое сообщение;
+- общий лимит Bot API (30 сообщений в секунду) соблюдается token bucket'ом,
+  лимит чата — паузой между сообщениями одного чата (1 с, для групп 3 с);
+  сообщения одного чата уходят последовательно в порядке постановки;
+- bucket живёт в памяти одного процесса, поэтому одновременно отправляет
+  только один запуск задачи (блокировка ``dispatcher_lock`` в общем кэше);
+- ответ 429 приостанавливает отправку всего бота на ``retry_after``;
+  слишком долгие паузы, сетевые ошибки и 5xx возвращают сообщение в
+  очередь с задержкой, 400/403 (чат не найден, бот заблокирован) —
+  окончательная ошибка.
+
+``TELEGRAM_API_URL`` позволяет направить отправку на локальный сервер
+Bot API или его заглушку в тестах.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Sequence
+
+import httpx
+from django.conf import settings  # type: ignore
+from django.core.cache import cache  # type: ignore
+from django.db import transaction  # type: ignore
+from django.db.models import Q  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .models import TelegramMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.telegram.org"
+GLOBAL_RATE = 30.0
+CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+MAX_CONNECTIONS = 10
+REQUEST_TIMEOUT = 10.0
+MAX_FLOOD_WAIT = 5.0
+FLOOD_RETRIES = 3
+BATCH_SIZE = 200
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+DISPATCH_LOCK_KEY = "notifications:telegram:dispatch-lock"
+DISPATCH_LOCK_TIMEOUT = int(CLAIM_TIMEOUT.total_seconds())
+
+
+@dataclass(frozen=True)
+class SendResult:
+    """Итог отправки одного сообщения."""
+
+    ok: bool
+    error: str = ""
+    permanent: bool = False
+    retry_after: float | None = None
+    attempted: bool = True
+
+
+class RateLimiter:
+    """Token bucket для asyncio: не больше ``rate`` отправок в секунду."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Приостанавливает все отправки (ответ 429 относится ко всему боту)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class TelegramSender:
+    """Асинхронный клиент Bot API с пулом соединений и лимитами отправки.
+
+    Используется как асинхронный контекстный менеджер: один экземпляр — один
+    пул соединений на всю пачку сообщений.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        api_url: str = DEFAULT_API_URL,
+        global_rate: float = GLOBAL_RATE,
+        chat_interval: float = CHAT_INTERVAL,
+        group_chat_interval: float = GROUP_CHAT_INTERVAL,
+        max_connections: int = MAX_CONNECTIONS,
+        timeout: float = REQUEST_TIMEOUT,
+        max_flood_wait: float = MAX_FLOOD_WAIT,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.global_rate = global_rate
+        self.chat_interval = chat_interval
+        self.group_chat_interval = group_chat_interval
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_flood_wait = max_flood_wait
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._limiter: RateLimiter | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    @classmethod
+    def from_settings(cls) -> "TelegramSender":
+        return cls(
+            settings.TELEGRAM_BOT_TOKEN,
+            api_url=getattr(settings, "TELEGRAM_API_URL", DEFAULT_API_URL),
+            global_rate=getattr(settings, "TELEGRAM_GLOBAL_RATE", GLOBAL_RATE),
+            chat_interval=getattr(settings, "TELEGRAM_CHAT_INTERVAL", CHAT_INTERVAL),
+            group_chat_interval=getattr(settings, "TELEGRAM_GROUP_CHAT_INTERVAL", GROUP_CHAT_INTERVAL),
+            max_connections=getattr(settings, "TELEGRAM_MAX_CONNECTIONS", MAX_CONNECTIONS),
+        )
+
+    async def __aenter__(self) -> "TelegramSender":
+        # Примитивы asyncio создаются в цикле событий, в котором идёт отправка
+        self._limiter = RateLimiter(self.global_rate)
+        self._slots = asyncio.Semaphore(self.max_connections)
+        self._client = httpx.AsyncClient(
+            base_url=f"{self.api_url}/bot{self.token}/",
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            timeout=self.timeout,
+            transport=self.transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:  # type: ignore
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send(self, chat_id: int, text: str, parse_mode: str = "HTML") -> SendResult:
+        """Отправляет одно сообщение с учётом общего лимита."""
+        assert self._client is not None and self._limiter is not None, "use `async with TelegramSender(...)`"
+
+        payload: dict = {"chat_id": chat_id, "text": text, "disable_web_page_preview": True}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
+        for _ in range(FLOOD_RETRIES + 1):
+            await self._limiter.acquire()
+            try:
+                response = await self._client.post("sendMessage", json=payload)
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as exc:
+                return SendResult(ok=False, error=f"{type(exc).__name__}: {exc}")
+            if data.get("ok"):
+                return SendResult(ok=True)
+
+            description = f"{response.status_code}: {data.get('description') or response.reason_phrase}"
+            retry_after = (data.get("parameters") or {}).get("retry_after")
+            if response.status_code != 429 or retry_after is None:
+                return SendResult(ok=False, error=description, permanent=400 <= response.status_code < 500)
+            self._limiter.pause(retry_after)
+            if retry_after > self.max_flood_wait:
+                return SendResult(ok=False, error=description, retry_after=float(retry_after))
+        return SendResult(ok=False, error=description, retry_after=float(retry_after))
+
+    async def send_many(self, messages: Sequence[TelegramMessage]) -> dict[int, SendResult]:
+        """Отправляет пачку сообщений; возвращает итоги по ``id`` сообщений.
+
+        Чаты обрабатываются параллельно (не больше ``max_connections``
+        запросов одновременно), сообщения одного чата — по очереди.
+        """
+        by_chat: dict[int, list[TelegramMessage]] = defaultdict(list)
+        for message in messages:
+            by_chat[message.chat_id].append(message)
+        results: dict[int, SendResult] = {}
+        await asyncio.gather(*(self._send_chat(chat_id, items, results) for chat_id, items in by_chat.items()))
+        return results
+
+    async def _send_chat(self, chat_id: int, items: list[TelegramMessage], results: dict[int, SendResult]) -> None:
+        assert self._slots is not None
+        interval = self.group_chat_interval if chat_id < 0 else self.chat_interval
+        last_sent: float | None = None
+        for index, message in enumerate(items):
+            if last_sent is not None:
+                delay = interval - (time.monotonic() - last_sent)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            async with self._slots:
+                result = await self.send(chat_id, message.text, message.parse_mode)
+            last_sent = time.monotonic()
+            results[message.id] = result
+            if not result.ok and not result.permanent:
+                # Остальные сообщения чата ждут повторной отправки этого, чтобы не нарушить порядок
+                for deferred in items[index + 1:]:
+                    results[deferred.id] = SendResult(ok=False, attempted=False)
+                return
+
+
+def queue_telegram_messages(
+    items: Iterable[tuple[int, str]],
+    *,
+    parse_mode: str = "HTML",
+) -> list[TelegramMessage]:
+    """Ставит сообщения ``(chat_id, text)`` в очередь отправки.
+
+    Запись идёт в текущей транзакции; после фиксации запускается отправка,
+    а если брокер недоступен, сообщения заберёт периодическая задача.
+    """
+
+    messages = TelegramMessage.objects.bulk_create(
+        [TelegramMessage(chat_id=chat_id, text=text, parse_mode=parse_mode) for chat_id, text in items]
+    )
+    if messages:
+        transaction.on_commit(_trigger_dispatch)
+    return messages
+
+
+def _trigger_dispatch() -> None:
+    from .tasks import dispatch_telegram_messages
+
+    try:
+        dispatch_telegram_messages.delay()
+    except Exception as exc:
+        logger.warning(f"Could not enqueue Telegram dispatch, periodic run will pick it up: {exc}")
+
+
+@contextmanager
+def dispatcher_lock() -> Iterator[bool]:
+    """Блокировка единственного отправителя на все процессы и воркеры.
+
+    Лимит бота общий, а token bucket у каждого отправителя свой: два
+    одновременных запуска вместе превысили бы 30 сообщений в секунду.
+    Возвращает, удалось ли захватить блокировку; запуск без неё ничего не
+    отправляет — очередь заберёт текущий отправитель или следующий запуск.
+    Блокировка истекает через ``DISPATCH_LOCK_TIMEOUT``, если процесс упал.
+    """
+
+    token = uuid.uuid4().hex
+    acquired = bool(cache.add(DISPATCH_LOCK_KEY, token, timeout=DISPATCH_LOCK_TIMEOUT))
+    try:
+        yield acquired
+    finally:
+        # Снимаем только свою блокировку: чужую, взятую после истечения нашей, не трогаем
+        if acquired and cache.get(DISPATCH_LOCK_KEY) == token:
+            cache.delete(DISPATCH_LOCK_KEY)
+
+
+def claim_batch(batch_size: int = BATCH_SIZE) -> list[TelegramMessage]:
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = list(
+            TelegramMessage.objects.filter(
+                Q(status=TelegramMessage.Status.PENDING, available_at__lte=now)
+                | Q(status=TelegramMessage.Status.PROCESSING, claimed_at__lt=now - CLAIM_TIMEOUT)
+            )
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", "chat_id")[:batch_size]
+        )
+        # Сообщение чата ждёт, пока другое сообщение этого чата отправляется
+        # (в том числе другим запуском) или не отправлено более раннее
+        claimed = {message_id for message_id, _ in candidates}
+        first_blocker: dict[int, int] = {}
+        waiting = (
+            TelegramMessage.objects.filter(
+                chat_id__in={chat_id for _, chat_id in candidates},
+                status__in=[TelegramMessage.Status.PENDING, TelegramMessage.Status.PROCESSING],
+            )
+            .exclude(id__in=claimed)
+            .values_list("id", "chat_id", "status")
+        )
+        for message_id, chat_id, status in waiting:
+            blocker = 0 if status == TelegramMessage.Status.PROCESSING else message_id
+            first_blocker[chat_id] = min(first_blocker.get(chat_id, blocker), blocker)
+        ids = [
+            message_id
+            for message_id, chat_id in candidates
+            if chat_id not in first_blocker or message_id < first_blocker[chat_id]
+        ]
+        if ids:
+            TelegramMessage.objects.filter(id__in=ids).update(
+                status=TelegramMessage.Status.PROCESSING,
+                claimed_at=now,
+            )
+    return list(TelegramMessage.objects.filter(id__in=ids).order_by("id"))
+
+
+async def _send_batch(messages: list[TelegramMessage]) -> dict[int, SendResult]:
+    async with TelegramSender.from_settings() as sender:
+        return await sender.send_many(messages)
+
+
+def dispatch_batch(batch_size: int = BATCH_SIZE) -> dict[str, int]:
+    """Отправляет одну пачку сообщений. Возвращает счётчики по итогам."""
+
+    stats = {"claimed": 0, "sent": 0, "retried": 0, "failed": 0}
+    if not getattr(settings, "TELEGRAM_BOT_TOKEN", ""):
+        logger.warning("TELEGRAM_BOT_TOKEN is not configured, Telegram messages stay queued")
+        return stats
+    messages = claim_batch(batch_size)
+    if not messages:
+        return stats
+
+    results = asyncio.run(_send_batch(messages))
+
+    now = timezone.now()
+    blocked_until: dict[int, datetime] = {}
+    for message in messages:
+        result = results.get(message.id) or SendResult(ok=False, attempted=False)
+        if result.attempted:
+            message.attempts += 1
+            message.last_error = result.error
+        message.claimed_at = None
+        if result.ok:
+            message.status = TelegramMessage.Status.SENT
+            message.sent_at = now
+            stats["sent"] += 1
+        elif result.permanent or message.attempts >= MAX_ATTEMPTS:
+            message.status = TelegramMessage.Status.FAILED
+            stats["failed"] += 1
+            logger.error(f"Telegram message {message.id} to {message.chat_id} failed: {message.last_error}")
+        else:
+            message.status = TelegramMessage.Status.PENDING
+            if result.attempted:
+                delay = result.retry_after or BACKOFF_BASE_SECONDS * 2 ** (message.attempts - 1)
+                message.available_at = now + timedelta(seconds=delay)
+                blocked_until[message.chat_id] = message.available_at
+            else:
+                message.available_at = blocked_until.get(message.chat_id, now)
+            stats["retried"] += 1
+
+    TelegramMessage.objects.bulk_update(
+        messages,
+        ["status", "attempts", "last_error", "available_at", "claimed_at", "sent_at"],
+    )
+    stats["claimed"] = len(messages)
+    return stats
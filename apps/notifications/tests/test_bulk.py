@@ -0,0 +1,65 @@
+"""Tests for bulk notification fan-out."""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from apps.notifications import services
+from apps.notifications.models import Notification, TelegramMessage
+from apps.users.models import User
+
+
+class BulkNotificationTests(TestCase):
+    def setUp(self) -> None:
+        self.users = [
+            User.objects.create_user(
+                email=f"bulk-{index}@example.com",
+                phone=f"+7700000008{index}",
+                password="GuestPass123",
+                role=User.RoleChoices.GUEST,
+                telegram_id=900000 + index if index % 2 == 0 else None,
+            )
+            for index in range(5)
+        ]
+
+    def test_fan_out_reuses_one_connection_and_counts_channels(self) -> None:
+        with mock.patch.object(services, "get_connection", wraps=services.get_connection) as get_connection:
+            results = services.notify_users_all_channels(
+                User.objects.filter(email__startswith="bulk-").order_by("id"),
+                "Новые правила платформы",
+                "Обновлены правила бронирования.",
+                email_html="<p>Обновлены <b>правила</b> бронирования.</p>",
+                chunk_size=2,
+            )
+
+        self.assertEqual(results, {"recipients": 5, "email": 5, "telegram": 3, "in_app": 5})
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].body, "Обновлены правила бронирования.")
+        self.assertEqual(Notification.objects.filter(title="Новые правила платформы").count(), 5)
+        self.assertEqual(TelegramMessage.objects.count(), 3)
+
+    def test_in_app_notifications_insert_per_chunk(self) -> None:
+        with self.assertNumQueries(3):
+            created = services.create_in_app_notifications(
+                ((user, "Заголовок", f"Текст {user.pk}") for user in self.users),
+                chunk_size=2,
+            )
+
+        self.assertEqual(created, 5)
+
+    def test_telegram_text_is_escaped_for_html_mode(self) -> None:
+        services.notify_users_all_channels(
+            User.objects.filter(telegram_id__isnull=False),
+            "Акция",
+            "Скидка <10% & бонус",
+        )
+
+        self.assertEqual(
+            set(TelegramMessage.objects.values_list("text", flat=True)),
+            {"Скидка &lt;10% &amp; бонус"},
+        )
+        self.assertEqual(Notification.objects.filter(title="Акция").first().message, "Скидка <10% & бонус")
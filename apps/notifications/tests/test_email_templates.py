@@ -0,0 +1,54 @@
+"""Tests for the email template registry."""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from django.template import engines
+from django.test import SimpleTestCase
+
+from apps.notifications.email_templates import EMAIL_SUBJECTS, EmailTemplateRegistry
+
+
+class EmailTemplateRegistryTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.registry = EmailTemplateRegistry()
+
+    def test_every_registered_email_renders(self) -> None:
+        for name in EMAIL_SUBJECTS:
+            with self.subTest(name=name):
+                rendered = self.registry.render(name, {"booking_code": "AB12", "property_title": "Дом"})
+                self.assertTrue(rendered.subject)
+                self.assertIn("<html>", rendered.html)
+                self.assertNotIn("<", rendered.text)
+
+    def test_templates_are_compiled_once_per_process(self) -> None:
+        engine = engines["django"]
+        with mock.patch.object(engine, "get_template", wraps=engine.get_template) as get_template:
+            self.registry.render("booking_expired", {"booking_code": "A1"})
+            self.registry.render("booking_expired", {"booking_code": "A2"})
+
+        # HTML и поиск .txt-варианта — только при первой компиляции
+        self.assertEqual(get_template.call_count, 2)
+
+    def test_text_is_not_html_escaped_and_html_is(self) -> None:
+        rendered = self.registry.render(
+            "booking_expired",
+            {"booking_code": "A1", "guest_name": "Tom & Jerry", "property_title": "<Дом>"},
+        )
+
+        self.assertEqual(rendered.subject, "Бронирование #A1 отменено")
+        self.assertIn("Tom & Jerry", rendered.text)
+        self.assertIn("Tom &amp; Jerry", rendered.html)
+        self.assertIn("&lt;Дом&gt;", rendered.html)
+        self.assertNotIn("\n\n\n", rendered.text)
+
+    def test_render_many_renders_identical_contexts_once(self) -> None:
+        compiled = self.registry.get("booking_reminder")
+        contexts = [{"property_title": "Дом", "guest_name": name} for name in ("Анна", "Анна", "Борис")]
+
+        with mock.patch.object(compiled, "render", wraps=compiled.render) as render:
+            results = self.registry.render_many("booking_reminder", contexts)
+
+        self.assertEqual(render.call_count, 2)
+        self.assertEqual([("Анна" in item.text) for item in results], [True, True, False])
@@ -0,0 +1,152 @@
+"""Tests for the queued Telegram delivery channel against a stand-in Bot API."""
+
+from __future__ import annotations
+
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.notifications.models import TelegramMessage
+from apps.notifications.services import send_telegram_notification
+from apps.notifications.tasks import dispatch_telegram_messages
+from apps.notifications.telegram import (
+    DISPATCH_LOCK_KEY,
+    claim_batch,
+    dispatch_batch,
+    dispatcher_lock,
+    queue_telegram_messages,
+)
+
+BLOCKED_CHAT = 403
+FLOODED_CHAT = 429
+
+
+class StubBotAPI(BaseHTTPRequestHandler):
+    """Минимальная заглушка ``sendMessage`` с keep-alive соединениями."""
+
+    protocol_version = "HTTP/1.1"
+    received: list[dict] = []
+    connections: set[int] = set()
+
+    def do_POST(self) -> None:  # noqa: N802
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).received.append({"path": self.path, **payload})
+        type(self).connections.add(self.client_address[1])
+
+        if payload["chat_id"] == BLOCKED_CHAT:
+            status, body = 403, {"ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"}
+        elif payload["chat_id"] == FLOODED_CHAT:
+            status, body = 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 60",
+                "parameters": {"retry_after": 60},
+            }
+        else:
+            status, body = 200, {"ok": True, "result": {"message_id": len(type(self).received)}}
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:  # type: ignore
+        pass
+
+
+class TelegramDispatchTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubBotAPI)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        StubBotAPI.received = []
+        StubBotAPI.connections = set()
+        settings_override = override_settings(
+            TELEGRAM_BOT_TOKEN="test-token",
+            TELEGRAM_API_URL=f"http://127.0.0.1:{self.server.server_address[1]}",
+            TELEGRAM_GLOBAL_RATE=0,
+            TELEGRAM_CHAT_INTERVAL=0,
+            TELEGRAM_MAX_CONNECTIONS=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_burst_is_sent_over_pooled_connections_in_chat_order(self) -> None:
+        for index in range(3):
+            send_telegram_notification(1001, f"first chat #{index}")
+        queue_telegram_messages([(2000 + index, f"chat {index}") for index in range(20)])
+
+        stats = dispatch_batch()
+
+        self.assertEqual(stats, {"claimed": 23, "sent": 23, "retried": 0, "failed": 0})
+        self.assertEqual(
+            [item["text"] for item in StubBotAPI.received if item["chat_id"] == 1001],
+            ["first chat #0", "first chat #1", "first chat #2"],
+        )
+        self.assertTrue(all(item["path"] == "/bottest-token/sendMessage" for item in StubBotAPI.received))
+        self.assertLessEqual(len(StubBotAPI.connections), 2)
+        self.assertFalse(TelegramMessage.objects.exclude(status=TelegramMessage.Status.SENT).exists())
+
+    def test_blocked_chat_fails_and_flood_wait_defers_the_chat(self) -> None:
+        queue_telegram_messages([(BLOCKED_CHAT, "blocked"), (FLOODED_CHAT, "flood 1"), (FLOODED_CHAT, "flood 2")])
+
+        stats = dispatch_batch()
+
+        self.assertEqual(stats, {"claimed": 3, "sent": 0, "retried": 2, "failed": 1})
+        blocked = TelegramMessage.objects.get(chat_id=BLOCKED_CHAT)
+        self.assertEqual(blocked.status, TelegramMessage.Status.FAILED)
+        self.assertIn("blocked", blocked.last_error)
+
+        first, second = TelegramMessage.objects.filter(chat_id=FLOODED_CHAT).order_by("id")
+        self.assertEqual((first.status, first.attempts), (TelegramMessage.Status.PENDING, 1))
+        self.assertGreater(first.available_at, timezone.now())
+        # Второе сообщение чата не отправлялось и ждёт первое
+        self.assertEqual((second.attempts, second.available_at), (0, first.available_at))
+        self.assertEqual([item["text"] for item in StubBotAPI.received if item["chat_id"] == FLOODED_CHAT], ["flood 1"])
+
+    def test_chat_in_flight_or_waiting_for_retry_is_not_claimed(self) -> None:
+        in_flight, after_in_flight, deferred, after_deferred, free = queue_telegram_messages(
+            [(1, "sending"), (1, "next"), (2, "retry later"), (2, "after retry"), (3, "free")]
+        )
+        # Первое сообщение чата 1 отправляет другой запуск, первое сообщение чата 2 ждёт повтора
+        TelegramMessage.objects.filter(id=in_flight.id).update(
+            status=TelegramMessage.Status.PROCESSING,
+            claimed_at=timezone.now(),
+        )
+        TelegramMessage.objects.filter(id=deferred.id).update(available_at=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual([message.id for message in claim_batch()], [free.id])
+        self.assertEqual(
+            set(TelegramMessage.objects.filter(status=TelegramMessage.Status.PENDING).values_list("id", flat=True)),
+            {after_in_flight.id, deferred.id, after_deferred.id},
+        )
+
+    def test_only_one_dispatcher_sends_at_a_time(self) -> None:
+        queue_telegram_messages([(3001, "one"), (3002, "two")])
+
+        with dispatcher_lock() as acquired:
+            self.assertTrue(acquired)
+            # Второй запуск не получает свой бюджет лимита и ничего не отправляет
+            self.assertEqual(dispatch_telegram_messages(), {"claimed": 0, "sent": 0, "retried": 0, "failed": 0})
+        self.assertEqual(StubBotAPI.received, [])
+        self.assertIsNone(cache.get(DISPATCH_LOCK_KEY))
+
+        self.assertEqual(dispatch_telegram_messages(), {"claimed": 2, "sent": 2, "retried": 0, "failed": 0})
+        self.assertIsNone(cache.get(DISPATCH_LOCK_KEY))
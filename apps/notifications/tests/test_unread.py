@@ -0,0 +1,74 @@
+"""Tests for cached unread counters and bulk mark-read endpoints."""
+
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.notifications.models import Notification
+from apps.notifications.services import create_in_app_notifications
+from apps.users.models import User
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="unread@example.com",
+            phone="+77000000090",
+            password="GuestPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _unread_count(self) -> int:
+        response = self.client.get(reverse("notification-unread-count"))
+        self.assertEqual(response.status_code, 200)
+        return response.data["unread_count"]
+
+    def test_counter_is_served_from_cache_and_follows_changes(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            notes = [Notification.objects.create(user=self.user, title=f"#{i}", message="...") for i in range(3)]
+        self.assertEqual(self._unread_count(), 3)
+
+        # Повторное чтение не обращается к базе
+        with self.assertNumQueries(0):
+            self.client.get(reverse("notification-unread-count"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_in_app_notifications([(self.user, "Рассылка", "...")])
+            Notification.objects.create(user=self.user, title="read", message="...", is_read=True)
+        self.assertEqual(self._unread_count(), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("notification-bulk-mark-read"),
+                {"ids": [notes[0].id, notes[1].id]},
+                format="json",
+            )
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(self._unread_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("notification-mark-all-read"))
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(self._unread_count(), 0)
+        self.assertFalse(Notification.objects.filter(user=self.user, is_read=False).exists())
+
+    def test_other_users_notifications_are_not_marked(self) -> None:
+        other = User.objects.create_user(
+            email="unread-other@example.com",
+            phone="+77000000091",
+            password="GuestPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        foreign = Notification.objects.create(user=other, title="чужое", message="...")
+
+        response = self.client.post(reverse("notification-bulk-mark-read"), {"ids": [foreign.id]}, format="json")
+
+        self.assertEqual(response.data["updated"], 0)
+        foreign.refresh_from_db()
+        self.assertFalse(foreign.is_read)
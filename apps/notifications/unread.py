@@ -0,0 +1,74 @@
+"""Per-user unread notification counters.
+
+Счётчик непрочитанных хранится в кэше (Redis в production) по ключу
+``notifications:unread:<user_id>``. Чтение счётчика не обращается к таблице,
+пока ключ есть в кэше; при промахе выполняется один ``COUNT`` по индексу
+``(user, is_read, -created_at)``.
+
+Создание, прочтение и удаление уведомлений корректируют счётчик через
+``INCR``/``DECR`` после фиксации транзакции. Если ключа нет, корректировка
+пропускается — значение будет посчитано при следующем чтении. TTL ключа
+ограничивает время жизни возможного расхождения.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.core.cache import cache  # type: ignore
+from django.db import transaction  # type: ignore
+
+CACHE_TIMEOUT = 60 * 10
+
+UNREAD_KEY = "notifications:unread:{user_id}"
+
+
+def unread_count(user_id: int) -> int:
+    """Количество непрочитанных уведомлений пользователя."""
+    from .models import Notification
+
+    key = UNREAD_KEY.format(user_id=user_id)
+    value = cache.get(key)
+    if value is None:
+        value = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(key, value, timeout=CACHE_TIMEOUT)
+    return max(value, 0)
+
+
+def _adjust(deltas: dict[int, int]) -> None:
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(UNREAD_KEY.format(user_id=user_id), delta)
+        except ValueError:
+            # Счётчик не закэширован — посчитается при чтении
+            pass
+
+
+def adjust_unread_on_commit(deltas: dict[int, int]) -> None:
+    """Корректирует счётчики ``{user_id: delta}`` после фиксации транзакции."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: _adjust(deltas))
+
+
+def mark_read(user_id: int, ids: Iterable[int] | None = None) -> int:
+    """
+    Отмечает уведомления пользователя прочитанными одним ``UPDATE``.
+
+    Args:
+        user_id: Пользователь
+        ids: Уведомления; ``None`` — все непрочитанные
+
+    Returns:
+        int: Количество отмеченных уведомлений
+    """
+    from .models import Notification
+
+    queryset = Notification.objects.filter(user_id=user_id, is_read=False)
+    if ids is not None:
+        queryset = queryset.filter(id__in=list(ids))
+    updated = queryset.update(is_read=True)
+    adjust_unread_on_commit({user_id: -updated})
+    return updated
@@ -6,8 +6,11 @@ from rest_framework import viewsets, permissions, status  # type: ignore
 from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response  # type: ignore
 
+from shared.infrastructure.pagination import CreatedAtCursorPagination
+
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationMarkReadSerializer, NotificationSerializer
+from . import unread
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -15,6 +18,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):  # type: ignore
         return Notification.objects.filter(user=self.request.user)
@@ -23,9 +27,38 @@ class NotificationViewSet(viewsets.ModelViewSet):
         """Disallow full updates; only partial updates to mark read."""
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def perform_update(self, serializer):  # type: ignore
+        was_read = serializer.instance.is_read
+        notification = serializer.save()
+        if notification.is_read != was_read:
+            unread.adjust_unread_on_commit({notification.user_id: -1 if notification.is_read else 1})
+
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):  # type: ignore
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
-        return Response({'status': 'read'}, status=status.HTTP_200_OK)
\ No newline at end of file
+        unread.mark_read(request.user.pk, [notification.pk])
+        return Response({'status': 'read'}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def bulk_mark_read(self, request):  # type: ignore
+        """
+        Отметить прочитанными несколько уведомлений одним запросом.
+
+        POST /api/v1/notifications/mark-read/
+        Body: {"ids": [1, 2, 3]}
+        """
+        serializer = NotificationMarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = unread.mark_read(request.user.pk, serializer.validated_data['ids'])
+        return Response({'updated': updated, 'unread_count': unread.unread_count(request.user.pk)})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):  # type: ignore
+        """Отметить прочитанными все уведомления пользователя."""
+        updated = unread.mark_read(request.user.pk)
+        return Response({'updated': updated, 'unread_count': unread.unread_count(request.user.pk)})
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):  # type: ignore
+        """Количество непрочитанных уведомлений (из кэша)."""
+        return Response({'unread_count': unread.unread_count(request.user.pk)})
@@ -0,0 +1,23 @@
+"""Admin registration for the outbox."""
+
+from __future__ import annotations
+
+from django.contrib import admin
+
+from .models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "event_type",
+        "aggregate_id",
+        "status",
+        "attempts",
+        "created_at",
+        "processed_at",
+    )
+    list_filter = ("status", "event_type")
+    search_fields = ("event_id", "aggregate_id")
+    readonly_fields = ("event_id", "event_type", "aggregate_id", "payload", "created_at")
@@ -0,0 +1,226 @@
+"""Outbox dispatcher.
+
+Забирает пачку ожидающих сообщений (короткая транзакция с SKIP LOCKED,
+сообщения помечаются как PROCESSING), затем доставляет события
+обработчикам ``MessageBus`` вне транзакции:
+
+- события разных агрегатов обрабатываются параллельно в пуле потоков,
+  события одного агрегата — строго по одному в порядке записи: сообщение
+  забирается, только если у агрегата нет сообщения в обработке и нет
+  более раннего недоставленного (в том числе отложенного после ошибки),
+  поэтому одновременные запуски диспетчера не обгоняют друг друга;
+- каждый обработчик повторяется до ``handler_retries`` раз с паузой;
+- успешно отработавшие обработчики запоминаются в ``completed_handlers``
+  и при повторной доставке сообщения не вызываются;
+- сообщение с неуспешными обработчиками возвращается в очередь с
+  экспоненциальной задержкой, после ``max_attempts`` попыток — FAILED.
+
+Зависшие в PROCESSING сообщения (воркер упал) снова забираются после
+``claim_timeout``.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection, transaction  # type: ignore
+from django.db.models import Exists, OuterRef, Q  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from shared.application.message_bus import MessageBus, message_bus
+
+from .models import OutboxMessage
+from .serialization import decode_event
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_WORKERS = 8
+HANDLER_RETRIES = 3
+RETRY_DELAY_SECONDS = 0.2
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+class OutboxDispatcher:
+    """Доставляет сообщения outbox обработчикам событий."""
+
+    def __init__(
+        self,
+        bus: MessageBus = message_bus,
+        *,
+        batch_size: int = BATCH_SIZE,
+        max_workers: int = MAX_WORKERS,
+        handler_retries: int = HANDLER_RETRIES,
+        retry_delay: float = RETRY_DELAY_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> None:
+        self.bus = bus
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.handler_retries = handler_retries
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+
+    def claim_batch(self) -> list[OutboxMessage]:
+        now = timezone.now()
+        stale_before = now - CLAIM_TIMEOUT
+        # Сообщение агрегата ждёт, пока обрабатывается другое или не доставлено более раннее
+        blockers = OutboxMessage.objects.filter(aggregate_id=OuterRef("aggregate_id")).exclude(
+            pk=OuterRef("pk"),
+        ).filter(
+            Q(status=OutboxMessage.Status.PROCESSING, claimed_at__gte=stale_before)
+            | Q(
+                pk__lt=OuterRef("pk"),
+                status__in=[OutboxMessage.Status.PENDING, OutboxMessage.Status.PROCESSING],
+            )
+        )
+        with transaction.atomic():
+            ids = list(
+                OutboxMessage.objects.filter(
+                    Q(status=OutboxMessage.Status.PENDING, available_at__lte=now)
+                    | Q(status=OutboxMessage.Status.PROCESSING, claimed_at__lt=stale_before)
+                )
+                .filter(Q(aggregate_id="") | ~Exists(blockers))
+                .order_by("id")
+                .select_for_update(skip_locked=True)
+                .values_list("id", flat=True)[: self.batch_size]
+            )
+            if ids:
+                OutboxMessage.objects.filter(id__in=ids).update(
+                    status=OutboxMessage.Status.PROCESSING,
+                    claimed_at=now,
+                )
+        return list(OutboxMessage.objects.filter(id__in=ids).order_by("id"))
+
+    def dispatch_batch(self) -> dict[str, int]:
+        """Обрабатывает одну пачку. Возвращает счётчики по итогам."""
+
+        messages = self.claim_batch()
+        if not messages:
+            return {"claimed": 0, "done": 0, "retried": 0, "failed": 0}
+
+        groups: dict[str, list[OutboxMessage]] = defaultdict(list)
+        for message in messages:
+            groups[message.aggregate_id or f"message:{message.id}"].append(message)
+
+        if self.max_workers > 1 and len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+                list(pool.map(self._deliver_group_in_thread, groups.values()))
+        else:
+            for group in groups.values():
+                self._deliver_group(group)
+
+        stats = {"claimed": len(messages), "done": 0, "retried": 0, "failed": 0}
+        for message in messages:
+            if message.status == OutboxMessage.Status.DONE:
+                stats["done"] += 1
+            elif message.status == OutboxMessage.Status.FAILED:
+                stats["failed"] += 1
+            else:
+                stats["retried"] += 1
+        return stats
+
+    def _deliver_group_in_thread(self, group: list[OutboxMessage]) -> None:
+        try:
+            self._deliver_group(group)
+        finally:
+            # Каждый поток открывает своё соединение с БД — закрываем его
+            connection.close()
+
+    def _deliver_group(self, group: list[OutboxMessage]) -> None:
+        for position, message in enumerate(group):
+            try:
+                self._deliver(message)
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.error(f"Outbox message {message.id} crashed: {exc}", exc_info=True)
+                self._finish(message, [f"dispatcher: {exc}"])
+            if message.status == OutboxMessage.Status.PENDING:
+                # Следующие события агрегата не обгоняют отложенное
+                self._release(group[position + 1:])
+                return
+
+    def _release(self, messages: list[OutboxMessage]) -> None:
+        """Возвращает забранные сообщения в очередь без попытки доставки."""
+        if not messages:
+            return
+        OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+            status=OutboxMessage.Status.PENDING,
+            claimed_at=None,
+        )
+        for message in messages:
+            message.status = OutboxMessage.Status.PENDING
+            message.claimed_at = None
+
+    def _deliver(self, message: OutboxMessage) -> None:
+        try:
+            event = decode_event(message.event_type, message.payload)
+        except Exception as exc:
+            logger.error(f"Cannot decode outbox message {message.id}: {exc}", exc_info=True)
+            message.attempts = self.max_attempts - 1
+            self._finish(message, [f"decode: {exc}"])
+            return
+
+        errors = []
+        completed = list(message.completed_handlers)
+        for handler in self.bus.get_event_handlers(type(event)):
+            name = self.bus.handler_name(handler)
+            if name in completed:
+                continue
+            error = self._run_handler(handler, event)
+            if error is None:
+                completed.append(name)
+            else:
+                errors.append(f"{name}: {error}")
+        message.completed_handlers = completed
+        self._finish(message, errors)
+
+    def _run_handler(self, handler, event) -> str | None:  # type: ignore
+        error = None
+        for attempt in range(1, self.handler_retries + 1):
+            try:
+                handler(event)
+                return None
+            except Exception as exc:
+                error = repr(exc)
+                logger.warning(
+                    f"Handler {self.bus.handler_name(handler)} failed for "
+                    f"{type(event).__name__} (attempt {attempt}/{self.handler_retries}): {exc}"
+                )
+                if attempt < self.handler_retries and self.retry_delay:
+                    time.sleep(self.retry_delay * attempt)
+        return error
+
+    def _finish(self, message: OutboxMessage, errors: list[str]) -> None:
+        now = timezone.now()
+        message.attempts += 1
+        if not errors:
+            message.status = OutboxMessage.Status.DONE
+            message.processed_at = now
+            message.last_error = ""
+        elif message.attempts >= self.max_attempts:
+            message.status = OutboxMessage.Status.FAILED
+            message.processed_at = now
+            message.last_error = "\n".join(errors)
+            logger.error(f"Outbox message {message.id} failed permanently: {message.last_error}")
+        else:
+            message.status = OutboxMessage.Status.PENDING
+            message.available_at = now + timedelta(seconds=BACKOFF_BASE_SECONDS * 2 ** (message.attempts - 1))
+            message.last_error = "\n".join(errors)
+        message.claimed_at = None
+        message.save(
+            update_fields=[
+                "status",
+                "attempts",
+                "completed_handlers",
+                "last_error",
+                "available_at",
+                "claimed_at",
+                "processed_at",
+            ]
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.12 on 2026-10-16 18:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.UUIDField(unique=True)),
+                ('event_type', models.CharField(help_text='Путь к классу события.', max_length=255)),
+                ('aggregate_id', models.CharField(blank=True, max_length=64)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Ожидает доставки'), ('processing', 'Обрабатывается'), ('done', 'Доставлено'), ('failed', 'Ошибка доставки')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('completed_handlers', models.JSONField(blank=True, default=list, help_text='Обработчики, успешно принявшие событие (не вызываются повторно).')),
+                ('last_error', models.TextField(blank=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Сообщение outbox',
+                'verbose_name_plural': 'Сообщения outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_outb_status_01a65a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.12 on 2026-10-16 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['aggregate_id', 'status'], name='outbox_outb_aggrega_f74d25_idx'),
+        ),
+    ]
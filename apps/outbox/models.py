@@ -0,0 +1,52 @@
+"""Transactional outbox for domain events.
+
+События записываются в ``OutboxMessage`` в той же транзакции, что и
+агрегаты, и доставляются обработчикам ``MessageBus`` отдельным воркером
+(см. ``apps.outbox.dispatcher``). Доставка «хотя бы один раз»: обработчики
+должны быть идемпотентными.
+"""
+
+from __future__ import annotations
+
+from django.db import models  # type: ignore
+from django.utils import timezone  # type: ignore
+from django.utils.translation import gettext_lazy as _  # type: ignore
+
+
+class OutboxMessage(models.Model):
+    """Доменное событие, ожидающее доставки обработчикам."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Ожидает доставки")
+        PROCESSING = "processing", _("Обрабатывается")
+        DONE = "done", _("Доставлено")
+        FAILED = "failed", _("Ошибка доставки")
+
+    event_id = models.UUIDField(unique=True)
+    event_type = models.CharField(max_length=255, help_text=_("Путь к классу события."))
+    aggregate_id = models.CharField(max_length=64, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    completed_handlers = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_("Обработчики, успешно принявшие событие (не вызываются повторно)."),
+    )
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Сообщение outbox")
+        verbose_name_plural = _("Сообщения outbox")
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+            models.Index(fields=["aggregate_id", "status"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_type} ({self.status})"
@@ -0,0 +1,82 @@
+"""JSON (de)serialization of domain events for the outbox."""
+
+from __future__ import annotations
+
+import dataclasses
+import types
+import typing
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.utils.module_loading import import_string  # type: ignore
+
+from shared.domain.base import DomainEvent
+
+
+def event_type_path(event: DomainEvent) -> str:
+    cls = type(event)
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _encode(value):  # type: ignore
+    if dataclasses.is_dataclass(value):
+        return {
+            f.name: _encode(getattr(value, f.name))
+            for f in dataclasses.fields(value)
+            if f.init
+        }
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value, hint):  # type: ignore
+    if value is None:
+        return None
+    origin = typing.get_origin(hint)
+    if origin in (typing.Union, types.UnionType):
+        for option in typing.get_args(hint):
+            if option is type(None):
+                continue
+            return _decode(value, option)
+    if origin in (list, tuple):
+        (item_hint, *_) = typing.get_args(hint) or (typing.Any,)
+        return origin(_decode(item, item_hint) for item in value)
+    if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+        return _build(hint, value)
+    if hint is UUID and isinstance(value, str):
+        return UUID(value)
+    if hint is datetime:
+        return datetime.fromisoformat(value)
+    if hint is date:
+        return date.fromisoformat(value)
+    if hint is Decimal:
+        return Decimal(value)
+    return value
+
+
+def _build(cls, data: dict):  # type: ignore
+    hints = typing.get_type_hints(cls)
+    kwargs = {
+        f.name: _decode(data[f.name], hints.get(f.name, typing.Any))
+        for f in dataclasses.fields(cls)
+        if f.init and f.name in data
+    }
+    return cls(**kwargs)
+
+
+def encode_event(event: DomainEvent) -> dict:
+    """Событие -> JSON-совместимый словарь (UUID, даты и Decimal — строками)."""
+
+    return _encode(event)
+
+
+def decode_event(event_type: str, payload: dict) -> DomainEvent:
+    """Восстанавливает событие по пути к классу и словарю из ``encode_event``."""
+
+    return _build(import_string(event_type), payload)
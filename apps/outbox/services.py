@@ -0,0 +1,47 @@
+"""Запись доменных событий в outbox."""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+
+from django.db import transaction  # type: ignore
+
+from shared.domain.base import DomainEvent
+
+from .models import OutboxMessage
+from .serialization import encode_event, event_type_path
+
+logger = logging.getLogger(__name__)
+
+
+def store_events(events: Iterable[DomainEvent]) -> list[OutboxMessage]:
+    """Сохраняет события в outbox в текущей транзакции.
+
+    После фиксации транзакции запускается доставка; если брокер недоступен,
+    сообщения заберёт периодическая задача ``outbox.dispatch_outbox``.
+    """
+
+    messages = OutboxMessage.objects.bulk_create(
+        [
+            OutboxMessage(
+                event_id=event.event_id,
+                event_type=event_type_path(event),
+                aggregate_id=str(event.aggregate_id) if event.aggregate_id else "",
+                payload=encode_event(event),
+            )
+            for event in events
+        ]
+    )
+    if messages:
+        transaction.on_commit(_trigger_dispatch)
+    return messages
+
+
+def _trigger_dispatch() -> None:
+    from .tasks import dispatch_outbox
+
+    try:
+        dispatch_outbox.delay()
+    except Exception as exc:
+        logger.warning(f"Could not enqueue outbox dispatch, periodic run will pick it up: {exc}")
@@ -0,0 +1,56 @@
+"""Celery tasks for the outbox."""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from celery import shared_task  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .dispatcher import OutboxDispatcher
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES_PER_RUN = 20
+RETENTION_DAYS = 7
+
+
+@shared_task(name="outbox.dispatch_outbox")
+def dispatch_outbox() -> dict[str, int]:
+    """
+    Доставка накопленных доменных событий.
+
+    Запускается после фиксации транзакций с событиями и каждые 10 секунд
+    через Celery Beat. За один запуск обрабатывается до MAX_BATCHES_PER_RUN пачек.
+
+    Returns:
+        dict: {"claimed", "done", "retried", "failed"}
+    """
+    dispatcher = OutboxDispatcher()
+    totals = {"claimed": 0, "done": 0, "retried": 0, "failed": 0}
+    for _ in range(MAX_BATCHES_PER_RUN):
+        stats = dispatcher.dispatch_batch()
+        for key, value in stats.items():
+            totals[key] += value
+        # Следующее событие агрегата забирается только после доставки
+        # предыдущего, поэтому неполная пачка ещё не значит пустую очередь
+        if not stats["claimed"]:
+            break
+
+    if totals["claimed"]:
+        logger.info(f"Outbox dispatch: {totals}")
+    return totals
+
+
+@shared_task(name="outbox.purge_dispatched_messages")
+def purge_dispatched_messages() -> dict[str, int]:
+    """Удаляет доставленные сообщения старше RETENTION_DAYS дней."""
+
+    threshold = timezone.now() - timedelta(days=RETENTION_DAYS)
+    deleted, _ = OutboxMessage.objects.filter(
+        status=OutboxMessage.Status.DONE,
+        processed_at__lt=threshold,
+    ).delete()
+    return {"deleted": deleted}
@@ -0,0 +1,135 @@
+"""Tests for the transactional outbox."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.bookings.domain.events import BookingCancelled, InventoryAllocated
+from apps.outbox.dispatcher import OutboxDispatcher
+from apps.outbox.models import OutboxMessage
+from apps.outbox.serialization import decode_event, encode_event, event_type_path
+from shared.application.message_bus import MessageBus
+from shared.application.uow import DjangoUnitOfWork
+from shared.domain.value_objects import DateRange, Money
+
+
+class OutboxSerializationTests(TestCase):
+    def test_event_round_trip(self) -> None:
+        event = BookingCancelled(
+            aggregate_id=uuid4(),
+            booking_id=uuid4(),
+            property_id=uuid4(),
+            reason="Передумал",
+            refund_amount=Money(Decimal("1500.50")),
+            old_status="confirmed",
+        )
+
+        restored = decode_event(event_type_path(event), encode_event(event))
+
+        self.assertEqual(restored, event)
+
+
+class OutboxDispatcherTests(TestCase):
+    def setUp(self) -> None:
+        self.bus = MessageBus()
+        self.received: list = []
+        self.failures = {"count": 0}
+
+    def _event(self) -> InventoryAllocated:
+        return InventoryAllocated(
+            aggregate_id=uuid4(),
+            property_id=uuid4(),
+            allocation_id=uuid4(),
+            booking_id=uuid4(),
+            dates=DateRange(date(2025, 3, 1), date(2025, 3, 4)),
+        )
+
+    def _dispatcher(self) -> OutboxDispatcher:
+        return OutboxDispatcher(self.bus, max_workers=1, retry_delay=0)
+
+    def test_unit_of_work_stores_events_until_dispatch(self) -> None:
+        self.bus.register_event_handler(InventoryAllocated, self.received.append)
+        event = self._event()
+
+        with DjangoUnitOfWork() as uow:
+            uow._events.append(event)
+
+        self.assertEqual(self.received, [])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+
+        stats = self._dispatcher().dispatch_batch()
+
+        self.assertEqual(stats["done"], 1)
+        self.assertEqual(self.received, [event])
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.Status.DONE)
+
+    def test_failed_handler_is_retried_without_repeating_successful_ones(self) -> None:
+        def flaky(event) -> None:
+            self.failures["count"] += 1
+            raise RuntimeError("boom")
+
+        self.bus.register_event_handler(InventoryAllocated, self.received.append)
+        self.bus.register_event_handler(InventoryAllocated, flaky)
+        with DjangoUnitOfWork() as uow:
+            uow._events.append(self._event())
+
+        stats = self._dispatcher().dispatch_batch()
+
+        self.assertEqual(stats["retried"], 1)
+        self.assertEqual(self.failures["count"], 3)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertIn("boom", message.last_error)
+
+        OutboxMessage.objects.update(available_at=message.created_at)
+        self._dispatcher().dispatch_batch()
+
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(OutboxMessage.objects.get().attempts, 2)
+
+    def test_events_of_one_aggregate_are_delivered_one_at_a_time_in_order(self) -> None:
+        attempts = {"count": 0}
+
+        def flaky_first(event) -> None:  # type: ignore
+            if event.booking_id == first.booking_id and attempts["count"] == 0:
+                attempts["count"] += 1
+                raise RuntimeError("boom")
+            self.received.append(event.booking_id)
+
+        self.bus.register_event_handler(InventoryAllocated, flaky_first)
+        first, second = self._event(), self._event()
+        second = InventoryAllocated(
+            aggregate_id=first.aggregate_id,
+            property_id=second.property_id,
+            allocation_id=second.allocation_id,
+            booking_id=second.booking_id,
+            dates=second.dates,
+        )
+        other = self._event()
+        with DjangoUnitOfWork() as uow:
+            uow._events.extend([first, second, other])
+        dispatcher = OutboxDispatcher(self.bus, max_workers=1, retry_delay=0, handler_retries=1)
+
+        # Второе событие агрегата ждёт, пока первое в обработке
+        claimed = dispatcher.claim_batch()
+        self.assertEqual([message.payload for message in claimed], [encode_event(first), encode_event(other)])
+        self.assertEqual(dispatcher.claim_batch(), [])
+
+        OutboxMessage.objects.update(status=OutboxMessage.Status.PENDING, claimed_at=None)
+        dispatcher.dispatch_batch()
+        # Первое отложено после ошибки — второе не обгоняет его
+        self.assertEqual(self.received, [other.booking_id])
+        self.assertEqual(dispatcher.dispatch_batch()["claimed"], 0)
+
+        OutboxMessage.objects.filter(status=OutboxMessage.Status.PENDING).update(available_at=timezone.now())
+        dispatcher.dispatch_batch()
+        dispatcher.dispatch_batch()
+        self.assertEqual(self.received, [other.booking_id, first.booking_id, second.booking_id])
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.properties"
+
+    def ready(self) -> None:
+        from .event_handlers import register_event_handlers
+
+        register_event_handlers()
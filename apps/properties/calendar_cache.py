@@ -0,0 +1,176 @@
+"""Read-through cache for public calendars and property details.
+
+Календарь кэшируется помесячно: ключ включает объект, месяц и версию объекта
+(``properties:calendar:<id>:v<версия>:<ГГГГ-ММ>``). Любое изменение календаря
+или карточки объекта увеличивает версию, поэтому старые ключи перестают
+читаться и просто истекают по TTL — удалять их по маске не нужно.
+
+Версия увеличивается после фиксации транзакции, чтобы параллельный запрос не
+успел положить в кэш данные, которые вот-вот будут перезаписаны.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable
+
+from django.core.cache import cache  # type: ignore
+from django.db import transaction  # type: ignore
+
+from .calendar_engine import CalendarWindow, resolve_calendar, resolve_calendars
+from .models import Property
+
+CACHE_TIMEOUT = 60 * 15
+VERSION_TIMEOUT = None
+
+VERSION_KEY = "properties:version:{property_id}"
+CALENDAR_KEY = "properties:calendar:{property_id}:v{version}:{month}"
+DETAIL_KEY = "properties:detail:{property_id}:v{version}"
+
+
+def _versions(property_ids: Iterable[int]) -> dict[int, int]:
+    keys = {VERSION_KEY.format(property_id=pid): pid for pid in property_ids}
+    stored = cache.get_many(list(keys))
+    versions: dict[int, int] = {}
+    for key, pid in keys.items():
+        if key not in stored:
+            cache.add(key, 1, timeout=VERSION_TIMEOUT)
+        versions[pid] = stored.get(key, 1)
+    return versions
+
+
+def invalidate_property_cache(property_id: int) -> None:
+    """Делает недействительными все закэшированные данные объекта."""
+
+    key = VERSION_KEY.format(property_id=property_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=VERSION_TIMEOUT)
+
+
+def invalidate_property_cache_on_commit(property_id: int) -> None:
+    transaction.on_commit(lambda: invalidate_property_cache(property_id))
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _months(start: date, end: date) -> list[date]:
+    months = []
+    current = _month_start(start)
+    while current <= end:
+        months.append(current)
+        current = _next_month(current)
+    return months
+
+
+def _slice(window: CalendarWindow, start: date, end: date) -> CalendarWindow:
+    lo = (start - window.start).days
+    hi = (end - window.start).days + 1
+    return CalendarWindow(
+        property_id=window.property_id,
+        start=start,
+        end=end,
+        statuses=window.statuses[lo:hi],
+        prices=window.prices[lo:hi],
+        pricing_sources=window.pricing_sources[lo:hi],
+        min_nights=window.min_nights[lo:hi],
+    )
+
+
+def _concat(parts: list[CalendarWindow]) -> CalendarWindow:
+    window = CalendarWindow(
+        property_id=parts[0].property_id,
+        start=parts[0].start,
+        end=parts[-1].end,
+        statuses=[],
+        prices=[],
+        pricing_sources=[],
+        min_nights=[],
+    )
+    for part in parts:
+        window.statuses.extend(part.statuses)
+        window.prices.extend(part.prices)
+        window.pricing_sources.extend(part.pricing_sources)
+        window.min_nights.extend(part.min_nights)
+    return window
+
+
+def cached_calendars(
+    properties: Iterable[Property],
+    start: date,
+    end: date,
+) -> dict[int, CalendarWindow]:
+    """Календари объектов на ``[start, end]`` с чтением через кэш.
+
+    Недостающие месяцы всех объектов рассчитываются одним вызовом
+    ``resolve_calendars`` и сохраняются в кэш.
+    """
+
+    properties = list(properties)
+    if not properties or end < start:
+        return {}
+    months = _months(start, end)
+    versions = _versions(prop.id for prop in properties)
+
+    keys = {
+        (prop.id, month): CALENDAR_KEY.format(
+            property_id=prop.id,
+            version=versions[prop.id],
+            month=month.strftime("%Y-%m"),
+        )
+        for prop in properties
+        for month in months
+    }
+    stored = cache.get_many(list(keys.values()))
+    monthly: dict[tuple[int, date], CalendarWindow] = {
+        slot: stored[key] for slot, key in keys.items() if key in stored
+    }
+
+    missing = [slot for slot in keys if slot not in monthly]
+    if missing:
+        stale_ids = {property_id for property_id, _ in missing}
+        stale_properties = [prop for prop in properties if prop.id in stale_ids]
+        missing_months = sorted({month for _, month in missing})
+        span_start = missing_months[0]
+        span_end = _next_month(missing_months[-1]) - timedelta(days=1)
+        resolved = resolve_calendars(stale_properties, span_start, span_end)
+
+        to_store = {}
+        for property_id, month in missing:
+            part = _slice(resolved[property_id], month, _next_month(month) - timedelta(days=1))
+            monthly[(property_id, month)] = part
+            to_store[keys[(property_id, month)]] = part
+        cache.set_many(to_store, timeout=CACHE_TIMEOUT)
+
+    return {
+        prop.id: _slice(_concat([monthly[(prop.id, month)] for month in months]), start, end)
+        for prop in properties
+    }
+
+
+def cached_calendar(property_obj: Property, start: date, end: date) -> CalendarWindow:
+    if end < start:
+        return resolve_calendar(property_obj, start, end)
+    return cached_calendars([property_obj], start, end)[property_obj.id]
+
+
+def get_cached_detail(property_id: int) -> tuple[int, dict | None]:
+    """Возвращает версию объекта и закэшированную карточку (если есть).
+
+    Версию нужно передать в ``set_cached_detail``: так карточка, собранная
+    до параллельного изменения объекта, не попадёт под новую версию.
+    """
+
+    version = _versions([property_id])[property_id]
+    return version, cache.get(DETAIL_KEY.format(property_id=property_id, version=version))
+
+
+def set_cached_detail(property_id: int, version: int, data: dict) -> None:
+    cache.set(DETAIL_KEY.format(property_id=property_id, version=version), data, timeout=CACHE_TIMEOUT)
@@ -0,0 +1,182 @@
+"""Public calendar resolution engine.
+
+Разрешает статус, цену и минимальный срок проживания для каждого дня окна
+одним проходом по отсортированным интервалам. Периоды «закрашивают» массивы
+окна в порядке возрастания старшинства, поэтому стоимость расчёта зависит от
+суммарной длины периодов внутри окна, а не от произведения дней на периоды.
+
+Правила старшинства:
+
+- блокировки — побеждает период, начавшийся раньше (как и прежде);
+- сезонные тарифы — побеждает более высокий ``priority``, при равенстве —
+  тариф, начавшийся раньше.
+
+Границы периодов включительные, как в исходном публичном календаре.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from .models import Property, PropertyAvailability, PropertySeasonalRate
+
+PRICING_BASE = "base"
+PRICING_SEASONAL = "seasonal"
+
+
+@dataclass
+class CalendarWindow:
+    """Разрешённый календарь одного объекта на окно ``[start, end]``."""
+
+    property_id: int
+    start: date
+    end: date
+    statuses: list[str]
+    prices: list[Decimal]
+    pricing_sources: list[str]
+    min_nights: list[int]
+
+    @property
+    def days(self) -> int:
+        return len(self.statuses)
+
+    def dates(self) -> list[date]:
+        return [self.start + timedelta(days=offset) for offset in range(self.days)]
+
+    def as_rows(self) -> list[dict]:
+        """Построчное представление для ``PropertyPublicCalendarSerializer``."""
+
+        return [
+            {
+                "date": day,
+                "status": status_value,
+                "final_price": price,
+                "pricing_source": source,
+                "min_nights": nights,
+            }
+            for day, status_value, price, source, nights in zip(
+                self.dates(),
+                self.statuses,
+                self.prices,
+                self.pricing_sources,
+                self.min_nights,
+            )
+        ]
+
+
+def _clip(period_start: date, period_end: date, start: date, days: int) -> tuple[int, int]:
+    """Индексы ``[lo, hi)`` периода с включительными границами внутри окна."""
+
+    lo = max((period_start - start).days, 0)
+    hi = min((period_end - start).days + 1, days)
+    return lo, hi
+
+
+def _resolve(
+    property_obj: Property,
+    start: date,
+    end: date,
+    availability: list[PropertyAvailability],
+    seasonal: list[PropertySeasonalRate],
+) -> CalendarWindow:
+    days = (end - start).days + 1
+    statuses = [PropertyAvailability.AvailabilityStatus.AVAILABLE.value] * days
+    prices = [property_obj.base_price] * days
+    sources = [PRICING_BASE] * days
+    min_nights = [property_obj.min_nights] * days
+
+    # Раньше начавшаяся блокировка побеждает: закрашиваем от поздних к ранним
+    for period in sorted(availability, key=lambda p: (p.start_date, p.id), reverse=True):
+        lo, hi = _clip(period.start_date, period.end_date, start, days)
+        if lo < hi:
+            statuses[lo:hi] = [period.status] * (hi - lo)
+
+    # Старший тариф закрашивается последним
+    ordered = sorted(seasonal, key=lambda r: (r.priority, -r.start_date.toordinal(), -r.id))
+    for rate in ordered:
+        lo, hi = _clip(rate.start_date, rate.end_date, start, days)
+        if lo >= hi:
+            continue
+        nights = property_obj.min_nights
+        if rate.min_nights:
+            nights = max(nights, rate.min_nights)
+        if rate.max_nights:
+            nights = min(nights, rate.max_nights)
+        prices[lo:hi] = [rate.price_per_night] * (hi - lo)
+        sources[lo:hi] = [PRICING_SEASONAL] * (hi - lo)
+        min_nights[lo:hi] = [nights] * (hi - lo)
+
+    return CalendarWindow(
+        property_id=property_obj.id,
+        start=start,
+        end=end,
+        statuses=statuses,
+        prices=prices,
+        pricing_sources=sources,
+        min_nights=min_nights,
+    )
+
+
+def resolve_calendars(
+    properties: Iterable[Property],
+    start: date,
+    end: date,
+) -> dict[int, CalendarWindow]:
+    """Календари нескольких объектов за два запроса к БД.
+
+    Используется страницами списков для мини-календарей.
+    """
+
+    properties = list(properties)
+    if not properties or end < start:
+        return {}
+    property_ids = [prop.id for prop in properties]
+
+    availability_by_property: dict[int, list[PropertyAvailability]] = defaultdict(list)
+    for period in PropertyAvailability.objects.filter(
+        property_id__in=property_ids,
+        start_date__lte=end,
+        end_date__gte=start,
+    ).only("id", "property_id", "start_date", "end_date", "status"):
+        availability_by_property[period.property_id].append(period)
+
+    seasonal_by_property: dict[int, list[PropertySeasonalRate]] = defaultdict(list)
+    for rate in PropertySeasonalRate.objects.filter(
+        property_id__in=property_ids,
+        start_date__lte=end,
+        end_date__gte=start,
+    ).only(
+        "id",
+        "property_id",
+        "start_date",
+        "end_date",
+        "price_per_night",
+        "min_nights",
+        "max_nights",
+        "priority",
+    ):
+        seasonal_by_property[rate.property_id].append(rate)
+
+    return {
+        prop.id: _resolve(
+            prop,
+            start,
+            end,
+            availability_by_property[prop.id],
+            seasonal_by_property[prop.id],
+        )
+        for prop in properties
+    }
+
+
+def resolve_calendar(property_obj: Property, start: date, end: date) -> CalendarWindow:
+    """Календарь одного объекта на окно ``[start, end]``."""
+
+    windows = resolve_calendars([property_obj], start, end)
+    if property_obj.id in windows:
+        return windows[property_obj.id]
+    return _resolve(property_obj, start, start - timedelta(days=1), [], [])
@@ -0,0 +1,20 @@
+"""Обработчики доменных событий, затрагивающих объекты недвижимости."""
+
+from __future__ import annotations
+
+from shared.application.message_bus import message_bus
+
+from .calendar_cache import invalidate_property_cache
+
+
+def invalidate_calendar_on_inventory_change(event) -> None:  # type: ignore
+    """Сбрасывает кэш календаря после выделения или освобождения дат."""
+
+    invalidate_property_cache(event.property_id)
+
+
+def register_event_handlers() -> None:
+    from apps.bookings.domain.events import InventoryAllocated, InventoryDeallocated
+
+    message_bus.register_event_handler(InventoryAllocated, invalidate_calendar_on_inventory_change)
+    message_bus.register_event_handler(InventoryDeallocated, invalidate_calendar_on_inventory_change)
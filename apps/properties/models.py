@@ -17,6 +17,17 @@ from django.utils.text import slugify  # type: ignore
 from django.utils.translation import gettext_lazy as _  # type: ignore
 
 from shared.infrastructure.fields import EncryptedCharField
+from shared.infrastructure.ranges import PeriodExclusionConstraint
+
+
+def _invalidate_property_cache(property_id: int | None) -> None:
+    """Сбрасывает кэш календаря и карточки объекта после фиксации транзакции."""
+
+    if property_id is None:
+        return
+    from .calendar_cache import invalidate_property_cache_on_commit  # Local import to prevent circular dependency
+
+    invalidate_property_cache_on_commit(property_id)
 
 
 class PropertyType(models.Model):
@@ -175,6 +186,28 @@ class Property(models.Model):
     additional_rules = models.TextField(blank=True)
     amenities = models.ManyToManyField(Amenity, blank=True, related_name="properties")
     is_featured = models.BooleanField(default=False)
+
+    # Сводка отзывов, поддерживается инкрементально apps.reviews.services
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0, help_text=_("Сумма оценок отзывов"))
+    rating_avg = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        help_text=_("Средняя оценка; 0, пока нет отзывов"),
+    )
+    cleanliness_rating_sum = models.PositiveIntegerField(default=0, help_text=_("Чистота: сумма оценок"))
+    cleanliness_rating_count = models.PositiveIntegerField(default=0, help_text=_("Чистота: количество оценок"))
+    location_rating_sum = models.PositiveIntegerField(default=0, help_text=_("Расположение: сумма оценок"))
+    location_rating_count = models.PositiveIntegerField(default=0, help_text=_("Расположение: количество оценок"))
+    value_rating_sum = models.PositiveIntegerField(default=0, help_text=_("Цена/качество: сумма оценок"))
+    value_rating_count = models.PositiveIntegerField(default=0, help_text=_("Цена/качество: количество оценок"))
+    communication_rating_sum = models.PositiveIntegerField(default=0, help_text=_("Связь с владельцем: сумма оценок"))
+    communication_rating_count = models.PositiveIntegerField(default=0, help_text=_("Связь с владельцем: количество оценок"))
+    accuracy_rating_sum = models.PositiveIntegerField(default=0, help_text=_("Соответствие описанию: сумма оценок"))
+    accuracy_rating_count = models.PositiveIntegerField(default=0, help_text=_("Соответствие описанию: количество оценок"))
+    check_in_rating_sum = models.PositiveIntegerField(default=0, help_text=_("Заселение: сумма оценок"))
+    check_in_rating_count = models.PositiveIntegerField(default=0, help_text=_("Заселение: количество оценок"))
     published_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -187,11 +220,29 @@ class Property(models.Model):
             # FK indexes for city_location and district_location created automatically
             models.Index(fields=["status"]),
             models.Index(fields=["owner", "status"]),
+            # Курсорная пагинация списков и поиска
+            models.Index(fields=["status", "-created_at", "-id"]),
+            models.Index(fields=["owner", "-created_at", "-id"]),
+            models.Index(fields=["agency", "-created_at", "-id"]),
+            models.Index(fields=["status", "-is_featured", "-created_at", "-id"]),
+            # Сортировка поиска по рейтингу
+            models.Index(fields=["status", "-rating_avg"]),
         ]
 
     def __str__(self) -> str:
         return self.title
 
+    def dimension_ratings(self) -> dict[str, float | None]:
+        """Средние оценки по категориям из сводки отзывов."""
+        from apps.reviews.services import RATING_DIMENSIONS  # Local import to prevent circular dependency
+
+        averages: dict[str, float | None] = {}
+        for dimension in RATING_DIMENSIONS:
+            count = getattr(self, f"{dimension}_rating_count")
+            total = getattr(self, f"{dimension}_rating_sum")
+            averages[dimension] = round(total / count, 2) if count else None
+        return averages
+
     def activate(self) -> None:
         if self.status != self.Status.ACTIVE:
             self.status = self.Status.ACTIVE
@@ -213,6 +264,7 @@ class Property(models.Model):
                 candidate = f"{base_slug}-{counter}"
             self.slug = candidate
         super().save(*args, **kwargs)
+        _invalidate_property_cache(self.pk)
 
 
 class PropertyPhoto(models.Model):
@@ -233,6 +285,16 @@ class PropertyPhoto(models.Model):
     def __str__(self) -> str:
         return f"{self.property.title} [{self.order}]"
 
+    def save(self, *args, **kwargs):  # type: ignore
+        super().save(*args, **kwargs)
+        _invalidate_property_cache(self.property_id)
+
+    def delete(self, *args, **kwargs):  # type: ignore
+        property_id = self.property_id
+        result = super().delete(*args, **kwargs)
+        _invalidate_property_cache(property_id)
+        return result
+
 
 class PropertySeasonalRate(models.Model):
     """Сезонные цены, перекрывающие базовую стоимость."""
@@ -303,6 +365,16 @@ class PropertySeasonalRate(models.Model):
     def __str__(self) -> str:
         return f"{self.property.title}: {self.start_date} - {self.end_date}"
 
+    def save(self, *args, **kwargs):  # type: ignore
+        super().save(*args, **kwargs)
+        _invalidate_property_cache(self.property_id)
+
+    def delete(self, *args, **kwargs):  # type: ignore
+        property_id = self.property_id
+        result = super().delete(*args, **kwargs)
+        _invalidate_property_cache(property_id)
+        return result
+
 
 class PropertyAvailability(models.Model):
     """Календарь доступности объекта (блокировки/бронь)."""
@@ -325,6 +397,13 @@ class PropertyAvailability(models.Model):
         WEEKLY = "weekly", _("Повтор еженедельный")
         MONTHLY = "monthly", _("Повтор ежемесячный")
 
+    # Статусы, при которых даты периода недоступны для бронирования
+    BLOCKING_STATUSES = (
+        AvailabilityStatus.BOOKED,
+        AvailabilityStatus.BLOCKED,
+        AvailabilityStatus.MAINTENANCE,
+    )
+
     property = models.ForeignKey(
         Property,
         on_delete=models.CASCADE,
@@ -379,9 +458,32 @@ class PropertyAvailability(models.Model):
             models.Index(fields=["availability_type", "status"]),
         ]
 
+    # PostgreSQL: GiST-индекс по периоду и запрет пересечения блокирующих периодов.
+    # Добавляется после Meta, потому что тело Meta не видит атрибуты модели,
+    # а условие должно совпадать с BLOCKING_STATUSES
+    Meta.constraints.append(
+        PeriodExclusionConstraint(
+            name="availability_no_overlapping_blocks",
+            owner_field="property",
+            start_field="start_date",
+            end_field="end_date",
+            condition=models.Q(status__in=BLOCKING_STATUSES),
+        )
+    )
+
     def __str__(self) -> str:
         return f"{self.property.title}: {self.start_date} — {self.end_date} ({self.status})"
 
+    def save(self, *args, **kwargs):  # type: ignore
+        super().save(*args, **kwargs)
+        _invalidate_property_cache(self.property_id)
+
+    def delete(self, *args, **kwargs):  # type: ignore
+        property_id = self.property_id
+        result = super().delete(*args, **kwargs)
+        _invalidate_property_cache(property_id)
+        return result
+
 
 class PropertyCalendarSettings(models.Model):
     """Настройки бронирования и календаря для объекта."""
@@ -431,6 +533,39 @@ class PropertyCalendarSettings(models.Model):
         return f"Настройки календаря для {self.property.title}"
 
 
+class PropertyOccupancyIndex(models.Model):
+    """Битовая карта занятости объекта по дням для быстрого поиска.
+
+    Бит ``i`` соответствует дню ``start_date + i``; единица означает, что день
+    занят бронированием или блокировкой. Карта покрывает полуинтервал
+    ``[start_date, end_date)`` и пересчитывается сервисом
+    ``apps.properties.occupancy`` при каждом изменении календаря объекта.
+    """
+
+    property = models.OneToOneField(
+        Property,
+        on_delete=models.CASCADE,
+        related_name="occupancy_index",
+    )
+    start_date = models.DateField(help_text=_("Первый день, покрытый картой."))
+    end_date = models.DateField(help_text=_("День, следующий за последним покрытым."))
+    bitmap = models.BinaryField(default=bytes, help_text=_("Один бит на день, little-endian."))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Индекс занятости объекта")
+        verbose_name_plural = _("Индексы занятости объектов")
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(end_date__gte=models.F("start_date")),
+                name="occupancy_index_valid_date_range",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Занятость {self.property_id}: {self.start_date} — {self.end_date}"
+
+
 class PropertyAccessInfo(models.Model):
     """
     Encrypted access information for a property.
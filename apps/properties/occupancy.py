@@ -0,0 +1,185 @@
+"""Per-day occupancy index for property availability search.
+
+Каждому объекту соответствует строка ``PropertyOccupancyIndex`` с битовой
+картой занятости на горизонт бронирования (``booking_window``). Карта
+пересчитывается при каждом изменении календаря объекта (резервирование и
+освобождение дат бронированием, ручные блокировки), поэтому поиск по датам
+проверяет свободные дни побитовой операцией и не сканирует таблицы
+``Booking`` и ``PropertyAvailability``.
+
+Объекты без карты или с картой, не покрывающей запрошенный период,
+проверяются прежним запросом по исходным таблицам — поиск остаётся
+корректным и до первого пересчёта индекса.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable
+
+from django.db import transaction  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .models import (
+    Property,
+    PropertyAvailability,
+    PropertyCalendarSettings,
+    PropertyOccupancyIndex,
+)
+
+DEFAULT_HORIZON_DAYS = 365
+
+
+def range_mask(anchor: date, start: date, end: date) -> int:
+    """Маска битов для дней ``[start, end)`` относительно ``anchor``."""
+
+    lo = max(start, anchor)
+    if lo >= end:
+        return 0
+    offset = (lo - anchor).days
+    length = (end - lo).days
+    return ((1 << length) - 1) << offset
+
+
+def encode_bitmap(bitmap: int, days: int) -> bytes:
+    return bitmap.to_bytes((days + 7) // 8, "little")
+
+
+def decode_bitmap(raw: bytes | memoryview | None) -> int:
+    if not raw:
+        return 0
+    return int.from_bytes(bytes(raw), "little")
+
+
+def occupied_property_ids(
+    start: date,
+    end: date,
+    property_ids: Iterable[int] | None = None,
+) -> set[int]:
+    """Объекты, занятые на ``[start, end)``, по исходным таблицам календаря."""
+
+    from apps.bookings.models import Booking  # Local import to prevent circular dependency
+
+    availability_qs = PropertyAvailability.objects.filter(
+        start_date__lt=end,
+        end_date__gt=start,
+        status__in=PropertyAvailability.BLOCKING_STATUSES,
+    )
+    bookings_qs = Booking.objects.filter(
+        check_in__lt=end,
+        check_out__gt=start,
+        status__in=Booking.BLOCKING_STATUSES,
+    )
+    if property_ids is not None:
+        property_ids = list(property_ids)
+        availability_qs = availability_qs.filter(property_id__in=property_ids)
+        bookings_qs = bookings_qs.filter(property_id__in=property_ids)
+
+    busy = set(availability_qs.values_list("property_id", flat=True))
+    busy.update(bookings_qs.values_list("property_id", flat=True))
+    return busy
+
+
+def build_bitmap(property_id: int, start_date: date, end_date: date) -> int:
+    """Собирает карту занятости объекта на ``[start_date, end_date)``."""
+
+    from apps.bookings.models import Booking  # Local import to prevent circular dependency
+
+    periods = list(
+        PropertyAvailability.objects.filter(
+            property_id=property_id,
+            status__in=PropertyAvailability.BLOCKING_STATUSES,
+            start_date__lt=end_date,
+            end_date__gt=start_date,
+        ).values_list("start_date", "end_date")
+    )
+    periods += list(
+        Booking.objects.filter(
+            property_id=property_id,
+            status__in=Booking.BLOCKING_STATUSES,
+            check_in__lt=end_date,
+            check_out__gt=start_date,
+        ).values_list("check_in", "check_out")
+    )
+
+    bitmap = 0
+    for period_start, period_end in periods:
+        bitmap |= range_mask(start_date, period_start, min(period_end, end_date))
+    return bitmap
+
+
+def _horizon_days(property_id: int) -> int:
+    window = (
+        PropertyCalendarSettings.objects.filter(property_id=property_id)
+        .values_list("booking_window", flat=True)
+        .first()
+    )
+    return window or DEFAULT_HORIZON_DAYS
+
+
+def refresh_occupancy_index(property_id: int, *, today: date | None = None) -> PropertyOccupancyIndex:
+    """Пересчитывает карту занятости одного объекта.
+
+    Карта строится заново по календарю объекта, а не переключением отдельных
+    битов: так пересекающиеся блокировки не освобождают дни друг друга.
+    Запросы ограничены одним объектом и горизонтом бронирования.
+
+    Строка индекса блокируется до пересчёта и держится до конца транзакции
+    вызывающего кода: параллельная бронь того же объекта ждёт фиксации и
+    строит карту уже с её днями, а не затирает их своей.
+    """
+
+    anchor = today or timezone.localdate()
+    days = _horizon_days(property_id)
+    horizon_end = anchor + timedelta(days=days)
+    with transaction.atomic():
+        # Строка должна существовать, чтобы её можно было заблокировать
+        PropertyOccupancyIndex.objects.bulk_create(
+            [PropertyOccupancyIndex(property_id=property_id, start_date=anchor, end_date=anchor)],
+            ignore_conflicts=True,
+        )
+        index = PropertyOccupancyIndex.objects.select_for_update().get(property_id=property_id)
+        bitmap = build_bitmap(property_id, anchor, horizon_end)
+        index.start_date = anchor
+        index.end_date = horizon_end
+        index.bitmap = encode_bitmap(bitmap, days)
+        index.save(update_fields=["start_date", "end_date", "bitmap", "updated_at"])
+    return index
+
+
+def rebuild_occupancy_index(property_ids: Iterable[int] | None = None) -> int:
+    """Пересчитывает карты занятости (по умолчанию — всех объектов)."""
+
+    if property_ids is None:
+        property_ids = Property.objects.values_list("id", flat=True).iterator()
+    today = timezone.localdate()
+    rebuilt = 0
+    for property_id in property_ids:
+        refresh_occupancy_index(property_id, today=today)
+        rebuilt += 1
+    return rebuilt
+
+
+def exclude_occupied(queryset, start: date, end: date):  # type: ignore
+    """Исключает из ``queryset`` объекты, занятые хотя бы один день ``[start, end)``."""
+
+    rows = PropertyOccupancyIndex.objects.filter(
+        property_id__in=queryset.values("id"),
+        start_date__lte=start,
+        end_date__gte=end,
+    ).values_list("property_id", "start_date", "bitmap")
+
+    busy: set[int] = set()
+    covered: set[int] = set()
+    for property_id, anchor, raw in rows:
+        covered.add(property_id)
+        if decode_bitmap(raw) & range_mask(anchor, start, end):
+            busy.add(property_id)
+
+    stale = set(queryset.values_list("id", flat=True)) - covered
+    if stale:
+        busy |= occupied_property_ids(start, end, property_ids=stale)
+
+    if not busy:
+        return queryset
+    return queryset.exclude(id__in=busy)
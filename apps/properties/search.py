@@ -0,0 +1,153 @@
+"""Поиск свободных объектов — общий для API и Telegram-бота.
+
+Доступность на даты проверяется анти-join'ом: ``NOT EXISTS`` по броням и
+блокировкам календаря, пересекающим период, в том же запросе, что и
+фильтры и сортировка. Списки занятых объектов в Python не собираются.
+
+``PropertySearch`` отдаёт результаты страницами (keyset, без OFFSET) сразу
+с полями карточки, поэтому листание карточек в боте не делает запросов.
+Асинхронные ``acount``/``alist``/``aget`` используют async API ORM и
+вызываются из обработчиков бота без обёрток ``sync_to_async``.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from django.db.models import Exists, OuterRef  # type: ignore
+
+from shared.infrastructure.pagination import akeyset_page, keyset_page
+
+from .models import Property, PropertyAvailability
+
+SEARCH_ORDERING = ("-is_featured", "-created_at", "-id")
+SEARCH_PAGE_SIZE = 10
+
+CARD_FIELDS = (
+    "id",
+    "title",
+    "city_location__name",
+    "district_location__name",
+    "base_price",
+    "currency",
+    "rooms",
+    "sleeping_places",
+    # Поля сортировки — для курсора следующей страницы
+    "is_featured",
+    "created_at",
+)
+
+
+def available(queryset, start: date, end: date):  # type: ignore
+    """Объекты ``queryset``, свободные все дни ``[start, end)``."""
+
+    from apps.bookings.models import Booking  # Local import to prevent circular dependency
+
+    bookings = Booking.objects.filter(
+        property=OuterRef("pk"),
+        check_in__lt=end,
+        check_out__gt=start,
+        status__in=Booking.BLOCKING_STATUSES,
+    )
+    blocks = PropertyAvailability.objects.filter(
+        property=OuterRef("pk"),
+        start_date__lt=end,
+        end_date__gt=start,
+        status__in=PropertyAvailability.BLOCKING_STATUSES,
+    )
+    return queryset.filter(~Exists(bookings), ~Exists(blocks))
+
+
+def property_card(row: dict[str, Any]) -> dict[str, Any]:
+    """Карточка результата поиска из строки ``values(*CARD_FIELDS)``."""
+
+    city = row["city_location__name"]
+    district = row["district_location__name"]
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "location": f"{city}, {district}" if city and district else city or "",
+        "base_price": row["base_price"],
+        "currency": row["currency"],
+        "rooms": row["rooms"],
+        "sleeping_places": row["sleeping_places"],
+    }
+
+
+class PropertySearch:
+    """Поиск активных объектов по параметрам и датам.
+
+    Args:
+        checkin, checkout: период проживания ``[checkin, checkout)``;
+            без них доступность не проверяется.
+        city, district: названия города и района (справочник ``Location``).
+        property_class: класс жилья.
+        rooms: точное количество комнат.
+        rooms_min: минимальное количество комнат.
+    """
+
+    ordering = SEARCH_ORDERING
+    page_size = SEARCH_PAGE_SIZE
+
+    def __init__(
+        self,
+        *,
+        checkin: date | None = None,
+        checkout: date | None = None,
+        city: str | None = None,
+        district: str | None = None,
+        property_class: str | None = None,
+        rooms: int | None = None,
+        rooms_min: int | None = None,
+    ) -> None:
+        self.checkin = checkin
+        self.checkout = checkout
+        self.city = city
+        self.district = district
+        self.property_class = property_class
+        self.rooms = rooms
+        self.rooms_min = rooms_min
+
+    def queryset(self):  # type: ignore
+        qs = Property.objects.filter(status=Property.Status.ACTIVE)
+        if self.city:
+            qs = qs.filter(city_location__name=self.city)
+        if self.district:
+            qs = qs.filter(district_location__name=self.district)
+        if self.property_class:
+            qs = qs.filter(property_class=self.property_class)
+        if self.rooms is not None:
+            qs = qs.filter(rooms=self.rooms)
+        if self.rooms_min is not None:
+            qs = qs.filter(rooms__gte=self.rooms_min)
+        if self.checkin and self.checkout:
+            qs = available(qs, self.checkin, self.checkout)
+        return qs
+
+    def _cards_queryset(self):  # type: ignore
+        return self.queryset().values(*CARD_FIELDS)
+
+    def count(self) -> int:
+        return self.queryset().count()
+
+    async def acount(self) -> int:
+        return await self.queryset().acount()
+
+    def list(self, cursor: str | None = None, size: int | None = None) -> tuple[list[dict], str | None]:
+        """Страница карточек после ``cursor`` и курсор следующей страницы."""
+        rows, next_cursor = keyset_page(
+            self._cards_queryset(), ordering=self.ordering, cursor=cursor, size=size or self.page_size,
+        )
+        return [property_card(row) for row in rows], next_cursor
+
+    async def alist(self, cursor: str | None = None, size: int | None = None) -> tuple[list[dict], str | None]:
+        rows, next_cursor = await akeyset_page(
+            self._cards_queryset(), ordering=self.ordering, cursor=cursor, size=size or self.page_size,
+        )
+        return [property_card(row) for row in rows], next_cursor
+
+    async def aget(self, property_id: int) -> dict | None:
+        """Карточка объекта, если он всё ещё подходит под поиск (и свободен)."""
+        row = await self._cards_queryset().filter(pk=property_id).afirst()
+        return property_card(row) if row else None
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import date
 
+from django.db.models import Prefetch  # type: ignore
 from django.utils import timezone  # type: ignore
 from rest_framework import serializers  # type: ignore
 
@@ -196,6 +197,152 @@ class PropertyPublicCalendarSerializer(serializers.Serializer):
     min_nights = serializers.IntegerField()
 
 
+class PropertyCalendarWindowSerializer(serializers.Serializer):
+    """Компактный календарь объекта: массивы значений по дням окна."""
+
+    property_id = serializers.IntegerField()
+    statuses = serializers.ListField(child=serializers.CharField())
+    prices = serializers.ListField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2)
+    )
+    pricing_sources = serializers.ListField(child=serializers.CharField())
+    min_nights = serializers.ListField(child=serializers.IntegerField())
+
+
+class PropertyListSerializer(serializers.ModelSerializer):
+    """Компактное представление объекта для списков.
+
+    Поддерживает разреженный набор полей: ``?fields=id,title,base_price``
+    оставляет только перечисленные поля, ``?expand=photos,seasonal_rates``
+    добавляет вложенные связи, которые по умолчанию не отдаются. Данные
+    календаря в раскрытии ограничены текущими и будущими периодами.
+
+    Связи подгружаются только для запрошенных полей —
+    см. ``optimize_queryset``.
+    """
+
+    owner_id = serializers.ReadOnlyField()
+    agency_id = serializers.ReadOnlyField()
+    city_location_id = serializers.ReadOnlyField()
+    district_location_id = serializers.ReadOnlyField()
+    property_type = PropertyTypeSerializer(read_only=True)
+    primary_photo = serializers.SerializerMethodField()
+    amenities = AmenitySerializer(many=True, read_only=True)
+    photos = PropertyPhotoSerializer(many=True, read_only=True)
+    seasonal_rates = PropertySeasonalRateSerializer(many=True, read_only=True)
+    availability_periods = PropertyAvailabilitySerializer(many=True, read_only=True)
+
+    EXPANDABLE_FIELDS = ("amenities", "photos", "seasonal_rates", "availability_periods")
+
+    class Meta:
+        model = Property
+        fields = [
+            "id",
+            "owner_id",
+            "agency_id",
+            "title",
+            "slug",
+            "status",
+            "property_type",
+            "property_class",
+            "city_location_id",
+            "district_location_id",
+            "address_line",
+            "rooms",
+            "bedrooms",
+            "bathrooms",
+            "sleeping_places",
+            "base_price",
+            "currency",
+            "min_nights",
+            "max_nights",
+            "primary_photo",
+            "rating_avg",
+            "reviews_count",
+            "is_featured",
+            "published_at",
+            "created_at",
+            "amenities",
+            "photos",
+            "seasonal_rates",
+            "availability_periods",
+        ]
+
+    def __init__(self, *args, fields: list[str] | None = None, **kwargs):  # type: ignore
+        super().__init__(*args, **kwargs)
+        selected = set(fields if fields is not None else self.default_fields())
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def default_fields(cls) -> list[str]:
+        return [name for name in cls.Meta.fields if name not in cls.EXPANDABLE_FIELDS]
+
+    @classmethod
+    def requested_fields(cls, fields_param: str | None, expand_param: str | None) -> list[str]:
+        """Поля ответа по параметрам ``fields`` и ``expand``.
+
+        Raises:
+            serializers.ValidationError: запрошено неизвестное поле.
+        """
+
+        expand = [name.strip() for name in (expand_param or "").split(",") if name.strip()]
+        unknown = [name for name in expand if name not in cls.EXPANDABLE_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(
+                {
+                    "expand": (
+                        f"Неизвестные связи: {', '.join(unknown)}. "
+                        f"Доступны: {', '.join(cls.EXPANDABLE_FIELDS)}."
+                    )
+                }
+            )
+
+        if fields_param:
+            fields = [name.strip() for name in fields_param.split(",") if name.strip()]
+            unknown = [name for name in fields if name not in cls.Meta.fields]
+            if unknown:
+                raise serializers.ValidationError({"fields": f"Неизвестные поля: {', '.join(unknown)}."})
+        else:
+            fields = cls.default_fields()
+        return list(dict.fromkeys([*fields, *expand]))
+
+    @staticmethod
+    def optimize_queryset(queryset, fields: list[str]):  # type: ignore
+        """Добавляет в ``queryset`` только связи, нужные полям ``fields``."""
+        selected = set(fields)
+        if "property_type" in selected:
+            queryset = queryset.select_related("property_type")
+        if "amenities" in selected:
+            queryset = queryset.prefetch_related("amenities")
+        if selected & {"photos", "primary_photo"}:
+            queryset = queryset.prefetch_related("photos")
+
+        today = timezone.localdate()
+        if "seasonal_rates" in selected:
+            queryset = queryset.prefetch_related(
+                Prefetch("seasonal_rates", queryset=PropertySeasonalRate.objects.filter(end_date__gte=today))
+            )
+        if "availability_periods" in selected:
+            queryset = queryset.prefetch_related(
+                Prefetch("availability_periods", queryset=PropertyAvailability.objects.filter(end_date__gte=today))
+            )
+        return queryset
+
+    def get_primary_photo(self, obj: Property) -> str | None:
+        photos = list(obj.photos.all())
+        if not photos:
+            return None
+        photo = next((item for item in photos if item.is_primary), None) or min(
+            photos, key=lambda item: (item.order, item.id)
+        )
+        if not photo.image:
+            return None
+        request = self.context.get("request")
+        url = photo.image.url
+        return request.build_absolute_uri(url) if request else url
+
 
 class PropertySerializer(serializers.ModelSerializer):
     """Read serializer with nested relations."""
@@ -207,6 +354,7 @@ class PropertySerializer(serializers.ModelSerializer):
     photos = PropertyPhotoSerializer(many=True, read_only=True)
     seasonal_rates = PropertySeasonalRateSerializer(many=True, read_only=True)
     availability_periods = PropertyAvailabilitySerializer(many=True, read_only=True)
+    rating_breakdown = serializers.DictField(source="dimension_ratings", read_only=True)
 
     class Meta:
         model = Property
@@ -254,6 +402,9 @@ class PropertySerializer(serializers.ModelSerializer):
             "photos",
             "seasonal_rates",
             "availability_periods",
+            "rating_avg",
+            "reviews_count",
+            "rating_breakdown",
             "is_featured",
             "published_at",
             "created_at",
@@ -263,6 +414,8 @@ class PropertySerializer(serializers.ModelSerializer):
             "owner_id",
             "agency_id",
             "status",
+            "rating_avg",
+            "reviews_count",
             "published_at",
             "created_at",
             "updated_at",
@@ -0,0 +1,28 @@
+"""Celery tasks for the properties domain."""
+
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task  # type: ignore
+
+from .occupancy import rebuild_occupancy_index as _rebuild_occupancy_index
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="properties.rebuild_occupancy_index")
+def rebuild_occupancy_index() -> dict[str, int]:
+    """
+    Ежедневный пересчёт карт занятости объектов.
+
+    Сдвигает начало каждой карты на текущий день, чтобы горизонт
+    бронирования не сокращался со временем. Между запусками карты
+    обновляются инкрементально при изменении календаря объекта.
+
+    Returns:
+        dict: {"rebuilt": количество пересчитанных объектов}
+    """
+    rebuilt = _rebuild_occupancy_index()
+    logger.info(f"Rebuilt occupancy index for {rebuilt} properties")
+    return {"rebuilt": rebuilt}
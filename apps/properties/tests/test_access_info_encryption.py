@@ -0,0 +1,76 @@
+"""Tests for encrypted access codes."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from apps.properties.models import Property, PropertyAccessInfo
+from apps.users.models import User
+from shared.infrastructure import encryption
+from shared.infrastructure.fields import EncryptedValue
+
+
+class AccessInfoEncryptionTests(TestCase):
+    def setUp(self) -> None:
+        owner = User.objects.create_user(
+            email="realtor-codes@example.com",
+            phone="+77000000060",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.property = Property.objects.create(
+            owner=owner,
+            title="Объект с кодами",
+            description="Описание",
+            address_line="ул. Абая, 5",
+            base_price=Decimal("20000.00"),
+        )
+        PropertyAccessInfo.objects.create(property=self.property, door_code="1234", safe_code="0000")
+
+    def _raw_door_code(self) -> str:
+        return PropertyAccessInfo.objects.values_list("door_code", flat=True).get().ciphertext
+
+    def test_values_are_decrypted_only_on_access(self) -> None:
+        with mock.patch.object(encryption, "decrypt_string", wraps=encryption.decrypt_string) as decrypt:
+            with mock.patch("shared.infrastructure.fields.decrypt_string", decrypt):
+                info = PropertyAccessInfo.objects.get(property=self.property)
+                self.assertEqual(decrypt.call_count, 0)
+
+                self.assertEqual(info.door_code, "1234")
+                self.assertEqual(info.door_code, "1234")
+                self.assertEqual(decrypt.call_count, 1)
+
+    def test_saving_untouched_codes_keeps_ciphertext(self) -> None:
+        raw = self._raw_door_code()
+        info = PropertyAccessInfo.objects.get(property=self.property)
+        info.instructions = "Ключ у консьержа"
+        info.save()
+
+        self.assertEqual(self._raw_door_code(), raw)
+        info.refresh_from_db()
+        self.assertEqual(info.door_code, "1234")
+
+    def test_old_keys_decrypt_and_rotate(self) -> None:
+        raw = self._raw_door_code()
+
+        with override_settings(ENCRYPTION_KEY="new-key", ENCRYPTION_OLD_KEYS=["dev-encryption-key-replace-in-production"]):
+            self.assertEqual(encryption.decrypt_string(raw), "1234")
+            rotated = encryption.rotate_string(raw)
+
+        with override_settings(ENCRYPTION_KEY="new-key", ENCRYPTION_OLD_KEYS=[]):
+            self.assertEqual(encryption.decrypt_string(rotated), "1234")
+        self.assertIsInstance(
+            PropertyAccessInfo.objects.values_list("safe_code", flat=True).get(),
+            EncryptedValue,
+        )
+
+    def test_keys_are_derived_once_per_key_set(self) -> None:
+        encryption.get_cipher()
+        with mock.patch.object(encryption, "_derive_key", wraps=encryption._derive_key) as derive:
+            encryption.encrypt_string("1234")
+            encryption.decrypt_string(self._raw_door_code())
+
+        self.assertEqual(derive.call_count, 0)
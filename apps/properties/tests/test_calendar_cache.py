@@ -0,0 +1,84 @@
+"""Tests for the public calendar read-through cache."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.properties.calendar_cache import cached_calendar, get_cached_detail, set_cached_detail
+from apps.properties.models import Property, PropertyAvailability, PropertySeasonalRate
+from apps.users.models import User
+
+
+class CalendarCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.owner = User.objects.create_user(
+            email="realtor-cache@example.com",
+            phone="+77000000031",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.property = Property.objects.create(
+            owner=self.owner,
+            title="Кэшируемый объект",
+            description="Описание",
+            address_line="ул. Абая, 2",
+            base_price=Decimal("20000.00"),
+            status=Property.Status.ACTIVE,
+        )
+        self.start = date.today() + timedelta(days=1)
+        self.end = self.start + timedelta(days=40)
+
+    def test_repeated_reads_hit_cache(self) -> None:
+        cached_calendar(self.property, self.start, self.end)
+
+        with self.assertNumQueries(0):
+            window = cached_calendar(self.property, self.start, self.end)
+
+        self.assertEqual(window.days, 41)
+        self.assertEqual(window.start, self.start)
+
+    def test_availability_save_invalidates_calendar(self) -> None:
+        cached_calendar(self.property, self.start, self.end)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PropertyAvailability.objects.create(
+                property=self.property,
+                start_date=self.start,
+                end_date=self.start + timedelta(days=1),
+                status=PropertyAvailability.AvailabilityStatus.BOOKED,
+            )
+
+        window = cached_calendar(self.property, self.start, self.end)
+        self.assertEqual(window.statuses[:3], ["booked", "booked", "available"])
+
+    def test_seasonal_rate_delete_invalidates_calendar(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            rate = PropertySeasonalRate.objects.create(
+                property=self.property,
+                start_date=self.start,
+                end_date=self.start,
+                price_per_night=Decimal("35000.00"),
+            )
+        self.assertEqual(cached_calendar(self.property, self.start, self.end).prices[0], Decimal("35000.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rate.delete()
+
+        self.assertEqual(cached_calendar(self.property, self.start, self.end).prices[0], Decimal("20000.00"))
+
+    def test_property_save_invalidates_detail(self) -> None:
+        version, data = get_cached_detail(self.property.id)
+        self.assertIsNone(data)
+        set_cached_detail(self.property.id, version, {"title": self.property.title})
+        self.assertEqual(get_cached_detail(self.property.id)[1], {"title": "Кэшируемый объект"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = "Новое название"
+            self.property.save()
+
+        self.assertIsNone(get_cached_detail(self.property.id)[1])
@@ -0,0 +1,97 @@
+"""Tests for the public calendar resolution engine."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.properties.calendar_engine import resolve_calendar, resolve_calendars
+from apps.properties.models import Property, PropertyAvailability, PropertySeasonalRate
+from apps.users.models import User
+
+
+class CalendarEngineTests(TestCase):
+    def setUp(self) -> None:
+        self.owner = User.objects.create_user(
+            email="realtor-engine@example.com",
+            phone="+77000000030",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.property = self._create_property("Объект с тарифами")
+        self.start = date.today() + timedelta(days=1)
+
+    def _create_property(self, title: str) -> Property:
+        return Property.objects.create(
+            owner=self.owner,
+            title=title,
+            description="Описание",
+            address_line="ул. Абая, 1",
+            base_price=Decimal("20000.00"),
+            min_nights=2,
+            status=Property.Status.ACTIVE,
+        )
+
+    def _rate(self, offset: int, length: int, price: str, priority: int = 0, **kwargs) -> None:
+        PropertySeasonalRate.objects.create(
+            property=self.property,
+            start_date=self.start + timedelta(days=offset),
+            end_date=self.start + timedelta(days=offset + length - 1),
+            price_per_night=Decimal(price),
+            priority=priority,
+            **kwargs,
+        )
+
+    def test_higher_priority_rate_wins_on_overlap(self) -> None:
+        self._rate(0, 5, "30000.00", priority=0)
+        self._rate(2, 2, "50000.00", priority=5, min_nights=3)
+
+        window = resolve_calendar(self.property, self.start, self.start + timedelta(days=6))
+
+        self.assertEqual(window.days, 7)
+        self.assertEqual(
+            window.prices,
+            [
+                Decimal("30000.00"),
+                Decimal("30000.00"),
+                Decimal("50000.00"),
+                Decimal("50000.00"),
+                Decimal("30000.00"),
+                Decimal("20000.00"),
+                Decimal("20000.00"),
+            ],
+        )
+        self.assertEqual(window.min_nights[2], 3)
+        self.assertEqual(window.min_nights[0], 2)
+        self.assertEqual(window.pricing_sources[-1], "base")
+
+    def test_inclusive_availability_bounds(self) -> None:
+        PropertyAvailability.objects.create(
+            property=self.property,
+            start_date=self.start + timedelta(days=1),
+            end_date=self.start + timedelta(days=2),
+            status=PropertyAvailability.AvailabilityStatus.BLOCKED,
+        )
+
+        window = resolve_calendar(self.property, self.start, self.start + timedelta(days=3))
+
+        self.assertEqual(
+            window.statuses,
+            ["available", "blocked", "blocked", "available"],
+        )
+
+    def test_batch_resolves_many_properties_in_constant_queries(self) -> None:
+        other = self._create_property("Второй объект")
+        self._rate(0, 1, "40000.00")
+
+        with self.assertNumQueries(2):
+            windows = resolve_calendars(
+                [self.property, other],
+                self.start,
+                self.start + timedelta(days=1),
+            )
+
+        self.assertEqual(windows[self.property.id].prices[0], Decimal("40000.00"))
+        self.assertEqual(windows[other.id].prices, [Decimal("20000.00")] * 2)
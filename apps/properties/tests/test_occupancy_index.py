@@ -0,0 +1,95 @@
+"""Tests for the per-day occupancy index used by property search."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.properties.models import Property, PropertyAvailability, PropertyOccupancyIndex
+from apps.properties.occupancy import exclude_occupied, range_mask, refresh_occupancy_index
+from apps.users.models import User
+
+
+class OccupancyIndexTests(TestCase):
+    def setUp(self) -> None:
+        self.owner = User.objects.create_user(
+            email="realtor-occupancy@example.com",
+            phone="+77000000020",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.first = self._create_property("Первый объект")
+        self.second = self._create_property("Второй объект")
+        self.today = date.today()
+
+    def _create_property(self, title: str) -> Property:
+        return Property.objects.create(
+            owner=self.owner,
+            title=title,
+            description="Описание",
+            address_line="ул. Кунаева, 10",
+            base_price=Decimal("25000.00"),
+            status=Property.Status.ACTIVE,
+        )
+
+    def _block(self, prop: Property, start: date, end: date) -> PropertyAvailability:
+        return PropertyAvailability.objects.create(
+            property=prop,
+            start_date=start,
+            end_date=end,
+            status=PropertyAvailability.AvailabilityStatus.BLOCKED,
+        )
+
+    def _search(self, start: date, end: date) -> set[int]:
+        qs = exclude_occupied(Property.objects.all(), start, end)
+        return set(qs.values_list("id", flat=True))
+
+    def test_range_mask_is_half_open(self) -> None:
+        anchor = self.today
+        self.assertEqual(range_mask(anchor, anchor, anchor + timedelta(days=2)), 0b11)
+        self.assertEqual(
+            range_mask(anchor, anchor + timedelta(days=2), anchor + timedelta(days=3)),
+            0b100,
+        )
+        self.assertEqual(range_mask(anchor, anchor - timedelta(days=5), anchor), 0)
+
+    def test_search_uses_index_and_respects_adjacent_dates(self) -> None:
+        start = self.today + timedelta(days=3)
+        self._block(self.first, start, start + timedelta(days=2))
+        refresh_occupancy_index(self.first.id)
+        refresh_occupancy_index(self.second.id)
+
+        self.assertEqual(self._search(start, start + timedelta(days=1)), {self.second.id})
+        # Выезд в день начала блокировки допустим
+        self.assertEqual(
+            self._search(start - timedelta(days=2), start),
+            {self.first.id, self.second.id},
+        )
+
+        # Индекс не должен обращаться к таблицам календаря
+        PropertyAvailability.objects.all().delete()
+        self.assertEqual(self._search(start, start + timedelta(days=1)), {self.second.id})
+
+    def test_overlapping_blocks_keep_days_busy_after_release(self) -> None:
+        start = self.today + timedelta(days=1)
+        first_block = self._block(self.first, start, start + timedelta(days=4))
+        self._block(self.first, start + timedelta(days=2), start + timedelta(days=6))
+        refresh_occupancy_index(self.first.id)
+
+        first_block.delete()
+        refresh_occupancy_index(self.first.id)
+
+        self.assertIn(self.first.id, self._search(start, start + timedelta(days=2)))
+        self.assertNotIn(
+            self.first.id,
+            self._search(start + timedelta(days=2), start + timedelta(days=3)),
+        )
+
+    def test_properties_without_index_fall_back_to_calendar_tables(self) -> None:
+        start = self.today + timedelta(days=5)
+        self._block(self.second, start, start + timedelta(days=1))
+        self.assertFalse(PropertyOccupancyIndex.objects.exists())
+
+        self.assertEqual(self._search(start, start + timedelta(days=1)), {self.first.id})
@@ -0,0 +1,100 @@
+"""Tests for the compact property list representation."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.properties.models import Property, PropertySeasonalRate
+from apps.users.models import User
+from shared.infrastructure.pagination import InvalidCursor, keyset_page
+
+
+class PropertyListTests(TestCase):
+    def setUp(self) -> None:
+        owner = User.objects.create_user(
+            email="realtor-list@example.com",
+            phone="+77000000074",
+            password="RealtorPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.properties = [
+            Property.objects.create(
+                owner=owner,
+                title=f"Квартира {index}",
+                description="Описание",
+                address_line=f"ул. Абая, {index}",
+                status=Property.Status.ACTIVE,
+                base_price=Decimal("20000.00"),
+            )
+            for index in range(3)
+        ]
+        today = timezone.localdate()
+        for prop in self.properties:
+            for offset in (-90, -60, 10):
+                PropertySeasonalRate.objects.create(
+                    property=prop,
+                    start_date=today + timedelta(days=offset),
+                    end_date=today + timedelta(days=offset + 5),
+                    price_per_night=Decimal("25000.00"),
+                )
+        self.client = APIClient()
+        self.url = reverse("property-list")
+
+    def test_default_list_is_compact(self) -> None:
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        item = response.data["results"][0]
+        self.assertIn("primary_photo", item)
+        self.assertNotIn("seasonal_rates", item)
+        self.assertNotIn("availability_periods", item)
+        self.assertNotIn("description", item)
+
+    def test_sparse_fields_skip_related_queries(self) -> None:
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"fields": "id,title,base_price"})
+
+        self.assertEqual(set(response.data["results"][0]), {"id", "title", "base_price"})
+
+    def test_expand_loads_only_current_calendar_rows(self) -> None:
+        response = self.client.get(self.url, {"fields": "id", "expand": "seasonal_rates"})
+
+        self.assertEqual(response.status_code, 200)
+        for item in response.data["results"]:
+            self.assertEqual(set(item), {"id", "seasonal_rates"})
+            self.assertEqual(len(item["seasonal_rates"]), 1)
+
+    def test_unknown_fields_are_rejected(self) -> None:
+        self.assertEqual(self.client.get(self.url, {"fields": "id,owner"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"expand": "bookings"}).status_code, 400)
+
+    def test_cursor_pages_follow_created_at_and_id(self) -> None:
+        first = self.client.get(self.url, {"fields": "id", "page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        ids = [item["id"] for item in first.data["results"] + second.data["results"]]
+        self.assertEqual(ids, [prop.id for prop in reversed(self.properties)])
+        self.assertIsNone(second.data["next"])
+
+    def test_keyset_page_walks_all_rows_with_opaque_cursor(self) -> None:
+        ordering = ("-is_featured", "-created_at", "-id")
+        Property.objects.filter(id=self.properties[0].id).update(is_featured=True)
+        queryset = Property.objects.filter(status=Property.Status.ACTIVE)
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(queryset, ordering=ordering, cursor=cursor, size=2)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [self.properties[0].id, self.properties[2].id, self.properties[1].id])
+        with self.assertRaises(InvalidCursor):
+            keyset_page(queryset, ordering=ordering, cursor="tampered", size=2)
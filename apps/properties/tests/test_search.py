@@ -0,0 +1,135 @@
+"""Tests for the shared property search service (API and Telegram bot)."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.properties.models import Location, Property, PropertyAvailability
+from apps.properties.search import PropertySearch, available
+from apps.users.models import User
+
+
+class PropertySearchTests(TestCase):
+    def setUp(self) -> None:
+        self.owner = User.objects.create_user(
+            email="realtor-search@example.com",
+            phone="+77000000092",
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.guest = User.objects.create_user(
+            email="guest-search@example.com",
+            phone="+77000000093",
+            password="StrongPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.city = Location.objects.create(name="Алматы", slug="almaty-search")
+        self.district = Location.objects.create(name="Медеуский", slug="medeu-search", parent=self.city)
+        self.start = date.today() + timedelta(days=10)
+        self.end = self.start + timedelta(days=3)
+
+        self.free = self._create_property("Свободный", rooms=2)
+        self.booked = self._create_property("С бронью", rooms=2)
+        self.blocked = self._create_property("Заблокирован", rooms=2)
+        self.adjacent = self._create_property("Бронь до заезда", rooms=5)
+
+        Booking.objects.create(
+            property=self.booked,
+            guest=self.guest,
+            check_in=self.start + timedelta(days=1),
+            check_out=self.end + timedelta(days=2),
+            guests_count=1,
+            status=Booking.Status.CONFIRMED,
+        )
+        # Отменённая бронь не занимает даты
+        Booking.objects.create(
+            property=self.free,
+            guest=self.guest,
+            check_in=self.start,
+            check_out=self.end,
+            guests_count=1,
+            status=Booking.Status.CANCELLED_BY_GUEST,
+        )
+        PropertyAvailability.objects.create(
+            property=self.blocked,
+            start_date=self.start - timedelta(days=1),
+            end_date=self.start + timedelta(days=1),
+            status=PropertyAvailability.AvailabilityStatus.BLOCKED,
+        )
+        # Выезд в день заезда допустим
+        Booking.objects.create(
+            property=self.adjacent,
+            guest=self.guest,
+            check_in=self.start - timedelta(days=2),
+            check_out=self.start,
+            guests_count=1,
+            status=Booking.Status.CONFIRMED,
+        )
+
+    def _create_property(self, title: str, rooms: int) -> Property:
+        return Property.objects.create(
+            owner=self.owner,
+            title=title,
+            description="Описание",
+            address_line="ул. Абая, 1",
+            city_location=self.city,
+            district_location=self.district,
+            base_price=Decimal("20000.00"),
+            rooms=rooms,
+            status=Property.Status.ACTIVE,
+        )
+
+    def test_availability_is_checked_in_a_single_query(self) -> None:
+        with self.assertNumQueries(1):
+            ids = set(available(Property.objects.all(), self.start, self.end).values_list("id", flat=True))
+        self.assertEqual(ids, {self.free.id, self.adjacent.id})
+
+    def test_pages_carry_card_fields(self) -> None:
+        search = PropertySearch(checkin=self.start, checkout=self.end, city="Алматы")
+        with self.assertNumQueries(1):
+            first, cursor = search.list(size=1)
+        second, last_cursor = search.list(cursor, size=1)
+
+        self.assertEqual(search.count(), 2)
+        self.assertIsNone(last_cursor)
+        self.assertEqual([card["id"] for card in first + second], [self.adjacent.id, self.free.id])
+        self.assertEqual(
+            first[0],
+            {
+                "id": self.adjacent.id,
+                "title": "Бронь до заезда",
+                "location": "Алматы, Медеуский",
+                "base_price": Decimal("20000.00"),
+                "currency": self.adjacent.currency,
+                "rooms": 5,
+                "sleeping_places": self.adjacent.sleeping_places,
+            },
+        )
+        self.assertEqual(PropertySearch(checkin=self.start, checkout=self.end, rooms_min=5).count(), 1)
+
+    async def test_async_entry_points(self) -> None:
+        search = PropertySearch(checkin=self.start, checkout=self.end, rooms=2)
+
+        self.assertEqual(await search.acount(), 1)
+        cards, cursor = await search.alist()
+        self.assertEqual([card["id"] for card in cards], [self.free.id])
+        self.assertIsNone(cursor)
+        self.assertEqual((await search.aget(self.free.id))["title"], "Свободный")
+        self.assertIsNone(await search.aget(self.booked.id))
+
+    def test_search_endpoint_excludes_occupied_properties(self) -> None:
+        response = APIClient().get(
+            reverse("property-search"),
+            {"start": self.start.isoformat(), "end": self.end.isoformat(), "fields": "id,title"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual({item["id"] for item in results}, {self.free.id, self.adjacent.id})
+        self.assertEqual(set(results[0]), {"id", "title"})
@@ -9,6 +9,7 @@ from .views import (
     AmenityViewSet,
     PropertyAvailabilityViewSet,
     PropertyCalendarSettingsView,
+    PropertyPublicCalendarBatchView,
     PropertyPublicCalendarView,
     PropertySeasonalRateViewSet,
     PropertyTypeViewSet,
@@ -34,9 +35,9 @@ seasonal_detail = PropertySeasonalRateViewSet.as_view(
 seasonal_bulk_delete = PropertySeasonalRateViewSet.as_view({"post": "bulk_delete"})
 
 urlpatterns = [
-    path("", include(router.urls)),
-    # Search endpoint
+    # Search endpoint; before the router, whose detail route would take "search" for a pk
     path("search/", SearchPropertiesView.as_view(), name="property-search"),
+    path("", include(router.urls)),
     # Calendar availability management
     path(
         "<int:property_id>/calendar/availability/",
@@ -81,4 +82,9 @@ urlpatterns = [
         PropertyPublicCalendarView.as_view(),
         name="property-calendar-public",
     ),
+    path(
+        "calendar/public/",
+        PropertyPublicCalendarBatchView.as_view(),
+        name="property-calendar-public-batch",
+    ),
 ]
@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date
 
-from django.db import models  # type: ignore
+from django.db import IntegrityError, models, transaction  # type: ignore
 from django.shortcuts import get_object_or_404  # type: ignore
 from rest_framework import permissions, serializers, status, viewsets, generics  # type: ignore
 from rest_framework.filters import OrderingFilter  # type: ignore
@@ -30,6 +30,8 @@ from .serializers import (
     PropertyAvailabilitySerializer,
     PropertyAvailabilityWriteSerializer,
     PropertyCalendarSettingsSerializer,
+    PropertyCalendarWindowSerializer,
+    PropertyListSerializer,
     PropertyPublicCalendarSerializer,
     PropertySeasonalRateSerializer,
     PropertySeasonalRateWriteSerializer,
@@ -37,7 +39,17 @@ from .serializers import (
     PropertyTypeSerializer,
     PropertyWriteSerializer,
 )
+from .calendar_cache import (
+    cached_calendar,
+    cached_calendars,
+    get_cached_detail,
+    invalidate_property_cache_on_commit,
+    set_cached_detail,
+)
+from shared.infrastructure.pagination import CreatedAtCursorPagination
+
 from .filters import PropertyFilterSet
+from .occupancy import exclude_occupied, refresh_occupancy_index
 
 
 class IsPropertyOwnerOrAdmin(permissions.BasePermission):
@@ -76,12 +88,23 @@ class IsPropertyOwnerOrAdmin(permissions.BasePermission):
         return False
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyListFieldsMixin:
+    """Разреженный набор полей списков объектов (``?fields=``, ``?expand=``)."""
+
+    def _list_fields(self) -> list[str]:
+        """Поля списка по параметрам ``?fields=`` и ``?expand=``."""
+        if not hasattr(self, "_requested_list_fields"):
+            params = self.request.query_params
+            self._requested_list_fields = PropertyListSerializer.requested_fields(
+                params.get("fields"), params.get("expand")
+            )
+        return self._requested_list_fields
+
+
+class PropertyViewSet(PropertyListFieldsMixin, viewsets.ModelViewSet):
     """Viewset для управления объектами недвижимости."""
 
-    queryset = Property.objects.select_related("owner", "agency", "property_type").prefetch_related(
-        "amenities", "photos", "seasonal_rates", "availability_periods"
-    )
+    queryset = Property.objects.all()
     permission_classes = [IsPropertyOwnerOrAdmin]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = PropertyFilterSet
@@ -90,7 +113,12 @@ class PropertyViewSet(viewsets.ModelViewSet):
         "created_at",
         "is_featured",
         "rooms",
+        "rating_avg",
+        "reviews_count",
     ]
+    # Курсорная пагинация: по умолчанию новые объекты первыми
+    ordering = ["-created_at", "-id"]
+    pagination_class = CreatedAtCursorPagination
 
     def get_permissions(self):  # type: ignore
         if self.action in {"list", "retrieve"}:
@@ -98,7 +126,17 @@ class PropertyViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def get_queryset(self):  # type: ignore
-        qs = super().get_queryset()
+        qs = self._scope_queryset(super().get_queryset())
+        if self.action == "list":
+            # Связи подгружаются только для запрошенных полей списка
+            return PropertyListSerializer.optimize_queryset(qs, self._list_fields())
+        if self.action == "retrieve":
+            return qs.select_related("owner", "agency", "property_type").prefetch_related(
+                "amenities", "photos", "seasonal_rates", "availability_periods"
+            )
+        return qs
+
+    def _scope_queryset(self, qs):  # type: ignore
         user = self.request.user
         if not user.is_authenticated:
             return qs.filter(status=Property.Status.ACTIVE)
@@ -115,11 +153,39 @@ class PropertyViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):  # type: ignore
         if self.action in {"create", "update", "partial_update"}:
             return PropertyWriteSerializer
+        if self.action == "list":
+            return PropertyListSerializer
         return PropertySerializer
 
+    def get_serializer(self, *args, **kwargs):  # type: ignore
+        if self.action == "list":
+            kwargs.setdefault("fields", self._list_fields())
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):  # type: ignore
         serializer.save()
 
+    def perform_update(self, serializer):  # type: ignore
+        instance = serializer.save()
+        # Удобства сохраняются после Property.save(), сбрасываем кэш ещё раз
+        invalidate_property_cache_on_commit(instance.id)
+
+    def retrieve(self, request, *args, **kwargs):  # type: ignore
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            visible = self.get_queryset().filter(pk=lookup).exists()
+        except (TypeError, ValueError):
+            visible = False
+        if not visible:
+            return super().retrieve(request, *args, **kwargs)
+
+        version, data = get_cached_detail(int(lookup))
+        if data is not None:
+            return Response(data)
+        response = super().retrieve(request, *args, **kwargs)
+        set_cached_detail(int(lookup), version, dict(response.data))
+        return response
+
     @action(detail=True, methods=["get"], url_path="access-info")
     def get_access_info(self, request, pk=None):  # type: ignore
         """
@@ -222,10 +288,10 @@ class PropertyViewSet(viewsets.ModelViewSet):
         return ip
 
 
-class SearchPropertiesView(generics.ListAPIView):
+class SearchPropertiesView(PropertyListFieldsMixin, generics.ListAPIView):
     """Search endpoint with filters, ordering and optional availability window."""
 
-    serializer_class = PropertySerializer
+    serializer_class = PropertyListSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = PropertyFilterSet
     ordering_fields = [
@@ -233,44 +299,36 @@ class SearchPropertiesView(generics.ListAPIView):
         "created_at",
         "is_featured",
         "rooms",
+        "rating_avg",
+        "reviews_count",
     ]
+    # Курсорная пагинация: по умолчанию новые объекты первыми
+    ordering = ["-created_at", "-id"]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_serializer(self, *args, **kwargs):  # type: ignore
+        kwargs.setdefault("fields", self._list_fields())
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):  # type: ignore
-        qs = Property.objects.select_related("owner", "agency", "property_type").prefetch_related(
-            "amenities", "photos",
-        ).filter(status=Property.Status.ACTIVE)
+        qs = PropertyListSerializer.optimize_queryset(
+            Property.objects.filter(status=Property.Status.ACTIVE), self._list_fields()
+        )
 
         # Optional availability filter by start/end
         start = self.request.query_params.get("start")
         end = self.request.query_params.get("end")
 
         if start and end:
-            # Exclude properties with blocking availability periods
-            blocking_statuses = [
-                PropertyAvailability.AvailabilityStatus.BOOKED,
-                PropertyAvailability.AvailabilityStatus.BLOCKED,
-                PropertyAvailability.AvailabilityStatus.MAINTENANCE,
-            ]
-            blocked_ids = PropertyAvailability.objects.filter(
-                start_date__lt=end,
-                end_date__gt=start,
-                status__in=blocking_statuses,
-            ).values_list("property_id", flat=True)
-
-            # Exclude properties with overlapping active bookings
-            from apps.bookings.models import Booking
-
-            overlapping_bookings = Booking.objects.filter(
-                check_in__lt=end,
-                check_out__gt=start,
-                status__in=[
-                    Booking.Status.PENDING,
-                    Booking.Status.CONFIRMED,
-                    Booking.Status.IN_PROGRESS,
-                ],
-            ).values_list("property_id", flat=True)
-
-            qs = qs.exclude(id__in=blocked_ids).exclude(id__in=overlapping_bookings)
+            try:
+                start_date = date.fromisoformat(start)
+                end_date = date.fromisoformat(end)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {"detail": "Параметры start и end должны быть в формате YYYY-MM-DD."}
+                )
+            # Exclude properties with bookings or blocks, using the occupancy index
+            qs = exclude_occupied(qs, start_date, end_date)
 
         return qs
 
@@ -320,6 +378,7 @@ class PropertyAvailabilityViewSet(
 
     serializer_class = PropertyAvailabilitySerializer
     queryset = PropertyAvailability.objects.select_related("property", "created_by").all()
+    OVERLAP_MESSAGE = "Невозможно создать блокировку: выбранные даты пересекаются с существующими событиями."
 
     def get_serializer_class(self):  # type: ignore
         if self.action in {"create", "update", "partial_update"}:
@@ -347,27 +406,31 @@ class PropertyAvailabilityViewSet(
     def _validate_overlap(self, start_date: date, end_date: date, exclude_id: int | None = None) -> None:
         property_obj = self.get_property()
         overlap_filter = models.Q(start_date__lt=end_date) & models.Q(end_date__gt=start_date)
-        blocking_statuses = [
-            PropertyAvailability.AvailabilityStatus.BOOKED,
-            PropertyAvailability.AvailabilityStatus.BLOCKED,
-            PropertyAvailability.AvailabilityStatus.MAINTENANCE,
-        ]
         qs = PropertyAvailability.objects.filter(
             property=property_obj,
-            status__in=blocking_statuses,
+            status__in=PropertyAvailability.BLOCKING_STATUSES,
         ).filter(overlap_filter)
         if exclude_id is not None:
             qs = qs.exclude(id=exclude_id)
         if qs.exists():
-            raise serializers.ValidationError(
-                "Невозможно создать блокировку: выбранные даты пересекаются с существующими событиями."
-            )
+            raise serializers.ValidationError(self.OVERLAP_MESSAGE)
+
+    def _save(self, serializer, **kwargs) -> None:  # type: ignore
+        # Параллельную пересекающуюся блокировку отклоняет исключающее
+        # ограничение PostgreSQL — ответ тот же, что и при проверке выше
+        try:
+            with transaction.atomic():
+                serializer.save(**kwargs)
+                refresh_occupancy_index(self.get_property().id)
+        except IntegrityError:
+            raise serializers.ValidationError(self.OVERLAP_MESSAGE)
 
     def perform_create(self, serializer):  # type: ignore
         start_date = serializer.validated_data["start_date"]
         end_date = serializer.validated_data["end_date"]
         self._validate_overlap(start_date, end_date)
-        serializer.save(
+        self._save(
+            serializer,
             property=self.get_property(),
             created_by=self.request.user,
             source=serializer.validated_data.get("availability_type", PropertyAvailability.AvailabilityType.MANUAL_BLOCK),
@@ -378,7 +441,11 @@ class PropertyAvailabilityViewSet(
         start_date = serializer.validated_data.get("start_date", instance.start_date)
         end_date = serializer.validated_data.get("end_date", instance.end_date)
         self._validate_overlap(start_date, end_date, exclude_id=instance.id)
-        serializer.save()
+        self._save(serializer)
+
+    def perform_destroy(self, instance):  # type: ignore
+        super().perform_destroy(instance)
+        refresh_occupancy_index(self.get_property().id)
 
     def destroy(self, request, *args, **kwargs):  # type: ignore
         instance: PropertyAvailability = self.get_object()
@@ -405,6 +472,9 @@ class PropertyAvailabilityViewSet(
                 PropertyAvailability.AvailabilityType.MAINTENANCE,
             ],
         ).delete()
+        if deleted:
+            refresh_occupancy_index(self.get_property().id)
+            invalidate_property_cache_on_commit(self.get_property().id)
         return Response({"deleted": deleted}, status=status.HTTP_200_OK)
  
     def create(self, request, *args, **kwargs):  # type: ignore
@@ -473,6 +543,9 @@ class PropertySeasonalRateViewSet(
             property=self.get_property(),
             id__in=ids,
         ).delete()
+        if deleted:
+            refresh_occupancy_index(self.get_property().id)
+            invalidate_property_cache_on_commit(self.get_property().id)
         return Response({"deleted": deleted}, status=status.HTTP_200_OK)
  
     def create(self, request, *args, **kwargs):  # type: ignore
@@ -524,68 +597,79 @@ class PropertyCalendarSettingsView(PropertyCalendarMixin, APIView):
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        if "booking_window" in serializer.validated_data:
+            refresh_occupancy_index(property_obj.id)
         return Response(serializer.data)
 
 
+def _parse_calendar_window(request) -> tuple[date, date] | Response:  # type: ignore
+    start = request.query_params.get("start")
+    end = request.query_params.get("end")
+    if not start or not end:
+        return Response(
+            {"detail": "Параметры start и end обязательны."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        return date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError:
+        return Response(
+            {"detail": "Параметры start и end должны быть в формате YYYY-MM-DD."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+
 class PropertyPublicCalendarView(APIView):
     """Возвращает агрегированную информацию календаря для публичного отображения."""
 
     def get(self, request, property_id):  # type: ignore
         property_obj = get_object_or_404(Property, pk=property_id, status=Property.Status.ACTIVE)
-        start = request.query_params.get("start")
-        end = request.query_params.get("end")
-        if not start or not end:
+        window = _parse_calendar_window(request)
+        if isinstance(window, Response):
+            return window
+        start_date, end_date = window
+
+        calendar = cached_calendar(property_obj, start_date, end_date)
+        serializer = PropertyPublicCalendarSerializer(calendar.as_rows(), many=True)
+        return Response({"property_id": property_obj.id, "dates": serializer.data})
+
+
+class PropertyPublicCalendarBatchView(APIView):
+    """Мини-календари нескольких объектов одним запросом (для страниц списков)."""
+
+    max_properties = 50
+    max_days = 93
+
+    def get(self, request):  # type: ignore
+        window = _parse_calendar_window(request)
+        if isinstance(window, Response):
+            return window
+        start_date, end_date = window
+        if end_date < start_date or (end_date - start_date).days + 1 > self.max_days:
             return Response(
-                {"detail": "Параметры start и end обязательны."},
+                {"detail": f"Окно календаря должно составлять от 1 до {self.max_days} дней."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        availability_qs = PropertyAvailability.objects.filter(
-            property=property_obj,
-            start_date__lte=end,
-            end_date__gte=start,
-        )
-        seasonal_qs = PropertySeasonalRate.objects.filter(
-            property=property_obj,
-            start_date__lte=end,
-            end_date__gte=start,
-        )
-
-        current = date.fromisoformat(start)
-        end_date = date.fromisoformat(end)
-        result = []
-
-        while current <= end_date:
-            status_value = PropertyAvailability.AvailabilityStatus.AVAILABLE
-            min_nights = property_obj.min_nights
-            final_price = property_obj.base_price
-            pricing_source = "base"
-
-            for availability in availability_qs:
-                if availability.start_date <= current <= availability.end_date:
-                    status_value = availability.status
-                    break
-
-            for seasonal in seasonal_qs:
-                if seasonal.start_date <= current <= seasonal.end_date:
-                    final_price = seasonal.price_per_night
-                    pricing_source = "seasonal"
-                    if seasonal.min_nights:
-                        min_nights = max(min_nights, seasonal.min_nights)
-                    if seasonal.max_nights:
-                        min_nights = min(min_nights, seasonal.max_nights)
-                    break
-
-            result.append(
-                {
-                    "date": current,
-                    "status": status_value,
-                    "final_price": final_price,
-                    "pricing_source": pricing_source,
-                    "min_nights": min_nights,
-                }
+        try:
+            ids = [int(x) for x in request.query_params.get("ids", "").replace(" ", "").split(",") if x]
+        except ValueError:
+            return Response(
+                {"detail": "Параметр ids должен содержать список идентификаторов."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not ids or len(ids) > self.max_properties:
+            return Response(
+                {"detail": f"Укажите от 1 до {self.max_properties} объектов в параметре ids."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            current = current + timedelta(days=1)
 
-        serializer = PropertyPublicCalendarSerializer(result, many=True)
-        return Response({"property_id": property_obj.id, "dates": serializer.data})
+        properties = Property.objects.filter(id__in=ids, status=Property.Status.ACTIVE).only(
+            "id", "base_price", "min_nights"
+        )
+        calendars = cached_calendars(properties, start_date, end_date)
+        serializer = PropertyCalendarWindowSerializer(
+            [calendars[pk] for pk in ids if pk in calendars],
+            many=True,
+        )
+        return Response({"start": start_date, "end": end_date, "calendars": serializer.data})
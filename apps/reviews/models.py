@@ -11,7 +11,7 @@ from __future__ import annotations
 import builtins
 
 from django.core.validators import MaxValueValidator, MinValueValidator  # type: ignore
-from django.db import models  # type: ignore
+from django.db import models, transaction  # type: ignore
 from django.utils.translation import gettext_lazy as _  # type: ignore
 
 
@@ -108,6 +108,47 @@ class Review(models.Model):
     def __str__(self) -> str:
         return f"Review by {self.user_id} for property {self.property_id} (Rating: {self.rating})"
 
+    def save(self, *args, **kwargs):  # type: ignore
+        from .services import RATING_FIELDS, apply_review_change, review_ratings  # local import to avoid circular
+
+        update_fields = kwargs.get("update_fields")
+        affects_summary = update_fields is None or bool(set(update_fields) & {"property", *RATING_FIELDS})
+        with transaction.atomic():
+            previous = None
+            if affects_summary and not self._state.adding:
+                previous = (
+                    Review.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values("property_id", *RATING_FIELDS)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            if affects_summary:
+                apply_review_change(previous, review_ratings(self))
+            self._mark_stats_stale()
+
+    def delete(self, *args, **kwargs):  # type: ignore
+        from .services import RATING_FIELDS, apply_review_change  # local import to avoid circular
+
+        with transaction.atomic():
+            self._mark_stats_stale()
+            # Вклад берётся из сохранённой версии, а не из изменённого в памяти экземпляра
+            stored = (
+                Review.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values("property_id", *RATING_FIELDS)
+                .first()
+            )
+            if stored is not None:
+                apply_review_change(stored, None)
+            return super().delete(*args, **kwargs)
+
+    def _mark_stats_stale(self) -> None:
+        """Помечает дневную аналитику объекта за день отзыва для пересчёта."""
+        from apps.analytics.rollups import mark_stale  # local import to avoid circular
+
+        mark_stale(self.property_id, self.created_at)
+
     @builtins.property
     def average_rating(self) -> float:
         """Средняя оценка по всем категориям."""
@@ -0,0 +1,136 @@
+"""Сводка отзывов объекта.
+
+``Property`` хранит количество отзывов, сумму и среднее основной оценки, а
+также сумму и количество оценок по каждой категории. Сводка обновляется
+инкрементально при создании, изменении и удалении отзыва: изменение
+сводится к разнице вкладов старой и новой версии отзыва, которая
+применяется к строке объекта под блокировкой. Карточки, избранное, поиск
+и аналитика читают эти колонки вместо агрегации по отзывам.
+
+``rebuild_rating_summaries`` пересчитывает сводку с нуля — для первичного
+заполнения и сверки (каскадные удаления отзывов обходят ``Review.delete``).
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable
+
+from django.db import transaction  # type: ignore
+from django.db.models import Count, Sum  # type: ignore
+
+RATING_DIMENSIONS = ("cleanliness", "location", "value", "communication", "accuracy", "check_in")
+RATING_FIELDS = ("rating", *(f"{dimension}_rating" for dimension in RATING_DIMENSIONS))
+SUMMARY_FIELDS = (
+    "reviews_count",
+    "rating_sum",
+    *(f"{dimension}_rating_{suffix}" for dimension in RATING_DIMENSIONS for suffix in ("sum", "count")),
+)
+
+
+def review_ratings(review) -> dict:  # type: ignore
+    """Оценки отзыва, влияющие на сводку объекта."""
+
+    return {"property_id": review.property_id, **{field: getattr(review, field) for field in RATING_FIELDS}}
+
+
+def _average(total: int, count: int) -> Decimal:
+    # Без отзывов — 0: колонка участвует в сортировке и курсорной пагинации
+    if not count:
+        return Decimal("0.00")
+    return (Decimal(total) / Decimal(count)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _contribution(ratings: dict, sign: int) -> Counter:
+    delta: Counter = Counter({"reviews_count": sign, "rating_sum": sign * ratings["rating"]})
+    for dimension in RATING_DIMENSIONS:
+        value = ratings.get(f"{dimension}_rating")
+        if value is not None:
+            delta[f"{dimension}_rating_sum"] += sign * value
+            delta[f"{dimension}_rating_count"] += sign
+    return delta
+
+
+def _apply_delta(property_id: int, delta: Counter) -> None:
+    from apps.properties.calendar_cache import invalidate_property_cache_on_commit
+    from apps.properties.models import Property
+
+    with transaction.atomic():
+        summary = (
+            Property.objects.select_for_update()
+            .filter(pk=property_id)
+            .values(*SUMMARY_FIELDS)
+            .first()
+        )
+        if summary is None:
+            # Объект удаляется вместе со своими отзывами
+            return
+        changes = {field: max(summary[field] + value, 0) for field, value in delta.items() if value}
+        summary.update(changes)
+        changes["rating_avg"] = _average(summary["rating_sum"], summary["reviews_count"])
+        Property.objects.filter(pk=property_id).update(**changes)
+    invalidate_property_cache_on_commit(property_id)
+
+
+def apply_review_change(old: dict | None, new: dict | None) -> None:
+    """Применяет к сводке изменение отзыва.
+
+    Args:
+        old: оценки отзыва до изменения (``None`` — отзыв создан).
+        new: оценки после изменения (``None`` — отзыв удалён).
+    """
+
+    deltas: dict[int, Counter] = defaultdict(Counter)
+    if old is not None:
+        deltas[old["property_id"]].update(_contribution(old, -1))
+    if new is not None:
+        deltas[new["property_id"]].update(_contribution(new, 1))
+    # Фиксированный порядок блокировок при переносе отзыва между объектами
+    for property_id in sorted(deltas):
+        if any(deltas[property_id].values()):
+            _apply_delta(property_id, deltas[property_id])
+
+
+def rebuild_rating_summaries(property_ids: Iterable[int] | None = None) -> int:
+    """Пересчитывает сводку отзывов из таблицы отзывов.
+
+    Args:
+        property_ids: ограничить пересчёт объектами; ``None`` — все объекты.
+
+    Returns:
+        int: количество объектов, сводка которых изменилась.
+    """
+
+    from apps.properties.calendar_cache import invalidate_property_cache_on_commit
+    from apps.properties.models import Property
+
+    from .models import Review
+
+    reviews = Review.objects.all()
+    properties = Property.objects.all()
+    if property_ids is not None:
+        property_ids = list(set(property_ids))
+        reviews = reviews.filter(property_id__in=property_ids)
+        properties = properties.filter(pk__in=property_ids)
+
+    aggregates = {"reviews_count": Count("id"), "rating_sum": Sum("rating")}
+    for dimension in RATING_DIMENSIONS:
+        aggregates[f"{dimension}_rating_sum"] = Sum(f"{dimension}_rating")
+        aggregates[f"{dimension}_rating_count"] = Count(f"{dimension}_rating")
+    actual = {
+        row.pop("property_id"): {field: value or 0 for field, value in row.items()}
+        for row in reviews.order_by().values("property_id").annotate(**aggregates)
+    }
+
+    empty = dict.fromkeys(SUMMARY_FIELDS, 0)
+    changed = 0
+    for row in properties.order_by().values("pk", "rating_avg", *SUMMARY_FIELDS).iterator():
+        expected = actual.get(row["pk"], empty)
+        expected_avg = _average(expected["rating_sum"], expected["reviews_count"])
+        if all(row[field] == expected[field] for field in SUMMARY_FIELDS) and row["rating_avg"] == expected_avg:
+            continue
+        Property.objects.filter(pk=row["pk"]).update(rating_avg=expected_avg, **expected)
+        invalidate_property_cache_on_commit(row["pk"])
+        changed += 1
+    return changed
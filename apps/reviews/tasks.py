@@ -0,0 +1,30 @@
+"""Celery tasks for review summaries."""
+
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task  # type: ignore
+
+from .services import rebuild_rating_summaries
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="reviews.rebuild_rating_summaries")
+def rebuild_property_rating_summaries(property_ids: list[int] | None = None) -> dict[str, int]:
+    """
+    Сверка сводки отзывов объектов с таблицей отзывов.
+
+    Сводка поддерживается инкрементально; сверка исправляет расхождения
+    после каскадных удалений и массовых правок в обход модели. Запускается
+    ежедневно ночью через Celery Beat, с ``property_ids`` — для отдельных
+    объектов.
+
+    Returns:
+        dict: {"changed": количество исправленных объектов}
+    """
+    changed = rebuild_rating_summaries(property_ids)
+    if changed:
+        logger.info(f"Rebuilt rating summaries of {changed} properties")
+    return {"changed": changed}
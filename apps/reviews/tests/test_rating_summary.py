@@ -0,0 +1,90 @@
+"""Tests for the review summary columns of properties."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.properties.models import Property
+from apps.reviews.models import Review
+from apps.reviews.services import rebuild_rating_summaries
+from apps.users.models import User
+
+
+class RatingSummaryTests(TestCase):
+    def setUp(self) -> None:
+        self.owner = User.objects.create_user(
+            email="realtor-rating@example.com",
+            phone="+77000000075",
+            password="RealtorPass123",
+            role=User.RoleChoices.REALTOR,
+        )
+        self.guests = [
+            User.objects.create_user(
+                email=f"guest-rating-{index}@example.com",
+                phone=f"+7700000007{6 + index}",
+                password="GuestPass123",
+                role=User.RoleChoices.GUEST,
+            )
+            for index in range(2)
+        ]
+        self.property = self._property("Квартира с отзывами")
+
+    def _property(self, title: str) -> Property:
+        return Property.objects.create(
+            owner=self.owner,
+            title=title,
+            description="Описание",
+            address_line="ул. Абая, 1",
+            status=Property.Status.ACTIVE,
+            base_price=Decimal("12000.00"),
+        )
+
+    def _summary(self, property_obj: Property) -> Property:
+        return Property.objects.get(pk=property_obj.pk)
+
+    def test_create_update_delete_adjust_summary(self) -> None:
+        first = Review.objects.create(user=self.guests[0], property=self.property, rating=5, cleanliness_rating=4)
+        Review.objects.create(user=self.guests[1], property=self.property, rating=4)
+
+        summary = self._summary(self.property)
+        self.assertEqual(summary.reviews_count, 2)
+        self.assertEqual(summary.rating_sum, 9)
+        self.assertEqual(summary.rating_avg, Decimal("4.50"))
+        self.assertEqual(summary.dimension_ratings()["cleanliness"], 4)
+        self.assertIsNone(summary.dimension_ratings()["location"])
+
+        first.rating = 2
+        first.cleanliness_rating = None
+        first.save()
+        summary = self._summary(self.property)
+        self.assertEqual(summary.rating_sum, 6)
+        self.assertEqual(summary.rating_avg, Decimal("3.00"))
+        self.assertEqual(summary.cleanliness_rating_count, 0)
+
+        first.delete()
+        summary = self._summary(self.property)
+        self.assertEqual(summary.reviews_count, 1)
+        self.assertEqual(summary.rating_avg, Decimal("4.00"))
+
+    def test_moving_review_between_properties(self) -> None:
+        other = self._property("Другая квартира")
+        review = Review.objects.create(user=self.guests[0], property=self.property, rating=3)
+
+        review.property = other
+        review.save()
+
+        self.assertEqual(self._summary(self.property).reviews_count, 0)
+        self.assertEqual(self._summary(self.property).rating_avg, Decimal("0.00"))
+        self.assertEqual(self._summary(other).rating_sum, 3)
+
+    def test_rebuild_repairs_drift(self) -> None:
+        Review.objects.create(user=self.guests[0], property=self.property, rating=5, value_rating=3)
+        Property.objects.filter(pk=self.property.pk).update(reviews_count=7, rating_sum=1)
+
+        self.assertEqual(rebuild_rating_summaries(), 1)
+        summary = self._summary(self.property)
+        self.assertEqual((summary.reviews_count, summary.rating_sum), (1, 5))
+        self.assertEqual(summary.value_rating_sum, 3)
+        self.assertEqual(rebuild_rating_summaries([self.property.pk]), 0)
@@ -10,6 +10,7 @@ from asgiref.sync import sync_to_async
 from django.utils import timezone  # type: ignore
 from django.db.models import Q  # type: ignore
 from django.core.exceptions import ValidationError  # type: ignore
+from django.db import IntegrityError, transaction  # type: ignore
 
 from telegram import ReplyKeyboardMarkup, ReplyKeyboardRemove, Update, InlineKeyboardButton, InlineKeyboardMarkup  # type: ignore
 from telegram.ext import (  # type: ignore
@@ -26,10 +27,18 @@ from apps.properties.models import Property, PropertyAvailability, Location
 from apps.favorites.models import Favorite
 from apps.reviews.models import Review
 from apps.notifications.models import Notification
+from apps.notifications.unread import mark_read as mark_notifications_read
 from apps.bookings.models import Booking
-from apps.bookings.services import ensure_property_is_available, reserve_dates_for_booking
+from apps.bookings.services import (
+    DATES_TAKEN_MESSAGE,
+    BookingConflictError,
+    ensure_property_is_available,
+    reserve_dates_for_booking,
+)
 from apps.finances.models import Payment
 from apps.users.models import CustomUser, RealEstateAgency
+from apps.users.api.leaderboard import invalidate_for_booking_on_commit
+from apps.telegrambot.persistence import BotApplication, CachePersistence
 from apps.telegrambot.services import (
     confirm_link_code,
     format_user_name,
@@ -37,6 +46,8 @@ from apps.telegrambot.services import (
     initiate_link_existing_account as _initiate_link_existing_account_sync,
     register_new_user as _register_new_user_sync,
 )
+from apps.properties.search import PropertySearch
+from shared.infrastructure.pagination import InvalidCursor
 
 logger = logging.getLogger(__name__)
 
@@ -395,8 +406,13 @@ async def search_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         "srch_district",
         "srch_class",
         "srch_rooms",
-        "sres_ids",
+        "sres_query",
+        "sres_cards",
         "sres_idx",
+        "sres_offset",
+        "sres_total",
+        "sres_cursors",
+        "sres_next",
     ]:
         context.user_data.pop(k, None)
 
@@ -642,106 +658,107 @@ async def search_perform(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await update.message.reply_text("Пожалуйста, выберите количество комнат из предложенных вариантов:", reply_markup=kb)
         return SRCH_ROOMS
 
-    # Build queryset with filters + availability window
-    checkin = context.user_data.get("srch_checkin")
-    checkout = context.user_data.get("srch_checkout")
-    city = context.user_data.get("srch_city")
-    district = context.user_data.get("srch_district")
-    prop_class = context.user_data.get("srch_class")
     rooms = context.user_data.get("srch_rooms")
+    # Параметры PropertySearch; хранятся для загрузки следующих страниц
+    criteria = {
+        "checkin": context.user_data.get("srch_checkin"),
+        "checkout": context.user_data.get("srch_checkout"),
+        "city": context.user_data.get("srch_city"),
+        "district": context.user_data.get("srch_district"),
+        "property_class": context.user_data.get("srch_class"),
+        # Для "5+" ищем объекты с 5 или более комнатами
+        "rooms": rooms if rooms is not None and rooms < 5 else None,
+        "rooms_min": rooms if rooms is not None and rooms >= 5 else None,
+    }
 
-    # Выполняем поиск через sync_to_async
-    @sync_to_async
-    def perform_search():
-        qs = Property.objects.select_related('city_location', 'district_location').filter(status=Property.Status.ACTIVE)
-        if city:
-            # Фильтруем по названию города через Location
-            qs = qs.filter(city_location__name=city)
-        if district:
-            # Фильтруем по названию района через Location
-            qs = qs.filter(district_location__name=district)
-        if prop_class:
-            qs = qs.filter(property_class=prop_class)
-        if rooms is not None:
-            # Для "5+" ищем объекты с 5 или более комнатами
-            if rooms >= 5:
-                qs = qs.filter(rooms__gte=rooms)
-            else:
-                qs = qs.filter(rooms=rooms)
-
-        # Exclude blocked and overlapping bookings
-        blocking_statuses = [
-            PropertyAvailability.AvailabilityStatus.BOOKED,
-            PropertyAvailability.AvailabilityStatus.BLOCKED,
-            PropertyAvailability.AvailabilityStatus.MAINTENANCE,
-        ]
-        blocked_ids = list(PropertyAvailability.objects.filter(
-            start_date__lt=checkout,
-            end_date__gt=checkin,
-            status__in=blocking_statuses,
-        ).values_list("property_id", flat=True))
-
-        overlapping_bookings = list(Booking.objects.filter(
-            check_in__lt=checkout,
-            check_out__gt=checkin,
-            status__in=[
-                Booking.Status.PENDING,
-                Booking.Status.CONFIRMED,
-                Booking.Status.IN_PROGRESS,
-            ],
-        ).values_list("property_id", flat=True))
-
-        qs = qs.exclude(id__in=blocked_ids).exclude(id__in=overlapping_bookings).order_by("-is_featured", "-created_at")
-        return list(qs.values_list("id", flat=True))
-
-    ids = await perform_search()
-    if not ids:
+    search = PropertySearch(**criteria)
+    total = await search.acount()
+    if not total:
         await update.message.reply_text("Ничего не найдено. Попробуйте изменить параметры.")
         return ConversationHandler.END
 
-    context.user_data["sres_ids"] = ids
-    context.user_data["sres_idx"] = 0
+    cards, next_cursor = await search.alist()
+    context.user_data.update({
+        "sres_query": criteria,
+        "sres_cards": cards,
+        "sres_idx": 0,
+        "sres_offset": 0,
+        "sres_total": total,
+        # Курсоры начала просмотренных страниц — для перехода назад
+        "sres_cursors": [None],
+        "sres_next": next_cursor,
+    })
     # Show first card
     await search_show_card(update, context, 0)
     return ConversationHandler.END
 
 
+def _search_nav_row(context: ContextTypes.DEFAULT_TYPE) -> list[str]:
+    position = context.user_data.get("sres_offset", 0) + context.user_data.get("sres_idx", 0)
+    nav_row = []
+    if position > 0:
+        nav_row.append("◀️ Назад")
+    nav_row.append("📄 Подробнее")
+    if position < context.user_data.get("sres_total", 0) - 1:
+        nav_row.append("Вперёд ▶️")
+    return nav_row
+
+
+async def search_step(update, context: ContextTypes.DEFAULT_TYPE, step: int) -> None:
+    """Переход к соседней карточке, при необходимости — к соседней странице."""
+    data = context.user_data
+    idx = data.get("sres_idx", 0) + step
+    cards = data.get("sres_cards", [])
+
+    if 0 <= idx < len(cards):
+        await search_show_card(update, context, idx)
+        return
+
+    search = PropertySearch(**data["sres_query"])
+    try:
+        if idx >= len(cards) and data.get("sres_next"):
+            cursor = data["sres_next"]
+            new_cards, next_cursor = await search.alist(cursor)
+            data["sres_cursors"].append(cursor)
+            data["sres_offset"] += len(cards)
+            idx = 0
+        elif idx < 0 and len(data.get("sres_cursors", [])) > 1:
+            data["sres_cursors"].pop()
+            new_cards, next_cursor = await search.alist(data["sres_cursors"][-1])
+            data["sres_offset"] -= len(new_cards)
+            idx = len(new_cards) - 1
+        else:
+            return
+    except InvalidCursor:
+        await update.message.reply_text("Результаты поиска устарели. Начните новый поиск.")
+        return
+
+    if not new_cards:
+        await update.message.reply_text("Результаты поиска изменились. Начните новый поиск.")
+        return
+    data["sres_cards"] = new_cards
+    data["sres_next"] = next_cursor
+    await search_show_card(update, context, idx)
+
+
 async def search_show_card(update, context: ContextTypes.DEFAULT_TYPE, idx: int):
-    ids = context.user_data.get("sres_ids", [])
-    if not ids:
+    cards = context.user_data.get("sres_cards", [])
+    if not cards:
         await update.message.reply_text("Результаты отсутствуют.", reply_markup=ReplyKeyboardRemove())
         return
-    idx = max(0, min(idx, len(ids) - 1))
+    idx = max(0, min(idx, len(cards) - 1))
     context.user_data["sres_idx"] = idx
+    position = context.user_data.get("sres_offset", 0) + idx
+    total = context.user_data.get("sres_total", len(cards))
 
-    # Загружаем объект через sync_to_async с предзагрузкой Location FK
-    @sync_to_async
-    def get_property(prop_id):
-        try:
-            prop = Property.objects.select_related('city_location', 'district_location').get(id=prop_id)
-            # Format all data within sync context
-            return {
-                'id': prop.id,
-                'title': prop.title,
-                'location': _format_location(prop),
-                'base_price': prop.base_price,
-                'currency': prop.currency,
-                'rooms': prop.rooms,
-                'sleeping_places': prop.sleeping_places,
-            }
-        except Property.DoesNotExist:
-            return None
-
-    prop = await get_property(ids[idx])
-    if not prop:
-        await update.message.reply_text("Объект не найден.", reply_markup=ReplyKeyboardRemove())
-        return
+    # Поля карточки загружены вместе со страницей результатов
+    prop = cards[idx]
 
     # Сохраняем текущий property_id для последующих действий
     context.user_data["current_property_id"] = prop['id']
 
     text = (
-        f"[{idx+1}/{len(ids)}]\n"
+        f"[{position+1}/{total}]\n"
         f"🏠 {prop['title']}\n"
         f"📍 {prop['location']}\n"
         f"💰 {prop['base_price']} {prop['currency']}/ночь\n"
@@ -752,13 +769,7 @@ async def search_show_card(update, context: ContextTypes.DEFAULT_TYPE, idx: int)
     buttons = []
 
     # Кнопки навигации
-    nav_row = []
-    if idx > 0:
-        nav_row.append("◀️ Назад")
-    nav_row.append("📄 Подробнее")
-    if idx < len(ids) - 1:
-        nav_row.append("Вперёд ▶️")
-    buttons.append(nav_row)
+    buttons.append(_search_nav_row(context))
 
     # Кнопки действий
     buttons.append(["📅 Забронировать", "⭐ В избранное"])
@@ -771,19 +782,18 @@ async def search_show_card(update, context: ContextTypes.DEFAULT_TYPE, idx: int)
 async def search_results_navigation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик навигации по результатам поиска и действий с объектами."""
     txt = (update.message.text or "").strip()
-    idx = context.user_data.get("sres_idx", 0)
-    ids = context.user_data.get("sres_ids", [])
+    cards = context.user_data.get("sres_cards", [])
 
-    if not ids:
+    if not cards:
         profile = await get_or_create_profile_from_update(update)
         keyboard = await build_main_menu_async(profile)
         await update.message.reply_text("Результаты поиска отсутствуют.", reply_markup=keyboard)
         return
 
-    if txt == "◀️ Назад" and idx > 0:
-        await search_show_card(update, context, idx - 1)
-    elif txt == "Вперёд ▶️" and idx < len(ids) - 1:
-        await search_show_card(update, context, idx + 1)
+    if txt == "◀️ Назад":
+        await search_step(update, context, -1)
+    elif txt == "Вперёд ▶️":
+        await search_step(update, context, 1)
     elif txt == "📄 Подробнее":
         # Показываем подробную информацию об объекте
         property_id = context.user_data.get("current_property_id")
@@ -793,6 +803,10 @@ async def search_results_navigation(update: Update, context: ContextTypes.DEFAUL
         # Запускаем процесс бронирования через ConversationHandler
         property_id = context.user_data.get("current_property_id")
         if property_id:
+            # Карточка могла устареть: объект заново проверяется на даты поиска
+            if not await PropertySearch(**context.user_data["sres_query"]).aget(property_id):
+                await update.message.reply_text("Объект уже недоступен на выбранные даты. Выберите другой.")
+                return
             context.user_data["booking_property_id"] = property_id
             await start_booking_flow_text(update, context)
     elif txt == "⭐ В избранное":
@@ -843,17 +857,8 @@ async def send_property_detail_text(update: Update, context: ContextTypes.DEFAUL
     )
 
     # Возвращаемся к кнопкам результатов поиска
-    idx = context.user_data.get("sres_idx", 0)
-    ids = context.user_data.get("sres_ids", [])
-
     buttons = []
-    nav_row = []
-    if idx > 0:
-        nav_row.append("◀️ Назад")
-    nav_row.append("📄 Подробнее")
-    if idx < len(ids) - 1:
-        nav_row.append("Вперёд ▶️")
-    buttons.append(nav_row)
+    buttons.append(_search_nav_row(context))
     buttons.append(["📅 Забронировать", "⭐ В избранное"])
     buttons.append(["🔙 Главное меню"])
 
@@ -918,8 +923,6 @@ async def start_booking_flow_text(update: Update, context: ContextTypes.DEFAULT_
         await update.message.reply_text("Объект не найден или неактивен.")
         return
 
-    context.user_data["booking_property"] = prop
-
     # Проверяем, есть ли даты и время из поиска
     srch_checkin = context.user_data.get("srch_checkin")
     srch_checkout = context.user_data.get("srch_checkout")
@@ -1314,31 +1317,31 @@ async def handle_guest_count_from_search(update: Update, context: ContextTypes.D
         except Property.DoesNotExist:
             return None, "Объект не найден."
 
-        # Проверка доступности
+        # Проверка, создание брони и резервирование дат — одна транзакция;
+        # параллельную бронь тех же дат отклоняет исключающее ограничение
         try:
-            ensure_property_is_available(prop, check_in, check_out)
-        except Exception as exc:
-            return None, f"Объект недоступен на выбранные даты: {exc}"
-
-        # Создаём бронь (pending)
-        try:
-            booking = Booking.objects.create(
-                guest=user,
-                property=prop,
-                agency=prop.agency,
-                check_in=check_in,
-                check_out=check_out,
-                guests_count=guests,
-                status=Booking.Status.PENDING,
-            )
+            with transaction.atomic():
+                ensure_property_is_available(prop, check_in, check_out)
+                # Создаём бронь (pending)
+                booking = Booking.objects.create(
+                    guest=user,
+                    property=prop,
+                    agency=prop.agency,
+                    check_in=check_in,
+                    check_out=check_out,
+                    guests_count=guests,
+                    status=Booking.Status.PENDING,
+                )
+                # Резервируем даты
+                reserve_dates_for_booking(booking)
+        except (BookingConflictError, IntegrityError):
+            return None, DATES_TAKEN_MESSAGE
         except ValidationError as e:
             # Validation failed (e.g., too many guests)
             if "превышает допустимое" in str(e):
                 return None, f"❌ Этот объект рассчитан максимум на {prop.sleeping_places} человек. Вы выбрали {guests} гостей. Пожалуйста, выберите другой объект или уменьшите количество гостей."
             error_msg = "; ".join(e.messages) if hasattr(e, 'messages') else str(e)
             return None, f"Ошибка бронирования: {error_msg}"
-        # Резервируем даты
-        reserve_dates_for_booking(booking)
 
         # Уведомления
         Notification.objects.create(
@@ -1381,24 +1384,25 @@ def _create_booking_with_notifications(profile, prop_id, check_in, check_out, gu
     except Property.DoesNotExist:
         return None, "Объект не найден."
 
-    # Проверка доступности
+    # Проверка, создание брони и резервирование дат — одна транзакция;
+    # параллельную бронь тех же дат отклоняет исключающее ограничение
     try:
-        ensure_property_is_available(prop, check_in, check_out)
-    except Exception as exc:
-        return None, f"Объект недоступен на выбранные даты: {exc}"
-
-    # Создаём бронь (pending)
-    booking = Booking.objects.create(
-        guest=user,
-        property=prop,
-        agency=prop.agency,
-        check_in=check_in,
-        check_out=check_out,
-        guests_count=guests,
-        status=Booking.Status.PENDING,
-    )
-    # Резервируем даты
-    reserve_dates_for_booking(booking)
+        with transaction.atomic():
+            ensure_property_is_available(prop, check_in, check_out)
+            # Создаём бронь (pending)
+            booking = Booking.objects.create(
+                guest=user,
+                property=prop,
+                agency=prop.agency,
+                check_in=check_in,
+                check_out=check_out,
+                guests_count=guests,
+                status=Booking.Status.PENDING,
+            )
+            # Резервируем даты
+            reserve_dates_for_booking(booking)
+    except (BookingConflictError, IntegrityError):
+        return None, DATES_TAKEN_MESSAGE
 
     # Уведомления
     Notification.objects.create(
@@ -1701,10 +1705,8 @@ async def my_notifications(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     @sync_to_async
     def get_and_mark_notifications():
         notes = list(Notification.objects.filter(user=profile.user, is_read=False).order_by("-created_at")[:10])
-        # Отмечаем как прочитанные
-        for n in notes:
-            n.is_read = True
-            n.save(update_fields=["is_read"])
+        # Отмечаем как прочитанные одним UPDATE
+        mark_notifications_read(profile.user_id, [n.id for n in notes])
         return notes
 
     notes = await get_and_mark_notifications()
@@ -2368,6 +2370,7 @@ def _realtor_confirm_booking(profile, booking_id):
         return False, "Бронирование уже обработано."
     b.status = Booking.Status.CONFIRMED
     b.save(update_fields=["status"])
+    invalidate_for_booking_on_commit(b.property_id)
     Notification.objects.create(user=b.guest, title="Бронирование подтверждено", message=f"#{b.booking_code}")
     return True, "Подтверждено."
 
@@ -2835,7 +2838,14 @@ def build_application(token: str | None = None) -> Application:
     if not token:
         raise RuntimeError("TELEGRAM_BOT_TOKEN is not configured.")
 
-    application = Application.builder().token(token).build()
+    # Состояние диалогов и user_data общее для всех процессов бота
+    application = (
+        Application.builder()
+        .token(token)
+        .application_class(BotApplication)
+        .persistence(CachePersistence())
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
@@ -2855,6 +2865,8 @@ def build_application(token: str | None = None) -> Application:
             REGISTER_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, register_name)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="register",
+        persistent=True,
     )
     application.add_handler(register_handler)
 
@@ -2868,6 +2880,8 @@ def build_application(token: str | None = None) -> Application:
             LINK_CODE: [MessageHandler(filters.TEXT & ~filters.COMMAND, link_code)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="link",
+        persistent=True,
     )
     application.add_handler(link_handler)
 
@@ -2890,6 +2904,8 @@ def build_application(token: str | None = None) -> Application:
         },
         fallbacks=[CommandHandler("cancel", cancel)],
         conversation_timeout=120,  # 2 минуты
+        name="adv_search",
+        persistent=True,
     )
     application.add_handler(adv_search_handler)
 
@@ -2905,6 +2921,8 @@ def build_application(token: str | None = None) -> Application:
             BOOKING_ASK_GUESTS: [MessageHandler(filters.TEXT & ~filters.COMMAND, booking_finish)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="booking",
+        persistent=True,
     )
     application.add_handler(booking_handler)
 
@@ -2916,6 +2934,8 @@ def build_application(token: str | None = None) -> Application:
             REVIEW_ASK_COMMENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, review_finish)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="review",
+        persistent=True,
     )
     application.add_handler(review_handler)
 
@@ -2937,6 +2957,8 @@ def build_application(token: str | None = None) -> Application:
             ADDPROP_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, add_property_finish)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="addprop",
+        persistent=True,
     )
     application.add_handler(addprop_handler)
 
@@ -2949,6 +2971,8 @@ def build_application(token: str | None = None) -> Application:
             BLOCK_REASON: [MessageHandler(filters.TEXT & ~filters.COMMAND, prop_calendar_add_finish)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="block",
+        persistent=True,
     )
     application.add_handler(block_handler)
 
@@ -2978,6 +3002,8 @@ def build_application(token: str | None = None) -> Application:
             SU_SEARCH_USER: [MessageHandler(filters.TEXT & ~filters.COMMAND, superuser_user_search_finish)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="su_user",
+        persistent=True,
     )
     application.add_handler(su_user_handler)
 
@@ -2991,6 +3017,8 @@ def build_application(token: str | None = None) -> Application:
             ]
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="su_assign",
+        persistent=True,
     )
     application.add_handler(su_assign_handler)
 
@@ -3001,6 +3029,8 @@ def build_application(token: str | None = None) -> Application:
             SU_FILTER_CITY_ASK: [MessageHandler(filters.TEXT & ~filters.COMMAND, su_realtor_filter_city_finish)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="su_filter_city",
+        persistent=True,
     )
     application.add_handler(su_filter_city_handler)
 
@@ -3010,6 +3040,8 @@ def build_application(token: str | None = None) -> Application:
             SU_FILTER_AGENCY_ASK: [MessageHandler(filters.TEXT & ~filters.COMMAND, su_realtor_filter_agency_input)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="su_filter_agency",
+        persistent=True,
     )
     application.add_handler(su_filter_agency_handler)
 
@@ -0,0 +1,383 @@
+"""Общее хранилище состояния бота для нескольких процессов.
+
+``CachePersistence`` хранит ``user_data``, ``chat_data`` и состояния
+``ConversationHandler`` в кэше Django (Redis в продакшене), поэтому диалог,
+начатый в одном процессе webhook, продолжается в другом и переживает
+перезапуск.
+
+Чтение ленивое: при старте ничего не загружается, а ``BotApplication``
+перед обработкой обновления одним ``get_many`` подгружает состояния
+диалогов и данные пользователя и чата этого обновления.
+
+Запись пакетная: изменения, собранные ``update_persistence`` после
+обработки, копятся в буфере процесса и записываются одним ``set_many``
+(и одним ``delete_many``). При ``flush_interval`` 0 (по умолчанию) буфер
+записывается до завершения обработки обновления, и следующее обновление
+чата в любом процессе видит новое состояние. При ``flush_interval`` > 0
+запись откладывается на этот срок или до заполнения буфера; пока запись не
+ушла в кэш, чтение в этом процессе берёт значения из буфера, а другие
+процессы видят прежнее состояние. Поэтому отложенная запись допустима,
+только если обновления одного чата обрабатывает один процесс (очередь
+webhook упорядочивает чат лишь в пределах процесса). Значения хранятся
+компактным JSON; даты, время, ``Decimal`` и словари с нестроковыми ключами
+кодируются метками.
+
+Кэш должен сообщать об ошибках (алиас ``telegram_state`` без
+``IGNORE_EXCEPTIONS``): если прочитать состояние не удалось, обработка
+продолжается с состоянием в памяти процесса, а неудачная запись
+повторяется.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings  # type: ignore
+from django.core.cache import caches  # type: ignore
+from telegram.ext import Application, BasePersistence, ConversationHandler, PersistenceInput  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "telegrambot:state:"
+_MISSING = object()
+# Кэш недоступен: данные в памяти процесса не перезаписываются
+_KEEP = object()
+# Пауза перед повтором неудачной записи, секунды
+FLUSH_RETRY_DELAY = 1.0
+
+
+# Сериализация
+def _pack(value: Any) -> Any:
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: _pack(item) for key, item in value.items()}
+        return {"$items": [[_pack(key), _pack(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_pack(item) for item in value]
+    # datetime — подкласс date, проверяется первым
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, time):
+        return {"$t": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError(f"Cannot store {type(value).__name__} in bot state")
+
+
+def _unpack_object(obj: dict) -> Any:
+    if len(obj) == 1:
+        tag, raw = next(iter(obj.items()))
+        if tag == "$items":
+            return {_freeze(key): value for key, value in raw}
+        if tag == "$dt":
+            return datetime.fromisoformat(raw)
+        if tag == "$d":
+            return date.fromisoformat(raw)
+        if tag == "$t":
+            return time.fromisoformat(raw)
+        if tag == "$dec":
+            return Decimal(raw)
+    return obj
+
+
+def _freeze(key: Any) -> Any:
+    # Ключ словаря из JSON-списка снова становится кортежем
+    return tuple(key) if isinstance(key, list) else key
+
+
+def dumps(value: Any) -> str:
+    """Компактное JSON-представление состояния."""
+    return json.dumps(_pack(value), ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(raw: str) -> Any:
+    return json.loads(raw, object_hook=_unpack_object)
+
+
+def conversation_key(handler: ConversationHandler, update: Any) -> tuple | None:
+    """Ключ диалога обновления по правилам ``ConversationHandler``."""
+    chat = update.effective_chat
+    user = update.effective_user
+    key: list = []
+    if handler.per_chat:
+        if chat is None:
+            return None
+        key.append(chat.id)
+    if handler.per_user:
+        if user is None:
+            return None
+        key.append(user.id)
+    if handler.per_message:
+        query = update.callback_query
+        if query is None:
+            return None
+        key.append(query.inline_message_id or query.message.message_id)
+    return tuple(key)
+
+
+class CachePersistence(BasePersistence):
+    """Хранилище состояния бота в кэше Django с отложенной пакетной записью.
+
+    Args:
+        cache_alias: кэш для состояния.
+        ttl: сколько секунд хранить состояние с последнего изменения.
+        flush_interval: задержка отложенной записи, секунды.
+        batch_size: размер буфера, при котором запись не ждёт интервала.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache_alias: str = "telegram_state",
+        ttl: int | None = None,
+        flush_interval: float | None = None,
+        batch_size: int | None = None,
+    ) -> None:
+        flush_interval = settings.TELEGRAM_STATE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=True, user_data=True, callback_data=False),
+            update_interval=max(flush_interval, 0.1),
+        )
+        self.cache_alias = cache_alias
+        self.ttl = settings.TELEGRAM_STATE_TTL if ttl is None else ttl
+        self.flush_interval = flush_interval
+        self.batch_size = settings.TELEGRAM_STATE_BATCH_SIZE if batch_size is None else batch_size
+
+        # Ключ кэша -> JSON или None (удаление)
+        self._pending: dict[str, str | None] = {}
+        self._flushing: dict[str, str | None] = {}
+        # Данные, подгруженные ``load`` для ближайшего refresh_*_data
+        self._loaded: dict[str, Any] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    @property
+    def cache(self):  # type: ignore
+        return caches[self.cache_alias]
+
+    # Ключи
+    @staticmethod
+    def user_key(user_id: int) -> str:
+        return f"{KEY_PREFIX}user:{user_id}"
+
+    @staticmethod
+    def chat_key(chat_id: int) -> str:
+        return f"{KEY_PREFIX}chat:{chat_id}"
+
+    @staticmethod
+    def conversation_cache_key(name: str, key: tuple) -> str:
+        return f"{KEY_PREFIX}conv:{name}:{':'.join(map(str, key))}"
+
+    # Чтение
+    def _local(self, key: str) -> Any:
+        if key in self._pending:
+            return self._pending[key]
+        return self._flushing.get(key, _MISSING)
+
+    async def _read_many(self, keys: list[str]) -> dict[str, Any]:
+        """Значения ключей с учётом буфера; отсутствующие ключи не попадают в ответ."""
+        raw: dict[str, str | None] = {}
+        remote = []
+        for key in keys:
+            value = self._local(key)
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                raw[key] = value
+        if remote:
+            raw.update(await self.cache.aget_many(remote))
+        return {key: loads(value) for key, value in raw.items() if value is not None}
+
+    async def load(self, application: Application, update: Any) -> list[str]:
+        """Подгружает состояние обновления одним запросом к кэшу.
+
+        Returns:
+            list[str]: ключи данных, отложенных для ``refresh_*_data``;
+            после обработки их нужно передать в ``release``.
+        """
+        conversations = []
+        for handlers in application.handlers.values():
+            for handler in handlers:
+                if isinstance(handler, ConversationHandler) and handler.persistent:
+                    key = conversation_key(handler, update)
+                    if key is not None:
+                        conversations.append((handler, key, self.conversation_cache_key(handler.name, key)))
+
+        keys = [cache_key for _, _, cache_key in conversations]
+        user = getattr(update, "effective_user", None)
+        chat = getattr(update, "effective_chat", None)
+        if user is not None:
+            keys.append(self.user_key(user.id))
+        if chat is not None:
+            keys.append(self.chat_key(chat.id))
+        if not keys:
+            return []
+
+        try:
+            values = await self._read_many(keys)
+        except Exception:
+            logger.exception("Failed to load bot state for update %s, using local state", getattr(update, "update_id", None))
+            values = None
+        loaded = []
+        if user is not None:
+            loaded.append(self.user_key(user.id))
+        if chat is not None:
+            loaded.append(self.chat_key(chat.id))
+        if values is None:
+            for key in loaded:
+                self._loaded[key] = _KEEP
+            return loaded
+
+        for handler, key, cache_key in conversations:
+            state = values.get(cache_key)
+            if state is None:
+                # Диалог завершён (возможно, в другом процессе); удаление
+                # мимо отслеживания, чтобы не записывать его обратно
+                handler._conversations.data.pop(key, None)
+            else:
+                handler._conversations.update_no_track({key: state})
+        for key in loaded:
+            self._loaded[key] = values.get(key, {})
+        return loaded
+
+    def release(self, keys: list[str]) -> None:
+        # Если обновление не дошло до обработчика, refresh_*_data не вызывался
+        for key in keys:
+            self._loaded.pop(key, None)
+
+    async def _refresh(self, key: str, data: dict) -> None:
+        stored = self._loaded.pop(key, _MISSING)
+        if stored is _MISSING:
+            try:
+                stored = (await self._read_many([key])).get(key, {})
+            except Exception:
+                logger.exception("Failed to read bot state %s, using local state", key)
+                stored = _KEEP
+        if stored is _KEEP:
+            return
+        data.clear()
+        data.update(stored)
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        await self._refresh(self.user_key(user_id), user_data)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        await self._refresh(self.chat_key(chat_id), chat_data)
+
+    async def refresh_bot_data(self, bot_data: Any) -> None:
+        pass
+
+    # Данные подгружаются по обновлениям, а не при старте
+    async def get_user_data(self) -> dict:
+        return {}
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        return {}
+
+    # Запись
+    def _buffer(self, key: str, value: Any) -> None:
+        try:
+            self._pending[key] = None if value is None else dumps(value)
+        except TypeError:
+            logger.exception("Bot state %s is not serializable, skipped", key)
+            return
+        if len(self._pending) >= self.batch_size:
+            self._schedule_flush(0)
+        elif self._timer is None:
+            self._schedule_flush(self.flush_interval)
+
+    def _schedule_flush(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._buffer(self.user_key(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        self._buffer(self.chat_key(chat_id), data)
+
+    async def update_conversation(self, name: str, key: tuple, new_state: object | None) -> None:
+        self._buffer(self.conversation_cache_key(name, key), new_state)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._buffer(self.user_key(user_id), None)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._buffer(self.chat_key(chat_id), None)
+
+    async def update_bot_data(self, data: Any) -> None:
+        pass
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Записывает буфер в кэш одним пакетом."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._flushing.update(batch)
+        try:
+            to_set = {key: value for key, value in batch.items() if value is not None}
+            to_delete = [key for key, value in batch.items() if value is None]
+            if to_set:
+                await self.cache.aset_many(to_set, self.ttl)
+            if to_delete:
+                await self.cache.adelete_many(to_delete)
+        except Exception:
+            logger.exception("Failed to flush %s bot state entries, will retry", len(batch))
+            for key, value in batch.items():
+                self._pending.setdefault(key, value)
+            self._schedule_flush(max(self.flush_interval, FLUSH_RETRY_DELAY))
+        finally:
+            for key, value in batch.items():
+                if self._flushing.get(key) is value:
+                    del self._flushing[key]
+
+
+class BotApplication(Application):
+    """Приложение бота, подгружающее общее состояние перед каждым обновлением."""
+
+    async def process_update(self, update: object) -> None:
+        persistence = self.persistence
+        if not isinstance(persistence, CachePersistence):
+            await super().process_update(update)
+            return
+        loaded = await persistence.load(self, update)
+        try:
+            await super().process_update(update)
+        finally:
+            persistence.release(loaded)
+        await self.update_persistence()
+        if persistence.flush_interval <= 0:
+            # Состояние записано до того, как чат получит следующее обновление
+            await persistence.flush()
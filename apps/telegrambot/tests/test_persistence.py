@@ -0,0 +1,157 @@
+"""Tests for the shared bot state store: serialization and cross-process dialogs."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from telegram import Update, User
+from telegram.ext import Application, CommandHandler, ConversationHandler, ExtBot, MessageHandler, filters
+
+from apps.telegrambot.persistence import BotApplication, CachePersistence, dumps, loads
+
+ASK_CITY = 1
+USER_ID = 501
+BOT_USER = User(id=1, is_bot=True, first_name="Bot", username="test_bot")
+
+
+async def ask_city(update, context) -> int:  # type: ignore
+    context.user_data["checkin"] = date(2025, 3, 1)
+    return ASK_CITY
+
+
+async def save_city(update, context) -> int:  # type: ignore
+    context.user_data["city"] = update.message.text
+    return ConversationHandler.END
+
+
+def build(persistence: CachePersistence) -> Application:
+    application = (
+        Application.builder()
+        .token("1:test")
+        .application_class(BotApplication)
+        .persistence(persistence)
+        .build()
+    )
+    application.add_handler(
+        ConversationHandler(
+            entry_points=[CommandHandler("search", ask_city)],
+            states={ASK_CITY: [MessageHandler(filters.TEXT & ~filters.COMMAND, save_city)]},
+            fallbacks=[],
+            name="search",
+            persistent=True,
+        )
+    )
+    return application
+
+
+def message(application: Application, update_id: int, text: str) -> Update:
+    entities = [{"type": "bot_command", "offset": 0, "length": len(text)}] if text.startswith("/") else []
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": USER_ID, "type": "private"},
+                "from": {"id": USER_ID, "is_bot": False, "first_name": "Guest"},
+                "text": text,
+                "entities": entities,
+            },
+        },
+        application.bot,
+    )
+
+
+cache = caches["telegram_state"]
+
+
+class CachePersistenceTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_compact_serialization_round_trip(self) -> None:
+        state = {
+            "srch_checkin": date(2025, 3, 1),
+            "paid_at": datetime(2025, 3, 1, 14, 30),
+            "price": Decimal("1500.50"),
+            "sres_ids": [3, 1, 2],
+            "by_id": {7: "Алматы"},
+            "srch_city": None,
+        }
+        raw = dumps(state)
+        self.assertNotIn(" ", raw.replace("Алматы", ""))
+        self.assertEqual(loads(raw), state)
+
+    @mock.patch.object(ExtBot, "bot", new_callable=mock.PropertyMock, return_value=BOT_USER)
+    @mock.patch.object(ExtBot, "get_me", new_callable=mock.AsyncMock, return_value=BOT_USER)
+    def test_dialog_continues_in_another_process(self, get_me, bot) -> None:  # type: ignore
+        async def scenario() -> tuple[dict, dict, dict | None]:
+            first = build(CachePersistence(flush_interval=60))
+            second = build(CachePersistence(flush_interval=60))
+            await first.initialize()
+            await second.initialize()
+
+            await first.process_update(message(first, 1, "/search"))
+            # Запись отложена до flush
+            self.assertIsNone(cache.get(CachePersistence.user_key(USER_ID)))
+            await first.persistence.flush()
+
+            await second.process_update(message(second, 2, "Алматы"))
+            await second.persistence.flush()
+            user_data = dict(second.user_data[USER_ID])
+
+            # Диалог завершён во втором процессе: первый не принимает ответ,
+            # а новый поиск видит данные, записанные вторым
+            await first.process_update(message(first, 3, "Астана"))
+            await first.process_update(message(first, 4, "/search"))
+            first_data = dict(first.user_data[USER_ID])
+            self.assertEqual(first.persistence._loaded, {})
+            conversation = cache.get(CachePersistence.conversation_cache_key("search", (USER_ID, USER_ID)))
+            return user_data, first_data, conversation
+
+        user_data, first_data, conversation = asyncio.run(scenario())
+
+        self.assertEqual(user_data, {"checkin": date(2025, 3, 1), "city": "Алматы"})
+        self.assertEqual(first_data, user_data)
+        self.assertIsNone(conversation)
+
+    @mock.patch.object(ExtBot, "bot", new_callable=mock.PropertyMock, return_value=BOT_USER)
+    @mock.patch.object(ExtBot, "get_me", new_callable=mock.AsyncMock, return_value=BOT_USER)
+    def test_state_is_written_before_the_update_is_released(self, get_me, bot) -> None:  # type: ignore
+        async def scenario() -> dict | None:
+            application = build(CachePersistence(flush_interval=0))
+            await application.initialize()
+            await application.process_update(message(application, 1, "/search"))
+            return cache.get(CachePersistence.user_key(USER_ID))
+
+        self.assertEqual(loads(asyncio.run(scenario())), {"checkin": date(2025, 3, 1)})
+
+    @mock.patch.object(ExtBot, "bot", new_callable=mock.PropertyMock, return_value=BOT_USER)
+    @mock.patch.object(ExtBot, "get_me", new_callable=mock.AsyncMock, return_value=BOT_USER)
+    def test_cache_outage_keeps_local_state_and_retries_writes(self, get_me, bot) -> None:  # type: ignore
+        cache_class = type(cache)
+
+        async def scenario() -> tuple[dict, dict | None]:
+            application = build(CachePersistence(flush_interval=0))
+            await application.initialize()
+            await application.process_update(message(application, 1, "/search"))
+
+            with (
+                mock.patch.object(cache_class, "aget_many", side_effect=ConnectionError("redis is down")),
+                mock.patch.object(cache_class, "aset_many", side_effect=ConnectionError("redis is down")),
+            ):
+                # Диалог продолжается с состоянием в памяти, запись ждёт повтора
+                await application.process_update(message(application, 2, "Алматы"))
+                self.assertTrue(application.persistence._pending)
+            await application.persistence.flush()
+            return dict(application.user_data[USER_ID]), cache.get(CachePersistence.user_key(USER_ID))
+
+        user_data, stored = asyncio.run(scenario())
+
+        self.assertEqual(user_data, {"checkin": date(2025, 3, 1), "city": "Алматы"})
+        self.assertEqual(loads(stored), user_data)
@@ -0,0 +1,115 @@
+"""Tests for the webhook update queue: dedup, per-chat ordering, overflow."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase
+
+from apps.telegrambot.update_queue import ACCEPTED, DUPLICATE, REJECTED, UpdateQueue
+
+
+def make_update(update_id: int, chat_id: int) -> SimpleNamespace:
+    return SimpleNamespace(update_id=update_id, effective_chat=SimpleNamespace(id=chat_id))
+
+
+class UpdateQueueTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_updates_of_one_chat_are_processed_in_order(self) -> None:
+        processed: list[tuple[int, int]] = []
+        active = 0
+        peak = 0
+
+        async def process(update) -> None:  # type: ignore
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Ранние обновления обрабатываются дольше поздних
+            await asyncio.sleep(0.01 * (10 - update.update_id % 10))
+            processed.append((update.effective_chat.id, update.update_id))
+            active -= 1
+
+        async def scenario() -> dict:
+            queue = UpdateQueue(process, workers=3, maxsize=30)
+            for update_id in range(10):
+                for chat_id in (1, 2, 3):
+                    self.assertEqual(await queue.put(make_update(chat_id * 100 + update_id, chat_id)), ACCEPTED)
+            await queue.join()
+            await queue.stop()
+            return queue.metrics()
+
+        metrics = asyncio.run(scenario())
+
+        for chat_id in (1, 2, 3):
+            order = [update_id for chat, update_id in processed if chat == chat_id]
+            self.assertEqual(order, sorted(order))
+        self.assertEqual(peak, 3)
+        self.assertEqual(metrics["processed"], 30)
+        self.assertEqual(metrics["depth"], 0)
+
+    def test_duplicates_are_dropped_and_overflow_is_rejected(self) -> None:
+        release = asyncio.Event()
+        processed: list[int] = []
+        setups: list[int] = []
+
+        async def process(update) -> None:  # type: ignore
+            await release.wait()
+            processed.append(update.update_id)
+
+        async def setup() -> None:
+            setups.append(1)
+
+        async def scenario() -> tuple[list[str], dict, str]:
+            queue = UpdateQueue(process, workers=1, maxsize=2, setup=setup)
+            results = [
+                await queue.put(make_update(1, 7)),
+                await queue.put(make_update(1, 7)),
+            ]
+            await asyncio.sleep(0)  # первое обновление взято в обработку
+            results += [
+                await queue.put(make_update(2, 7)),
+                await queue.put(make_update(3, 7)),
+                await queue.put(make_update(4, 7)),
+            ]
+            metrics = queue.metrics()
+            release.set()
+            await queue.join()
+            # Отклонённое обновление принимается при повторной доставке
+            retried = await queue.put(make_update(4, 7))
+            await queue.join()
+            await queue.stop()
+            return results, metrics, retried
+
+        results, metrics, retried = asyncio.run(scenario())
+
+        self.assertEqual(results, [ACCEPTED, DUPLICATE, ACCEPTED, ACCEPTED, REJECTED])
+        self.assertEqual(retried, ACCEPTED)
+        self.assertEqual(processed, [1, 2, 3, 4])
+        self.assertEqual(setups, [1])
+        self.assertEqual(metrics["depth"], 2)
+        self.assertEqual(metrics["in_progress"], 1)
+        self.assertEqual(metrics["duplicates"], 1)
+        self.assertEqual(metrics["rejected"], 1)
+
+    def test_updates_are_accepted_while_dedup_cache_is_down(self) -> None:
+        processed: list[int] = []
+
+        async def process(update) -> None:  # type: ignore
+            processed.append(update.update_id)
+
+        async def scenario() -> list[str]:
+            queue = UpdateQueue(process, workers=1)
+            # django-redis с IGNORE_EXCEPTIONS возвращает None вместо ошибки
+            with mock.patch.object(type(caches["default"]), "aadd", return_value=None):
+                results = [await queue.put(make_update(1, 7)), await queue.process_inline(make_update(2, 7))]
+            await queue.join()
+            await queue.stop()
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), [ACCEPTED, ACCEPTED])
+        self.assertEqual(sorted(processed), [1, 2])
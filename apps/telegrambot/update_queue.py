@@ -0,0 +1,237 @@
+"""Очередь обновлений Telegram для режима webhook.
+
+Webhook не обрабатывает обновление в запросе: он кладёт его в очередь и
+сразу отвечает Telegram, поэтому медленные обработчики бота больше не
+держат соединение и не вызывают повторных доставок.
+
+Очередь разбита на шарды по числу обработчиков; обновления одного чата
+всегда попадают в один шард и обрабатываются строго по порядку, разные
+чаты — параллельно. Ёмкость ограничена: при переполнении ``put``
+возвращает ``REJECTED`` и webhook отвечает 503, чтобы Telegram доставил
+обновление повторно позже, а не потерял его.
+
+Повторы отсекаются по ``update_id`` через кэш (``cache.add`` с TTL), так что
+при Redis дубликаты отсекаются и между процессами. Пока кэш недоступен,
+обновления принимаются без дедупликации.
+
+Обработчики живут в цикле событий сервера, поэтому очередь работает только
+под ASGI (``config.asgi``). Под WSGI (``runserver``) цикл событий создаётся
+на каждый запрос, и webhook обрабатывает обновление сразу через
+``process_inline`` — с той же дедупликацией. Порядок обновлений чата
+гарантируется в пределах процесса.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings  # type: ignore
+from django.core.cache import caches  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+DEDUP_KEY = "telegrambot:update:{}"
+
+
+def chat_key(update: Any) -> int:
+    """Ключ упорядочивания: чат, иначе пользователь, иначе само обновление."""
+    chat = getattr(update, "effective_chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(update, "effective_user", None)
+    if user is not None:
+        return user.id
+    return update.update_id
+
+
+class UpdateQueue:
+    """Ограниченная очередь обновлений с пулом обработчиков.
+
+    Args:
+        process: корутина обработки одного обновления.
+        workers: число обработчиков (и шардов очереди).
+        maxsize: общая ёмкость очереди.
+        dedup_ttl: сколько секунд помнить принятые ``update_id``.
+        setup: корутина, выполняемая один раз перед первой обработкой.
+        cache_alias: кэш для дедупликации.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[Any], Awaitable[None]],
+        *,
+        workers: int = 4,
+        maxsize: int = 1000,
+        dedup_ttl: int = 3600,
+        setup: Callable[[], Awaitable[None]] | None = None,
+        cache_alias: str = "default",
+    ) -> None:
+        self.process = process
+        self.workers = max(workers, 1)
+        self.shard_size = max(-(-maxsize // self.workers), 1)
+        self.dedup_ttl = dedup_ttl
+        self.setup = setup
+        self.cache_alias = cache_alias
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._shards: list[asyncio.Queue] = []
+        self._tasks: list[asyncio.Task] = []
+        self._setup_lock: asyncio.Lock | None = None
+        self._prepared = False
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.in_progress = 0
+        self.max_depth = 0
+
+    # Приём
+    async def put(self, update: Any) -> str:
+        """Ставит обновление в очередь.
+
+        Returns:
+            str: ``ACCEPTED``, ``DUPLICATE`` (уже принималось) или
+            ``REJECTED`` (очередь переполнена, нужно ответить ошибкой).
+        """
+        self._ensure_started()
+        if not await self._claim(update):
+            self.duplicates += 1
+            return DUPLICATE
+
+        shard = self._shards[chat_key(update) % self.workers]
+        try:
+            shard.put_nowait(update)
+        except asyncio.QueueFull:
+            # Повтор от Telegram должен быть принят, когда очередь освободится
+            await caches[self.cache_alias].adelete(DEDUP_KEY.format(update.update_id))
+            self.rejected += 1
+            logger.warning("Telegram update queue is full, rejected update %s", update.update_id)
+            return REJECTED
+
+        self.accepted += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        return ACCEPTED
+
+    async def process_inline(self, update: Any) -> str:
+        """Обрабатывает обновление сразу, минуя очередь (режим WSGI)."""
+        if not await self._claim(update):
+            self.duplicates += 1
+            return DUPLICATE
+        self.accepted += 1
+        await self._run(update)
+        return ACCEPTED
+
+    async def _claim(self, update: Any) -> bool:
+        """Отмечает ``update_id`` принятым; ``False`` — обновление уже принималось.
+
+        Дубликатом считается только явный отказ ``add``. Если кэш недоступен
+        (ошибка или ``None`` от django-redis с ``IGNORE_EXCEPTIONS``),
+        обновление принимается: повторная обработка лучше потерянной.
+        """
+        key = DEDUP_KEY.format(update.update_id)
+        try:
+            added = await caches[self.cache_alias].aadd(key, 1, self.dedup_ttl)
+        except Exception:
+            logger.exception("Telegram update dedup cache failed, accepting update %s", update.update_id)
+            return True
+        return added is not False
+
+    # Обработка
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None and self.depth:
+            logger.warning("Event loop changed, %s queued Telegram updates are lost", self.depth)
+        self._loop = loop
+        self._shards = [asyncio.Queue(self.shard_size) for _ in range(self.workers)]
+        self._setup_lock = asyncio.Lock()
+        self._tasks = [
+            loop.create_task(self._work(shard), name=f"telegram-update-worker-{index}")
+            for index, shard in enumerate(self._shards)
+        ]
+
+    async def _prepare(self) -> None:
+        if self._prepared or self.setup is None:
+            return
+        if self._setup_lock is None:
+            await self.setup()
+            self._prepared = True
+            return
+        async with self._setup_lock:
+            if not self._prepared:
+                await self.setup()
+                self._prepared = True
+
+    async def _run(self, update: Any) -> None:
+        self.in_progress += 1
+        try:
+            await self._prepare()
+            await self.process(update)
+            self.processed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Failed to process Telegram update %s", update.update_id)
+        finally:
+            self.in_progress -= 1
+
+    async def _work(self, shard: asyncio.Queue) -> None:
+        while True:
+            update = await shard.get()
+            try:
+                await self._run(update)
+            finally:
+                shard.task_done()
+
+    async def join(self) -> None:
+        """Ждёт обработки всех принятых обновлений."""
+        for shard in self._shards:
+            await shard.join()
+
+    async def stop(self) -> None:
+        """Останавливает обработчики; необработанные обновления отбрасываются."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._loop = None
+        self._shards = []
+        self._tasks = []
+
+    # Метрики
+    @property
+    def depth(self) -> int:
+        return sum(shard.qsize() for shard in self._shards)
+
+    def metrics(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.shard_size * self.workers,
+            "shard_depths": [shard.qsize() for shard in self._shards],
+            "workers": self.workers,
+            "in_progress": self.in_progress,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+def build_update_queue(application) -> UpdateQueue:  # type: ignore
+    """Очередь webhook для приложения бота с параметрами из настроек."""
+    return UpdateQueue(
+        application.process_update,
+        workers=settings.TELEGRAM_UPDATE_WORKERS,
+        maxsize=settings.TELEGRAM_UPDATE_QUEUE_SIZE,
+        dedup_ttl=settings.TELEGRAM_UPDATE_DEDUP_TTL,
+        setup=application.initialize,
+    )
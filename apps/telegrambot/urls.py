@@ -2,11 +2,12 @@
 
 from django.urls import path
 
-from .views import telegram_webhook, telegram_health
+from .views import telegram_webhook, telegram_health, telegram_queue_metrics
 
 app_name = 'telegrambot'
 
 urlpatterns = [
     path('webhook/', telegram_webhook, name='webhook'),
     path('health/', telegram_health, name='health'),
+    path('queue/', telegram_queue_metrics, name='queue'),
 ]
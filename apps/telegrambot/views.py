@@ -6,17 +6,20 @@ import json
 import logging
 from typing import Any
 
+from django.core.handlers.asgi import ASGIRequest
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from telegram import Update
 
 from .bot import build_application
+from .update_queue import REJECTED, build_update_queue
 
 logger = logging.getLogger(__name__)
 
 # Global application instance (initialized once)
 _application = None
+_update_queue = None
 
 
 def get_application():
@@ -28,6 +31,14 @@ def get_application():
     return _application
 
 
+def get_update_queue():
+    """Get or create the webhook update queue."""
+    global _update_queue
+    if _update_queue is None:
+        _update_queue = build_update_queue(get_application())
+    return _update_queue
+
+
 @csrf_exempt
 @require_POST
 async def telegram_webhook(request: HttpRequest) -> HttpResponse:
@@ -35,7 +46,9 @@ async def telegram_webhook(request: HttpRequest) -> HttpResponse:
     Handle incoming webhook requests from Telegram.
 
     This endpoint receives POST requests from Telegram servers containing
-    updates (messages, callbacks, etc.) and processes them asynchronously.
+    updates (messages, callbacks, etc.), puts them into the update queue and
+    answers immediately; the queue workers process them in the background.
+    A full queue is answered with 503 so that Telegram redelivers the update.
     """
     try:
         # Parse JSON payload
@@ -46,12 +59,20 @@ async def telegram_webhook(request: HttpRequest) -> HttpResponse:
         update = Update.de_json(data, get_application().bot)
 
         if update:
-            # Process the update asynchronously
-            application = get_application()
-            await application.process_update(update)
-
-            logger.info(f"Processed update: {update.update_id}")
-            return JsonResponse({"status": "ok"}, status=200)
+            queue = get_update_queue()
+            if not isinstance(request, ASGIRequest):
+                # Under WSGI the event loop lives for one request only, so the
+                # bot state is written before it ends
+                result = await queue.process_inline(update)
+                await get_application().persistence.flush()
+                return JsonResponse({"status": "ok", "result": result}, status=200)
+
+            result = await queue.put(update)
+            if result == REJECTED:
+                return JsonResponse({"status": "error", "message": "Update queue is full"}, status=503)
+
+            logger.debug(f"Queued update {update.update_id}: {result}")
+            return JsonResponse({"status": "ok", "result": result}, status=200)
         else:
             logger.warning("Received invalid update data")
             return JsonResponse({"status": "error", "message": "Invalid update"}, status=400)
@@ -77,7 +98,8 @@ async def telegram_health(request: HttpRequest) -> HttpResponse:
                 "id": bot_info.id,
                 "username": bot_info.username,
                 "name": bot_info.first_name,
-            }
+            },
+            "queue": get_update_queue().metrics(),
         }, status=200)
     except Exception as e:
         logger.error(f"Health check failed: {e}", exc_info=True)
@@ -85,3 +107,9 @@ async def telegram_health(request: HttpRequest) -> HttpResponse:
             "status": "unhealthy",
             "error": str(e)
         }, status=500)
+
+
+@csrf_exempt
+async def telegram_queue_metrics(request: HttpRequest) -> HttpResponse:
+    """Queue depth and processing counters of the webhook update queue."""
+    return JsonResponse(get_update_queue().metrics(), status=200)
@@ -0,0 +1,94 @@
+"""Cached agency leaderboards (top realtors and properties).
+
+Рейтинг считается в БД сгруппированными агрегатами с ``ORDER BY ... LIMIT``
+(``stats.top_realtors``/``stats.top_properties``) и кэшируется по ключу
+``users:leaderboard:<agency>:v<версия>:<period>:<limit>:<начало периода>``.
+Начало периода отсчитывается от сегодняшней даты, поэтому ключ сменяется
+раз в сутки сам.
+
+Оплата, подтверждение и отмена брони увеличивают версию агентства после
+фиксации транзакции (``cache.incr`` атомарен), и следующее чтение
+пересчитывает рейтинг. Закэшированные рейтинги не дописываются на месте,
+поэтому одновременные оплаты не затирают друг друга, а старые ключи просто
+истекают по TTL. Прочие изменения (деактивация риелтора, снятие объекта)
+попадают в рейтинг по истечении TTL.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.core.cache import cache  # type: ignore
+from django.db import transaction  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from . import stats
+
+CACHE_TIMEOUT = 60 * 60
+VERSION_TIMEOUT = None
+
+VERSION_KEY = "users:leaderboard:{agency_id}:version"
+LEADERBOARD_KEY = "users:leaderboard:{agency_id}:v{version}:{period}:{limit}:{start}"
+
+
+def period_start(period_days: int) -> date:
+    return timezone.localdate() - timedelta(days=period_days)
+
+
+def _version(agency_id: int) -> int:
+    key = VERSION_KEY.format(agency_id=agency_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=VERSION_TIMEOUT)
+        version = 1
+    return version
+
+
+def get_leaderboard(agency_id: int, period_days: int, limit: int) -> dict:
+    """
+    Рейтинг агентства за ``period_days`` дней (из кэша или двумя запросами).
+
+    Returns:
+        dict: ``start_date``, ``top_realtors``, ``top_properties``
+    """
+    start = period_start(period_days)
+    key = LEADERBOARD_KEY.format(
+        agency_id=agency_id,
+        version=_version(agency_id),
+        period=period_days,
+        limit=limit,
+        start=start.isoformat(),
+    )
+    board = cache.get(key)
+    if board is None:
+        board = {
+            "start_date": start,
+            "top_realtors": stats.top_realtors(agency_id, start, limit),
+            "top_properties": stats.top_properties(agency_id, start, limit),
+        }
+        cache.set(key, board, timeout=CACHE_TIMEOUT)
+    return board
+
+
+def invalidate_agency(agency_id: int) -> None:
+    """Делает недействительными все закэшированные рейтинги агентства."""
+    key = VERSION_KEY.format(agency_id=agency_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=VERSION_TIMEOUT)
+
+
+def invalidate_for_booking(property_id: int) -> None:
+    """Сбрасывает рейтинги агентств объекта брони (агентство объекта и владельца)."""
+    from apps.properties.models import Property
+
+    prop = Property.objects.filter(pk=property_id).values("agency_id", "owner__agency_id").first()
+    if prop is None:
+        return
+    for agency_id in {prop["agency_id"], prop["owner__agency_id"]} - {None}:
+        invalidate_agency(agency_id)
+
+
+def invalidate_for_booking_on_commit(property_id: int) -> None:
+    transaction.on_commit(lambda: invalidate_for_booking(property_id))
@@ -0,0 +1,218 @@
+"""Performance statistics for realtors and agencies.
+
+Every counter and the revenue come from a single conditional-aggregation
+query (``Count(filter=...)``/``Sum(filter=...)``) instead of one query per
+number. Realtor stats are annotations on a users queryset, so stats for a
+whole team are one grouped query. The period only narrows the booking
+aggregates, so realtors without bookings still get a row.
+
+Leaderboards (``top_realtors``/``top_properties``) are ranked by the
+database with ``ORDER BY ... LIMIT``; ``leaderboard`` caches them.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum  # type: ignore
+from django.db.models.functions import Coalesce  # type: ignore
+
+from apps.bookings.models import Booking
+from apps.properties.models import Property
+from apps.users.models import CustomUser, RealEstateAgency
+
+REVENUE_STATUSES = (
+    Booking.Status.CONFIRMED,
+    Booking.Status.IN_PROGRESS,
+    Booking.Status.COMPLETED,
+)
+CANCELLED_STATUSES = (
+    Booking.Status.CANCELLED_BY_GUEST,
+    Booking.Status.CANCELLED_BY_REALTOR,
+)
+ZERO = Decimal("0.00")
+
+
+def booking_metrics(prefix: str, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """
+    Conditional aggregates over bookings reached through ``prefix``.
+
+    ``prefix`` is the lookup path to the booking: ``"properties__bookings__"``
+    from a user, ``"bookings__"`` from an agency.
+    """
+    period = Q()
+    if start_date:
+        period &= Q(**{f"{prefix}check_in__gte": start_date})
+    if end_date:
+        period &= Q(**{f"{prefix}check_out__lte": end_date})
+    booking = f"{prefix}id"
+    status = f"{prefix}status"
+    paid = period & Q(**{f"{status}__in": REVENUE_STATUSES, f"{prefix}payment_status": Booking.PaymentStatus.PAID})
+    return {
+        "total_bookings": Count(booking, filter=period & Q(**{f"{booking}__isnull": False})),
+        "confirmed_bookings": Count(booking, filter=period & Q(**{status: Booking.Status.CONFIRMED})),
+        "completed_bookings": Count(booking, filter=period & Q(**{status: Booking.Status.COMPLETED})),
+        "cancelled_bookings": Count(booking, filter=period & Q(**{f"{status}__in": CANCELLED_STATUSES})),
+        "paid_bookings": Count(booking, filter=paid),
+        "total_revenue": Coalesce(Sum(f"{prefix}total_price", filter=paid), ZERO),
+    }
+
+
+def average_booking_value(total_revenue: Decimal, paid_bookings: int) -> Decimal:
+    if not paid_bookings:
+        return ZERO
+    return (total_revenue / paid_bookings).quantize(Decimal("0.01"))
+
+
+def annotate_realtor_stats(queryset, start_date: date | None = None, end_date: date | None = None):  # type: ignore
+    """
+    Users ``queryset`` annotated with their stats, grouped per realtor.
+
+    Properties are counted distinct because each is joined once per booking;
+    bookings appear once per row, so their counts and sums are exact.
+    """
+    return queryset.annotate(
+        properties_count=Count("properties", distinct=True),
+        active_properties=Count(
+            "properties", distinct=True, filter=Q(properties__status=Property.Status.ACTIVE),
+        ),
+        **booking_metrics("properties__bookings__", start_date, end_date),
+    )
+
+
+def realtor_stats_row(realtor: CustomUser, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """Stats dict (``RealtorStatsSerializer``) of a realtor from ``annotate_realtor_stats``."""
+    return {
+        "realtor_id": realtor.id,
+        "realtor_name": realtor.username or realtor.email,
+        "realtor_email": realtor.email,
+        "properties_count": realtor.properties_count,
+        "active_properties": realtor.active_properties,
+        "total_bookings": realtor.total_bookings,
+        "confirmed_bookings": realtor.confirmed_bookings,
+        "completed_bookings": realtor.completed_bookings,
+        "cancelled_bookings": realtor.cancelled_bookings,
+        "total_revenue": realtor.total_revenue,
+        "average_booking_value": average_booking_value(realtor.total_revenue, realtor.paid_bookings),
+        "period_start": start_date,
+        "period_end": end_date,
+    }
+
+
+def realtor_stats(realtor: CustomUser, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """Stats of one realtor in one query."""
+    annotated = annotate_realtor_stats(CustomUser.objects.filter(pk=realtor.pk), start_date, end_date).get()
+    return realtor_stats_row(annotated, start_date, end_date)
+
+
+def realtors_stats(queryset, start_date: date | None = None, end_date: date | None = None) -> list[dict]:  # type: ignore
+    """Stats of every realtor in ``queryset`` in one grouped query."""
+    annotated = annotate_realtor_stats(queryset.order_by("id"), start_date, end_date)
+    return [realtor_stats_row(realtor, start_date, end_date) for realtor in annotated]
+
+
+def _count(queryset) -> Coalesce:  # type: ignore
+    """Scalar subquery counting ``queryset`` rows of the outer agency."""
+    counted = queryset.filter(agency=OuterRef("pk")).order_by().values("agency").annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def agency_stats(agency: RealEstateAgency, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """
+    Agency stats in one query.
+
+    Booking counters and revenue are conditional aggregates over the
+    agency's bookings; realtor and property counts are scalar subqueries
+    of the same statement (joining them would multiply booking rows).
+    """
+    realtors = CustomUser.objects.filter(role=CustomUser.RoleChoices.REALTOR)
+    row = (
+        RealEstateAgency.objects.filter(pk=agency.pk)
+        .annotate(
+            total_realtors=_count(realtors),
+            active_realtors=_count(realtors.filter(is_active=True)),
+            total_properties=_count(Property.objects.all()),
+            active_properties=_count(Property.objects.filter(status=Property.Status.ACTIVE)),
+            **booking_metrics("bookings__", start_date, end_date),
+        )
+        .values(
+            "total_realtors",
+            "active_realtors",
+            "total_properties",
+            "active_properties",
+            "total_bookings",
+            "confirmed_bookings",
+            "completed_bookings",
+            "paid_bookings",
+            "total_revenue",
+        )
+        .get()
+    )
+    paid_bookings = row.pop("paid_bookings")
+    return {
+        "agency_id": agency.id,
+        "agency_name": agency.name,
+        **row,
+        "average_booking_value": average_booking_value(row["total_revenue"], paid_bookings),
+    }
+
+
+def top_realtors(
+    agency_id: int, start_date: date, limit: int, realtor_ids: list[int] | None = None,
+) -> list[dict]:
+    """
+    Active agency realtors ranked by paid revenue of bookings from ``start_date``.
+
+    Grouped ``Sum`` with ``ORDER BY ... LIMIT`` in the database; ties are
+    broken by id so the ranking is stable.
+    """
+    paid = Q(
+        properties__bookings__check_in__gte=start_date,
+        properties__bookings__status__in=REVENUE_STATUSES,
+        properties__bookings__payment_status=Booking.PaymentStatus.PAID,
+    )
+    realtors = CustomUser.objects.filter(
+        agency_id=agency_id, role=CustomUser.RoleChoices.REALTOR, is_active=True,
+    )
+    if realtor_ids is not None:
+        realtors = realtors.filter(pk__in=realtor_ids)
+    rows = (
+        realtors.annotate(revenue=Coalesce(Sum("properties__bookings__total_price", filter=paid), ZERO))
+        .order_by("-revenue", "id")
+        .values("id", "username", "email", "revenue")[:limit]
+    )
+    return [
+        {
+            "realtor_id": row["id"],
+            "realtor_name": row["username"] or row["email"],
+            "realtor_email": row["email"],
+            "revenue": float(row["revenue"]),
+        }
+        for row in rows
+    ]
+
+
+def top_properties(
+    agency_id: int, start_date: date, limit: int, property_ids: list[int] | None = None,
+) -> list[dict]:
+    """Active agency properties with bookings from ``start_date``, most booked first."""
+    counted = Q(bookings__check_in__gte=start_date, bookings__status__in=REVENUE_STATUSES)
+    properties = Property.objects.filter(agency_id=agency_id, status=Property.Status.ACTIVE)
+    if property_ids is not None:
+        properties = properties.filter(pk__in=property_ids)
+    rows = (
+        properties.annotate(bookings_count=Count("bookings", filter=counted))
+        .filter(bookings_count__gt=0)
+        .order_by("-bookings_count", "id")
+        .values("id", "title", "owner__email", "bookings_count")[:limit]
+    )
+    return [
+        {
+            "property_id": row["id"],
+            "property_title": row["title"],
+            "owner_email": row["owner__email"],
+            "bookings_count": row["bookings_count"],
+        }
+        for row in rows
+    ]
@@ -2,16 +2,15 @@
 
 from __future__ import annotations
 
-from datetime import date, timedelta
-from decimal import Decimal
+from datetime import date
 
-from django.db import models  # type: ignore
-from django.utils import timezone  # type: ignore
 from rest_framework import viewsets, status, permissions  # type: ignore
 from rest_framework.decorators import action  # type: ignore
+from rest_framework.exceptions import ValidationError  # type: ignore
 from rest_framework.response import Response  # type: ignore
 
 from apps.users.models import CustomUser, RealEstateAgency
+from . import leaderboard, stats as stats_engine
 from .permissions import IsSuperAdmin, IsAgencyOwner
 from .serializers import (
     RealtorListSerializer,
@@ -23,6 +22,35 @@ from .serializers import (
     AgencySerializer,
 )
 
+MAX_TOP_LIMIT = 50
+MAX_TOP_PERIOD_DAYS = 3650
+
+
+def _parse_period(request) -> tuple[date | None, date | None]:  # type: ignore
+    """Parse optional ``start``/``end`` (YYYY-MM-DD) query params."""
+    period = []
+    for name in ("start", "end"):
+        value = request.query_params.get(name)
+        try:
+            period.append(date.fromisoformat(value) if value else None)
+        except ValueError:
+            raise ValidationError({name: "Ожидается дата в формате YYYY-MM-DD."})
+    return period[0], period[1]
+
+
+def _int_param(request, name: str, default: int, maximum: int) -> int:  # type: ignore
+    """Parse a positive integer query param capped at ``maximum``."""
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValidationError({name: "Ожидается целое число."})
+    if number < 1:
+        raise ValidationError({name: "Должно быть положительным."})
+    return min(number, maximum)
+
 
 class RealtorViewSet(viewsets.ModelViewSet):
     """
@@ -37,6 +65,7 @@ class RealtorViewSet(viewsets.ModelViewSet):
     - POST /api/v1/super-admin/realtors/{id}/deactivate/ - deactivate realtor
     - POST /api/v1/super-admin/realtors/{id}/activate/ - activate realtor
     - GET /api/v1/super-admin/realtors/{id}/stats/ - realtor performance stats
+    - GET /api/v1/super-admin/realtors/stats/ - stats of all agency realtors at once
     """
 
     queryset = CustomUser.objects.select_related("agency").all()
@@ -50,7 +79,7 @@ class RealtorViewSet(viewsets.ModelViewSet):
             return RealtorCreateSerializer  # type: ignore
         if self.action in ["update", "partial_update"]:
             return RealtorUpdateSerializer  # type: ignore
-        if self.action == "stats":
+        if self.action in ["stats", "batch_stats"]:
             return RealtorStatsSerializer  # type: ignore
         return RealtorDetailSerializer  # type: ignore
 
@@ -98,7 +127,6 @@ class RealtorViewSet(viewsets.ModelViewSet):
             ).count()
 
             if agency.realtors_limit > 0 and current_realtors >= agency.realtors_limit:
-                from rest_framework.exceptions import ValidationError
                 raise ValidationError(
                     {
                         "detail": f"Достигнут лимит риелторов для агентства "
@@ -200,19 +228,37 @@ class RealtorViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Parse date filters
-        start_date = request.query_params.get("start")
-        end_date = request.query_params.get("end")
+        start_date, end_date = _parse_period(request)
+        stats_data = stats_engine.realtor_stats(realtor, start_date, end_date)
 
-        if start_date:
-            start_date = date.fromisoformat(start_date)
-        if end_date:
-            end_date = date.fromisoformat(end_date)
+        serializer = RealtorStatsSerializer(stats_data)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-        # Calculate stats
-        stats_data = self._calculate_realtor_stats(realtor, start_date, end_date)
+    @action(detail=False, methods=["get"], url_path="stats", url_name="batch-stats")
+    def batch_stats(self, request):  # type: ignore
+        """
+        Get performance statistics for all realtors visible to the user.
 
-        serializer = RealtorStatsSerializer(stats_data)
+        GET /api/v1/super-admin/realtors/stats/?start=2025-01-01&end=2025-10-31&ids=5,7
+
+        Query params:
+        - start, end (YYYY-MM-DD): Period (optional)
+        - ids (comma-separated): Only these realtors (optional)
+
+        All realtors are computed in one grouped query.
+        """
+        queryset = self.get_queryset()
+        ids = request.query_params.get("ids")
+        if ids:
+            try:
+                queryset = queryset.filter(pk__in=[int(pk) for pk in ids.split(",") if pk.strip()])
+            except ValueError:
+                raise ValidationError({"ids": "Ожидается список id через запятую."})
+
+        start_date, end_date = _parse_period(request)
+        stats_data = stats_engine.realtors_stats(queryset.select_related(None), start_date, end_date)
+
+        serializer = RealtorStatsSerializer(stats_data, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def check_agency_ownership(self, realtor: CustomUser) -> bool:
@@ -228,66 +274,6 @@ class RealtorViewSet(viewsets.ModelViewSet):
         # Check agency match
         return realtor.agency and realtor.agency == user.agency
 
-    def _calculate_realtor_stats(
-        self, realtor: CustomUser, start_date: date | None, end_date: date | None
-    ) -> dict:  # type: ignore
-        """Calculate performance statistics for a realtor."""
-        from apps.bookings.models import Booking
-
-        # Properties stats
-        properties_qs = realtor.properties.all()
-        properties_count = properties_qs.count()
-        active_properties = properties_qs.filter(status="active").count()
-
-        # Bookings stats
-        bookings_qs = Booking.objects.filter(property__owner=realtor)
-
-        # Apply date filters
-        if start_date:
-            bookings_qs = bookings_qs.filter(check_in__gte=start_date)
-        if end_date:
-            bookings_qs = bookings_qs.filter(check_out__lte=end_date)
-
-        total_bookings = bookings_qs.count()
-        confirmed_bookings = bookings_qs.filter(status=Booking.Status.CONFIRMED).count()
-        completed_bookings = bookings_qs.filter(status=Booking.Status.COMPLETED).count()
-        cancelled_bookings = bookings_qs.filter(
-            status__in=[
-                Booking.Status.CANCELLED_BY_GUEST,
-                Booking.Status.CANCELLED_BY_REALTOR,
-            ]
-        ).count()
-
-        # Revenue stats (only confirmed and completed)
-        revenue_qs = bookings_qs.filter(
-            status__in=[Booking.Status.CONFIRMED, Booking.Status.IN_PROGRESS, Booking.Status.COMPLETED],
-            payment_status=Booking.PaymentStatus.PAID,
-        )
-
-        total_revenue = revenue_qs.aggregate(
-            total=models.Sum("total_price")
-        )["total"] or Decimal("0.00")
-
-        average_booking_value = Decimal("0.00")
-        if revenue_qs.count() > 0:
-            average_booking_value = total_revenue / revenue_qs.count()
-
-        return {
-            "realtor_id": realtor.id,
-            "realtor_name": realtor.username or realtor.email,
-            "realtor_email": realtor.email,
-            "properties_count": properties_count,
-            "active_properties": active_properties,
-            "total_bookings": total_bookings,
-            "confirmed_bookings": confirmed_bookings,
-            "completed_bookings": completed_bookings,
-            "cancelled_bookings": cancelled_bookings,
-            "total_revenue": total_revenue,
-            "average_booking_value": average_booking_value,
-            "period_start": start_date,
-            "period_end": end_date,
-        }
-
 
 class AgencyViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -343,17 +329,8 @@ class AgencyViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Parse date filters
-        start_date = request.query_params.get("start")
-        end_date = request.query_params.get("end")
-
-        if start_date:
-            start_date = date.fromisoformat(start_date)
-        if end_date:
-            end_date = date.fromisoformat(end_date)
-
-        # Calculate stats
-        stats_data = self._calculate_agency_stats(agency, start_date, end_date)
+        start_date, end_date = _parse_period(request)
+        stats_data = stats_engine.agency_stats(agency, start_date, end_date)
 
         serializer = AgencyStatsSerializer(stats_data)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -372,6 +349,9 @@ class AgencyViewSet(viewsets.ReadOnlyModelViewSet):
         Returns:
         - Top realtors by revenue
         - Top properties by bookings count
+
+        Ranked in the database and cached per (agency, period, limit);
+        paid bookings update the cached ranking in place.
         """
         user = request.user
 
@@ -384,130 +364,16 @@ class AgencyViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Parse params
-        limit = int(request.query_params.get("limit", 5))
-        period_days = int(request.query_params.get("period", 30))
-
-        start_date = timezone.now().date() - timedelta(days=period_days)
-
-        # Get top realtors
-        from apps.bookings.models import Booking
-
-        realtors = agency.employees.filter(role=CustomUser.RoleChoices.REALTOR, is_active=True)
-
-        # Calculate revenue per realtor
-        realtor_stats = []
-        for realtor in realtors:
-            revenue = Booking.objects.filter(
-                property__owner=realtor,
-                check_in__gte=start_date,
-                status__in=[
-                    Booking.Status.CONFIRMED,
-                    Booking.Status.IN_PROGRESS,
-                    Booking.Status.COMPLETED,
-                ],
-                payment_status=Booking.PaymentStatus.PAID,
-            ).aggregate(total=models.Sum("total_price"))["total"] or Decimal("0.00")
-
-            realtor_stats.append({
-                "realtor_id": realtor.id,
-                "realtor_name": realtor.username or realtor.email,
-                "realtor_email": realtor.email,
-                "revenue": float(revenue),
-            })
-
-        # Sort by revenue
-        top_realtors = sorted(realtor_stats, key=lambda x: x["revenue"], reverse=True)[:limit]
-
-        # Get top properties
-        properties = agency.properties.filter(status="active")
-
-        property_stats = []
-        for prop in properties:
-            bookings_count = Booking.objects.filter(
-                property=prop,
-                check_in__gte=start_date,
-                status__in=[
-                    Booking.Status.CONFIRMED,
-                    Booking.Status.IN_PROGRESS,
-                    Booking.Status.COMPLETED,
-                ],
-            ).count()
-
-            if bookings_count > 0:
-                property_stats.append({
-                    "property_id": prop.id,
-                    "property_title": prop.title,
-                    "owner_email": prop.owner.email,
-                    "bookings_count": bookings_count,
-                })
-
-        # Sort by bookings count
-        top_properties = sorted(property_stats, key=lambda x: x["bookings_count"], reverse=True)[:limit]
+        limit = _int_param(request, "limit", 5, MAX_TOP_LIMIT)
+        period_days = _int_param(request, "period", 30, MAX_TOP_PERIOD_DAYS)
+        board = leaderboard.get_leaderboard(agency.id, period_days, limit)
 
         return Response(
             {
                 "period_days": period_days,
-                "start_date": start_date,
-                "top_realtors": top_realtors,
-                "top_properties": top_properties,
+                "start_date": board["start_date"],
+                "top_realtors": board["top_realtors"],
+                "top_properties": board["top_properties"],
             },
             status=status.HTTP_200_OK,
         )
-
-    def _calculate_agency_stats(
-        self, agency: RealEstateAgency, start_date: date | None, end_date: date | None
-    ) -> dict:  # type: ignore
-        """Calculate agency-level statistics."""
-        from apps.bookings.models import Booking
-
-        # Realtors stats
-        realtors = agency.employees.filter(role=CustomUser.RoleChoices.REALTOR)
-        total_realtors = realtors.count()
-        active_realtors = realtors.filter(is_active=True).count()
-
-        # Properties stats
-        properties = agency.properties.all()
-        total_properties = properties.count()
-        active_properties = properties.filter(status="active").count()
-
-        # Bookings stats
-        bookings_qs = Booking.objects.filter(agency=agency)
-
-        # Apply date filters
-        if start_date:
-            bookings_qs = bookings_qs.filter(check_in__gte=start_date)
-        if end_date:
-            bookings_qs = bookings_qs.filter(check_out__lte=end_date)
-
-        total_bookings = bookings_qs.count()
-        confirmed_bookings = bookings_qs.filter(status=Booking.Status.CONFIRMED).count()
-        completed_bookings = bookings_qs.filter(status=Booking.Status.COMPLETED).count()
-
-        # Revenue stats
-        revenue_qs = bookings_qs.filter(
-            status__in=[Booking.Status.CONFIRMED, Booking.Status.IN_PROGRESS, Booking.Status.COMPLETED],
-            payment_status=Booking.PaymentStatus.PAID,
-        )
-
-        total_revenue = revenue_qs.aggregate(
-            total=models.Sum("total_price")
-        )["total"] or Decimal("0.00")
-
-        average_booking_value = Decimal("0.00")
-        if revenue_qs.count() > 0:
-            average_booking_value = total_revenue / revenue_qs.count()
-
-        return {
-            "agency_id": agency.id,
-            "agency_name": agency.name,
-            "total_realtors": total_realtors,
-            "active_realtors": active_realtors,
-            "total_properties": total_properties,
-            "active_properties": active_properties,
-            "total_bookings": total_bookings,
-            "confirmed_bookings": confirmed_bookings,
-            "completed_bookings": completed_bookings,
-            "total_revenue": total_revenue,
-            "average_booking_value": average_booking_value,
-        }
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""Tests for super admin realtor and agency stats computed in one query."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.properties.models import Location, Property
+from apps.users.api.leaderboard import get_leaderboard
+from apps.users.api.stats import agency_stats, realtor_stats, realtors_stats
+from apps.users.models import RealEstateAgency, User
+
+
+class SuperAdminStatsTests(TestCase):
+    def setUp(self) -> None:
+        self.agency = RealEstateAgency.objects.create(
+            name="Агентство", city="Алматы", phone="+77000000082", email="agency-stats@example.com",
+        )
+        self.admin = User.objects.create_user(
+            email="admin-stats@example.com",
+            phone="+77000000083",
+            password="StrongPass123",
+            role=User.RoleChoices.SUPER_ADMIN,
+            agency=self.agency,
+        )
+        self.first = self._realtor("first-stats@example.com", "+77000000084")
+        self.second = self._realtor("second-stats@example.com", "+77000000085")
+        self.idle = self._realtor("idle-stats@example.com", "+77000000086", is_active=False)
+        self.guest = User.objects.create_user(
+            email="guest-stats@example.com",
+            phone="+77000000087",
+            password="StrongPass123",
+            role=User.RoleChoices.GUEST,
+        )
+        self.city = Location.objects.create(name="Алматы", slug="almaty-stats")
+        self.start = date(2025, 3, 1)
+
+        self.flat = flat = self._property(self.first, Property.Status.ACTIVE)
+        self._property(self.first, Property.Status.DRAFT)
+        self.house = house = self._property(self.second, Property.Status.ACTIVE)
+
+        self._booking(flat, 0, Booking.Status.COMPLETED, paid=True)
+        self._booking(flat, 10, Booking.Status.CONFIRMED, paid=True)
+        self._booking(flat, 20, Booking.Status.CANCELLED_BY_GUEST)
+        self._booking(house, 0, Booking.Status.CONFIRMED)
+        self._booking(house, 60, Booking.Status.IN_PROGRESS, paid=True)
+        cache.clear()
+
+    def _realtor(self, email: str, phone: str, is_active: bool = True) -> User:
+        return User.objects.create_user(
+            email=email,
+            phone=phone,
+            password="StrongPass123",
+            role=User.RoleChoices.REALTOR,
+            agency=self.agency,
+            is_active=is_active,
+        )
+
+    def _property(self, owner: User, status: str) -> Property:
+        return Property.objects.create(
+            owner=owner,
+            agency=self.agency,
+            title=f"Объект {owner.email}",
+            description="Описание",
+            address_line="ул. Абая, 1",
+            city_location=self.city,
+            base_price=Decimal("10000.00"),
+            status=status,
+        )
+
+    def _booking(self, prop: Property, offset: int, status: str, paid: bool = False, nights: int = 2) -> Booking:
+        check_in = self.start + timedelta(days=offset)
+        return Booking.objects.create(
+            property=prop,
+            guest=self.guest,
+            agency=self.agency,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=nights),
+            guests_count=1,
+            status=status,
+            payment_status=Booking.PaymentStatus.PAID if paid else Booking.PaymentStatus.WAITING,
+        )
+
+    def test_realtor_stats_in_one_query(self) -> None:
+        with self.assertNumQueries(1):
+            stats = realtor_stats(self.first)
+
+        self.assertEqual(
+            {key: stats[key] for key in (
+                "properties_count", "active_properties", "total_bookings", "confirmed_bookings",
+                "completed_bookings", "cancelled_bookings", "total_revenue", "average_booking_value",
+            )},
+            {
+                "properties_count": 2,
+                "active_properties": 1,
+                "total_bookings": 3,
+                "confirmed_bookings": 1,
+                "completed_bookings": 1,
+                "cancelled_bookings": 1,
+                "total_revenue": Decimal("40000.00"),
+                "average_booking_value": Decimal("20000.00"),
+            },
+        )
+        # Период сужает только брони
+        period = realtor_stats(self.second, date(2025, 4, 1), date(2025, 6, 1))
+        self.assertEqual((period["properties_count"], period["total_bookings"]), (1, 1))
+        self.assertEqual(period["total_revenue"], Decimal("20000.00"))
+
+    def test_batch_stats_for_all_realtors_in_one_query(self) -> None:
+        queryset = User.objects.filter(agency=self.agency, role=User.RoleChoices.REALTOR)
+        with self.assertNumQueries(1):
+            rows = realtors_stats(queryset)
+
+        by_id = {row["realtor_id"]: row for row in rows}
+        self.assertEqual(set(by_id), {self.first.id, self.second.id, self.idle.id})
+        self.assertEqual(by_id[self.second.id]["total_bookings"], 2)
+        self.assertEqual(by_id[self.idle.id]["total_revenue"], Decimal("0.00"))
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(
+            reverse("superadmin-realtor-batch-stats"), {"ids": f"{self.first.id},{self.second.id}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["realtor_id"] for row in response.data], [self.first.id, self.second.id])
+        self.assertEqual(response.data[0]["total_revenue"], "40000.00")
+
+    def test_agency_stats_in_one_query(self) -> None:
+        with self.assertNumQueries(1):
+            stats = agency_stats(self.agency, end_date=date(2025, 3, 31))
+
+        self.assertEqual(
+            stats,
+            {
+                "agency_id": self.agency.id,
+                "agency_name": "Агентство",
+                "total_realtors": 3,
+                "active_realtors": 2,
+                "total_properties": 3,
+                "active_properties": 2,
+                "total_bookings": 4,
+                "confirmed_bookings": 2,
+                "completed_bookings": 1,
+                "total_revenue": Decimal("40000.00"),
+                "average_booking_value": Decimal("20000.00"),
+            },
+        )
+
+    def test_top_performers_are_ranked_in_the_database_and_cached(self) -> None:
+        with self.assertNumQueries(2):
+            board = get_leaderboard(self.agency.id, 3650, 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_leaderboard(self.agency.id, 3650, 5), board)
+
+        self.assertEqual(
+            [(row["realtor_id"], row["revenue"]) for row in board["top_realtors"]],
+            [(self.first.id, 40000.0), (self.second.id, 20000.0)],
+        )
+        self.assertEqual(
+            [(row["property_id"], row["bookings_count"]) for row in board["top_properties"]],
+            [(self.flat.id, 2), (self.house.id, 2)],
+        )
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(reverse("superadmin-agency-top-performers"), {"limit": 1, "period": 3650})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["top_realtors"], board["top_realtors"][:1])
+        self.assertEqual(client.get(reverse("superadmin-agency-top-performers"), {"limit": "x"}).status_code, 400)
+
+    def test_booking_changes_invalidate_cached_leaderboard(self) -> None:
+        get_leaderboard(self.agency.id, 3650, 1)
+        booking = self._booking(self.house, 30, Booking.Status.PENDING, nights=4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.mark_paid()
+
+        with self.assertNumQueries(2):
+            board = get_leaderboard(self.agency.id, 3650, 1)
+        self.assertEqual(board["top_realtors"][0]["realtor_id"], self.second.id)
+        self.assertEqual(board["top_realtors"][0]["revenue"], 60000.0)
+        self.assertEqual(
+            board["top_properties"],
+            [{
+                "property_id": self.house.id,
+                "property_title": self.house.title,
+                "owner_email": self.second.email,
+                "bookings_count": 3,
+            }],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.mark_cancelled(Booking.CancellationSource.GUEST)
+        board = get_leaderboard(self.agency.id, 3650, 1)
+        self.assertEqual(board["top_realtors"][0]["realtor_id"], self.first.id)
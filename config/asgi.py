@@ -4,6 +4,10 @@ This module exposes the ASGI application used for serving real‑time
 communication (e.g. WebSocket) alongside the traditional HTTP interface.
 Refer to the official Django documentation for more information on using
 ASGI with Django.
+
+HTTP goes to Django; WebSocket connections to ``/ws/chat/`` go to the chat
+application (``apps.chat.realtime``). The lifespan protocol is handled here
+so that the chat broker connection is closed on server shutdown.
 """
 
 import os
@@ -13,4 +17,35 @@ from django.core.asgi import get_asgi_application  # type: ignore
 # DJANGO_SETTINGS_MODULE accordingly.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django setup: the chat application uses models and settings.
+from apps.chat.realtime import ChatWebSocketApp  # noqa: E402
+
+CHAT_WEBSOCKET_PATH = '/ws/chat/'
+
+chat_application = ChatWebSocketApp()
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await chat_application.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'] == CHAT_WEBSOCKET_PATH:
+            await chat_application(scope, receive, send)
+        else:
+            await receive()
+            await send({'type': 'websocket.close'})
+    elif scope['type'] == 'lifespan':
+        await lifespan(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -37,6 +37,44 @@ app.conf.beat_schedule = {
         "task": "bookings.send_upcoming_booking_reminders",
         "schedule": crontab(minute=0, hour="*/6"),  # каждые 6 часов
     },
+    # Доставка доменных событий из outbox - каждые 10 секунд
+    "dispatch-outbox": {
+        "task": "outbox.dispatch_outbox",
+        "schedule": 10.0,
+        "options": {"expires": 9},
+    },
+    # Отправка очереди Telegram-уведомлений - каждые 10 секунд
+    "dispatch-telegram-messages": {
+        "task": "notifications.dispatch_telegram_messages",
+        "schedule": 10.0,
+        "options": {"expires": 9},
+    },
+    # Очистка доставленных сообщений outbox - ежедневно ночью
+    "purge-dispatched-outbox-messages": {
+        "task": "outbox.purge_dispatched_messages",
+        "schedule": crontab(minute=0, hour=3),  # каждый день в 03:00
+    },
+    # Пересчёт карт занятости объектов для поиска - ежедневно ночью
+    "rebuild-occupancy-index": {
+        "task": "properties.rebuild_occupancy_index",
+        "schedule": crontab(minute=30, hour=0),  # каждый день в 00:30
+    },
+    # Инкрементальное обновление дневных агрегатов аналитики - каждые 5 минут
+    "refresh-stale-daily-stats": {
+        "task": "analytics.refresh_stale_daily_stats",
+        "schedule": crontab(minute="*/5"),
+        "options": {"expires": 240},
+    },
+    # Сверка дневных агрегатов за последние дни - ежедневно ночью
+    "rebuild-daily-stats": {
+        "task": "analytics.rebuild_daily_stats",
+        "schedule": crontab(minute=0, hour=1),  # каждый день в 01:00
+    },
+    # Сверка сводки отзывов объектов - ежедневно ночью
+    "rebuild-rating-summaries": {
+        "task": "reviews.rebuild_rating_summaries",
+        "schedule": crontab(minute=30, hour=1),  # каждый день в 01:30
+    },
 }
 
 app.conf.timezone = "Asia/Almaty"
@@ -19,6 +19,8 @@ SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'replace-me-in-production')
 # Encryption key for sensitive data (property access codes)
 # Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
 ENCRYPTION_KEY = os.environ.get('ENCRYPTION_KEY', 'dev-encryption-key-replace-in-production')
+# Previous keys (comma separated), used only to decrypt values during key rotation
+ENCRYPTION_OLD_KEYS = [key for key in os.environ.get('ENCRYPTION_OLD_KEYS', '').split(',') if key]
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -53,6 +55,7 @@ INSTALLED_APPS = [
     'apps.favorites',
     'apps.telegrambot',
     'apps.chat',
+    'apps.outbox',
 ]
 
 MIDDLEWARE = [
@@ -168,6 +171,73 @@ REST_FRAMEWORK = {
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
 
+# Telegram Bot API для уведомлений. TELEGRAM_API_URL можно направить на
+# локальный сервер Bot API; лимиты — сообщений в секунду на бота и пауза
+# между сообщениями одного чата (секунды).
+TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')
+TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')
+TELEGRAM_GLOBAL_RATE = float(os.environ.get('TELEGRAM_GLOBAL_RATE', 30))
+TELEGRAM_CHAT_INTERVAL = float(os.environ.get('TELEGRAM_CHAT_INTERVAL', 1))
+TELEGRAM_MAX_CONNECTIONS = int(os.environ.get('TELEGRAM_MAX_CONNECTIONS', 10))
+# Очередь обновлений webhook: число обработчиков, общая ёмкость и сколько
+# секунд помнить update_id для отсечения повторных доставок.
+TELEGRAM_UPDATE_WORKERS = int(os.environ.get('TELEGRAM_UPDATE_WORKERS', 4))
+TELEGRAM_UPDATE_QUEUE_SIZE = int(os.environ.get('TELEGRAM_UPDATE_QUEUE_SIZE', 1000))
+TELEGRAM_UPDATE_DEDUP_TTL = int(os.environ.get('TELEGRAM_UPDATE_DEDUP_TTL', 3600))
+# Состояние диалогов бота в кэше (алиас 'telegram_state'): срок хранения
+# (секунды), задержка отложенной записи (секунды) и размер буфера,
+# записываемого без задержки. При задержке 0 состояние записывается до
+# завершения обработки обновления; отложенная запись допустима, только если
+# обновления одного чата обрабатывает один процесс (один воркер webhook).
+TELEGRAM_STATE_TTL = int(os.environ.get('TELEGRAM_STATE_TTL', 7 * 24 * 3600))
+TELEGRAM_STATE_FLUSH_INTERVAL = float(os.environ.get('TELEGRAM_STATE_FLUSH_INTERVAL', 0))
+TELEGRAM_STATE_BATCH_SIZE = int(os.environ.get('TELEGRAM_STATE_BATCH_SIZE', 200))
+
+# Чат в реальном времени (WebSocket /ws/chat/). CHAT_REDIS_URL — Redis для
+# рассылки событий между процессами; без него события доходят только до
+# соединений своего процесса. Heartbeat: интервал ping и таймаут тишины
+# клиента (секунды); очередь исходящих кадров соединения; длина сообщения.
+CHAT_REDIS_URL = os.environ.get('CHAT_REDIS_URL', os.environ.get('REDIS_CACHE_URL'))
+CHAT_HEARTBEAT_INTERVAL = float(os.environ.get('CHAT_HEARTBEAT_INTERVAL', 20))
+CHAT_HEARTBEAT_TIMEOUT = float(os.environ.get('CHAT_HEARTBEAT_TIMEOUT', 60))
+CHAT_SEND_QUEUE_SIZE = int(os.environ.get('CHAT_SEND_QUEUE_SIZE', 100))
+CHAT_MESSAGE_MAX_LENGTH = int(os.environ.get('CHAT_MESSAGE_MAX_LENGTH', 4000))
+
+# Cache (Redis). Без REDIS_CACHE_URL используется локальный кэш процесса.
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'IGNORE_EXCEPTIONS': True,
+            },
+            'KEY_PREFIX': 'zhilyego',
+        },
+        # Состояние диалогов бота: ошибки Redis не скрываются, чтобы
+        # недоступный кэш не читался как «состояния нет», а запись повторялась
+        'telegram_state': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+            'KEY_PREFIX': 'zhilyego',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'telegram_state': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'telegram-state',
+        },
+    }
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
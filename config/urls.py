@@ -20,6 +20,7 @@ urlpatterns = [
     path('api/v1/analytics/', include('apps.analytics.urls')),
     path('api/v1/reviews/', include('apps.reviews.urls')),
     path('api/v1/favorites/', include('apps.favorites.urls')),
+    path('api/v1/chat/', include('apps.chat.urls')),
     # Super Admin API
     path('api/v1/super-admin/', include('apps.users.api.urls')),
     # Telegram Bot Webhook
@@ -58,6 +58,15 @@ class MessageBus:
         self._command_handlers[command_type] = handler
         logger.debug(f"Registered command handler for {command_type.__name__}")
 
+    def get_event_handlers(self, event_type: Type[DomainEvent]) -> List[Callable]:
+        """Return handlers registered for an event type (copy)"""
+        return list(self._event_handlers.get(event_type, []))
+
+    @staticmethod
+    def handler_name(handler: Callable) -> str:
+        """Stable handler identifier, used by the outbox to track deliveries"""
+        return f"{handler.__module__}.{getattr(handler, '__qualname__', repr(handler))}"
+
     def handle_command(self, command: Any) -> Any:
         """
         Handle a command
@@ -1,8 +1,9 @@
 """
 Unit of Work Pattern
 
-Manages database transactions and ensures that domain events
-are published only after successful transaction commit.
+Manages database transactions and ensures that domain events are
+stored in the transactional outbox together with the aggregates and
+delivered only after successful transaction commit.
 """
 
 from abc import ABC, abstractmethod
@@ -92,10 +93,12 @@ class DjangoUnitOfWork(AbstractUnitOfWork):
 
     def commit(self):
         """
-        Commit changes and publish events
+        Commit changes and store events in the outbox
 
-        Events are published using Django's transaction.on_commit()
-        to ensure they're only sent after database commit succeeds.
+        Events are written to the transactional outbox inside the same
+        transaction as the aggregates, so they are never lost and never
+        published for rolled-back changes. Delivery to handlers happens
+        in the outbox dispatcher worker, outside the request path.
         """
         logger.debug(f"Committing transaction with {len(self._events)} events")
 
@@ -103,9 +106,10 @@ class DjangoUnitOfWork(AbstractUnitOfWork):
         events = self._events.copy()
         self._events.clear()
 
-        # Schedule event publishing after commit
         if events:
-            transaction.on_commit(lambda: self._publish_events(events))
+            from apps.outbox.services import store_events
+
+            store_events(events)
 
     def rollback(self):
         """Rollback changes and discard events"""
@@ -128,20 +132,3 @@ class DjangoUnitOfWork(AbstractUnitOfWork):
                     f"Collected {len(new_events)} events from "
                     f"{aggregate.__class__.__name__} (ID: {aggregate.id})"
                 )
-
-    def _publish_events(self, events: List[DomainEvent]):
-        """
-        Publish collected events to message bus
-
-        Called after successful transaction commit.
-        """
-        from shared.application.message_bus import message_bus
-
-        logger.info(f"Publishing {len(events)} domain events after commit")
-
-        try:
-            message_bus.publish_events(events)
-        except Exception as e:
-            logger.error(f"Error publishing events: {e}", exc_info=True)
-            # Events are already committed to database
-            # Failure to publish events should be handled by monitoring
\ No newline at end of file
@@ -15,7 +15,7 @@ from typing import List
 from uuid import UUID, uuid4
 
 
-@dataclass
+@dataclass(kw_only=True)
 class Entity(ABC):
     """
     Base class for all entities
@@ -71,7 +71,7 @@ class Aggregate(Entity):
         return self._events.copy()
 
 
-@dataclass
+@dataclass(kw_only=True)
 class DomainEvent:
     """
     Base class for domain events
@@ -3,21 +3,32 @@ Encryption utilities
 
 Provides encryption/decryption for sensitive data like property access codes.
 Uses AES-256 encryption with Fernet (symmetric encryption).
+
+The cipher is built once per key set and cached. Key rotation is supported
+through MultiFernet: new values are encrypted with ENCRYPTION_KEY, values
+encrypted with any key from ENCRYPTION_OLD_KEYS can still be decrypted and
+re-encrypted with rotate_string().
 """
 
-from cryptography.fernet import Fernet
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, MultiFernet
 from django.conf import settings
 import base64
 import hashlib
 
 
-def get_encryption_key() -> bytes:
-    """
-    Get encryption key from settings
+def _derive_key(key) -> bytes:
+    # If key is a string, encode it
+    if isinstance(key, str):
+        # Hash the key to ensure it's 32 bytes
+        key = base64.urlsafe_b64encode(
+            hashlib.sha256(key.encode()).digest()
+        )
+    return key
 
-    The key should be a 32-byte URL-safe base64-encoded key.
-    In production, this should be stored in environment variables.
-    """
+
+def _configured_key():
     key = getattr(settings, 'ENCRYPTION_KEY', None)
 
     if not key:
@@ -26,16 +37,37 @@ def get_encryption_key() -> bytes:
             "Generate one with: python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'"
         )
 
-    # If key is a string, encode it
-    if isinstance(key, str):
-        # Hash the key to ensure it's 32 bytes
-        key = base64.urlsafe_b64encode(
-            hashlib.sha256(key.encode()).digest()
-        )
-
     return key
 
 
+def get_encryption_key() -> bytes:
+    """
+    Get encryption key from settings
+
+    The key should be a 32-byte URL-safe base64-encoded key.
+    In production, this should be stored in environment variables.
+    """
+    return _derive_key(_configured_key())
+
+
+@lru_cache(maxsize=8)
+def _build_cipher(primary_key, old_keys: tuple) -> MultiFernet:
+    # Keys are derived here, once per key set, not on every call
+    return MultiFernet([Fernet(_derive_key(key)) for key in (primary_key, *old_keys)])
+
+
+def get_cipher() -> MultiFernet:
+    """
+    Cached cipher for the current key settings
+
+    The cache is keyed by the raw configured keys, so a call costs a
+    settings lookup and a cache hit; changing settings (e.g.
+    override_settings in tests) yields a new cipher.
+    """
+    old_keys = tuple(key for key in getattr(settings, 'ENCRYPTION_OLD_KEYS', ()) if key)
+    return _build_cipher(_configured_key(), old_keys)
+
+
 def encrypt_string(plaintext: str) -> str:
     """
     Encrypt a string
@@ -45,10 +77,7 @@ def encrypt_string(plaintext: str) -> str:
     if not plaintext:
         return ''
 
-    key = get_encryption_key()
-    fernet = Fernet(key)
-
-    encrypted = fernet.encrypt(plaintext.encode())
+    encrypted = get_cipher().encrypt(plaintext.encode())
     return encrypted.decode()
 
 
@@ -61,8 +90,17 @@ def decrypt_string(encrypted: str) -> str:
     if not encrypted:
         return ''
 
-    key = get_encryption_key()
-    fernet = Fernet(key)
+    decrypted = get_cipher().decrypt(encrypted.encode())
+    return decrypted.decode()
+
+
+def rotate_string(encrypted: str) -> str:
+    """
+    Re-encrypt a value with the current primary key
+
+    Accepts values encrypted with the primary or any old key.
+    """
+    if not encrypted:
+        return ''
 
-    decrypted = fernet.decrypt(encrypted.encode())
-    return decrypted.decode()
\ No newline at end of file
+    return get_cipher().rotate(encrypted.encode()).decode()
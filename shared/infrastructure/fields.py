@@ -3,45 +3,117 @@ Custom Django model fields for sensitive data.
 
 Provides EncryptedCharField that transparently encrypts data
 before saving to database and decrypts when loading.
+
+By default decryption is lazy: rows are loaded with the ciphertext and a
+value is decrypted on first attribute access (then cached on the instance).
+Bulk loads that never read the codes - admin lists, exports of other
+columns - skip decryption entirely, and saving an instance whose codes were
+never read writes the stored ciphertext back unchanged.
 """
 
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 from .encryption import encrypt_string, decrypt_string
 
 
+class EncryptedValue:
+    """Ciphertext loaded from the database, not decrypted yet."""
+
+    __slots__ = ('ciphertext',)
+
+    def __init__(self, ciphertext: str):
+        self.ciphertext = ciphertext
+
+    def decrypt(self) -> str:
+        try:
+            return decrypt_string(self.ciphertext)
+        except Exception:
+            # If decryption fails, return empty string
+            return ''
+
+    def __str__(self):
+        return self.decrypt()
+
+    def __repr__(self):
+        return '<EncryptedValue>'
+
+
+class EncryptedAttribute(DeferredAttribute):
+    """
+    Decrypts EncryptedValue on first access and caches the plaintext.
+
+    Defines __set__ so it is a data descriptor and __get__ runs even when
+    the value is already in the instance __dict__.
+    """
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, EncryptedValue):
+            value = value.decrypt()
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
 class EncryptedCharField(models.TextField):
     """
     CharField that automatically encrypts data before saving
     and decrypts when loading.
 
     Stores encrypted data as text in database.
+
+    Pass lazy=False to decrypt eagerly in from_db_value. Note that
+    values()/values_list() bypass model attributes, so in lazy mode they
+    return EncryptedValue objects (use str() or .decrypt()).
     """
 
     description = "Encrypted text field"
+    descriptor_class = EncryptedAttribute
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, lazy: bool = True, **kwargs):
         # Store max_length for validation but use TextField storage
         self.max_length_validation = kwargs.pop('max_length', None)
+        self.lazy = lazy
         super().__init__(*args, **kwargs)
 
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if not self.lazy:
+            kwargs['lazy'] = False
+        return name, path, args, kwargs
+
     def from_db_value(self, value, expression, connection):
-        """Decrypt when loading from database."""
+        """Decrypt when loading from database (on first access in lazy mode)."""
         if value is None:
             return value
-        try:
-            return decrypt_string(value)
-        except Exception:
-            # If decryption fails, return empty string
+        if not value:
             return ''
+        if self.lazy:
+            return EncryptedValue(value)
+        return EncryptedValue(value).decrypt()
+
+    def pre_save(self, model_instance, add):
+        # Read the raw value so saving does not force decryption
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, EncryptedValue):
+            return value
+        return super().pre_save(model_instance, add)
 
     def get_prep_value(self, value):
         """Encrypt before saving to database."""
         if value is None or value == '':
             return ''
+        if isinstance(value, EncryptedValue):
+            # Never decrypted - store the original ciphertext as is
+            return value.ciphertext
         return encrypt_string(str(value))
 
     def to_python(self, value):
         """Convert to Python string."""
         if value is None:
             return value
-        return str(value)
\ No newline at end of file
+        if isinstance(value, EncryptedValue):
+            return value.decrypt()
+        return str(value)
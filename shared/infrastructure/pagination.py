@@ -0,0 +1,124 @@
+"""
+Cursor (keyset) pagination
+
+Pages are addressed by the sort key of their boundary row instead of an
+offset, so fetching a deep page is an index range scan of page size rows,
+the same cost as the first page. Lists are ordered by ``(-created_at, -id)``
+and backed by composite indexes ending in those columns.
+
+``CreatedAtCursorPagination`` is the DRF paginator for API lists.
+``keyset_page`` (and its async twin ``akeyset_page``) serves callers outside
+DRF (the Telegram bot) and works with any ordering that ends in a unique
+field; its cursors are signed, opaque strings.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Sequence
+
+from django.core import signing
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+CURSOR_SALT = "shared.pagination.cursor"
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest first, ``?cursor=`` navigation, ``?page_size=`` up to 100"""
+
+    ordering = DEFAULT_ORDERING
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class InvalidCursor(ValueError):
+    """The cursor was tampered with or belongs to another ordering"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(ordering: Sequence[str], obj: Any) -> str:
+    """Opaque cursor pointing right after ``obj`` (a model or a ``values()`` row) in ``ordering``"""
+    if isinstance(obj, dict):
+        values = [_encode_value(obj[field.lstrip("-")]) for field in ordering]
+    else:
+        values = [_encode_value(getattr(obj, field.lstrip("-"))) for field in ordering]
+    return signing.dumps({"o": list(ordering), "v": values}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(ordering: Sequence[str], cursor: str) -> list[Any]:
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if payload.get("o") != list(ordering) or len(payload.get("v", ())) != len(ordering):
+        raise InvalidCursor("Cursor does not match the ordering")
+    return payload["v"]
+
+
+def after_position(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """
+    Rows strictly after ``values`` in ``ordering``
+
+    Lexicographic comparison expanded into
+    ``a > x OR (a = x AND b > y) OR ...`` with the direction of each field.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _page_queryset(queryset, ordering: Sequence[str], cursor: str | None, size: int):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(after_position(ordering, decode_cursor(ordering, cursor)))
+    return queryset[: size + 1]
+
+
+def _split_page(rows: list, ordering: Sequence[str], size: int) -> tuple[list, str | None]:
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(ordering, rows[-1])
+
+
+def keyset_page(
+    queryset,
+    *,
+    ordering: Sequence[str] = DEFAULT_ORDERING,
+    cursor: str | None = None,
+    size: int = 20,
+) -> tuple[list, str | None]:
+    """
+    One page of ``queryset`` in ``ordering`` starting after ``cursor``
+
+    Returns the rows and the cursor of the next page (``None`` on the last
+    page). The last field of ``ordering`` must be unique.
+    """
+    rows = list(_page_queryset(queryset, ordering, cursor, size))
+    return _split_page(rows, ordering, size)
+
+
+async def akeyset_page(
+    queryset,
+    *,
+    ordering: Sequence[str] = DEFAULT_ORDERING,
+    cursor: str | None = None,
+    size: int = 20,
+) -> tuple[list, str | None]:
+    """``keyset_page`` for async callers, fetched with async iteration"""
+    rows = [row async for row in _page_queryset(queryset, ordering, cursor, size)]
+    return _split_page(rows, ordering, size)
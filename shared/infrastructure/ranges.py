@@ -0,0 +1,122 @@
+"""
+Date range helpers for PostgreSQL overlap indexes
+
+Periods are stored as two date columns (start inclusive, end exclusive).
+On PostgreSQL they are indexed as ``daterange(start, end, '[)')`` inside a
+GiST exclusion constraint, and overlap queries are written against the same
+expression so the planner can use that index. Other backends (SQLite in
+development and tests) fall back to plain ``start < end AND end > start``
+comparisons and skip the constraint DDL.
+
+The owning row id is indexed as the one-point range
+``int8range(id, id, '[]')`` so the constraint needs no btree_gist extension.
+"""
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import BigIntegerRangeField, DateRangeField
+from django.contrib.postgres.fields.ranges import RangeOperators
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.postgresql.psycopg_any import DateRange, NumericRange
+from django.db.models import F, Func, Q, Value
+
+
+class DateSpan(Func):
+    """``daterange(start, end, '[)')``"""
+
+    function = "DATERANGE"
+    output_field = DateRangeField()
+
+    def __init__(self, start_field: str, end_field: str):
+        super().__init__(F(start_field), F(end_field), Value("[)"))
+
+
+class IdSpan(Func):
+    """``int8range(id, id, '[]')`` - a range containing exactly one id"""
+
+    function = "INT8RANGE"
+    output_field = BigIntegerRangeField()
+
+    def __init__(self, field: str):
+        super().__init__(F(field), F(field), Value("[]"))
+
+
+def _is_postgres(connection) -> bool:
+    return connection.vendor == "postgresql"
+
+
+class PeriodExclusionConstraint(ExclusionConstraint):
+    """
+    No two rows of the same owner may have overlapping periods
+
+    Built on a GiST index over ``(IdSpan(owner), DateSpan(start, end))``.
+    The constraint (and its index) only exist on PostgreSQL; on other
+    backends the DDL and model validation are skipped.
+    """
+
+    def __init__(self, *, name, owner_field, start_field, end_field, condition=None, **kwargs):
+        kwargs.pop("expressions", None)
+        kwargs.pop("index_type", None)
+        self.owner_field = owner_field
+        self.start_field = start_field
+        self.end_field = end_field
+        super().__init__(
+            name=name,
+            expressions=[
+                (IdSpan(owner_field), RangeOperators.OVERLAPS),
+                (DateSpan(start_field, end_field), RangeOperators.OVERLAPS),
+            ],
+            index_type="GIST",
+            condition=condition,
+            **kwargs,
+        )
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        kwargs.pop("expressions", None)
+        kwargs.pop("index_type", None)
+        kwargs["owner_field"] = self.owner_field
+        kwargs["start_field"] = self.start_field
+        kwargs["end_field"] = self.end_field
+        return path, args, kwargs
+
+    def constraint_sql(self, model, schema_editor):
+        if not _is_postgres(schema_editor.connection):
+            return None
+        return super().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if not _is_postgres(schema_editor.connection):
+            return None
+        return super().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if not _is_postgres(schema_editor.connection):
+            return None
+        return super().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using=DEFAULT_DB_ALIAS):
+        if not _is_postgres(connections[using]):
+            return
+        super().validate(model, instance, exclude=exclude, using=using)
+
+
+def filter_overlapping(queryset, *, owner_field, owner_id, start_field, end_field, start, end):
+    """
+    Rows of ``owner_id`` whose ``[start_field, end_field)`` overlaps ``[start, end)``
+
+    On PostgreSQL the predicate matches the expressions of
+    PeriodExclusionConstraint, so the lookup is served by its GiST index.
+    """
+    if _is_postgres(connections[queryset.db]):
+        return queryset.alias(
+            _owner_span=IdSpan(owner_field),
+            _period_span=DateSpan(start_field, end_field),
+        ).filter(
+            _owner_span__overlap=NumericRange(owner_id, owner_id, "[]"),
+            _period_span__overlap=DateRange(start, end, "[)"),
+        )
+    return queryset.filter(
+        Q(**{owner_field: owner_id})
+        & Q(**{f"{start_field}__lt": end})
+        & Q(**{f"{end_field}__gt": start})
+    )